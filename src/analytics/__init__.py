@@ -0,0 +1,9 @@
+"""Analytics package."""
+from .recorder import PortfolioRecorder
+from .metrics import compute_metrics
+from .robustness import (
+    format_monte_carlo, monte_carlo_returns, monte_carlo_trades, run_monte_carlo
+)
+
+__all__ = ['PortfolioRecorder', 'compute_metrics', 'run_monte_carlo', 'format_monte_carlo',
+           'monte_carlo_trades', 'monte_carlo_returns']
@@ -0,0 +1,272 @@
+"""Vectorized performance metrics computed after a run.
+
+These functions take the arrays captured by ``PortfolioRecorder`` (per-bar
+portfolio value and closed-trade records) and compute every metric the
+runners report in a handful of NumPy operations. They replace the stacked
+``Returns``/``SharpeRatio``/``DrawDown``/``TradeAnalyzer`` analyzers, which
+each added a Python callback per bar.
+
+Where a metric was previously produced by a backtrader analyzer, the same
+definition is used so reported numbers do not change:
+
+- ``returns`` mirrors ``bt.analyzers.Returns`` (log total return, average
+  per-bar log return, annualized normalized return)
+- ``sharpe_ratio`` mirrors ``bt.analyzers.SharpeRatio`` defaults (yearly
+  returns, 1% risk-free rate, population standard deviation)
+- ``max_drawdown`` mirrors ``bt.analyzers.DrawDown`` (percent from peak)
+- ``trades`` mirrors the ``total``/``won``/``lost``/``pnl``/``len`` sections
+  of ``bt.analyzers.TradeAnalyzer``
+"""
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+# Trading periods per year used for annualization (daily bars)
+PERIODS_PER_YEAR = 252
+
+# Risk-free rate used by backtrader's SharpeRatio analyzer by default
+RISK_FREE_RATE = 0.01
+
+# backtrader's float date for 1970-01-01
+_EPOCH_ORDINAL = 719163.0
+
+
+def log_returns_summary(initial_value: float, final_value: float, bars: int,
+                        periods_per_year: int = PERIODS_PER_YEAR) -> Dict[str, float]:
+    """Compute the ``Returns`` analyzer summary.
+
+    Args:
+        initial_value: Portfolio value at start
+        final_value: Portfolio value at end
+        bars: Number of bars in the run
+        periods_per_year: Bars per year for annualization
+
+    Returns:
+        Dictionary with 'rtot', 'ravg', 'rnorm' and 'rnorm100'
+    """
+    if initial_value <= 0 or final_value <= 0:
+        rtot = float('-inf')
+    else:
+        rtot = math.log(final_value / initial_value)
+
+    ravg = rtot / bars if bars else 0.0
+    rnorm = math.expm1(ravg * periods_per_year) if ravg > float('-inf') else ravg
+
+    return {
+        'rtot': rtot,
+        'ravg': ravg,
+        'rnorm': rnorm,
+        'rnorm100': rnorm * 100.0,
+    }
+
+
+def max_drawdown(values: np.ndarray) -> Dict[str, float]:
+    """Compute maximum drawdown from a value series.
+
+    Args:
+        values: Per-bar portfolio values
+
+    Returns:
+        Dictionary with 'drawdown' (percent), 'moneydown' and 'len' (bars)
+    """
+    if len(values) == 0:
+        return {'drawdown': 0.0, 'moneydown': 0.0, 'len': 0}
+
+    peaks = np.maximum.accumulate(values)
+    moneydown = peaks - values
+    drawdown = 100.0 * moneydown / peaks
+
+    # Length of the longest stretch spent below a previous peak
+    underwater = moneydown > 0
+    if underwater.any():
+        # Index of the last bar at a peak, for every bar
+        last_peak = np.maximum.accumulate(np.where(underwater, 0, np.arange(len(values))))
+        max_len = int((np.arange(len(values)) - last_peak)[underwater].max())
+    else:
+        max_len = 0
+
+    return {
+        'drawdown': float(drawdown.max()),
+        'moneydown': float(moneydown.max()),
+        'len': max_len,
+    }
+
+
+def yearly_sharpe_ratio(values: np.ndarray, datetimes: np.ndarray, initial_value: float,
+                        riskfreerate: float = RISK_FREE_RATE) -> Optional[float]:
+    """Compute the Sharpe ratio the way ``bt.analyzers.SharpeRatio`` does by default.
+
+    Returns are taken per calendar year and the ratio is not annualized. A run
+    covering a single year has zero return deviation and yields None, exactly
+    like the analyzer.
+
+    Args:
+        values: Per-bar portfolio values
+        datetimes: Per-bar backtrader float dates
+        initial_value: Portfolio value at start
+        riskfreerate: Yearly risk-free rate
+
+    Returns:
+        Sharpe ratio or None if it cannot be computed
+    """
+    if len(values) == 0:
+        return None
+
+    days = np.floor(datetimes - _EPOCH_ORDINAL).astype('int64')
+    years = days.astype('datetime64[D]').astype('datetime64[Y]').astype('int64')
+
+    # Last bar of each year
+    year_ends = np.flatnonzero(np.diff(years, append=years[-1] + 1))
+    end_values = values[year_ends]
+    start_values = np.concatenate(([initial_value], end_values[:-1]))
+    returns = end_values / start_values - 1.0
+
+    excess = returns - riskfreerate
+    deviation = excess.std()
+    if deviation == 0 or not np.isfinite(deviation):
+        return None
+
+    return float(excess.mean() / deviation)
+
+
+def sortino_ratio(returns: np.ndarray, periods_per_year: int = PERIODS_PER_YEAR) -> Optional[float]:
+    """Compute the annualized Sortino ratio from per-bar returns.
+
+    Args:
+        returns: Per-bar simple returns
+        periods_per_year: Bars per year for annualization
+
+    Returns:
+        Sortino ratio or None if there is no downside deviation
+    """
+    if len(returns) == 0:
+        return None
+
+    downside = np.minimum(returns, 0.0)
+    downside_dev = np.sqrt(np.mean(downside * downside))
+    if downside_dev == 0:
+        return None
+
+    return float(returns.mean() / downside_dev * math.sqrt(periods_per_year))
+
+
+def trade_summary(trade_pnl: np.ndarray, trade_pnlcomm: np.ndarray,
+                  trade_barlen: np.ndarray, trades_opened: int) -> Dict[str, Any]:
+    """Summarize closed trades in the layout of ``bt.analyzers.TradeAnalyzer``.
+
+    Args:
+        trade_pnl: Gross P&L of each closed trade
+        trade_pnlcomm: Net P&L (after commission) of each closed trade
+        trade_barlen: Bars each closed trade was open
+        trades_opened: Number of trades opened during the run
+
+    Returns:
+        Nested dictionary with 'total', 'won', 'lost', 'pnl' and 'len' sections
+    """
+    closed = len(trade_pnlcomm)
+    summary: Dict[str, Any] = {
+        'total': {
+            'total': trades_opened,
+            'open': trades_opened - closed,
+            'closed': closed,
+        }
+    }
+    if closed == 0:
+        return summary
+
+    won = trade_pnlcomm >= 0.0
+    lost = ~won
+    won_pnl = trade_pnlcomm[won]
+    lost_pnl = trade_pnlcomm[lost]
+
+    summary['won'] = {
+        'total': int(won.sum()),
+        'pnl': {
+            'total': float(won_pnl.sum()),
+            'average': float(won_pnl.mean()) if len(won_pnl) else 0.0,
+            'max': float(won_pnl.max()) if len(won_pnl) else 0.0,
+        },
+    }
+    summary['lost'] = {
+        'total': int(lost.sum()),
+        'pnl': {
+            'total': float(lost_pnl.sum()),
+            'average': float(lost_pnl.mean()) if len(lost_pnl) else 0.0,
+            'max': float(lost_pnl.min()) if len(lost_pnl) else 0.0,
+        },
+    }
+    summary['pnl'] = {
+        'gross': {'total': float(trade_pnl.sum()), 'average': float(trade_pnl.mean())},
+        'net': {'total': float(trade_pnlcomm.sum()), 'average': float(trade_pnlcomm.mean())},
+    }
+    summary['len'] = {
+        'total': int(trade_barlen.sum()),
+        'average': float(trade_barlen.mean()),
+        'max': int(trade_barlen.max()),
+        'min': int(trade_barlen.min()),
+    }
+    return summary
+
+
+def compute_metrics(recording: Dict[str, Any], initial_value: float,
+                    periods_per_year: int = PERIODS_PER_YEAR) -> Dict[str, Any]:
+    """Compute all run metrics from a ``PortfolioRecorder`` analysis.
+
+    Args:
+        recording: Output of ``PortfolioRecorder.get_analysis()``
+        initial_value: Portfolio value at start
+        periods_per_year: Bars per year for annualization
+
+    Returns:
+        Dictionary of metrics (see module docstring for definitions), plus the
+        per-bar simple returns ('bar_returns') and net closed-trade P&L
+        ('trade_pnl') arrays for resampling
+    """
+    values = recording['values']
+    cash = recording['cash']
+    datetimes = recording['datetime']
+    final_value = float(values[-1]) if len(values) else initial_value
+
+    returns_summary = log_returns_summary(initial_value, final_value, len(values), periods_per_year)
+    drawdown = max_drawdown(values)
+
+    # Per-bar simple returns, including the move from the initial value
+    previous = np.concatenate(([initial_value], values[:-1]))
+    bar_returns = values / previous - 1.0
+
+    # Calmar: annualized return over max drawdown (as fractions)
+    calmar = None
+    if drawdown['drawdown'] > 0:
+        calmar = returns_summary['rnorm'] / (drawdown['drawdown'] / 100.0)
+
+    # Exposure: share of bars with capital in the market
+    invested = np.abs(values - cash) > 1e-9 * np.maximum(np.abs(values), 1.0)
+    exposure = float(invested.mean()) if len(values) else 0.0
+
+    trades = trade_summary(
+        recording['trade_pnl'], recording['trade_pnlcomm'],
+        recording['trade_barlen'], recording['trades_opened']
+    )
+    total_trades = trades['total']['total']
+    won_trades = trades.get('won', {}).get('total', 0)
+    lost_trades = trades.get('lost', {}).get('total', 0)
+
+    return {
+        'final_value': final_value,
+        'total_return': final_value / initial_value - 1.0,
+        'returns': returns_summary,
+        'sharpe_ratio': yearly_sharpe_ratio(values, datetimes, initial_value),
+        'sortino_ratio': sortino_ratio(bar_returns, periods_per_year),
+        'max_drawdown': drawdown['drawdown'],
+        'calmar_ratio': calmar,
+        'exposure': exposure,
+        'trades': trades,
+        'total_trades': total_trades,
+        'won_trades': won_trades,
+        'lost_trades': lost_trades,
+        'win_rate': (won_trades / total_trades * 100) if total_trades > 0 else 0,
+        'bar_returns': bar_returns,
+        'trade_pnl': recording['trade_pnlcomm'],
+    }
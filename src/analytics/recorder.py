@@ -0,0 +1,127 @@
+"""Lightweight run recorder for backtests and optimization.
+
+``PortfolioRecorder`` is the only analyzer the runners attach. Per bar it
+stores the portfolio value, cash and bar date into preallocated NumPy arrays;
+per closed trade it stores the P&L and duration. All metrics are computed
+afterwards by ``src.analytics.metrics.compute_metrics``.
+"""
+from typing import Any, Dict
+
+import backtrader as bt
+import numpy as np
+
+
+# Initial capacity when the run length is not known up front (no preload)
+_DEFAULT_CAPACITY = 1024
+_DEFAULT_TRADE_CAPACITY = 64
+
+
+def _grow(array: np.ndarray) -> np.ndarray:
+    """Return a copy of ``array`` with doubled capacity."""
+    grown = np.empty(max(len(array) * 2, 1), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class PortfolioRecorder(bt.Analyzer):
+    """Records per-bar portfolio value and closed-trade records into arrays.
+
+    Params:
+        capacity: Number of bars to preallocate (None = longest preloaded data)
+    """
+
+    params = (
+        ('capacity', None),
+    )
+
+    def start(self):
+        """Preallocate the recording arrays."""
+        capacity = self.p.capacity  # type: ignore[attr-defined]
+        if capacity is None:
+            # With preloading the full length of every data feed is known
+            capacity = max((data.buflen() for data in self.datas), default=0)
+        capacity = max(capacity, 1) if capacity else _DEFAULT_CAPACITY
+
+        self._values = np.empty(capacity, dtype=np.float64)
+        self._cash = np.empty(capacity, dtype=np.float64)
+        self._datetime = np.empty(capacity, dtype=np.float64)
+        self._bars = 0
+
+        self._trade_pnl = np.empty(_DEFAULT_TRADE_CAPACITY, dtype=np.float64)
+        self._trade_pnlcomm = np.empty(_DEFAULT_TRADE_CAPACITY, dtype=np.float64)
+        self._trade_barlen = np.empty(_DEFAULT_TRADE_CAPACITY, dtype=np.int64)
+        self._trade_dtclose = np.empty(_DEFAULT_TRADE_CAPACITY, dtype=np.float64)
+        self._closed = 0
+        self._opened = 0
+
+        self._fund_cash = 0.0
+        self._fund_value = 0.0
+
+    def notify_fund(self, cash, value, fundvalue, shares):
+        """Keep the latest broker cash/value (delivered once per bar)."""
+        self._fund_cash = cash
+        self._fund_value = value
+
+    def notify_trade(self, trade):
+        """Count opened trades and record closed ones."""
+        if trade.justopened:
+            self._opened += 1
+
+        if not trade.isclosed:
+            return
+
+        i = self._closed
+        if i == len(self._trade_pnl):
+            self._trade_pnl = _grow(self._trade_pnl)
+            self._trade_pnlcomm = _grow(self._trade_pnlcomm)
+            self._trade_barlen = _grow(self._trade_barlen)
+            self._trade_dtclose = _grow(self._trade_dtclose)
+
+        self._trade_pnl[i] = trade.pnl
+        self._trade_pnlcomm[i] = trade.pnlcomm
+        self._trade_barlen[i] = trade.barlen
+        self._trade_dtclose[i] = trade.dtclose
+        self._closed = i + 1
+
+    def next(self):
+        """Record the current bar (also invoked during prenext/nextstart)."""
+        i = self._bars
+        if i == len(self._values):
+            self._values = _grow(self._values)
+            self._cash = _grow(self._cash)
+            self._datetime = _grow(self._datetime)
+
+        self._values[i] = self._fund_value
+        self._cash[i] = self._fund_cash
+        self._datetime[i] = self.strategy.datetime[0]
+        self._bars = i + 1
+
+    def stop(self):
+        """Trim the arrays to the recorded length."""
+        self._values = self._values[:self._bars]
+        self._cash = self._cash[:self._bars]
+        self._datetime = self._datetime[:self._bars]
+
+        self._trade_pnl = self._trade_pnl[:self._closed]
+        self._trade_pnlcomm = self._trade_pnlcomm[:self._closed]
+        self._trade_barlen = self._trade_barlen[:self._closed]
+        self._trade_dtclose = self._trade_dtclose[:self._closed]
+
+    def get_analysis(self) -> Dict[str, Any]:
+        """Return the recorded arrays.
+
+        Returns:
+            Dictionary with per-bar 'values', 'cash', 'datetime' arrays,
+            closed-trade 'trade_pnl', 'trade_pnlcomm', 'trade_barlen',
+            'trade_dtclose' arrays and the 'trades_opened' count
+        """
+        return {
+            'values': self._values,
+            'cash': self._cash,
+            'datetime': self._datetime,
+            'trade_pnl': self._trade_pnl,
+            'trade_pnlcomm': self._trade_pnlcomm,
+            'trade_barlen': self._trade_barlen,
+            'trade_dtclose': self._trade_dtclose,
+            'trades_opened': self._opened,
+        }
@@ -0,0 +1,281 @@
+"""Monte Carlo robustness analysis of backtest results.
+
+A backtest yields a single equity path, so its final value, drawdown and
+Sharpe ratio are point estimates. This module resamples the closed-trade P&L
+list and the per-bar returns of a run thousands of times and reports
+confidence intervals for those metrics.
+
+Three resampling methods are supported:
+
+- ``bootstrap``: draw with replacement (assumes independent trades/returns)
+- ``block``: circular block bootstrap, drawing runs of ``block_size``
+  consecutive observations to preserve short-range autocorrelation
+- ``shuffle``: permute the observed sequence (the final value of returns is
+  unchanged, but the path, hence drawdown, varies)
+
+All resamples are generated and evaluated as 2-D NumPy arrays (one row per
+resample), processed in chunks to bound memory.
+"""
+import math
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .metrics import PERIODS_PER_YEAR
+
+
+METHODS = ('bootstrap', 'block', 'shuffle')
+
+# Array elements materialized per chunk (512 KB of float64, cache friendly)
+_CHUNK_ELEMENTS = 65_536
+
+
+def resample_indices(n: int, n_samples: int, method: str = 'bootstrap',
+                     block_size: int = 5,
+                     rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Generate resampling indices.
+
+    Args:
+        n: Number of observations
+        n_samples: Number of resamples
+        method: 'bootstrap', 'block' or 'shuffle'
+        block_size: Block length for the block bootstrap
+        rng: Random generator (a fresh default generator if None)
+
+    Returns:
+        Integer array of shape (n_samples, n)
+    """
+    rng = rng or np.random.default_rng()
+
+    if method == 'bootstrap':
+        return rng.integers(0, n, size=(n_samples, n))
+
+    if method == 'block':
+        block_size = max(1, min(block_size, n))
+        n_blocks = -(-n // block_size)
+        starts = rng.integers(0, n, size=(n_samples, n_blocks, 1))
+        indices = (starts + np.arange(block_size)) % n
+        return indices.reshape(n_samples, n_blocks * block_size)[:, :n]
+
+    if method == 'shuffle':
+        return rng.permuted(np.broadcast_to(np.arange(n), (n_samples, n)), axis=1)
+
+    raise ValueError(f"Unknown resampling method '{method}', expected one of {METHODS}")
+
+
+def _max_drawdown_percent(equity: np.ndarray, initial_value: float) -> np.ndarray:
+    """Row-wise maximum drawdown (percent) of equity paths starting at initial_value."""
+    peaks = np.maximum.accumulate(equity, axis=1)
+    np.maximum(peaks, initial_value, out=peaks)
+    # Drawdown is 1 - equity / peak; reuse the peaks buffer for the ratio
+    np.divide(equity, peaks, out=peaks)
+    return 100.0 * (1.0 - peaks.min(axis=1))
+
+
+def _sharpe(returns: np.ndarray, periods_per_year: Optional[float]) -> np.ndarray:
+    """Row-wise Sharpe ratio with population deviation (NaN without deviation)."""
+    n = returns.shape[1]
+    mean = returns.sum(axis=1) / n
+    # Single-pass variance from the sum of squares (row-wise dot product)
+    variance = np.einsum('ij,ij->i', returns, returns) / n - mean * mean
+    deviation = np.sqrt(np.maximum(variance, 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(deviation > 1e-12 * np.abs(mean), mean / deviation, np.nan)
+    if periods_per_year:
+        sharpe = sharpe * math.sqrt(periods_per_year)
+    return sharpe
+
+
+def _simulate_trades(pnl: np.ndarray, initial_value: float,
+                     periods_per_year: Optional[float]) -> Dict[str, np.ndarray]:
+    """Evaluate resampled trade P&L sequences (rows) as additive equity paths."""
+    equity = np.cumsum(pnl, axis=1)
+    equity += initial_value
+
+    # Per-trade return: P&L over the equity before the trade
+    returns = np.empty_like(equity)
+    returns[:, 0] = initial_value
+    returns[:, 1:] = equity[:, :-1]
+    np.divide(pnl, returns, out=returns)
+
+    return {
+        'final_value': equity[:, -1].copy(),
+        'sharpe_ratio': _sharpe(returns, periods_per_year),
+        'max_drawdown': _max_drawdown_percent(equity, initial_value),
+    }
+
+
+def _simulate_returns(returns: np.ndarray, initial_value: float,
+                      periods_per_year: Optional[float]) -> Dict[str, np.ndarray]:
+    """Evaluate resampled per-bar return sequences (rows) as compounded equity paths."""
+    equity = np.add(returns, 1.0)
+    np.multiply.accumulate(equity, axis=1, out=equity)
+    equity *= initial_value
+    return {
+        'final_value': equity[:, -1].copy(),
+        'sharpe_ratio': _sharpe(returns, periods_per_year),
+        'max_drawdown': _max_drawdown_percent(equity, initial_value),
+    }
+
+
+def _summarize(samples: np.ndarray, observed: float, confidence: float) -> Dict[str, Any]:
+    """Confidence interval and distribution summary for one metric."""
+    finite = samples[np.isfinite(samples)]
+    if len(finite) == 0:
+        return {'observed': observed, 'mean': None, 'median': None, 'lower': None, 'upper': None}
+
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    lower, median, upper = np.percentile(finite, [tail, 50.0, 100.0 - tail])
+    return {
+        'observed': observed,
+        'mean': float(finite.mean()),
+        'median': float(median),
+        'lower': float(lower),
+        'upper': float(upper),
+    }
+
+
+def _monte_carlo(observations: np.ndarray, simulate, initial_value: float,
+                 n_samples: int, method: str, block_size: int, confidence: float,
+                 periods_per_year: Optional[float], seed: Optional[int]) -> Optional[Dict[str, Any]]:
+    observations = np.asarray(observations, dtype=np.float64)
+    n = len(observations)
+    if n == 0 or n_samples <= 0:
+        return None
+
+    rng = np.random.default_rng(seed)
+    observed = simulate(observations[None, :], initial_value, periods_per_year)
+
+    chunk = max(1, _CHUNK_ELEMENTS // n)
+    collected: Dict[str, list] = {name: [] for name in observed}
+    for start in range(0, n_samples, chunk):
+        size = min(chunk, n_samples - start)
+        indices = resample_indices(n, size, method, block_size, rng)
+        for name, values in simulate(observations[indices], initial_value, periods_per_year).items():
+            collected[name].append(values)
+
+    summary: Dict[str, Any] = {
+        'method': method,
+        'samples': n_samples,
+        'observations': n,
+        'confidence': confidence,
+    }
+    for name, chunks in collected.items():
+        values = np.concatenate(chunks)
+        summary[name] = _summarize(values, float(observed[name][0]), confidence)
+
+    # Share of resamples that ended below the initial value
+    final_values = np.concatenate(collected['final_value'])
+    summary['probability_of_loss'] = float((final_values < initial_value).mean())
+    return summary
+
+
+def monte_carlo_trades(trade_pnl: np.ndarray, initial_value: float, n_samples: int = 10000,
+                       method: str = 'bootstrap', block_size: int = 5,
+                       confidence: float = 0.95, periods_per_year: Optional[float] = None,
+                       seed: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Resample closed-trade P&L and report metric confidence intervals.
+
+    Each resample is an equity path of ``initial_value`` plus the cumulative
+    resampled P&L. The Sharpe ratio is computed from per-trade returns
+    (P&L over equity before the trade).
+
+    Args:
+        trade_pnl: Net P&L of each closed trade, in order
+        initial_value: Portfolio value at start
+        n_samples: Number of resamples
+        method: 'bootstrap', 'block' or 'shuffle'
+        block_size: Block length for the block bootstrap
+        confidence: Confidence level of the reported intervals
+        periods_per_year: Trades per year to annualize the Sharpe ratio (None = per trade)
+        seed: Random seed for reproducible results
+
+    Returns:
+        Dictionary with 'final_value', 'max_drawdown' and 'sharpe_ratio'
+        summaries ('observed', 'mean', 'median', 'lower', 'upper'),
+        'probability_of_loss' and the run settings, or None without trades
+    """
+    return _monte_carlo(trade_pnl, _simulate_trades, initial_value, n_samples, method,
+                        block_size, confidence, periods_per_year, seed)
+
+
+def monte_carlo_returns(bar_returns: np.ndarray, initial_value: float, n_samples: int = 10000,
+                        method: str = 'block', block_size: int = 5,
+                        confidence: float = 0.95,
+                        periods_per_year: Optional[float] = PERIODS_PER_YEAR,
+                        seed: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Resample per-bar returns and report metric confidence intervals.
+
+    Args:
+        bar_returns: Per-bar simple portfolio returns, in order
+        initial_value: Portfolio value at start
+        n_samples: Number of resamples
+        method: 'bootstrap', 'block' or 'shuffle'
+        block_size: Block length for the block bootstrap
+        confidence: Confidence level of the reported intervals
+        periods_per_year: Bars per year to annualize the Sharpe ratio
+        seed: Random seed for reproducible results
+
+    Returns:
+        Dictionary in the layout of ``monte_carlo_trades``, or None without data
+    """
+    return _monte_carlo(bar_returns, _simulate_returns, initial_value, n_samples, method,
+                        block_size, confidence, periods_per_year, seed)
+
+
+def run_monte_carlo(trade_pnl: np.ndarray, bar_returns: np.ndarray, initial_value: float,
+                    settings: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Run trade and return resampling with settings from config.
+
+    Args:
+        trade_pnl: Net P&L of each closed trade
+        bar_returns: Per-bar simple portfolio returns
+        initial_value: Portfolio value at start
+        settings: ``backtest.monte_carlo`` config section ('samples', 'method',
+                  'block_size', 'confidence', 'seed')
+
+    Returns:
+        Dictionary with 'trades' and 'returns' summaries (None when empty)
+    """
+    settings = settings or {}
+    options = {
+        'n_samples': settings.get('samples', 10000),
+        'method': settings.get('method', 'block'),
+        'block_size': settings.get('block_size', 5),
+        'confidence': settings.get('confidence', 0.95),
+        'seed': settings.get('seed'),
+    }
+    return {
+        'trades': monte_carlo_trades(trade_pnl, initial_value, **options),
+        'returns': monte_carlo_returns(bar_returns, initial_value, **options),
+    }
+
+
+def format_monte_carlo(summary: Dict[str, Any]) -> str:
+    """Format a ``run_monte_carlo`` result as report lines.
+
+    Args:
+        summary: Output of ``run_monte_carlo``
+
+    Returns:
+        Multi-line text report
+    """
+    lines = []
+    for source in ('trades', 'returns'):
+        result = summary.get(source)
+        if result is None:
+            continue
+
+        lines.append(f"Monte Carlo ({source}, {result['method']}, {result['samples']:,} samples, "
+                     f"{result['confidence'] * 100:.0f}% CI):")
+        for name, label, fmt in (('final_value', 'Final Value', '${:,.2f}'),
+                                 ('max_drawdown', 'Max Drawdown', '{:.2f}%'),
+                                 ('sharpe_ratio', 'Sharpe Ratio', '{:.2f}')):
+            stats = result[name]
+            if stats['median'] is None:
+                lines.append(f"  {label + ':':<15} N/A")
+                continue
+            lines.append(f"  {label + ':':<15} median {fmt.format(stats['median'])} "
+                         f"[{fmt.format(stats['lower'])}, {fmt.format(stats['upper'])}]")
+        lines.append(f"  {'P(loss):':<15} {result['probability_of_loss'] * 100:.1f}%")
+    return "\n".join(lines)
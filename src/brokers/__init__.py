@@ -1,14 +1,17 @@
 """Brokers package."""
 from .alpaca_broker import AlpacaBroker
+from .order_store import OrderStore
+from .trade_updates import AlpacaTradeUpdates, ReplayTradeUpdates, TradeUpdateConsumer
 from .types import (
     OrderSide, OrderType, TimeInForce, OrderStatus,
-    MarketOrder, LimitOrder, StopOrder, StopLimitOrder, TrailingStopOrder,
-    Order, Position, Account, OrderResult
+    MarketOrder, LimitOrder, StopOrder, StopLimitOrder, TrailingStopOrder, OTOOrder,
+    Order, OrderEvent, Position, Account, OrderResult, PortfolioSnapshot
 )
 
 __all__ = [
-    'AlpacaBroker',
+    'AlpacaBroker', 'OrderStore',
+    'TradeUpdateConsumer', 'AlpacaTradeUpdates', 'ReplayTradeUpdates',
     'OrderSide', 'OrderType', 'TimeInForce', 'OrderStatus',
-    'MarketOrder', 'LimitOrder', 'StopOrder', 'StopLimitOrder', 'TrailingStopOrder',
-    'Order', 'Position', 'Account', 'OrderResult'
+    'MarketOrder', 'LimitOrder', 'StopOrder', 'StopLimitOrder', 'TrailingStopOrder', 'OTOOrder',
+    'Order', 'OrderEvent', 'Position', 'Account', 'OrderResult', 'PortfolioSnapshot'
 ]
@@ -1,28 +1,42 @@
 """Custom Alpaca broker for backtrader.
 
 This broker integrates Alpaca's API for live trading while working within
-the backtrader framework. It supports market, limit, stop, and trailing stop orders.
+the backtrader framework. It supports market, limit, stop, and trailing stop orders,
+and entries with an attached stop (OTO) submitted in one request.
 """
 import logging
-from typing import List, Optional, Union
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
+from zoneinfo import ZoneInfo
 
 from alpaca.trading.client import TradingClient
+from alpaca.trading.enums import OrderClass, QueryOrderStatus
 from alpaca.trading.requests import (
+    GetCalendarRequest,
+    GetOrdersRequest,
     MarketOrderRequest as AlpacaMarketOrderRequest,
     LimitOrderRequest as AlpacaLimitOrderRequest,
     StopOrderRequest as AlpacaStopOrderRequest,
     StopLimitOrderRequest as AlpacaStopLimitOrderRequest,
+    StopLossRequest,
     TrailingStopOrderRequest as AlpacaTrailingStopOrderRequest,
 )
 
+from .order_store import OrderStore
 from .types import (
-    MarketOrder, LimitOrder, StopOrder, StopLimitOrder, TrailingStopOrder,
-    OrderRequest, Order, Position, Account, OrderResult
+    MarketOrder, LimitOrder, StopOrder, StopLimitOrder, TrailingStopOrder, OTOOrder,
+    OrderRequest, Order, Position, Account, OrderResult, PortfolioSnapshot
 )
 
 
 logger = logging.getLogger(__name__)
 
+# Alpaca's error when a client_order_id was used before
+DUPLICATE_CLIENT_ORDER_ID = 'client_order_id must be unique'
+
+# Time zone of Alpaca's market calendar
+MARKET_TIMEZONE = ZoneInfo('America/New_York')
+
 
 class AlpacaBroker:
     """Custom broker implementation for Alpaca API.
@@ -32,16 +46,19 @@ class AlpacaBroker:
     backtesting (as a backtrader broker) and live trading contexts.
     """
     
-    def __init__(self, api_key: str, secret_key: str, paper: bool = True):
+    def __init__(self, api_key: str, secret_key: str, paper: bool = True,
+                 order_store: Optional[OrderStore] = None):
         """Initialize Alpaca broker.
         
         Args:
             api_key: Alpaca API key
             secret_key: Alpaca secret key
             paper: If True, use paper trading; otherwise use live trading
+            order_store: Local record of submitted orders (None = none)
         """
         self.client = TradingClient(api_key, secret_key, paper=paper)
         self.paper = paper
+        self.order_store = order_store
         
     def submit_order(self, order: OrderRequest) -> OrderResult:
         """Submit an order (generic method for all order types).
@@ -49,55 +66,36 @@ class AlpacaBroker:
         Args:
             order: Order request (MarketOrder, LimitOrder, etc.)
             
+        With an order store, an order whose ``client_order_id`` is already
+        recorded as accepted is not submitted again (the recorded order is
+        returned), and every submission is recorded.
+        
         Returns:
             OrderResult with success status and order details
         """
+        if self.order_store is not None and order.client_order_id:
+            existing = self.order_store.by_client_id(order.client_order_id)
+            if existing is not None:
+                logger.info(f"Order {order.client_order_id} already submitted, Order ID: {existing.id}")
+                return OrderResult(success=True, order=existing)
+        
+        advanced = {'client_order_id': order.client_order_id} if order.client_order_id else {}
         try:
-            if isinstance(order, MarketOrder):
-                alpaca_request = AlpacaMarketOrderRequest(
-                    symbol=order.symbol,
-                    qty=order.qty,
-                    side=order.to_alpaca_side(),
-                    time_in_force=order.to_alpaca_tif()
-                )
-            elif isinstance(order, LimitOrder):
-                alpaca_request = AlpacaLimitOrderRequest(
-                    symbol=order.symbol,
-                    qty=order.qty,
-                    side=order.to_alpaca_side(),
-                    time_in_force=order.to_alpaca_tif(),
-                    limit_price=order.limit_price
-                )
-            elif isinstance(order, StopOrder):
-                alpaca_request = AlpacaStopOrderRequest(
-                    symbol=order.symbol,
-                    qty=order.qty,
-                    side=order.to_alpaca_side(),
-                    time_in_force=order.to_alpaca_tif(),
-                    stop_price=order.stop_price
-                )
-            elif isinstance(order, StopLimitOrder):
-                alpaca_request = AlpacaStopLimitOrderRequest(
-                    symbol=order.symbol,
-                    qty=order.qty,
-                    side=order.to_alpaca_side(),
-                    time_in_force=order.to_alpaca_tif(),
-                    stop_price=order.stop_price,
-                    limit_price=order.limit_price
-                )
-            elif isinstance(order, TrailingStopOrder):
-                # PERCENTAGE CONVERSION: Internal decimal (0.05) → Alpaca whole number (5.0)
-                # Alpaca API expects trail_percent as whole number (5.0 = 5%)
-                trail_percent_alpaca = order.trail_percent * 100 if order.trail_percent is not None else None
-                alpaca_request = AlpacaTrailingStopOrderRequest(
-                    symbol=order.symbol,
-                    qty=order.qty,
-                    side=order.to_alpaca_side(),
-                    time_in_force=order.to_alpaca_tif(),
-                    trail_percent=trail_percent_alpaca,
-                    trail_price=order.trail_price
+            if isinstance(order, OTOOrder):
+                # Both legs in one request: Alpaca holds the stop until the entry fills
+                alpaca_request = self._alpaca_request(
+                    order.entry,
+                    **advanced,
+                    order_class=OrderClass.OTO,
+                    stop_loss=StopLossRequest(
+                        stop_price=order.stop.stop_price,
+                        limit_price=getattr(order.stop, 'limit_price', None)
+                    )
                 )
             else:
+                alpaca_request = self._alpaca_request(order, **advanced)
+            
+            if alpaca_request is None:
                 return OrderResult(
                     success=False,
                     error=f"Unsupported order type: {type(order)}"
@@ -108,6 +106,8 @@ class AlpacaBroker:
             
             # Convert to our Order type
             result_order = Order.from_alpaca(alpaca_order)
+            if self.order_store is not None:
+                self.order_store.save(result_order)
             
             logger.info(f"{order.order_type.value.upper()} order submitted: "
                        f"{order.symbol} x{order.qty} {order.side.value.upper()}, "
@@ -116,9 +116,87 @@ class AlpacaBroker:
             return OrderResult(success=True, order=result_order)
             
         except Exception as e:
+            if order.client_order_id and DUPLICATE_CLIENT_ORDER_ID in str(e):
+                # Submitted before but not recorded (e.g. a crash in between)
+                return self._existing_order(order.client_order_id)
             logger.error(f"Error submitting order: {e}")
+            if self.order_store is not None:
+                self.order_store.record_rejection(order, str(e))
             return OrderResult(success=False, error=str(e))
     
+    def _existing_order(self, client_order_id: str) -> OrderResult:
+        """Fetch (and record) the order already submitted under a client order ID."""
+        try:
+            existing = Order.from_alpaca(self.client.get_order_by_client_id(client_order_id))
+        except Exception as e:
+            logger.error(f"Error fetching order {client_order_id}: {e}")
+            return OrderResult(success=False, error=str(e))
+        if self.order_store is not None:
+            self.order_store.save(existing)
+        logger.info(f"Order {client_order_id} already submitted, Order ID: {existing.id}")
+        return OrderResult(success=True, order=existing)
+    
+    def _alpaca_request(self, order: OrderRequest, **advanced):
+        """Build the Alpaca request of a simple order.
+        
+        Args:
+            order: Order request (MarketOrder, LimitOrder, etc.)
+            **advanced: Extra request fields (order class and legs)
+            
+        Returns:
+            Alpaca order request, or None for an unsupported order type
+        """
+        if isinstance(order, MarketOrder):
+            return AlpacaMarketOrderRequest(
+                symbol=order.symbol,
+                qty=order.qty,
+                side=order.to_alpaca_side(),
+                time_in_force=order.to_alpaca_tif(),
+                **advanced
+            )
+        elif isinstance(order, LimitOrder):
+            return AlpacaLimitOrderRequest(
+                symbol=order.symbol,
+                qty=order.qty,
+                side=order.to_alpaca_side(),
+                time_in_force=order.to_alpaca_tif(),
+                limit_price=order.limit_price,
+                **advanced
+            )
+        elif isinstance(order, StopOrder):
+            return AlpacaStopOrderRequest(
+                symbol=order.symbol,
+                qty=order.qty,
+                side=order.to_alpaca_side(),
+                time_in_force=order.to_alpaca_tif(),
+                stop_price=order.stop_price,
+                **advanced
+            )
+        elif isinstance(order, StopLimitOrder):
+            return AlpacaStopLimitOrderRequest(
+                symbol=order.symbol,
+                qty=order.qty,
+                side=order.to_alpaca_side(),
+                time_in_force=order.to_alpaca_tif(),
+                stop_price=order.stop_price,
+                limit_price=order.limit_price,
+                **advanced
+            )
+        elif isinstance(order, TrailingStopOrder):
+            # PERCENTAGE CONVERSION: Internal decimal (0.05) → Alpaca whole number (5.0)
+            # Alpaca API expects trail_percent as whole number (5.0 = 5%)
+            trail_percent_alpaca = order.trail_percent * 100 if order.trail_percent is not None else None
+            return AlpacaTrailingStopOrderRequest(
+                symbol=order.symbol,
+                qty=order.qty,
+                side=order.to_alpaca_side(),
+                time_in_force=order.to_alpaca_tif(),
+                trail_percent=trail_percent_alpaca,
+                trail_price=order.trail_price,
+                **advanced
+            )
+        return None
+    
     def get_account(self) -> Account:
         """Get account information.
         
@@ -153,15 +231,61 @@ class AlpacaBroker:
             logger.debug(f"No position for {symbol}: {e}")
             return None
     
+    def get_open_orders(self) -> List[Order]:
+        """Get all open orders.
+        
+        Returns:
+            List of Order objects
+        """
+        request = GetOrdersRequest(status=QueryOrderStatus.OPEN, limit=500)
+        alpaca_orders = self.client.get_orders(filter=request)
+        return [Order.from_alpaca(order) for order in alpaca_orders]
+    
+    def get_snapshot(self) -> PortfolioSnapshot:
+        """Get the account, positions and open orders in one snapshot.
+        
+        Returns:
+            PortfolioSnapshot (three API calls, independent of the number of
+            symbols)
+        """
+        account = self.get_account()
+        positions = {position.symbol: position for position in self.get_positions()}
+        return PortfolioSnapshot(account=account, positions=positions,
+                                 open_orders=self.get_open_orders())
+    
+    def get_market_hours(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """Get the regular session hours of a day (early closes included).
+        
+        Args:
+            day: Calendar date
+            
+        Returns:
+            (open, close) as timezone-aware datetimes, or None if the market
+            is closed that day
+        """
+        calendar = self.client.get_calendar(GetCalendarRequest(start=day, end=day))
+        for session in calendar:
+            if session.date == day:
+                return (session.open.replace(tzinfo=MARKET_TIMEZONE),
+                        session.close.replace(tzinfo=MARKET_TIMEZONE))
+        return None
+    
     def get_order(self, order_id: str) -> Optional[Order]:
         """Get order by ID.
         
+        An order the order store has recorded as final (filled, canceled,
+        ...) is read from the store without an API call.
+        
         Args:
             order_id: Order ID
             
         Returns:
             Order object or None if not found
         """
+        if self.order_store is not None:
+            recorded = self.order_store.get(order_id)
+            if recorded is not None and not recorded.is_open:
+                return recorded
         try:
             alpaca_order = self.client.get_order_by_id(order_id)
             return Order.from_alpaca(alpaca_order)
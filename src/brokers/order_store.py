@@ -0,0 +1,269 @@
+"""Local record of submitted orders and their fills.
+
+The broker only reports an order's fate when asked (``get_order``, one REST
+call per order). ``OrderStore`` keeps every order in a SQLite database
+instead: ``AlpacaBroker.submit_order`` records each submission, and a trade
+update consumer (``src.brokers.trade_updates``) applies the broker's events
+(fills, cancellations, expiries) as they happen. Reconciliation and reports
+then read this local state.
+
+Orders are keyed by ``client_order_id``. Callers that choose deterministic
+IDs (e.g. strategy, ticker, side and bar date) can resubmit after a crash or
+a retried invocation: an ID already recorded as accepted is not submitted
+again. Events are stored once per (order, execution), so replayed or
+duplicated events do not change the result.
+"""
+import sqlite3
+import threading
+from dataclasses import fields
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, List, Optional, Union
+
+import pandas as pd
+
+from .types import (
+    TERMINAL_STATUSES, Order, OrderEvent, OrderRequest, OrderSide, OrderStatus, OrderType
+)
+
+
+# Events that fill (part of) an order
+FILL_EVENTS = ('fill', 'partial_fill')
+
+_ORDER_FIELDS = tuple(field.name for field in fields(Order))
+_TIME_FIELDS = ('submitted_at', 'filled_at', 'canceled_at', 'expired_at', 'failed_at')
+
+
+# Stored state of an order submission without a broker timestamp
+_EARLIEST = datetime.min.replace(tzinfo=timezone.utc)
+
+
+def _timestamp(value: datetime) -> str:
+    """UTC ISO timestamp, comparable as text (naive times are taken as UTC)."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+
+def _to_row(order: Order) -> List[Any]:
+    row = []
+    for name in _ORDER_FIELDS:
+        value = getattr(order, name)
+        if isinstance(value, (OrderSide, OrderType, OrderStatus)):
+            value = value.value
+        elif isinstance(value, datetime):
+            value = _timestamp(value)
+        row.append(value)
+    return row
+
+
+def _from_row(row: sqlite3.Row) -> Order:
+    values = {name: row[name] for name in _ORDER_FIELDS}
+    values['side'] = OrderSide(values['side'])
+    values['order_type'] = OrderType(values['order_type'])
+    values['status'] = OrderStatus(values['status'])
+    values['qty'] = int(values['qty'])
+    values['filled_qty'] = int(values['filled_qty'])
+    for name in _TIME_FIELDS:
+        if values[name] is not None:
+            values[name] = datetime.fromisoformat(values[name])
+    return Order(**values)
+
+
+class OrderStore:
+    """SQLite-backed store of orders and their events.
+
+    Safe to share between threads (e.g. the runner submitting orders and a
+    trade update consumer). Use as a context manager, or call ``close``
+    when done.
+    """
+
+    def __init__(self, path: Union[str, Path], wal: bool = True):
+        """Open (and create if needed) an order database.
+
+        Args:
+            path: Database file path (':memory:' for a temporary store)
+            wal: Use write-ahead logging (a consumer process and the runner
+                 can use the same file, on one host)
+        """
+        self.path = path if path == ':memory:' else Path(path)
+        if isinstance(self.path, Path):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=60.0, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        if wal and self.path != ':memory:':
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._create_tables()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def _create_tables(self):
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS orders (
+                client_order_id TEXT PRIMARY KEY,
+                id TEXT UNIQUE,
+                symbol TEXT NOT NULL,
+                qty REAL NOT NULL,
+                side TEXT NOT NULL,
+                order_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                filled_qty REAL NOT NULL,
+                filled_avg_price REAL,
+                limit_price REAL,
+                stop_price REAL,
+                trail_percent REAL,
+                trail_price REAL,
+                submitted_at TEXT,
+                filled_at TEXT,
+                canceled_at TEXT,
+                expired_at TEXT,
+                failed_at TEXT,
+                error TEXT,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS orders_open ON orders (status, symbol);
+            CREATE TABLE IF NOT EXISTS events (
+                order_id TEXT NOT NULL,
+                execution_id TEXT NOT NULL,
+                event TEXT NOT NULL,
+                symbol TEXT NOT NULL,
+                side TEXT NOT NULL,
+                price REAL,
+                qty REAL,
+                timestamp TEXT NOT NULL,
+                PRIMARY KEY (order_id, execution_id)
+            );
+        """)
+        self._conn.commit()
+
+    def save(self, order: Order, updated_at: Optional[datetime] = None):
+        """Record an order's current state.
+
+        Args:
+            order: Order as returned by the broker (its ``client_order_id``
+                   is the key)
+            updated_at: Broker time of this state (None = its submission
+                        time); an older state than the stored one is
+                        ignored, so a submission response arriving after
+                        its fill event does not undo the fill
+        """
+        updated_at = updated_at or order.submitted_at or _EARLIEST
+        columns = ', '.join(_ORDER_FIELDS)
+        placeholders = ', '.join('?' * (len(_ORDER_FIELDS) + 1))
+        updates = ', '.join(f'{name} = excluded.{name}' for name in _ORDER_FIELDS if name != 'client_order_id')
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"""INSERT INTO orders ({columns}, updated_at) VALUES ({placeholders})
+                    ON CONFLICT (client_order_id) DO UPDATE SET {updates}, error = NULL,
+                        updated_at = excluded.updated_at
+                    WHERE excluded.updated_at >= orders.updated_at OR orders.id IS NULL""",
+                [*_to_row(order), _timestamp(updated_at)],
+            )
+
+    def record_rejection(self, request: OrderRequest, error: str):
+        """Record an order the broker refused at submission.
+
+        Args:
+            request: Submitted order request (with its ``client_order_id``)
+            error: Broker error message
+        """
+        if request.client_order_id is None:
+            return
+        now = _timestamp(datetime.now(timezone.utc))
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO orders (client_order_id, symbol, qty, side, order_type, status,
+                                       filled_qty, failed_at, error, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?)
+                   ON CONFLICT (client_order_id) DO UPDATE SET error = excluded.error
+                   WHERE orders.id IS NULL""",
+                (request.client_order_id, request.symbol, request.qty, request.side.value,
+                 getattr(request, 'order_type', OrderType.MARKET).value, OrderStatus.REJECTED.value,
+                 now, error, now),
+            )
+
+    def apply(self, event: OrderEvent):
+        """Apply a trade update (idempotent).
+
+        Args:
+            event: Broker event of an order
+        """
+        order = event.order
+        execution_id = event.execution_id or f"{event.event}@{_timestamp(event.timestamp)}"
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (order.id, execution_id, event.event, order.symbol, order.side.value,
+                 event.price, event.qty, _timestamp(event.timestamp)),
+            )
+        self.save(order, updated_at=event.timestamp)
+
+    def get(self, order_id: str) -> Optional[Order]:
+        """Get an order by broker ID (None if not recorded)."""
+        return self._one('SELECT * FROM orders WHERE id = ?', order_id)
+
+    def by_client_id(self, client_order_id: str) -> Optional[Order]:
+        """Get an accepted order by client order ID (None if not recorded or rejected)."""
+        return self._one('SELECT * FROM orders WHERE client_order_id = ? AND id IS NOT NULL', client_order_id)
+
+    def _one(self, sql: str, key: str) -> Optional[Order]:
+        with self._lock:
+            row = self._conn.execute(sql, (key,)).fetchone()
+        return _from_row(row) if row is not None else None
+
+    def open_orders(self, symbol: Optional[str] = None) -> List[Order]:
+        """Orders that can still fill or be canceled.
+
+        Args:
+            symbol: Only this symbol's orders (None = all)
+
+        Returns:
+            Open orders, oldest first
+        """
+        terminal = [status.value for status in TERMINAL_STATUSES]
+        sql = f"SELECT * FROM orders WHERE id IS NOT NULL AND status NOT IN ({', '.join('?' * len(terminal))})"
+        args: List[Any] = terminal
+        if symbol is not None:
+            sql += ' AND symbol = ?'
+            args = [*terminal, symbol]
+        with self._lock:
+            rows = self._conn.execute(sql + ' ORDER BY submitted_at', args).fetchall()
+        return [_from_row(row) for row in rows]
+
+    def orders(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        """Recorded orders (including rejected submissions) for reports.
+
+        Args:
+            since: Only orders updated at or after this time (None = all)
+        """
+        sql = 'SELECT * FROM orders'
+        args: List[Any] = []
+        if since is not None:
+            sql += ' WHERE updated_at >= ?'
+            args.append(_timestamp(since))
+        with self._lock:
+            return pd.read_sql_query(sql + ' ORDER BY updated_at', self._conn, params=args)
+
+    def fills(self, since: Optional[datetime] = None) -> pd.DataFrame:
+        """Fills (partial and final) recorded from trade updates.
+
+        Args:
+            since: Only fills at or after this time (None = all)
+        """
+        placeholders = ', '.join('?' * len(FILL_EVENTS))
+        sql = f'SELECT * FROM events WHERE event IN ({placeholders})'
+        args: List[Any] = list(FILL_EVENTS)
+        if since is not None:
+            sql += ' AND timestamp >= ?'
+            args.append(_timestamp(since))
+        with self._lock:
+            return pd.read_sql_query(sql + ' ORDER BY timestamp', self._conn, params=args)
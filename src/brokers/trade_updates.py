@@ -0,0 +1,120 @@
+"""Trade update consumers: keep an ``OrderStore`` current from broker events.
+
+Instead of polling ``get_order`` for each order, a consumer applies the
+broker's trade updates (new, fill, partial_fill, canceled, expired, ...) to
+the order store as they are pushed. Event sources:
+
+    AlpacaTradeUpdates: Alpaca's trade update websocket (production), run
+        as a long-lived process next to the runs
+        (``python src/runners/live.py --track-orders``)
+    ReplayTradeUpdates: a fixed sequence of events (tests and local runs)
+
+Both deliver ``OrderEvent``s to ``TradeUpdateConsumer.handle``, so what is
+recorded does not depend on the source.
+"""
+import logging
+import threading
+from typing import Callable, Iterable, Optional
+
+from .order_store import OrderStore
+from .types import OrderEvent
+
+
+logger = logging.getLogger(__name__)
+
+
+class TradeUpdateConsumer:
+    """Applies trade updates to an order store."""
+
+    def __init__(self, store: OrderStore, on_event: Optional[Callable[[OrderEvent], None]] = None):
+        """Initialize consumer.
+
+        Args:
+            store: Order store to keep current
+            on_event: Called with each event after it is recorded
+        """
+        self.store = store
+        self.on_event = on_event
+        self.events = 0
+
+    def handle(self, event: OrderEvent):
+        """Record one event (duplicates are ignored by the store).
+
+        Args:
+            event: Trade update
+        """
+        self.store.apply(event)
+        self.events += 1
+        order = event.order
+        logger.info(f"{event.event.upper()}: {order.symbol} {order.side.value} "
+                    f"{order.filled_qty}/{order.qty} ({order.id})")
+        if self.on_event is not None:
+            self.on_event(event)
+
+    async def handle_alpaca(self, update):
+        """Trade update handler for Alpaca's ``TradingStream``."""
+        try:
+            self.handle(OrderEvent.from_alpaca(update))
+        except Exception as e:
+            # Keep the stream alive; the order is reconciled by later events
+            logger.error(f"Error recording trade update: {e}")
+
+
+class AlpacaTradeUpdates:
+    """Alpaca's trade update stream."""
+
+    def __init__(self, api_key: str, secret_key: str, paper: bool = True):
+        """Initialize event source.
+
+        Args:
+            api_key: Alpaca API key
+            secret_key: Alpaca secret key
+            paper: If True, stream the paper trading account's updates
+        """
+        from alpaca.trading.stream import TradingStream
+        self.stream = TradingStream(api_key, secret_key, paper=paper)
+
+    def run(self, consumer: TradeUpdateConsumer, duration: Optional[float] = None):
+        """Deliver trade updates to a consumer (blocks).
+
+        Args:
+            consumer: Consumer of the events
+            duration: Seconds to run for (None = until stopped)
+        """
+        self.stream.subscribe_trade_updates(consumer.handle_alpaca)
+        timer = None
+        if duration is not None:
+            timer = threading.Timer(duration, self.stream.stop)
+            timer.daemon = True
+            timer.start()
+        try:
+            self.stream.run()
+        finally:
+            if timer is not None:
+                timer.cancel()
+
+    def stop(self):
+        """Stop the stream (from another thread)."""
+        self.stream.stop()
+
+
+class ReplayTradeUpdates:
+    """Replays a fixed sequence of trade updates (stand-in for the stream)."""
+
+    def __init__(self, events: Iterable[OrderEvent]):
+        """Initialize event source.
+
+        Args:
+            events: Events to deliver, in order
+        """
+        self.events = list(events)
+
+    def run(self, consumer: TradeUpdateConsumer, duration: Optional[float] = None):
+        """Deliver the events to a consumer.
+
+        Args:
+            consumer: Consumer of the events
+            duration: Ignored (all events are delivered at once)
+        """
+        for event in self.events:
+            consumer.handle(event)
@@ -3,9 +3,9 @@
 This module defines type-safe classes for orders, positions, accounts,
 and other broker-related entities.
 """
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Optional
+from typing import Dict, List, Optional, Union
 from datetime import datetime
 
 
@@ -41,6 +41,13 @@ class OrderStatus(Enum):
     PENDING_CANCEL = "pending_cancel"
     REJECTED = "rejected"
     EXPIRED = "expired"
+    HELD = "held"  # Leg waiting for its entry to fill
+    REPLACED = "replaced"
+
+
+# Statuses after which an order never changes again
+TERMINAL_STATUSES = (OrderStatus.FILLED, OrderStatus.CANCELED, OrderStatus.REJECTED,
+                     OrderStatus.EXPIRED, OrderStatus.REPLACED)
 
 
 @dataclass
@@ -50,6 +57,8 @@ class OrderRequest:
     qty: int
     side: OrderSide
     time_in_force: TimeInForce = TimeInForce.DAY
+    # Caller-chosen ID: resubmitting the same ID never creates a second order
+    client_order_id: Optional[str] = None
     
     def to_alpaca_side(self):
         """Convert to Alpaca OrderSide enum."""
@@ -132,6 +141,24 @@ class TrailingStopOrder(OrderRequest):
         self.order_type = OrderType.TRAILING_STOP
 
 
+class OTOOrder(OrderRequest):
+    """Entry order with a stop attached (one-triggers-other).
+    
+    Both legs are submitted in one request; the broker activates the stop
+    once the entry fills. Alpaca only accepts stop or stop-limit exit legs
+    (not trailing stops), and both legs share the entry's time in force,
+    so swing entries should be GTC for the stop to outlive the day.
+    """
+    
+    def __init__(self, entry: Union[MarketOrder, LimitOrder], stop: Union[StopOrder, StopLimitOrder]):
+        super().__init__(entry.symbol, entry.qty, entry.side, entry.time_in_force, entry.client_order_id)
+        if stop.symbol != entry.symbol or stop.side == entry.side:
+            raise ValueError("The stop must exit the entry's position")
+        self.entry = entry
+        self.stop = stop
+        self.order_type = entry.order_type
+
+
 @dataclass
 class Order:
     """Represents an order (response from broker).
@@ -156,6 +183,7 @@ class Order:
     canceled_at: Optional[datetime]
     expired_at: Optional[datetime]
     failed_at: Optional[datetime]
+    client_order_id: Optional[str] = None
     
     @classmethod
     def from_alpaca(cls, alpaca_order):
@@ -176,7 +204,7 @@ class Order:
         order_type = order_type_mapping.get(alpaca_order.type, OrderType.MARKET)
         
         # Map status
-        status_str = str(alpaca_order.status).lower()
+        status_str = str(getattr(alpaca_order.status, 'value', alpaca_order.status)).lower()
         try:
             status = OrderStatus(status_str)
         except ValueError:
@@ -189,7 +217,7 @@ class Order:
             trail_percent_decimal = float(alpaca_order.trail_percent) / 100
         
         return cls(
-            id=alpaca_order.id,
+            id=str(alpaca_order.id),
             symbol=alpaca_order.symbol,
             qty=int(alpaca_order.qty),
             side=side,
@@ -206,7 +234,13 @@ class Order:
             canceled_at=alpaca_order.canceled_at,
             expired_at=alpaca_order.expired_at,
             failed_at=alpaca_order.failed_at,
+            client_order_id=alpaca_order.client_order_id,
         )
+    
+    @property
+    def is_open(self) -> bool:
+        """Whether the order can still fill or be canceled."""
+        return self.status not in TERMINAL_STATUSES
 
 
 @dataclass
@@ -284,6 +318,38 @@ class Account:
         )
 
 
+@dataclass
+class OrderEvent:
+    """Update of an order's state (Alpaca trade update).
+    
+    Attributes:
+        event: Event name ('new', 'fill', 'partial_fill', 'canceled', ...)
+        order: Order as of the event
+        timestamp: Event time
+        price: Price of this fill (fill events only)
+        qty: Quantity of this fill (fill events only)
+        execution_id: Broker ID of the event, unique per order
+    """
+    event: str
+    order: Order
+    timestamp: datetime
+    price: Optional[float] = None
+    qty: Optional[float] = None
+    execution_id: Optional[str] = None
+    
+    @classmethod
+    def from_alpaca(cls, update):
+        """Create OrderEvent from an Alpaca trade update."""
+        return cls(
+            event=str(getattr(update.event, 'value', update.event)),
+            order=Order.from_alpaca(update.order),
+            timestamp=update.timestamp,
+            price=float(update.price) if update.price is not None else None,
+            qty=float(update.qty) if update.qty is not None else None,
+            execution_id=str(update.execution_id) if update.execution_id is not None else None,
+        )
+
+
 @dataclass
 class OrderResult:
     """Result of an order submission."""
@@ -295,3 +361,50 @@ class OrderResult:
     def order_id(self) -> Optional[str]:
         """Get order ID if successful."""
         return self.order.id if self.order else None
+
+
+@dataclass
+class PortfolioSnapshot:
+    """Account, positions and open orders as of one point in time.
+    
+    Taken once per live run (``AlpacaBroker.get_snapshot``) and then updated
+    locally as orders are submitted, so signal checks and order sizing read
+    a consistent view without an API call per ticker.
+    """
+    account: Account
+    positions: Dict[str, Position]
+    open_orders: List[Order]
+    taken_at: datetime = field(default_factory=datetime.now)
+    
+    def position(self, symbol: str) -> Optional[Position]:
+        """Get the position in a symbol, or None if flat."""
+        return self.positions.get(symbol)
+    
+    def orders_for(self, symbol: str) -> List[Order]:
+        """Get the open orders in a symbol."""
+        return [order for order in self.open_orders if order.symbol == symbol]
+    
+    def record_order(self, request: OrderRequest, price: float, order: Optional[Order] = None):
+        """Apply a submitted order to the local view.
+        
+        Buys reserve their estimated cost from cash and buying power; sells
+        remove the quantity from the position (sale proceeds are not counted
+        until the next snapshot).
+        
+        Args:
+            request: Submitted order request
+            price: Estimated fill price
+            order: Order returned by the broker, kept as an open order
+        """
+        if request.side == OrderSide.BUY:
+            cost = request.qty * price
+            self.account.cash -= cost
+            self.account.buying_power -= cost
+        else:
+            position = self.positions.get(request.symbol)
+            if position is not None:
+                position.qty -= request.qty
+                if position.qty <= 0:
+                    del self.positions[request.symbol]
+        if order is not None:
+            self.open_orders.append(order)
@@ -0,0 +1,173 @@
+"""Bar update sources for the live daemon.
+
+The live daemon (``src.runners.daemon``) reacts to minute bars as they are
+published instead of fetching history on a schedule. Sources deliver
+``BarUpdate``s through the same async iterator interface:
+
+    AlpacaBarStream: Alpaca's market data websocket (production)
+    ReplayBarStream: a fixed sequence of bars, e.g. cached minute data
+        (tests and local runs)
+
+so the daemon behaves the same whichever source it is given.
+"""
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BarUpdate:
+    """A completed bar of one symbol.
+
+    Attributes:
+        symbol: Stock ticker
+        timestamp: Start of the bar (UTC)
+        open, high, low, close: Prices
+        volume: Shares traded
+    """
+    symbol: str
+    timestamp: datetime
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+    @classmethod
+    def from_alpaca(cls, bar) -> 'BarUpdate':
+        """Create from an alpaca-py ``Bar``."""
+        timestamp = bar.timestamp
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return cls(symbol=bar.symbol, timestamp=timestamp, open=float(bar.open), high=float(bar.high),
+                   low=float(bar.low), close=float(bar.close), volume=float(bar.volume))
+
+
+class AlpacaBarStream:
+    """Minute bars from Alpaca's market data stream."""
+
+    def __init__(self, api_key: str, secret_key: str, feed: str = 'iex'):
+        """Initialize bar source.
+
+        Args:
+            api_key: Alpaca API key
+            secret_key: Alpaca secret key
+            feed: Data feed ('iex' on free plans, 'sip' for all exchanges)
+        """
+        from alpaca.data.enums import DataFeed
+        from alpaca.data.live import StockDataStream
+        self.stream = StockDataStream(api_key, secret_key, feed=DataFeed(feed))
+        self._thread: Optional[threading.Thread] = None
+
+    async def bars(self, symbols: List[str]) -> AsyncIterator[BarUpdate]:
+        """Stream the minute bars of symbols until stopped.
+
+        The websocket runs its own event loop on a thread; bars are handed
+        over to the caller's loop as they arrive.
+
+        Args:
+            symbols: Stock tickers to subscribe to
+
+        Yields:
+            Each bar as it is published (shortly after its minute ends)
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def hand_over(item: Optional[BarUpdate]):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass  # The consumer's loop is closed
+
+        async def on_bar(bar):
+            hand_over(BarUpdate.from_alpaca(bar))
+
+        def run():
+            try:
+                self.stream.run()
+            except Exception as e:
+                logger.error(f"Bar stream stopped: {e}")
+            finally:
+                hand_over(None)
+
+        self.stream.subscribe_bars(on_bar, *symbols)
+        self._thread = threading.Thread(target=run, name='bar-stream', daemon=True)
+        self._thread.start()
+        try:
+            while (bar := await queue.get()) is not None:
+                yield bar
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Close the websocket."""
+        if self._thread is None:
+            return
+        try:
+            self.stream.stop()
+        except Exception as e:
+            logger.debug(f"Error stopping bar stream: {e}")
+        self._thread = None
+
+
+class ReplayBarStream:
+    """Replays a fixed sequence of bars (stand-in for the stream)."""
+
+    def __init__(self, bars: Iterable[BarUpdate], delay: float = 0.0):
+        """Initialize bar source.
+
+        Args:
+            bars: Bars to deliver, in time order
+            delay: Seconds between bars (0 = as fast as they are consumed)
+        """
+        self.updates = list(bars)
+        self.delay = delay
+        self._stopped = False
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], delay: float = 0.0) -> 'ReplayBarStream':
+        """Replay minute bars of several symbols, interleaved in time order.
+
+        Args:
+            frames: Symbol -> OHLCV DataFrame indexed by bar start (UTC)
+            delay: Seconds between bars
+        """
+        updates = [
+            BarUpdate(symbol, timestamp.to_pydatetime(), *(float(value) for value in row))
+            for symbol, frame in frames.items()
+            for timestamp, row in zip(frame.index, frame[['open', 'high', 'low', 'close', 'volume']].to_numpy())
+        ]
+        updates.sort(key=lambda update: update.timestamp)
+        return cls(updates, delay)
+
+    async def bars(self, symbols: List[str]) -> AsyncIterator[BarUpdate]:
+        """Deliver the bars of symbols.
+
+        Args:
+            symbols: Stock tickers to deliver (others are skipped)
+
+        Yields:
+            Each bar, in order
+        """
+        self._stopped = False
+        subscribed = set(symbols)
+        for update in self.updates:
+            if self._stopped:
+                break
+            if update.symbol in subscribed:
+                yield update
+                # Let the consumer's tasks run between bars
+                await asyncio.sleep(self.delay)
+
+    def stop(self):
+        """Stop delivering bars."""
+        self._stopped = True
@@ -8,12 +8,15 @@ import pandas as pd
 import backtrader as bt
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
-from typing import Optional, List, Tuple
+from typing import TYPE_CHECKING, Optional, List, Tuple
 from alpaca.data.historical import StockHistoricalDataClient
 from alpaca.data.requests import StockBarsRequest
 from alpaca.data.timeframe import TimeFrame, TimeFrameUnit
 import logging
 
+if TYPE_CHECKING:
+    from .streaming_feed import ParquetStreamingData
+
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,10 @@ logger = logging.getLogger(__name__)
 class DataManager:
     """Manages market data loading from parquet files or Alpaca API."""
     
+    # Rows per parquet row group when caching data. Streaming feeds hold one
+    # row group in memory at a time, so this bounds their footprint.
+    ROW_GROUP_SIZE = 100_000
+    
     def __init__(self, daily_path: str = "data/daily", minute_path: str = "data/minute"):
         """Initialize data manager.
         
@@ -75,13 +82,12 @@ class DataManager:
             return False
         
         try:
-            df = pd.read_parquet(file_path)
-            if df.empty:
+            bounds = self._read_index_bounds(file_path)
+            if bounds is None:
                 return False
             
             # Check if data covers required range
-            data_start = df.index.min()
-            data_end = df.index.max()
+            data_start, data_end = bounds
             
             # Convert to datetime and ensure timezone-aware (UTC)
             if isinstance(data_start, pd.Timestamp):
@@ -116,6 +122,42 @@ class DataManager:
             logger.warning(f"Error checking date range for {ticker}: {e}")
             return False
     
+    def _read_index_bounds(self, file_path: Path) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        """Read the first and last timestamp of a parquet file.
+        
+        Uses the row group statistics in the parquet footer when available so
+        large minute files are not loaded just to check their coverage.
+        
+        Args:
+            file_path: Path to the parquet file
+            
+        Returns:
+            Tuple of (first, last) timestamps, or None if the file is empty
+        """
+        # Parquet I/O is imported on use: live runs never read cache files
+        import pyarrow.parquet as pq
+        from .streaming_feed import get_index_column
+        
+        parquet_file = pq.ParquetFile(file_path)
+        metadata = parquet_file.metadata
+        if metadata.num_rows == 0:
+            return None
+        
+        index_column = get_index_column(parquet_file.schema_arrow)
+        column_index = parquet_file.schema_arrow.get_field_index(index_column)
+        
+        mins, maxs = [], []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(column_index).statistics
+            if stats is None or not stats.has_min_max:
+                # No statistics - read just the index column
+                index = parquet_file.read(columns=[index_column]).column(0).to_pandas()
+                return pd.Timestamp(index.min()), pd.Timestamp(index.max())
+            mins.append(pd.Timestamp(stats.min))
+            maxs.append(pd.Timestamp(stats.max))
+        
+        return min(mins), max(maxs)
+    
     def _fetch_from_alpaca(self, ticker: str, start_date: datetime, 
                           end_date: Optional[datetime], timeframe: str) -> pd.DataFrame:
         """Fetch data from Alpaca API.
@@ -242,12 +284,50 @@ class DataManager:
         
         return df
     
-    def get_data_for_live(self, ticker: str, days_back: int = 30) -> pd.DataFrame:
+    def ensure_cached(self, ticker: str, start_date: datetime,
+                      end_date: datetime, timeframe: str = 'daily') -> bool:
+        """Make sure the local cache covers a date range without loading it.
+        
+        Fetches and saves data from Alpaca only if the cached file is missing
+        or does not cover the range. Used by streaming backtests, which read
+        the cache lazily instead of materializing a DataFrame.
+        
+        Args:
+            ticker: Stock ticker symbol
+            start_date: Start date
+            end_date: End date
+            timeframe: 'daily' or 'minute'
+            
+        Returns:
+            True if cached data is available, False otherwise
+        """
+        if self._check_file_exists(ticker, timeframe):
+            if self._check_date_range_coverage(ticker, timeframe, start_date, end_date):
+                return True
+            logger.info(f"Cached {timeframe} data insufficient for {ticker}, fetching from Alpaca")
+        else:
+            logger.info(f"No cached {timeframe} data for {ticker}, fetching from Alpaca")
+        
+        df = self._fetch_from_alpaca(ticker, start_date, end_date, timeframe)
+        if df.empty:
+            return False
+        
+        self.save_data(ticker, df, timeframe)
+        return True
+    
+    def get_data_for_live(self, ticker: str, days_back: int = 30,
+                          cached: Optional[pd.DataFrame] = None) -> pd.DataFrame:
         """Get data for live trading (always fetches fresh from Alpaca).
         
+        With ``cached`` bars from the previous run, only the last two cached
+        bars onwards are fetched: the older one must be unchanged (otherwise
+        the history was revised and the full window is refetched), the newer
+        one may have been incomplete and is replaced.
+        
         Args:
             ticker: Stock ticker symbol
             days_back: Number of days of historical data to fetch
+            cached: Bars returned by an earlier call with the same ``days_back``
             
         Returns:
             DataFrame with OHLCV data indexed by timestamp
@@ -256,6 +336,15 @@ class DataManager:
         # This works with free Alpaca plans that have 15-minute delayed data
         start_date = datetime.now(timezone.utc) - timedelta(days=days_back + 10)  # Add buffer for weekends/holidays
         
+        if cached is not None and len(cached) >= 2:
+            logger.info(f"Fetching new live data for {ticker}")
+            fresh = self._fetch_from_alpaca(ticker, cached.index[-2].to_pydatetime(), None, 'daily')
+            if not fresh.empty and fresh.index[0] == cached.index[-2] \
+                    and (fresh.iloc[0] == cached.iloc[-2][fresh.columns]).all():
+                df = pd.concat([cached.iloc[:-2], fresh])
+                return df[df.index >= start_date]
+            logger.info(f"Cached live data for {ticker} was revised, fetching the full window")
+        
         logger.info(f"Fetching live data for {ticker}")
         
         return self._fetch_from_alpaca(ticker, start_date, None, 'daily')
@@ -272,7 +361,7 @@ class DataManager:
         path.mkdir(parents=True, exist_ok=True)
         
         file_path = path / f"{ticker}.parquet"
-        df.to_parquet(file_path)
+        df.to_parquet(file_path, row_group_size=self.ROW_GROUP_SIZE)
         logger.info(f"Cached {timeframe} data for {ticker}")
     
     def create_backtrader_feed(self, df: pd.DataFrame, ticker_name: str) -> bt.feeds.PandasData:
@@ -303,3 +392,29 @@ class DataManager:
         )
         
         return data_feed
+    
+    def create_streaming_feed(self, ticker: str, start_date: datetime,
+                              end_date: datetime, timeframe: str = 'daily') -> 'ParquetStreamingData':
+        """Create a backtrader feed that streams cached data row group by row group.
+        
+        Call ``ensure_cached`` first so the parquet file covers the range.
+        
+        Args:
+            ticker: Stock ticker symbol
+            start_date: Start date
+            end_date: End date
+            timeframe: 'daily' or 'minute'
+            
+        Returns:
+            Streaming parquet data feed
+        """
+        from .streaming_feed import ParquetStreamingData
+        
+        path = self.daily_path if timeframe == 'daily' else self.minute_path
+        file_path = path / f"{ticker}.parquet"
+        
+        return ParquetStreamingData(
+            dataname=str(file_path),  # type: ignore[call-arg]
+            start=start_date,  # type: ignore[call-arg]
+            end=end_date  # type: ignore[call-arg]
+        )
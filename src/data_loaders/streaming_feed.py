@@ -0,0 +1,181 @@
+"""Streaming parquet data feed for low-memory backtests.
+
+This module provides a backtrader data feed that reads a cached parquet file
+one row group at a time instead of materializing the whole date range as a
+DataFrame. Combined with cerebro's non-preload / ``exactbars`` mode, memory use
+stays bounded regardless of how many years of (minute) history are replayed.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+import backtrader as bt
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from ..utils.arrays import OHLCV_COLUMNS, ns_to_bt_num
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _to_ns(dt: Optional[datetime]) -> Optional[int]:
+    """Convert a datetime to UTC epoch nanoseconds (naive means UTC)."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(microseconds=1) * 1_000
+
+
+def get_index_column(schema: pa.Schema) -> str:
+    """Find the name of the timestamp index column in a parquet schema.
+
+    Args:
+        schema: Arrow schema of a parquet file written by ``DataFrame.to_parquet``
+
+    Returns:
+        Name of the column holding the timestamp index
+    """
+    metadata = schema.pandas_metadata or {}
+    for column in metadata.get('index_columns', []):
+        if isinstance(column, str):
+            return column
+
+    # No pandas metadata - fall back to the first timestamp column
+    for field in schema:
+        if pa.types.is_timestamp(field.type):
+            return field.name
+
+    raise ValueError("Parquet file has no timestamp index column")
+
+
+class ParquetStreamingData(bt.feed.DataBase):
+    """Backtrader feed that lazily streams OHLCV bars from a parquet file.
+
+    Only one row group is held in memory at a time. Row groups whose timestamp
+    statistics fall entirely outside the requested range are skipped without
+    being read. Timestamps are converted to backtrader dates in one vectorized
+    step per row group, so the per-bar cost of ``_load`` is a handful of array
+    lookups.
+
+    Params:
+        dataname: Path to the parquet file
+        start: First timestamp to include (datetime, naive means UTC)
+        end: Last timestamp to include (datetime, naive means UTC)
+    """
+
+    params = (
+        ('start', None),
+        ('end', None),
+    )
+
+    def start(self):
+        """Open the parquet file and select the row groups to stream."""
+        super().start()
+        self._file = pq.ParquetFile(self.p.dataname)  # type: ignore[attr-defined]
+        self._index_column = get_index_column(self._file.schema_arrow)
+        self._start_ns = _to_ns(self.p.start)  # type: ignore[attr-defined]
+        self._end_ns = _to_ns(self.p.end)  # type: ignore[attr-defined]
+        self._row_groups = self._select_row_groups()
+        self._next_group = 0
+        self._block: List[np.ndarray] = []
+        self._block_len = 0
+        self._pos = 0
+
+    def stop(self):
+        """Release the file handle and the current row group."""
+        super().stop()
+        self._block = []
+        self._block_len = 0
+        self._file = None
+
+    def _select_row_groups(self) -> List[int]:
+        """Return indices of row groups that may overlap the requested range.
+
+        Uses the min/max statistics stored in the parquet footer; groups
+        without statistics are always kept.
+        """
+        metadata = self._file.metadata
+        column_index = self._file.schema_arrow.get_field_index(self._index_column)
+
+        selected = []
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(column_index).statistics
+            if stats is not None and stats.has_min_max:
+                group_min = _to_ns(self._as_utc(stats.min))
+                group_max = _to_ns(self._as_utc(stats.max))
+                if self._start_ns is not None and group_max < self._start_ns:
+                    continue
+                if self._end_ns is not None and group_min > self._end_ns:
+                    continue
+            selected.append(i)
+
+        return selected
+
+    @staticmethod
+    def _as_utc(value) -> datetime:
+        """Normalize a parquet statistics value to an aware UTC datetime."""
+        if hasattr(value, 'to_pydatetime'):
+            value = value.to_pydatetime()
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+    def _read_next_block(self) -> bool:
+        """Load the next non-empty row group into numpy arrays.
+
+        Returns:
+            True if a block was loaded, False once all row groups are consumed
+        """
+        while self._next_group < len(self._row_groups):
+            group = self._row_groups[self._next_group]
+            self._next_group += 1
+
+            table = self._file.read_row_group(
+                group, columns=[self._index_column, *OHLCV_COLUMNS]
+            )
+
+            timestamps = table.column(self._index_column)
+            timestamps = pc.cast(timestamps, pa.timestamp('ns', tz='UTC'))
+            ns = timestamps.to_numpy().view('int64')
+
+            mask = np.ones(len(ns), dtype=bool)
+            if self._start_ns is not None:
+                mask &= ns >= self._start_ns
+            if self._end_ns is not None:
+                mask &= ns <= self._end_ns
+            if not mask.any():
+                continue
+
+            columns = [ns_to_bt_num(ns[mask])]
+            for name in OHLCV_COLUMNS:
+                values = table.column(name).to_numpy()
+                columns.append(np.asarray(values, dtype=np.float64)[mask])
+
+            self._block = columns
+            self._block_len = len(columns[0])
+            self._pos = 0
+            return True
+
+        return False
+
+    def _load(self):
+        """Load the next bar into the feed's lines."""
+        if self._pos >= self._block_len:
+            if not self._read_next_block():
+                return False
+
+        i = self._pos
+        self._pos += 1
+
+        dtnum, opens, highs, lows, closes, volumes = self._block
+        self.lines.datetime[0] = dtnum[i]
+        self.lines.open[0] = opens[i]
+        self.lines.high[0] = highs[i]
+        self.lines.low[0] = lows[i]
+        self.lines.close[0] = closes[i]
+        self.lines.volume[0] = volumes[i]
+        self.lines.openinterest[0] = 0.0
+        return True
@@ -3,28 +3,58 @@
 This module provides the Lambda entry point for automated trading.
 The Lambda function is triggered on a schedule (e.g., market close) and
 executes all trading strategies.
+
+Startup: this module only imports the standard library. The live runner
+(backtrader, pandas, alpaca-py) is imported and built on the first
+invocation and kept at module scope, so warm invocations reuse it together
+with its HTTP sessions (keep-alive connections to Alpaca). A
+``{"warmup": true}`` event, e.g. scheduled shortly before the trading run,
+pays that cost ahead of time without trading. To see what a cold start
+imports, run ``python src/lambda_handler.py --import-report``.
+
+Fan-out: with ``live.fanout: lambda`` the scheduled invocation coordinates.
+It invokes this same function once per shard of tickers with
+``{"mode": "worker", ...}`` events, which only fetch data and compute
+signals, and submits all orders itself (see ``src.utils.fanout``).
 """
 import json
 import logging
 import os
+import time
 from typing import Dict, Any
 
 # Configure logging for Lambda
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Import must happen after setting up logging
-from src.runners.live import LiveRunner
+# Live runner reused across warm invocations (built on first use)
+_runner = None
+
+
+def get_runner():
+    """Get the live runner, importing and building it on first use.
+    
+    Returns:
+        LiveRunner shared by all invocations in this execution environment
+    """
+    global _runner
+    if _runner is None:
+        from src.runners.live import LiveRunner
+        _runner = LiveRunner()
+    return _runner
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """AWS Lambda handler function.
     
-    This function is called by AWS Lambda when triggered. It initializes
-    the live trading runner and executes strategies.
+    This function is called by AWS Lambda when triggered. It gets the live
+    trading runner (built on the first invocation) and executes strategies.
     
     Args:
-        event: Lambda event object (contains trigger information)
+        event: Lambda event object (contains trigger information;
+               ``{"warmup": true}`` only loads the runner, a
+               ``{"mode": "worker", ...}`` shard from a coordinator is
+               evaluated without trading)
         context: Lambda context object (contains runtime information)
         
     Returns:
@@ -38,14 +68,35 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     logger.info("="*80)
     
     try:
-        # Initialize live runner
+        # Get the live runner (imported and initialized on a cold start)
         # Note: Environment variables should be set in Lambda configuration
-        logger.info("Initializing LiveRunner")
-        runner = LiveRunner()
+        cold = _runner is None
+        start = time.perf_counter()
+        runner = get_runner()
+        logger.info(f"LiveRunner {'initialized' if cold else 'reused'} in "
+                    f"{(time.perf_counter() - start) * 1000:.0f}ms")
+        
+        if event.get('warmup'):
+            return {
+                'statusCode': 200,
+                'body': {'message': 'Warmed up', 'cold_start': cold}
+            }
+        
+        # Start no new tickers once the timeout is near
+        deadline = runner.deadline_after(context.get_remaining_time_in_millis() / 1000)
+        
+        if event.get('mode') == 'worker':
+            return {
+                'statusCode': 200,
+                'body': runner.evaluate_shard(event, deadline)
+            }
         
-        # Run strategies
+        # Run strategies, as the coordinator of worker invocations when
+        # live.fanout is set
         logger.info("Executing strategies...")
-        results = runner.run_strategies()
+        from src.utils.fanout import open_transport
+        transport = open_transport(runner.live_config, function_name=context.function_name)
+        results = runner.run_strategies(deadline, transport)
         
         # Prepare response
         response = {
@@ -111,5 +162,22 @@ def local_test():
 
 
 if __name__ == '__main__':
-    # Run local test when executed directly
-    local_test()
+    import argparse
+    import sys
+    from pathlib import Path
+    
+    parser = argparse.ArgumentParser(description='Test the Lambda handler locally')
+    parser.add_argument('--import-report', action='store_true',
+                        help='Show the import time of a cold start by package')
+    args = parser.parse_args()
+    
+    if args.import_report:
+        sys.path.insert(0, str(Path(__file__).parent.parent))
+        from src.utils.profiling import import_report
+        # Module load (Lambda init phase), then the runner (first invocation)
+        print(import_report('src.lambda_handler', top=5))
+        print()
+        print(import_report('src.runners.live'))
+    else:
+        # Run local test when executed directly
+        local_test()
@@ -0,0 +1,23 @@
+"""Optimization package."""
+from ..utils.arrays import crossovers, frame_to_arrays, moving_averages
+from ..utils.indicator_cache import IndicatorCache, PrecomputedLine, get_indicator_cache
+from .evaluation import ArrayData, evaluate_batch
+from .vectorized import evaluate_vectorized
+from .parallel import ParallelOptimizer, SharedDataPlane
+from .store import ResultsStore, run_fingerprint
+from .cross_section import load_cube, rank_parameters, results_cube, save_cube
+from .search import (
+    SEARCH_STRATEGIES, GridSearch, ParameterSpace, RandomSearch, SearchStrategy,
+    SobolSearch, SuccessiveHalving, TPESearch, create_search, resolve_budget,
+)
+
+__all__ = [
+    'IndicatorCache', 'PrecomputedLine', 'get_indicator_cache',
+    'ArrayData', 'evaluate_batch', 'frame_to_arrays',
+    'crossovers', 'evaluate_vectorized', 'moving_averages',
+    'ParallelOptimizer', 'SharedDataPlane',
+    'ResultsStore', 'run_fingerprint',
+    'load_cube', 'rank_parameters', 'results_cube', 'save_cube',
+    'SEARCH_STRATEGIES', 'GridSearch', 'ParameterSpace', 'RandomSearch', 'SearchStrategy',
+    'SobolSearch', 'SuccessiveHalving', 'TPESearch', 'create_search', 'resolve_budget',
+]
@@ -0,0 +1,134 @@
+"""Cross-sectional optimization results.
+
+In cross-sectional mode every (ticker, combination) cell is backtested on its
+own (``ParallelOptimizer.evaluate`` with ``tickers``), which shows which
+symbols drive a result and parallelizes across the universe. ``results_cube``
+arranges the per-cell records as a ticker x parameter table, stored as
+Parquet (columnar: a few metrics of a large universe load without reading
+the rest), and ``rank_parameters`` aggregates each combination across
+tickers, e.g. by its median or worst-case result, to pick parameters that
+hold up across the universe rather than on one symbol.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Union
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from .evaluation import RECORD_METRICS
+
+
+# Aggregates computed by rank_parameters
+AGGREGATES = ('median', 'mean', 'worst', 'best', 'std', 'hit_rate', 'tickers')
+
+# Metrics whose sign tells a win from a loss, for the hit rate (drawdowns,
+# final values, exposure and trade counts are never negative)
+SIGNED_METRICS = ('total_return', 'sharpe_ratio', 'sortino_ratio', 'calmar_ratio')
+
+
+def results_cube(records: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """Arrange per-ticker records as a table.
+
+    Args:
+        records: Result records with a 'ticker' key
+
+    Returns:
+        DataFrame with one row per (ticker, combination): 'ticker', one
+        column per parameter and the ``RECORD_METRICS``
+    """
+    rows = [
+        {'ticker': record['ticker'], **record['params'], **{name: record[name] for name in RECORD_METRICS}}
+        for record in records
+    ]
+    cube = pd.DataFrame(rows)
+    if cube.empty:
+        return cube
+
+    # Missing ratios (e.g. Sharpe of a single year) become NaN
+    cube[list(RECORD_METRICS)] = cube[list(RECORD_METRICS)].astype(np.float64)
+    return cube.sort_values(parameter_columns(cube) + ['ticker'], ignore_index=True)
+
+
+def parameter_columns(cube: pd.DataFrame) -> List[str]:
+    """Parameter columns of a results cube."""
+    return [column for column in cube.columns if column != 'ticker' and column not in RECORD_METRICS]
+
+
+def save_cube(cube: pd.DataFrame, path: Union[str, Path]):
+    """Write a results cube to a Parquet file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cube.to_parquet(path, index=False)
+
+
+def load_cube(path: Union[str, Path], metrics: Sequence[str] = ()) -> pd.DataFrame:
+    """Read a results cube, optionally only some of its metrics.
+
+    Args:
+        path: Parquet file written by ``save_cube``
+        metrics: Metric columns to read (empty = all); the ticker and
+                 parameter columns are always read
+
+    Returns:
+        Results cube
+    """
+    if not metrics:
+        return pd.read_parquet(path)
+    names = pq.read_schema(path).names
+    columns = [name for name in names if name not in RECORD_METRICS or name in metrics]
+    return pd.read_parquet(path, columns=columns)
+
+
+def rank_parameters(cube: pd.DataFrame, metric: str = 'total_return', by: str = 'median',
+                    ascending: bool = False) -> pd.DataFrame:
+    """Aggregate each parameter combination across tickers.
+
+    Args:
+        cube: Results cube
+        metric: Metric to aggregate (one of ``RECORD_METRICS``)
+        by: Aggregate to rank by (one of ``AGGREGATES``)
+        ascending: Lower metric values are better (e.g. max_drawdown); the
+                   worst and best cases follow the same direction
+
+    Returns:
+        DataFrame with the parameter columns and, per combination, the
+        'median', 'mean', 'worst' and 'best' metric across tickers, its
+        'std', the 'hit_rate' (share of tickers where the metric is on the
+        better side of zero; NaN for metrics not in ``SIGNED_METRICS``) and
+        the number of 'tickers' with a value, best combination first
+    """
+    if metric not in RECORD_METRICS:
+        raise ValueError(f"Unknown metric '{metric}', expected one of {RECORD_METRICS}")
+    if by not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate '{by}', expected one of {AGGREGATES}")
+    if by == 'hit_rate' and metric not in SIGNED_METRICS:
+        raise ValueError(f"hit_rate needs a metric whose sign marks a win, one of {SIGNED_METRICS}")
+    if cube.empty:
+        return pd.DataFrame(columns=list(AGGREGATES))
+
+    values = cube[metric]
+    keys = [cube[name] for name in parameter_columns(cube)]
+    grouped = values.groupby(keys)
+    if metric in SIGNED_METRICS:
+        hit_rate = (values < 0 if ascending else values > 0).groupby(keys).mean()
+    else:
+        hit_rate = pd.Series(np.nan, index=grouped.size().index)
+    ranking = pd.DataFrame({
+        'median': grouped.median(),
+        'mean': grouped.mean(),
+        'worst': grouped.max() if ascending else grouped.min(),
+        'best': grouped.min() if ascending else grouped.max(),
+        'std': grouped.std(ddof=0),
+        'hit_rate': hit_rate,
+        'tickers': grouped.count(),
+    })
+
+    # Metric aggregates follow the metric's direction, a smaller spread is
+    # better, more hits and tickers are better; NaN aggregates rank last
+    if by in ('median', 'mean', 'worst', 'best'):
+        order_ascending = ascending
+    else:
+        order_ascending = by == 'std'
+    return ranking.sort_values(by, ascending=order_ascending, na_position='last',
+                               kind='stable').reset_index()
@@ -0,0 +1,185 @@
+"""Batch evaluation of strategy parameter combinations.
+
+``evaluate_batch`` runs a list of explicit parameter combinations through one
+cerebro (backtrader's optimization loop, run in-process) and reduces each run
+to a compact result record. Price data is supplied as plain NumPy arrays via
+``ArrayData``, which preloads a run with a handful of buffer copies instead of
+the per-bar pandas lookups of ``PandasData``. This is the unit of work the
+parallel optimizer dispatches to worker processes.
+
+Memory stays flat in the batch size: each run is reduced to its record as
+soon as it finishes (backtrader's ``optreturn`` already drops the strategy,
+the record extraction drops the analyzers), and the finished strategies,
+which backtrader's reference cycles keep alive until a full garbage
+collection, are collected every few runs. Pool workers freeze the objects
+that outlive their batches (modules, price data) when they start, so these
+collections only scan the batch's own objects.
+"""
+import gc
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import backtrader as bt
+import numpy as np
+
+from ..analytics import PortfolioRecorder, compute_metrics
+from ..utils.arrays import ARRAY_LINES, slice_window
+from ..utils.indicator_cache import get_indicator_cache
+from .pruning import EarlyStop
+
+
+# Finished runs between garbage collections of their strategies
+COLLECT_EVERY = 8
+
+# Metrics kept in result records (scalars only, cheap to send between processes)
+RECORD_METRICS = (
+    'final_value', 'total_return', 'sharpe_ratio', 'sortino_ratio', 'max_drawdown',
+    'calmar_ratio', 'exposure', 'total_trades', 'won_trades', 'lost_trades', 'win_rate',
+)
+
+
+class ArrayData(bt.feed.DataBase):
+    """Backtrader feed over a (6, bars) float64 array.
+
+    Preloading copies each row into the line buffer in one step; in
+    non-preload mode bars are loaded one at a time.
+
+    Params:
+        arrays: Array in the ``frame_to_arrays`` layout (may be a view into
+                shared memory; it is never modified)
+    """
+
+    params = (
+        ('arrays', None),
+    )
+
+    def start(self):
+        super().start()
+        self._idx = -1
+
+    def preload(self):
+        arrays = self.p.arrays  # type: ignore[attr-defined]
+        bars = arrays.shape[1]
+
+        for row, name in enumerate(ARRAY_LINES):
+            line = getattr(self.lines, name)
+            line.array = array('d', np.ascontiguousarray(arrays[row]).tobytes())
+        self.lines.openinterest.array = array('d', bytes(8 * bars))
+
+        for line in self.lines:
+            line.idx = bars - 1
+            line.lencount = bars
+
+        self._idx = bars - 1
+        self._last()
+        self.home()
+
+    def _load(self):
+        arrays = self.p.arrays  # type: ignore[attr-defined]
+        self._idx += 1
+        if self._idx >= arrays.shape[1]:
+            return False
+
+        i = self._idx
+        self.lines.datetime[0] = arrays[0, i]
+        self.lines.open[0] = arrays[1, i]
+        self.lines.high[0] = arrays[2, i]
+        self.lines.low[0] = arrays[3, i]
+        self.lines.close[0] = arrays[4, i]
+        self.lines.volume[0] = arrays[5, i]
+        self.lines.openinterest[0] = 0.0
+        return True
+
+
+def evaluate_batch(strategy_class: Type[bt.Strategy], combos: Sequence[Dict[str, Any]],
+                   datas: Sequence[Tuple[str, np.ndarray]], initial_cash: float,
+                   commission: float, fixed_params: Optional[Dict[str, Any]] = None,
+                   include_series: bool = False, window: Optional[Tuple[float, float]] = None,
+                   pruning: Optional[Dict[str, Any]] = None, profiler=None) -> List[Dict[str, Any]]:
+    """Backtest a batch of parameter combinations and return compact records.
+
+    Args:
+        strategy_class: Strategy class
+        combos: Parameter dictionaries, one per run
+        datas: (ticker, arrays) pairs in ``frame_to_arrays`` layout
+        initial_cash: Starting portfolio value
+        commission: Commission rate
+        fixed_params: Parameters passed to every run (e.g. verbose_logging)
+        include_series: Also return 'trade_pnl' and 'bar_returns' arrays
+        window: Inclusive (start, end) backtrader float dates to backtest
+                (None = all bars)
+        pruning: ``EarlyStop`` params ('max_drawdown', 'min_final_value') to
+                 abort hopeless runs (None = run every combination to the end)
+        profiler: Optional HotPathProfiler timing the broker
+
+    Returns:
+        One record per combination with 'params', the ``RECORD_METRICS`` and
+        'pruned' (None, or why the run was stopped early: 'drawdown', 'top_n')
+    """
+    if not combos:
+        return []
+
+    # Runs are already distributed by the caller: keep backtrader in-process
+    # and return lightweight results. In-process, backtrader preloads the
+    # data again for every run (optdatas only applies to its own process
+    # pool); for ArrayData that is one buffer copy per line
+    cerebro = bt.Cerebro(stdstats=False, maxcpus=1, optreturn=True)
+
+    # Orders execute at the signal bar's close, as in backtests and live trading
+    cerebro.broker.set_coc(True)
+    cerebro.broker.setcash(initial_cash)
+    cerebro.broker.setcommission(commission=commission)
+    if profiler is not None:
+        profiler.instrument_broker(cerebro.broker)
+
+    # Batches of a job share their data buffers; another job's cached
+    # indicators are dropped instead of accumulating in the worker
+    get_indicator_cache().use_for(tuple((ticker, arrays.ctypes.data, arrays.shape) for ticker, arrays in datas))
+    for ticker, arrays in datas:
+        cerebro.adddata(ArrayData(arrays=slice_window(arrays, window)), name=ticker)
+    cerebro.addanalyzer(PortfolioRecorder, _name='recorder')
+    if pruning:
+        cerebro.addanalyzer(EarlyStop, _name='early_stop', **pruning)
+
+    # Explicit combinations instead of optstrategy's Cartesian product:
+    # the same (class, args, kwargs) list optstrategy appends to the
+    # strategies, for backtrader (1.9.78) to run one combination at a time.
+    # Both attributes are private, so fail rather than run every
+    # combination together in one cerebro if they ever change.
+    if (not isinstance(getattr(cerebro, 'strats', None), list)
+            or getattr(cerebro, '_dooptimize', None) is not False):
+        raise RuntimeError(f"Unsupported backtrader version {bt.__version__}: "
+                           "Cerebro.strats/_dooptimize changed")
+    fixed_params = fixed_params or {}
+    cerebro.strats.append([(strategy_class, (), {**fixed_params, **combo}) for combo in combos])
+    cerebro._dooptimize = True
+
+    records: List[Dict[str, Any]] = []
+    pending = iter(combos)
+
+    def finish(run):
+        # Called by cerebro right after each run (in combination order)
+        (result,) = run
+        metrics = compute_metrics(result.analyzers.recorder.get_analysis(), initial_cash)
+        record: Dict[str, Any] = {'params': dict(next(pending))}
+        record.update((name, metrics[name]) for name in RECORD_METRICS)
+        record['pruned'] = result.analyzers.early_stop.get_analysis()['reason'] if pruning else None
+        if include_series:
+            record['trade_pnl'] = metrics['trade_pnl']
+            record['bar_returns'] = metrics['bar_returns']
+        records.append(record)
+
+        # Cerebro keeps every run's result until the batch ends: keep only
+        # the params, not the recorded arrays
+        result.analyzers = None
+        if len(records) % COLLECT_EVERY == 0:
+            gc.collect()
+        # A stop request (EarlyStop's runstop) otherwise persists into the
+        # following combinations: backtrader (1.9.78) only clears the private
+        # flag at the start of Cerebro.run, not between optimization runs, and
+        # offers no public way to reset it
+        cerebro._event_stop = False
+
+    cerebro.optcallback(finish)
+    cerebro.run()
+    return records
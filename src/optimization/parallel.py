@@ -0,0 +1,423 @@
+"""Process-pool optimizer with a shared-memory data plane.
+
+Each ticker's OHLCV arrays are written once into POSIX shared memory. Worker
+processes attach to those blocks when they start (zero-copy NumPy views), so
+price data is never pickled per task. Parameter combinations are dispatched
+in chunks; every worker evaluates its chunk with ``evaluate_batch`` and sends
+back only compact result records.
+
+With ``workers=1`` everything runs in-process (no pool, no shared memory),
+which also allows profiler-instrumented strategy classes.
+"""
+import gc
+import heapq
+import importlib
+import logging
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+from ..utils.arrays import frame_to_arrays
+from .evaluation import evaluate_batch
+from .store import run_fingerprint
+from .vectorized import evaluate_vectorized
+
+logger = logging.getLogger(__name__)
+
+
+# Chunks per worker when no batch size is configured (balances load while
+# keeping per-task overhead low)
+_CHUNKS_PER_WORKER = 4
+
+# (ticker, shared memory block name, array shape)
+DataSpec = List[Tuple[str, str, Tuple[int, ...]]]
+
+
+class SharedDataPlane:
+    """Price arrays for all tickers, stored in shared memory blocks."""
+
+    def __init__(self):
+        self._blocks: List[SharedMemory] = []
+        self._views: List[Tuple[str, np.ndarray]] = []
+        self.spec: DataSpec = []
+
+    def add(self, ticker: str, arrays: np.ndarray):
+        """Copy a ticker's arrays into a new shared memory block.
+
+        Args:
+            ticker: Ticker name
+            arrays: Arrays in ``frame_to_arrays`` layout
+        """
+        block = SharedMemory(create=True, size=max(arrays.nbytes, 1))
+        view = np.ndarray(arrays.shape, dtype=np.float64, buffer=block.buf)
+        view[:] = arrays
+
+        self._blocks.append(block)
+        self._views.append((ticker, view))
+        self.spec.append((ticker, block.name, arrays.shape))
+
+    @property
+    def datas(self) -> List[Tuple[str, np.ndarray]]:
+        """(ticker, arrays) pairs viewing the shared blocks."""
+        return list(self._views)
+
+    @staticmethod
+    def attach(spec: DataSpec) -> Tuple[List[SharedMemory], List[Tuple[str, np.ndarray]]]:
+        """Attach to blocks created by another process.
+
+        Worker processes share the owner's resource tracker, so attaching
+        does not transfer ownership: the owner alone unlinks the blocks.
+
+        Args:
+            spec: ``SharedDataPlane.spec`` of the owning process
+
+        Returns:
+            Tuple of (block handles to keep alive, (ticker, arrays) pairs)
+        """
+        blocks = []
+        datas = []
+        for ticker, name, shape in spec:
+            block = SharedMemory(name=name)
+            view = np.ndarray(shape, dtype=np.float64, buffer=block.buf)
+            view.flags.writeable = False
+            blocks.append(block)
+            datas.append((ticker, view))
+        return blocks, datas
+
+    def close(self):
+        """Release and unlink all blocks."""
+        self._views.clear()
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks.clear()
+        self.spec = []
+
+
+# Per-worker state set up once by the pool initializer
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(strategy_ref: Tuple[str, str], spec: DataSpec, settings: Dict[str, Any]):
+    """Pool initializer: import the strategy and attach to the data plane."""
+    module_path, class_name = strategy_ref
+    _worker['strategy_class'] = getattr(importlib.import_module(module_path), class_name)
+    _worker['blocks'], _worker['datas'] = SharedDataPlane.attach(spec)
+    _worker['settings'] = settings
+
+    # Move everything the worker keeps for its lifetime out of the garbage
+    # collector's generations, so the collections between runs only scan
+    # the batch's objects. The worker process belongs to the pool, so this
+    # never affects the caller's process.
+    gc.freeze()
+
+
+def _select_datas(datas: List[Tuple[str, np.ndarray]], ticker: Optional[str]) -> List[Tuple[str, np.ndarray]]:
+    """All datas, or only the given ticker's."""
+    return datas if ticker is None else [(name, arrays) for name, arrays in datas if name == ticker]
+
+
+def _evaluate_chunk(combos: List[Dict[str, Any]], include_series: bool,
+                    window: Optional[Tuple[float, float]],
+                    pruning: Optional[Dict[str, Any]], ticker: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Pool task: evaluate a chunk of combinations in a worker."""
+    records = evaluate_batch(
+        _worker['strategy_class'], combos, _select_datas(_worker['datas'], ticker),
+        include_series=include_series, window=window, pruning=pruning, **_worker['settings']
+    )
+    return _tag(records, ticker)
+
+
+def _tag(records: List[Dict[str, Any]], ticker: Optional[str]) -> List[Dict[str, Any]]:
+    """Add the ticker to per-ticker records."""
+    if ticker is not None:
+        for record in records:
+            record['ticker'] = ticker
+    return records
+
+
+class ParallelOptimizer:
+    """Evaluates parameter combinations across a pool of worker processes.
+
+    Use as a context manager so the pool and shared memory are released::
+
+        with ParallelOptimizer(SMAStrategy, frames, 100000.0, 0.001) as optimizer:
+            records = optimizer.evaluate(combos)
+    """
+
+    def __init__(self, strategy_class: Type[bt.Strategy], frames: Dict[str, pd.DataFrame],
+                 initial_cash: float, commission: float,
+                 fixed_params: Optional[Dict[str, Any]] = None,
+                 workers: Optional[int] = None, batch_size: Optional[int] = None,
+                 pruning: Optional[Dict[str, Any]] = None, profiler=None):
+        """Initialize optimizer.
+
+        Args:
+            strategy_class: Strategy class (must be importable for workers > 1)
+            frames: Ticker -> OHLCV DataFrame
+            initial_cash: Starting portfolio value
+            commission: Commission rate
+            fixed_params: Parameters passed to every run
+            workers: Worker processes (None = all CPU cores, 1 = in-process)
+            batch_size: Combinations per task (None = automatic)
+            pruning: Early stopping settings: 'max_drawdown' (percent) and
+                     'top_n' (stop runs that can no longer reach the top N
+                     final values of the same window); None = disabled
+            profiler: Optional HotPathProfiler (forces in-process evaluation)
+        """
+        self.strategy_class = strategy_class
+        self.settings = {
+            'initial_cash': initial_cash,
+            'commission': commission,
+            'fixed_params': fixed_params or {},
+        }
+        self.workers = 1 if profiler is not None and profiler.enabled else (workers or os.cpu_count() or 1)
+        self.batch_size = batch_size
+        self.pruning = pruning or {}
+        self.profiler = profiler
+
+        self._datas = [(ticker, frame_to_arrays(df)) for ticker, df in frames.items()]
+        self._plane: Optional[SharedDataPlane] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+        # Best final values per window, or per window and ticker for
+        # per-ticker runs (min-heaps of size top_n) for pruning
+        self._leaders: Dict[Any, List[float]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _start_pool(self):
+        self._plane = SharedDataPlane()
+        for ticker, arrays in self._datas:
+            self._plane.add(ticker, arrays)
+
+        strategy_ref = (self.strategy_class.__module__, self.strategy_class.__qualname__)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(strategy_ref, self._plane.spec, self.settings),
+        )
+
+    def close(self):
+        """Shut down the worker pool and release shared memory."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._plane is not None:
+            self._plane.close()
+            self._plane = None
+
+    @property
+    def tickers(self) -> List[str]:
+        """Tickers in data order."""
+        return [ticker for ticker, _ in self._datas]
+
+    def _chunks(self, combos: Sequence[Dict[str, Any]], copies: int = 1) -> List[List[Dict[str, Any]]]:
+        # copies: how many times each chunk is evaluated (once per ticker)
+        cells = len(combos) * copies
+        size = self.batch_size or max(1, math.ceil(cells / (self.workers * _CHUNKS_PER_WORKER)))
+        return [list(combos[i:i + size]) for i in range(0, len(combos), size)]
+
+    @property
+    def date_range(self) -> Tuple[float, float]:
+        """First and last bar date (backtrader float dates) across all tickers."""
+        starts = [arrays[0, 0] for _, arrays in self._datas if arrays.shape[1]]
+        ends = [arrays[0, -1] for _, arrays in self._datas if arrays.shape[1]]
+        return (min(starts), max(ends)) if starts else (0.0, 0.0)
+
+    def trailing_window(self, fraction: float) -> Optional[Tuple[float, float]]:
+        """Window covering the most recent fraction of the date range.
+
+        Args:
+            fraction: Share of the date range (1.0 = everything)
+
+        Returns:
+            (start, end) window for ``evaluate``, or None for the full range
+        """
+        if fraction >= 1.0:
+            return None
+        start, end = self.date_range
+        return (end - (end - start) * fraction, end)
+
+    def _pruning(self, window: Optional[Tuple[float, float]],
+                 ticker: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """``EarlyStop`` params for the next chunk, from the current leaders."""
+        max_drawdown = self.pruning.get('max_drawdown')
+        top_n = self.pruning.get('top_n')
+        leaders = self._leaders.get(_leader_key(window, ticker), [])
+        min_final_value = leaders[0] if top_n and len(leaders) >= top_n else None
+
+        if max_drawdown is None and min_final_value is None:
+            return None
+        return {'max_drawdown': max_drawdown, 'min_final_value': min_final_value}
+
+    def fingerprint(self, window: Optional[Tuple[float, float]] = None) -> str:
+        """Fingerprint of the strategy, data and settings for a window (see ``run_fingerprint``)."""
+        strategy_name = f"{self.strategy_class.__module__}.{self.strategy_class.__qualname__}"
+        return run_fingerprint(strategy_name, self._datas, self.settings, window)
+
+    def observe(self, records: Sequence[Dict[str, Any]],
+                window: Optional[Tuple[float, float]] = None):
+        """Feed results obtained elsewhere (e.g. a results store) into pruning.
+
+        Args:
+            records: Result records
+            window: Window the records were evaluated on
+        """
+        self._track(window, records)
+
+    def _track(self, window: Optional[Tuple[float, float]], records: Sequence[Dict[str, Any]]):
+        """Update the leaders of a window with completed runs."""
+        top_n = self.pruning.get('top_n')
+        if not top_n:
+            return
+
+        for record in records:
+            if record.get('pruned'):
+                continue
+            leaders = self._leaders.setdefault(_leader_key(window, record.get('ticker')), [])
+            if len(leaders) < top_n:
+                heapq.heappush(leaders, record['final_value'])
+            elif record['final_value'] > leaders[0]:
+                heapq.heapreplace(leaders, record['final_value'])
+
+    def evaluate(self, combos: Sequence[Dict[str, Any]], include_series: bool = False,
+                 window: Optional[Tuple[float, float]] = None, prune: bool = True,
+                 on_records: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+                 tickers: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Evaluate parameter combinations.
+
+        Args:
+            combos: Parameter dictionaries
+            include_series: Also return 'trade_pnl' and 'bar_returns' arrays
+            window: Inclusive (start, end) backtrader float dates to backtest
+                    (None = full date range)
+            prune: Apply the configured early stopping
+            on_records: Called with the records of each finished chunk
+                        (e.g. to persist them as they arrive)
+            tickers: Backtest every combination on each of these tickers
+                     alone, as independent tasks (records get a 'ticker'
+                     key and are pruned against the same ticker's results);
+                     None = all tickers together in one run
+
+        Returns:
+            Result records (see ``evaluate_batch``) in completion order
+        """
+        targets: Sequence[Optional[str]] = list(tickers) if tickers is not None else [None]
+        tasks = [(ticker, chunk) for chunk in self._chunks(combos, len(targets)) for ticker in targets]
+        tracker = _Progress(len(combos) * len(targets))
+        records: List[Dict[str, Any]] = []
+
+        def pruning(ticker):
+            return self._pruning(window, ticker) if prune else None
+
+        if self.workers == 1:
+            for ticker, chunk in tasks:
+                chunk_records = _tag(evaluate_batch(
+                    self.strategy_class, chunk, _select_datas(self._datas, ticker),
+                    include_series=include_series, window=window, pruning=pruning(ticker),
+                    profiler=self.profiler, **self.settings
+                ), ticker)
+                self._track(window, chunk_records)
+                if on_records is not None:
+                    on_records(chunk_records)
+                records.extend(chunk_records)
+                tracker.update(len(chunk))
+            return records
+
+        if self._pool is None:
+            self._start_pool()
+
+        # Keep a bounded number of chunks in flight so later chunks are
+        # dispatched with the pruning threshold of the results so far
+        pending = set()
+        queue = iter(tasks)
+        while True:
+            for ticker, chunk in queue:
+                pending.add(self._pool.submit(  # type: ignore[union-attr]
+                    _evaluate_chunk, chunk, include_series, window, pruning(ticker), ticker
+                ))
+                if len(pending) >= 2 * self.workers:
+                    break
+            if not pending:
+                break
+
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk_records = future.result()
+                self._track(window, chunk_records)
+                if on_records is not None:
+                    on_records(chunk_records)
+                records.extend(chunk_records)
+                tracker.update(len(chunk_records))
+
+        return records
+
+    def evaluate_vectorized(self, combos: Sequence[Dict[str, Any]], include_series: bool = False,
+                            window: Optional[Tuple[float, float]] = None,
+                            checkpoint: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        """Evaluate combinations in-process with array-form signals.
+
+        Args:
+            combos: Parameter dictionaries
+            include_series: Also return 'trade_pnl' and 'bar_returns' arrays
+            window: Inclusive (start, end) backtrader float dates to backtest
+                    (None = full date range)
+            checkpoint: File to resume the simulation from when only new
+                        bars were added, and to save it to (None = none)
+
+        Returns:
+            Approximate result records in combination order (see
+            ``evaluate_vectorized``), or None when the strategy has no
+            array-form signals
+        """
+        # Approximate final values do not feed the pruning thresholds
+        return evaluate_vectorized(self.strategy_class, combos, self._datas,
+                                   include_series=include_series, window=window,
+                                   checkpoint=checkpoint, **self.settings)
+
+
+def _leader_key(window: Optional[Tuple[float, float]], ticker: Optional[str]) -> Any:
+    """Pruning leaders are kept per window, and per ticker for per-ticker runs."""
+    return window if ticker is None else (window, ticker)
+
+
+class _Progress:
+    """Logs evaluation progress at most every few seconds.
+
+    Evaluations finishing within the first interval are not logged, so the
+    many small batches of adaptive searches stay quiet.
+    """
+
+    _INTERVAL = 5.0
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self._start = time.perf_counter()
+        self._last = self._start
+
+    def update(self, count: int):
+        self.done += count
+        now = time.perf_counter()
+        finished = self.done >= self.total and self._last > self._start
+        if not finished and now - self._last < self._INTERVAL:
+            return
+
+        self._last = now
+        elapsed = now - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = (self.total - self.done) / rate if rate > 0 else 0.0
+        logger.info(f"Progress: {self.done}/{self.total} ({self.done / self.total * 100:.0f}%) - "
+                    f"{rate:.1f} combos/s, ETA {eta:.0f}s")
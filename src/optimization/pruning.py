@@ -0,0 +1,115 @@
+"""Early stopping of optimization runs.
+
+``EarlyStop`` is attached to optimization runs when pruning is configured. It
+aborts a run as soon as
+
+- its drawdown exceeds ``max_drawdown`` percent, or
+- it can no longer finish above ``min_final_value`` (the N-th best final
+  value seen so far), even with perfect foresight.
+
+The second check uses an upper bound on the growth a long-only, unlevered
+portfolio can still achieve: for every remaining bar the best possible move
+is ``high / min(low, previous close)`` (never below 1). The bound is loose
+early in a run and tightens towards the end. It only holds for long-only,
+unlevered runs, so the check applies to strategies that declare
+``long_only = True`` (``BaseStrategy`` does), and stops for the rest of a
+run that nevertheless ends up short (e.g. an exit that filled twice). It is
+still a bound for the portfolio as simulated by backtrader's broker, not a
+guarantee for every order interaction.
+"""
+import math
+from typing import Any, Dict, Optional
+
+import backtrader as bt
+import numpy as np
+
+from ..utils.arrays import OHLCV_COLUMNS
+
+
+def remaining_log_growth(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Log of the maximum growth achievable after each bar.
+
+    Args:
+        high: High prices
+        low: Low prices
+        close: Close prices
+
+    Returns:
+        Array where element i bounds log(final value / value at bar i)
+    """
+    bars = len(close)
+    growth = np.zeros(bars, dtype=np.float64)
+    if bars < 2:
+        return growth
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        best_move = high[1:] / np.minimum(low[1:], close[:-1])
+    best_move = np.where(np.isfinite(best_move), np.maximum(best_move, 1.0), 1.0)
+
+    # growth[i] = sum of log moves of bars i+1 .. end
+    growth[:-1] = np.cumsum(np.log(best_move)[::-1])[::-1]
+    return growth
+
+
+class EarlyStop(bt.Analyzer):
+    """Stops the run once a combination is hopeless.
+
+    Params:
+        max_drawdown: Maximum drawdown in percent (None = no limit)
+        min_final_value: Final value the run must still be able to beat
+                         (None = no threshold)
+    """
+
+    params = (
+        ('max_drawdown', None),
+        ('min_final_value', None),
+    )
+
+    def start(self):
+        self.reason: Optional[str] = None
+        self._peak = -math.inf
+        self._growth = []
+
+        min_final_value = self.p.min_final_value  # type: ignore[attr-defined]
+        if min_final_value is None or min_final_value <= 0:
+            return
+        if not getattr(self.strategy, 'long_only', False):
+            return
+
+        # The bound needs every bar up front (preloaded data)
+        for data in self.datas:
+            lines = {name: np.frombuffer(getattr(data.lines, name).array, dtype=np.float64)
+                     for name in OHLCV_COLUMNS[1:4]}
+            if len(lines['close']) != data.buflen():
+                self._growth = []
+                return
+            self._growth.append(remaining_log_growth(lines['high'], lines['low'], lines['close']))
+
+    def next(self):
+        if self.reason is not None:
+            return
+
+        value = self.strategy.broker.getvalue()
+        max_drawdown = self.p.max_drawdown  # type: ignore[attr-defined]
+        if max_drawdown is not None:
+            self._peak = max(self._peak, value)
+            if self._peak > 0 and (self._peak - value) / self._peak * 100 > max_drawdown:
+                self._abort('drawdown')
+                return
+
+        if self._growth and any(self.strategy.getposition(data).size < 0 for data in self.datas):
+            # Shorts can gain on falling prices, which the bound ignores
+            self._growth = []
+
+        if self._growth and value > 0:
+            # Product of per-data bounds: also valid when switching between tickers
+            growth = sum(bound[len(data) - 1] for bound, data in zip(self._growth, self.datas))
+            if math.log(value) + growth < math.log(self.p.min_final_value):  # type: ignore[attr-defined]
+                self._abort('top_n')
+
+    def _abort(self, reason: str):
+        self.reason = reason
+        self.strategy.env.runstop()
+
+    def get_analysis(self) -> Dict[str, Any]:
+        return {'reason': self.reason}
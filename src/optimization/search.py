@@ -0,0 +1,499 @@
+"""Search strategies for parameter optimization.
+
+The full Cartesian grid grows multiplicatively with every parameter. The
+strategies here explore the same discrete grid under an evaluation budget:
+
+- ``grid``: every combination (the budget is ignored)
+- ``random``: distinct combinations drawn uniformly
+- ``sobol``: a scrambled Sobol sequence, which covers the grid more evenly
+  than random draws
+- ``halving``: successive halving; many candidates are backtested on the most
+  recent part of the date range, and the best ``1/eta`` are promoted to
+  progressively longer windows, ending on the full range
+- ``tpe``: a Tree-structured Parzen Estimator; after a space-filling start it
+  proposes combinations whose values resemble the best results seen so far
+
+Budgets count full-window backtests: a run on a quarter of the date range
+costs 0.25. A budget <= 1 is a fraction of the grid size.
+
+The space is pruned before any search: strategies declare constraints and
+equivalence rules next to ``OPTIMIZE_PARAMS`` and invalid or duplicate
+combinations are never dispatched.
+
+Strategies only see an ``evaluate(combos, fraction)`` callable returning
+result records and a ``score(record)`` callable, so they are independent of
+how backtests are executed.
+"""
+import logging
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+# evaluate(combos, fraction of the date range) -> result records
+Evaluator = Callable[[List[Dict[str, Any]], float], List[Dict[str, Any]]]
+Scorer = Callable[[Dict[str, Any]], float]
+# Parameter constraint (True = valid) and equivalence rule (-> canonical parameters)
+Constraint = Callable[[Dict[str, Any]], bool]
+Equivalence = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# Joe-Kuo direction numbers (s, a, m) for Sobol dimensions 2..13; the first
+# dimension uses the van der Corput sequence
+_SOBOL_DIRECTIONS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+)
+_SOBOL_BITS = 32
+SOBOL_MAX_DIMENSIONS = len(_SOBOL_DIRECTIONS) + 1
+
+
+def sobol_points(n: int, dimensions: int,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Generate points of a Sobol sequence in the unit hypercube.
+
+    Args:
+        n: Number of points
+        dimensions: Number of dimensions (at most ``SOBOL_MAX_DIMENSIONS``)
+        rng: If given, apply a random digital shift (scrambling)
+
+    Returns:
+        Array of shape (n, dimensions) with values in [0, 1)
+    """
+    if dimensions > SOBOL_MAX_DIMENSIONS:
+        raise ValueError(f"Sobol sampling supports up to {SOBOL_MAX_DIMENSIONS} parameters")
+
+    directions = np.zeros((dimensions, _SOBOL_BITS), dtype=np.uint64)
+    directions[0] = [1 << (_SOBOL_BITS - 1 - k) for k in range(_SOBOL_BITS)]
+    for dim in range(1, dimensions):
+        s, a, m = _SOBOL_DIRECTIONS[dim - 1]
+        v = [m_k << (_SOBOL_BITS - 1 - k) for k, m_k in enumerate(m)]
+        for k in range(s, _SOBOL_BITS):
+            value = v[k - s] ^ (v[k - s] >> s)
+            for j in range(1, s):
+                if (a >> (s - 1 - j)) & 1:
+                    value ^= v[k - j]
+            v.append(value)
+        directions[dim] = v
+
+    # Gray code construction: point i differs from point i-1 by the direction
+    # number of the lowest zero bit of i-1
+    points = np.zeros((n, dimensions), dtype=np.uint64)
+    for i in range(1, n):
+        c = (i & -i).bit_length() - 1
+        points[i] = points[i - 1] ^ directions[:, c]
+
+    if rng is not None:
+        points ^= rng.integers(0, 1 << _SOBOL_BITS, size=dimensions, dtype=np.uint64)
+
+    return points.astype(np.float64) / float(1 << _SOBOL_BITS)
+
+
+class ParameterSpace:
+    """Discrete parameter grid addressed by per-parameter value indices.
+
+    Combinations violating a constraint are pruned, and combinations that an
+    equivalence rule maps onto the same canonical parameters are evaluated
+    once (the first in grid order represents the group). Pruning happens
+    before any backtest is built; ``invalid`` and ``duplicates`` count what
+    was removed.
+    """
+
+    def __init__(self, param_ranges: Dict[str, Sequence[Any]],
+                 constraints: Sequence[Constraint] = (),
+                 equivalence: Optional[Equivalence] = None):
+        """Initialize parameter space.
+
+        Args:
+            param_ranges: Parameter name -> values to test
+            constraints: Predicates a combination must satisfy, e.g.
+                         ``lambda p: p['fast_period'] < p['slow_period']``
+            equivalence: Maps a combination to canonical parameters; combinations
+                         with equal canonical parameters behave identically
+        """
+        self.names = list(param_ranges)
+        self.values = [list(values) for values in param_ranges.values()]
+        self.shape = tuple(len(values) for values in self.values)
+
+        self.invalid = 0
+        self.duplicates = 0
+        self.members: List[Tuple[int, ...]] = []
+        self._representative: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+
+        groups: Dict[Tuple[Any, ...], Tuple[int, ...]] = {}
+        for idx in np.ndindex(*self.shape):
+            idx = tuple(int(i) for i in idx)
+            params = self.combo(idx)
+            if not all(constraint(params) for constraint in constraints):
+                self.invalid += 1
+                continue
+
+            if equivalence is not None:
+                key = tuple(sorted(equivalence(params).items()))
+                if key in groups:
+                    self.duplicates += 1
+                    self._representative[idx] = groups[key]
+                    continue
+                groups[key] = idx
+
+            self._representative[idx] = idx
+            self.members.append(idx)
+
+    @property
+    def grid_size(self) -> int:
+        """Number of combinations in the Cartesian grid, before pruning."""
+        return math.prod(self.shape)
+
+    @property
+    def size(self) -> int:
+        """Number of distinct valid combinations."""
+        return len(self.members)
+
+    @property
+    def pruned(self) -> int:
+        """Combinations removed by constraints and equivalence rules."""
+        return self.invalid + self.duplicates
+
+    def combo(self, indices: Sequence[int]) -> Dict[str, Any]:
+        """Parameter dictionary for a tuple of value indices."""
+        return {name: values[i] for name, values, i in zip(self.names, self.values, indices)}
+
+    def index_of(self, params: Dict[str, Any]) -> Tuple[int, ...]:
+        """Value indices of a parameter dictionary produced by ``combo``."""
+        return tuple(values.index(params[name]) for name, values in zip(self.names, self.values))
+
+    def representative(self, indices: Tuple[int, ...]) -> Optional[Tuple[int, ...]]:
+        """Combination evaluated in place of ``indices`` (None if it was pruned)."""
+        return self._representative.get(indices)
+
+    def grid(self) -> List[Tuple[int, ...]]:
+        """Value indices of every distinct valid combination, in grid order."""
+        return list(self.members)
+
+    def random(self, n: int, rng: np.random.Generator,
+               exclude: Optional[set] = None) -> List[Tuple[int, ...]]:
+        """Draw up to n distinct combinations not in ``exclude``."""
+        exclude = exclude or set()
+        remaining = [idx for idx in self.members if idx not in exclude]
+        order = rng.permutation(len(remaining))[:n]
+        return [remaining[i] for i in order]
+
+    def sobol(self, n: int, rng: np.random.Generator,
+              exclude: Optional[set] = None) -> List[Tuple[int, ...]]:
+        """Draw up to n distinct combinations from a scrambled Sobol sequence.
+
+        Sobol points are mapped onto the grid (pruned points are skipped and
+        duplicates replaced by their representative), so several points may
+        land on the same combination; draws continue until n distinct
+        combinations are found, topping up with random ones if the sequence
+        stalls.
+        """
+        if len(self.shape) > SOBOL_MAX_DIMENSIONS:
+            logger.warning(f"More than {SOBOL_MAX_DIMENSIONS} parameters, using random sampling")
+            return self.random(n, rng, exclude)
+
+        seen = set(exclude or ())
+        n = min(n, self.size - len(seen))
+        if n <= 0:
+            return []
+        points = sobol_points(4 * n + 16, len(self.shape), rng)
+        indices = np.floor(points * np.array(self.shape)).astype(int)
+
+        chosen: List[Tuple[int, ...]] = []
+        for row in indices:
+            idx = self.representative(tuple(int(i) for i in row))
+            if idx is not None and idx not in seen:
+                seen.add(idx)
+                chosen.append(idx)
+                if len(chosen) == n:
+                    return chosen
+
+        return chosen + self.random(n - len(chosen), rng, seen)
+
+
+def resolve_budget(budget: Optional[float], size: int) -> int:
+    """Convert a configured budget into a number of full-window backtests.
+
+    Args:
+        budget: None (whole grid), a fraction of the grid (<= 1) or a count
+        size: Number of combinations in the grid
+
+    Returns:
+        Budget between 1 and ``size``
+    """
+    if budget is None:
+        return size
+    if budget <= 1:
+        budget = math.ceil(budget * size)
+    return max(1, min(int(budget), size))
+
+
+def _score_of(score: Scorer, record: Dict[str, Any]) -> float:
+    # Runs stopped early have partial metrics and rank last
+    if record.get('pruned'):
+        return -math.inf
+    value = score(record)
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return -math.inf
+    return float(value)
+
+
+class SearchStrategy(ABC):
+    """Base class for search strategies.
+
+    Subclasses implement ``search`` and return full-window result records.
+    """
+
+    name = ''
+
+    def __init__(self, budget: Optional[float] = None, seed: Optional[int] = None):
+        """Initialize search strategy.
+
+        Args:
+            budget: Full-window backtests allowed (None = grid size,
+                    <= 1 = fraction of the grid size)
+            seed: Random seed for reproducible searches
+        """
+        self.budget = budget
+        self.rng = np.random.default_rng(seed)
+
+    @abstractmethod
+    def search(self, space: ParameterSpace, evaluate: Evaluator,
+               score: Scorer) -> List[Dict[str, Any]]:
+        """Explore the parameter space.
+
+        Args:
+            space: Parameter space
+            evaluate: Backtests combinations on a fraction of the date range
+            score: Objective to maximize
+
+        Returns:
+            Result records of the combinations evaluated on the full window
+        """
+
+    def _evaluate(self, space: ParameterSpace, evaluate: Evaluator,
+                  indices: Sequence[Tuple[int, ...]], fraction: float = 1.0) -> List[Dict[str, Any]]:
+        return evaluate([space.combo(idx) for idx in indices], fraction)
+
+
+class GridSearch(SearchStrategy):
+    """Exhaustive search over every combination."""
+
+    name = 'grid'
+
+    def search(self, space, evaluate, score):
+        return self._evaluate(space, evaluate, space.grid())
+
+
+class RandomSearch(SearchStrategy):
+    """Uniformly sampled distinct combinations."""
+
+    name = 'random'
+
+    def search(self, space, evaluate, score):
+        n = resolve_budget(self.budget, space.size)
+        return self._evaluate(space, evaluate, space.random(n, self.rng))
+
+
+class SobolSearch(SearchStrategy):
+    """Combinations drawn from a scrambled Sobol sequence."""
+
+    name = 'sobol'
+
+    def search(self, space, evaluate, score):
+        n = resolve_budget(self.budget, space.size)
+        return self._evaluate(space, evaluate, space.sobol(n, self.rng))
+
+
+class SuccessiveHalving(SearchStrategy):
+    """Successive halving over growing windows of the date range.
+
+    Rungs backtest their candidates on the most recent part of the date
+    range, growing geometrically from ``min_fraction`` to the full range, and
+    keep the best ``1 / eta`` for the next rung. The last rung uses the
+    full range. The initial candidate count is the largest one whose total
+    cost fits the budget.
+    """
+
+    name = 'halving'
+
+    def __init__(self, budget: Optional[float] = None, seed: Optional[int] = None,
+                 eta: int = 3, min_fraction: float = 0.25):
+        """Initialize successive halving.
+
+        Args:
+            budget: Full-window backtests allowed
+            seed: Random seed
+            eta: Reduction factor between rungs
+            min_fraction: Shortest window as a fraction of the date range
+                          (long enough for indicators to warm up)
+        """
+        super().__init__(budget, seed)
+        if eta < 2:
+            raise ValueError("eta must be at least 2")
+        self.eta = eta
+        self.min_fraction = min(max(min_fraction, 1e-3), 1.0)
+
+    def fractions(self) -> List[float]:
+        """Window fraction of each rung, shortest first (geometric from ``min_fraction`` to 1)."""
+        rungs = math.ceil(math.log(1.0 / self.min_fraction, self.eta) - 1e-9) + 1
+        if rungs == 1:
+            return [1.0]
+        return [self.min_fraction ** ((rungs - 1 - r) / (rungs - 1)) for r in range(rungs)]
+
+    def search(self, space, evaluate, score):
+        budget = resolve_budget(self.budget, space.size)
+        fractions = self.fractions()
+        cost_per_candidate = sum(f / self.eta ** r for r, f in enumerate(fractions))
+        n_initial = min(space.size, max(1, int(budget / cost_per_candidate)))
+
+        candidates = space.sobol(n_initial, self.rng)
+        records: List[Dict[str, Any]] = []
+        for rung, fraction in enumerate(fractions):
+            logger.info(f"Rung {rung + 1}/{len(fractions)}: {len(candidates)} candidates "
+                        f"on the last {fraction * 100:.0f}% of the date range")
+            records = self._evaluate(space, evaluate, candidates, fraction)
+            if rung == len(fractions) - 1:
+                break
+
+            records.sort(key=lambda record: _score_of(score, record), reverse=True)
+            keep = max(1, len(records) // self.eta)
+            candidates = [space.index_of(record['params']) for record in records[:keep]]
+
+        return records
+
+
+class TPESearch(SearchStrategy):
+    """Tree-structured Parzen Estimator over the discrete grid.
+
+    Results are split into the best ``gamma`` share and the rest. For each
+    parameter a Parzen density over value indices is fitted to both groups;
+    candidates are sampled from the density of the good group and the one
+    maximizing the ratio good/bad is evaluated next. Parameters are treated
+    as ordered (neighbouring values are similar), which suits periods and
+    thresholds.
+    """
+
+    name = 'tpe'
+
+    def __init__(self, budget: Optional[float] = None, seed: Optional[int] = None,
+                 gamma: float = 0.25, startup: float = 0.3, candidates: int = 24,
+                 batch_size: int = 1):
+        """Initialize TPE.
+
+        Args:
+            budget: Full-window backtests allowed
+            seed: Random seed
+            gamma: Share of results forming the good group
+            startup: Share of the budget spent on space-filling (Sobol) samples
+            candidates: Candidates sampled per proposal
+            batch_size: Combinations proposed per evaluation round
+                        (e.g. the number of worker processes)
+        """
+        super().__init__(budget, seed)
+        self.gamma = gamma
+        self.startup = startup
+        self.candidates = candidates
+        self.batch_size = max(1, batch_size)
+
+    def _densities(self, space: ParameterSpace, observed: List[Tuple[int, ...]]) -> List[np.ndarray]:
+        """Per-parameter probabilities over value indices (Gaussian kernels + uniform prior)."""
+        densities = []
+        for dim, size in enumerate(space.shape):
+            positions = np.arange(size)
+            bandwidth = max(1.0, size / 10)
+            weights = np.full(size, 1.0 / size)
+            for idx in observed:
+                kernel = np.exp(-0.5 * ((positions - idx[dim]) / bandwidth) ** 2)
+                weights += kernel / kernel.sum()
+            densities.append(weights / weights.sum())
+        return densities
+
+    def _propose(self, space: ParameterSpace, history: List[Tuple[float, Tuple[int, ...]]],
+                 seen: set, n: int) -> List[Tuple[int, ...]]:
+        ranked = [idx for _, idx in sorted(history, key=lambda item: item[0], reverse=True)]
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good = self._densities(space, ranked[:n_good])
+        bad = self._densities(space, ranked[n_good:])
+
+        proposals: List[Tuple[int, ...]] = []
+        pending = set(seen)
+        for _ in range(n):
+            samples = np.column_stack([
+                self.rng.choice(len(p), size=self.candidates, p=p) for p in good
+            ])
+            ratio = sum(np.log(g[samples[:, d]]) - np.log(b[samples[:, d]])
+                        for d, (g, b) in enumerate(zip(good, bad)))
+            for row in np.argsort(-ratio):
+                idx = space.representative(tuple(int(i) for i in samples[row]))
+                if idx is not None and idx not in pending:
+                    break
+            else:
+                # Every candidate was already evaluated: explore instead
+                fallback = space.random(1, self.rng, pending)
+                if not fallback:
+                    break
+                idx = fallback[0]
+            pending.add(idx)
+            proposals.append(idx)
+        return proposals
+
+    def search(self, space, evaluate, score):
+        budget = resolve_budget(self.budget, space.size)
+        n_startup = min(budget, max(len(space.shape) + 1, int(round(self.startup * budget))))
+
+        indices = space.sobol(n_startup, self.rng)
+        records = self._evaluate(space, evaluate, indices)
+        history = [(_score_of(score, record), space.index_of(record['params'])) for record in records]
+        seen = set(indices)
+
+        while len(seen) < budget:
+            batch = self._propose(space, history, seen, min(self.batch_size, budget - len(seen)))
+            if not batch:
+                break
+            batch_records = self._evaluate(space, evaluate, batch)
+            history.extend((_score_of(score, record), space.index_of(record['params']))
+                           for record in batch_records)
+            seen.update(batch)
+            records.extend(batch_records)
+
+        return records
+
+
+SEARCH_STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (GridSearch, RandomSearch, SobolSearch, SuccessiveHalving, TPESearch)
+}
+
+
+def create_search(name: str, budget: Optional[float] = None, seed: Optional[int] = None,
+                  **options) -> SearchStrategy:
+    """Create a search strategy by name.
+
+    Args:
+        name: One of ``SEARCH_STRATEGIES`` ('grid', 'random', 'sobol',
+              'halving', 'tpe')
+        budget: Full-window backtests allowed
+        seed: Random seed
+        **options: Strategy-specific options (e.g. eta, min_fraction, gamma)
+
+    Returns:
+        SearchStrategy instance
+    """
+    if name not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unknown search strategy '{name}', "
+                         f"expected one of {sorted(SEARCH_STRATEGIES)}")
+    return SEARCH_STRATEGIES[name](budget=budget, seed=seed, **options)
@@ -0,0 +1,287 @@
+"""Persistent optimization results.
+
+``ResultsStore`` streams result records into a SQLite database as each chunk
+of combinations finishes, so an interrupted sweep keeps everything computed
+so far. Rows are keyed by a run fingerprint (strategy, price data, settings
+and date window, see ``run_fingerprint``) and the parameter combination; a
+resumed sweep with the same fingerprint skips combinations already stored,
+except runs stopped early by pruning (the pruning settings may have changed).
+
+The query methods (``top``, ``records``, ``heatmap``) read stored results
+without re-running anything.
+"""
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .evaluation import RECORD_METRICS
+
+
+# Comparison operators accepted in filters
+_OPERATORS = ('=', '!=', '<', '<=', '>', '>=')
+
+# Filter value: equality, or (operator, value)
+Filter = Union[Any, Tuple[str, Any]]
+
+
+def params_key(params: Dict[str, Any]) -> str:
+    """Canonical JSON representation of a parameter combination."""
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def run_fingerprint(strategy_name: str, datas: Sequence[Tuple[str, np.ndarray]],
+                    settings: Dict[str, Any],
+                    window: Optional[Tuple[float, float]] = None) -> str:
+    """Fingerprint the inputs that determine a combination's results.
+
+    Args:
+        strategy_name: Strategy module and class name
+        datas: (ticker, arrays) pairs in ``frame_to_arrays`` layout
+        settings: Cash, commission and fixed parameters
+        window: Backtest date window (None = full range)
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([strategy_name, settings, window], sort_keys=True, default=str).encode())
+    for ticker, arrays in datas:
+        digest.update(ticker.encode())
+        digest.update(np.ascontiguousarray(arrays).tobytes())
+    return digest.hexdigest()
+
+
+class ResultsStore:
+    """SQLite-backed store of optimization result records.
+
+    Use as a context manager, or call ``close`` when done.
+    """
+
+    def __init__(self, path: Union[str, Path], wal: bool = True):
+        """Open (and create if needed) a results database.
+
+        Args:
+            path: Database file path
+            wal: Use write-ahead logging (cheap commits per chunk and
+                 concurrent readers, but all processes must be on one host)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Wait for locks held by other processes instead of failing at once
+        self._conn = sqlite3.connect(str(self.path), timeout=60.0)
+        if wal:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+        self._create_tables()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close the database connection."""
+        self._conn.close()
+
+    def _create_tables(self):
+        metric_columns = ', '.join(
+            f"{name} {'INTEGER' if name.endswith('_trades') else 'REAL'}" for name in RECORD_METRICS
+        )
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS runs (
+                fingerprint TEXT PRIMARY KEY,
+                strategy TEXT NOT NULL,
+                window TEXT,
+                description TEXT,
+                updated_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS results (
+                fingerprint TEXT NOT NULL,
+                params TEXT NOT NULL,
+                {metric_columns},
+                pruned TEXT,
+                PRIMARY KEY (fingerprint, params)
+            );
+        """)
+        self._conn.commit()
+
+    def register_run(self, fingerprint: str, strategy: str,
+                     window: Optional[Tuple[float, float]] = None,
+                     description: Optional[Dict[str, Any]] = None):
+        """Record a run's metadata, or mark an existing run as the most recent.
+
+        Args:
+            fingerprint: ``run_fingerprint`` of the run
+            strategy: Strategy name
+            window: Backtest date window (None = full range)
+            description: JSON-serializable details (tickers, dates)
+        """
+        with self._conn:
+            self._conn.execute(
+                """INSERT INTO runs VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (fingerprint) DO UPDATE SET updated_at = excluded.updated_at""",
+                (fingerprint, strategy, json.dumps(window) if window else None,
+                 json.dumps(description or {}, default=str),
+                 datetime.now(timezone.utc).isoformat()),
+            )
+
+    def add(self, fingerprint: str, records: Iterable[Dict[str, Any]]):
+        """Store result records, replacing earlier results of the same combinations.
+
+        Args:
+            fingerprint: ``run_fingerprint`` of the run
+            records: Result records from ``evaluate_batch``
+        """
+        rows = [
+            (fingerprint, params_key(record['params']),
+             *(record.get(name) for name in RECORD_METRICS), record.get('pruned'))
+            for record in records
+        ]
+        placeholders = ', '.join('?' * (len(RECORD_METRICS) + 3))
+        with self._conn:
+            self._conn.executemany(f'INSERT OR REPLACE INTO results VALUES ({placeholders})', rows)
+
+    def completed(self, fingerprint: str,
+                  combos: Optional[Sequence[Dict[str, Any]]] = None,
+                  include_pruned: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Stored records of a run.
+
+        Runs stopped early are left out by default: the fingerprint does not
+        cover the pruning settings, so a resumed sweep runs them again.
+
+        Args:
+            fingerprint: ``run_fingerprint`` of the run
+            combos: Restrict to these combinations (None = all)
+            include_pruned: Include runs stopped early
+
+        Returns:
+            ``params_key`` -> result record
+        """
+        where = 'WHERE fingerprint = ?' + ('' if include_pruned else ' AND pruned IS NULL')
+        records = {params_key(record['params']): record
+                   for record in self._select(where, [fingerprint])}
+        if combos is None:
+            return records
+        keys = {params_key(combo) for combo in combos}
+        return {key: record for key, record in records.items() if key in keys}
+
+    def latest_fingerprint(self, strategy: Optional[str] = None) -> Optional[str]:
+        """Fingerprint of the most recent full-range run (optionally of a strategy)."""
+        sql = 'SELECT fingerprint FROM runs WHERE window IS NULL'
+        args: List[Any] = []
+        if strategy is not None:
+            sql += ' AND strategy = ?'
+            args.append(strategy)
+        row = self._conn.execute(sql + ' ORDER BY updated_at DESC LIMIT 1', args).fetchone()
+        return row[0] if row else None
+
+    def runs(self) -> pd.DataFrame:
+        """Registered runs with their number of stored results."""
+        return pd.read_sql_query("""
+            SELECT runs.fingerprint, strategy, window, description, updated_at,
+                   COUNT(results.params) AS results
+            FROM runs LEFT JOIN results USING (fingerprint)
+            GROUP BY runs.fingerprint ORDER BY updated_at
+        """, self._conn)
+
+    def _where(self, fingerprint: Optional[str], filters: Optional[Dict[str, Filter]],
+               include_pruned: bool) -> Tuple[str, List[Any]]:
+        fingerprint = fingerprint or self.latest_fingerprint()
+        clauses = ['fingerprint = ?']
+        args: List[Any] = [fingerprint]
+        if not include_pruned:
+            clauses.append('pruned IS NULL')
+
+        for name, condition in (filters or {}).items():
+            operator, value = condition if isinstance(condition, tuple) else ('=', condition)
+            if operator not in _OPERATORS:
+                raise ValueError(f"Unsupported filter operator '{operator}'")
+            column = name if name in RECORD_METRICS else "json_extract(params, ?)"
+            if name not in RECORD_METRICS:
+                args.append(f'$.{name}')
+            clauses.append(f'{column} {operator} ?')
+            args.append(value)
+
+        return 'WHERE ' + ' AND '.join(clauses), args
+
+    def _select(self, where: str, args: List[Any], order: str = '') -> List[Dict[str, Any]]:
+        columns = ', '.join(('params',) + RECORD_METRICS + ('pruned',))
+        cursor = self._conn.execute(f'SELECT {columns} FROM results {where} {order}', args)
+        records = []
+        for row in cursor:
+            record: Dict[str, Any] = {'params': json.loads(row[0])}
+            record.update(zip(RECORD_METRICS + ('pruned',), row[1:]))
+            records.append(record)
+        return records
+
+    def records(self, fingerprint: Optional[str] = None,
+                filters: Optional[Dict[str, Filter]] = None,
+                include_pruned: bool = False) -> pd.DataFrame:
+        """Stored results as a table with one column per parameter and metric.
+
+        Args:
+            fingerprint: Run to query (None = most recent run)
+            filters: Parameter or metric -> value, or (operator, value),
+                     e.g. ``{'fast_period': 10, 'sharpe_ratio': ('>', 1.0)}``
+            include_pruned: Include runs stopped early
+
+        Returns:
+            DataFrame of results
+        """
+        where, args = self._where(fingerprint, filters, include_pruned)
+        rows = [{**record['params'], **{k: v for k, v in record.items() if k != 'params'}}
+                for record in self._select(where, args)]
+        return pd.DataFrame(rows)
+
+    def top(self, n: int = 10, metric: str = 'total_return',
+            fingerprint: Optional[str] = None, filters: Optional[Dict[str, Filter]] = None,
+            ascending: bool = False) -> List[Dict[str, Any]]:
+        """Best stored results by a metric.
+
+        Args:
+            n: Number of results
+            metric: One of ``RECORD_METRICS``
+            fingerprint: Run to query (None = most recent run)
+            filters: See ``records``
+            ascending: Lowest values first (e.g. for max_drawdown)
+
+        Returns:
+            Result records, best first
+        """
+        if metric not in RECORD_METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {RECORD_METRICS}")
+        where, args = self._where(fingerprint, filters, include_pruned=False)
+        order = f"ORDER BY {metric} IS NULL, {metric} {'ASC' if ascending else 'DESC'} LIMIT ?"
+        return self._select(where, args + [n], order)
+
+    def heatmap(self, x: str, y: str, metric: str = 'total_return',
+                fingerprint: Optional[str] = None, filters: Optional[Dict[str, Filter]] = None,
+                agg: str = 'max') -> pd.DataFrame:
+        """Metric over a pair of parameters.
+
+        Other parameters are aggregated (e.g. the best trailing stop for each
+        fast/slow period pair).
+
+        Args:
+            x: Parameter for the columns
+            y: Parameter for the rows
+            metric: One of ``RECORD_METRICS``
+            fingerprint: Run to query (None = most recent run)
+            filters: See ``records``
+            agg: Aggregation over the other parameters ('max', 'mean', ...)
+
+        Returns:
+            DataFrame indexed by ``y`` values with ``x`` values as columns
+        """
+        if metric not in RECORD_METRICS:
+            raise ValueError(f"Unknown metric '{metric}', expected one of {RECORD_METRICS}")
+        frame = self.records(fingerprint, filters)
+        if frame.empty:
+            return pd.DataFrame()
+        return frame.pivot_table(index=y, columns=x, values=metric, aggfunc=agg)
@@ -0,0 +1,374 @@
+"""Vectorized evaluation of whole parameter grids.
+
+Strategies whose signals can be written as array expressions (moving average
+crossovers and the like) implement ``BaseStrategy.signal_arrays``: given the
+price arrays and one array per parameter, it returns entry and exit signals
+as (combinations, bars) boolean matrices. ``evaluate_vectorized`` then steps
+through the bars once for a whole chunk of combinations, with NumPy operations
+across the combination axis, simulating the base strategy order flow:
+
+- long-only positions in the first data feed, entered with
+  ``int(cash * position_percent / close)`` shares at the signal bar's close
+  (cheat-on-close, as in backtests) and rejected, like backtrader's margin
+  check, when the shares plus commission cost more than the cash,
+- full exits at the signal bar's close,
+- a stop ``trailing_stop_percent`` below the entry price, placed on the bar
+  the entry fills and filled at the stop price (or the open when a bar gaps
+  through it),
+- commission on the value of every fill.
+
+Records have the same schema as ``evaluate_batch`` and their metrics come from
+``compute_metrics``. The simulation is an approximation of the broker: order
+interactions it does not model (e.g. a stop left working after a signal exit
+fills) make individual results differ, so the best candidates should be
+re-run through backtrader (``optimize.verify_top``).
+
+Because the whole state of a simulation is a handful of arrays, it can be
+checkpointed at the last bar (``checkpoint``): when new bars are appended to
+the data, the next evaluation simulates only those bars instead of the whole
+history, and falls back to a full simulation when the strategy code,
+combinations, settings or earlier bars changed.
+"""
+import hashlib
+import inspect
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type, Union
+
+import backtrader as bt
+import numpy as np
+
+from ..analytics import compute_metrics
+from ..utils.arrays import slice_window
+from .evaluation import RECORD_METRICS
+from .store import params_key, run_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+# Combinations simulated together (bounds the (combinations, bars) matrices)
+DEFAULT_CHUNK_SIZE = 1024
+
+
+def _parameter_arrays(strategy_class: Type[bt.Strategy], combos: Sequence[Dict[str, Any]],
+                      fixed_params: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """One array per scalar parameter (combination, fixed or default value)."""
+    defaults = dict(strategy_class.params._getpairs())  # type: ignore[attr-defined]
+    merged = [{**defaults, **fixed_params, **combo} for combo in combos]
+    return {
+        name: np.array([params[name] for params in merged])
+        for name in merged[0]
+        if all(isinstance(params[name], (bool, int, float)) for params in merged)
+    }
+
+
+class SimulationState:
+    """Order flow state of a set of combinations after the bars simulated so far.
+
+    Holds everything needed to continue with further bars and to compute the
+    metrics over the whole history: broker and strategy state per
+    combination, the per-bar values and cash, and the closed trades.
+    """
+
+    # Per-combination state arrays (saved in checkpoints)
+    STATE = ('cash', 'shares', 'entry_price', 'entry_bar', 'stop_price', 'stop_set',
+             'buy_size', 'sell', 'opened')
+    # Closed trades, one element per trade
+    TRADES = ('trade_combo', 'trade_pnl', 'trade_pnlcomm', 'trade_barlen', 'trade_dtclose')
+
+    def __init__(self, count: int, initial_cash: float):
+        self.cash = np.full(count, float(initial_cash))
+        self.shares = np.zeros(count)
+        self.entry_price = np.zeros(count)
+        self.entry_bar = np.zeros(count, dtype=np.int64)
+        self.stop_price = np.full(count, np.nan)  # working stop order (NaN = none)
+        self.stop_set = np.zeros(count, dtype=bool)  # stop placed for the current position
+        self.buy_size = np.zeros(count)  # market buy submitted on the previous bar
+        self.sell = np.zeros(count, dtype=bool)  # market sell submitted on the previous bar
+        self.opened = np.zeros(count, dtype=np.int64)
+
+        self.values = np.empty((count, 0))
+        self.cash_values = np.empty((count, 0))
+        self.trade_combo = np.empty(0, dtype=np.int64)
+        self.trade_pnl = np.empty(0)
+        self.trade_pnlcomm = np.empty(0)
+        self.trade_barlen = np.empty(0, dtype=np.int64)
+        self.trade_dtclose = np.empty(0)
+
+    @property
+    def count(self) -> int:
+        """Number of combinations."""
+        return len(self.cash)
+
+    @property
+    def bars(self) -> int:
+        """Number of bars simulated."""
+        return self.values.shape[1]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """All state as named arrays."""
+        return {name: getattr(self, name) for name in self.STATE + self.TRADES + ('values', 'cash_values')}
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> 'SimulationState':
+        """Restore state saved with ``to_arrays``."""
+        state = cls(0, 0.0)
+        for name in cls.STATE + cls.TRADES + ('values', 'cash_values'):
+            setattr(state, name, np.array(arrays[name]))
+        return state
+
+    def select(self, start: int, stop: int) -> 'SimulationState':
+        """State of combinations ``start`` to ``stop`` (renumbered from 0)."""
+        state = SimulationState(0, 0.0)
+        for name in self.STATE + ('values', 'cash_values'):
+            setattr(state, name, getattr(self, name)[start:stop].copy())
+        keep = (self.trade_combo >= start) & (self.trade_combo < stop)
+        for name in self.TRADES:
+            setattr(state, name, getattr(self, name)[keep])
+        state.trade_combo = state.trade_combo - start
+        return state
+
+    @classmethod
+    def concatenate(cls, states: Sequence['SimulationState']) -> 'SimulationState':
+        """Combine the states of consecutive combination chunks."""
+        state = cls(0, 0.0)
+        for name in cls.STATE + ('values', 'cash_values') + cls.TRADES[1:]:
+            setattr(state, name, np.concatenate([getattr(part, name) for part in states]))
+        offsets = np.cumsum([0] + [part.count for part in states[:-1]])
+        state.trade_combo = np.concatenate([part.trade_combo + offset
+                                            for part, offset in zip(states, offsets)])
+        return state
+
+    def advance(self, prices: np.ndarray, entries: np.ndarray, exits: np.ndarray,
+                params: Dict[str, np.ndarray], commission: float):
+        """Simulate the bars after those already simulated.
+
+        Args:
+            prices: All bars so far in ``frame_to_arrays`` layout
+            entries: Entry signals for all bars, shape (combinations, bars)
+            exits: Exit signals, same shape
+            params: Parameter arrays (see ``BaseStrategy.signal_arrays``)
+            commission: Commission rate
+        """
+        count, first, bars = self.count, self.bars, prices.shape[1]
+        datetimes, opens, lows, closes = prices[0], prices[1], prices[3], prices[4]
+        position_percent = params.get('position_percent', np.ones(count)).astype(np.float64)
+        stop_percent = params.get('trailing_stop_percent', np.zeros(count)).astype(np.float64)
+
+        cash, shares = self.cash, self.shares
+        entry_price, entry_bar, opened = self.entry_price, self.entry_bar, self.opened
+        stop_price, stop_set = self.stop_price, self.stop_set
+        buy_size, sell = self.buy_size, self.sell
+
+        values = np.empty((count, bars - first))
+        cash_values = np.empty((count, bars - first))
+        trades: List[Tuple[np.ndarray, ...]] = []
+
+        def close_positions(mask: np.ndarray, price, bar: int):
+            index = np.flatnonzero(mask)
+            size = shares[index]
+            fill = price[index] if np.ndim(price) else np.full(len(index), price)
+            pnl = size * (fill - entry_price[index])
+            exit_commission = size * fill * commission
+            pnlcomm = pnl - exit_commission - size * entry_price[index] * commission
+            trades.append((index, pnl, pnlcomm, bar - entry_bar[index], np.full(len(index), datetimes[bar])))
+
+            cash[index] += size * fill - exit_commission
+            shares[index] = 0.0
+            stop_price[index] = np.nan
+
+        for i in range(first, bars):
+            # Broker: orders submitted on the previous bar fill at its close;
+            # working stops (older orders) are checked before them
+            if i > 0:
+                price = closes[i - 1]
+                if buy_size.any():
+                    cost = buy_size * price
+                    filled = (buy_size > 0) & (cash - cost - cost * commission >= 0.0)
+                    cash[filled] -= cost[filled] + cost[filled] * commission
+                    shares[filled] = buy_size[filled]
+                    entry_price[filled] = price
+                    entry_bar[filled] = i
+                    stop_set[filled] = False
+                    opened += filled
+                    buy_size[:] = 0.0
+
+                stopped = lows[i] <= stop_price
+                if stopped.any():
+                    close_positions(stopped, np.minimum(opens[i], stop_price), i)
+
+                sell &= shares > 0
+                if sell.any():
+                    close_positions(sell, price, i)
+
+            values[:, i - first] = cash + shares * closes[i]
+            cash_values[:, i - first] = cash
+
+            # Strategy: enter when flat, exit on the signal, otherwise make
+            # sure the position has its stop
+            flat = shares == 0
+            buy_size[:] = np.where(flat & entries[:, i], np.floor(cash * position_percent / closes[i]), 0.0)
+            sell[:] = ~flat & exits[:, i]
+            stop_price[sell] = np.nan
+
+            place = ~flat & ~sell & ~stop_set & (stop_percent > 0)
+            stop_price[place] = entry_price[place] * (1 - stop_percent[place])
+            stop_set |= place
+
+        self.values = np.concatenate([self.values, values], axis=1)
+        self.cash_values = np.concatenate([self.cash_values, cash_values], axis=1)
+        if trades:
+            for name, column in zip(self.TRADES, zip(*trades)):
+                setattr(self, name, np.concatenate((getattr(self, name),) + column))
+
+    def recordings(self, datetimes: np.ndarray) -> List[Dict[str, Any]]:
+        """``PortfolioRecorder``-style analyses, one per combination.
+
+        Args:
+            datetimes: Dates of the simulated bars
+        """
+        order = np.argsort(self.trade_combo, kind='stable')
+        bounds = np.cumsum(np.bincount(self.trade_combo, minlength=self.count))[:-1]
+        pnl, pnlcomm, barlen, dtclose = (
+            np.split(getattr(self, name)[order], bounds) for name in self.TRADES[1:]
+        )
+        return [
+            {
+                'values': self.values[combo],
+                'cash': self.cash_values[combo],
+                'datetime': datetimes,
+                'trade_pnl': pnl[combo],
+                'trade_pnlcomm': pnlcomm[combo],
+                'trade_barlen': barlen[combo],
+                'trade_dtclose': dtclose[combo],
+                'trades_opened': int(self.opened[combo]),
+            }
+            for combo in range(self.count)
+        ]
+
+
+def _checkpoint_key(strategy_class: Type[bt.Strategy], combos: Sequence[Dict[str, Any]],
+                    prices: np.ndarray, settings: Dict[str, Any]) -> Optional[str]:
+    """Fingerprint of the code, combinations, settings and price bars of a simulation.
+
+    None when the source code is unavailable (checkpoints are not used).
+    """
+    # The strategy's modules (signals) and this module (order flow)
+    modules = dict.fromkeys(cls.__module__ for cls in strategy_class.__mro__
+                            if issubclass(cls, bt.Strategy) and cls is not bt.Strategy)
+    try:
+        code = [inspect.getsource(sys.modules[name]) for name in list(modules) + [__name__]]
+    except (KeyError, OSError, TypeError):
+        return None
+    digest = hashlib.blake2b('\0'.join(code).encode(), digest_size=16).hexdigest()
+    strategy_name = f"{strategy_class.__module__}.{strategy_class.__qualname__}:{digest}"
+    return run_fingerprint(strategy_name, [('prices', prices)],
+                           {**settings, 'combos': [params_key(combo) for combo in combos]})
+
+
+def _load_checkpoint(path: Path, strategy_class: Type[bt.Strategy], combos: Sequence[Dict[str, Any]],
+                     prices: np.ndarray, settings: Dict[str, Any]) -> Optional[SimulationState]:
+    """State saved for the same code, combinations and settings over a prefix of ``prices``."""
+    if not path.exists():
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as saved:
+            bars = int(saved['bars'])
+            if bars > prices.shape[1]:
+                return None
+            key = _checkpoint_key(strategy_class, combos, prices[:, :bars], settings)
+            if key is None or str(saved['key']) != key:
+                return None
+            return SimulationState.from_arrays(dict(saved))
+    except (OSError, KeyError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable checkpoint {path}: {e}")
+        return None
+
+
+def _save_checkpoint(path: Path, state: SimulationState, strategy_class: Type[bt.Strategy],
+                     combos: Sequence[Dict[str, Any]], prices: np.ndarray, settings: Dict[str, Any]):
+    key = _checkpoint_key(strategy_class, combos, prices, settings)
+    if key is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Write then rename, so an interrupted save keeps the previous checkpoint
+    partial = path.with_name(path.name + '.partial')
+    with open(partial, 'wb') as f:
+        np.savez(f, key=np.array(key), bars=np.array(state.bars), **state.to_arrays())
+    os.replace(partial, path)
+
+
+def evaluate_vectorized(strategy_class: Type[bt.Strategy], combos: Sequence[Dict[str, Any]],
+                        datas: Sequence[Tuple[str, np.ndarray]], initial_cash: float,
+                        commission: float, fixed_params: Optional[Dict[str, Any]] = None,
+                        include_series: bool = False, window: Optional[Tuple[float, float]] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE,
+                        checkpoint: Optional[Union[str, Path]] = None) -> Optional[List[Dict[str, Any]]]:
+    """Evaluate parameter combinations with array-form signals.
+
+    With a checkpoint file, the simulation state at the last bar is saved,
+    and a later call whose bars extend the checkpointed ones (same strategy
+    code, combinations and settings) only simulates the new bars. Anything
+    else falls back to a full simulation.
+
+    Args:
+        strategy_class: Strategy class implementing ``signal_arrays``
+        combos: Parameter dictionaries, one per run
+        datas: (ticker, arrays) pairs in ``frame_to_arrays`` layout; the
+               first one is traded
+        initial_cash: Starting portfolio value
+        commission: Commission rate
+        fixed_params: Parameters shared by every run
+        include_series: Also return 'trade_pnl' and 'bar_returns' arrays
+        window: Inclusive (start, end) backtrader float dates to backtest
+                (None = all bars)
+        chunk_size: Combinations simulated together
+        checkpoint: File to resume from and save the state to (None = none)
+
+    Returns:
+        One record per combination, as from ``evaluate_batch``, or None when
+        the strategy has no array-form signals
+    """
+    if not combos:
+        return []
+
+    prices = slice_window(datas[0][1], window)
+    settings = {'initial_cash': initial_cash, 'commission': commission, 'fixed_params': fixed_params or {}}
+    path = Path(checkpoint) if checkpoint is not None else None
+    resumed = _load_checkpoint(path, strategy_class, combos, prices, settings) if path else None
+    if resumed is not None:
+        logger.info(f"Resuming {len(combos)} combinations from {path} "
+                    f"({prices.shape[1] - resumed.bars} new bars)")
+
+    records: List[Dict[str, Any]] = []
+    states = []
+    for start in range(0, len(combos), chunk_size):
+        chunk = combos[start:start + chunk_size]
+        params = _parameter_arrays(strategy_class, chunk, fixed_params or {})
+        signals = strategy_class.signal_arrays(prices, params)  # type: ignore[attr-defined]
+        if signals is None:
+            return None
+
+        # Signals only depend on past bars, so they are recomputed in full
+        # and the simulation continues after the checkpointed bars
+        state = resumed.select(start, start + len(chunk)) if resumed is not None \
+            else SimulationState(len(chunk), initial_cash)
+        entries, exits = signals
+        state.advance(prices, entries, exits, params, commission)
+        states.append(state)
+
+        for combo, recording in zip(chunk, state.recordings(prices[0])):
+            metrics = compute_metrics(recording, initial_cash)
+            record: Dict[str, Any] = {'params': dict(combo)}
+            record.update((name, metrics[name]) for name in RECORD_METRICS)
+            record['pruned'] = None
+            if include_series:
+                record['trade_pnl'] = metrics['trade_pnl']
+                record['bar_returns'] = metrics['bar_returns']
+            records.append(record)
+
+    if path is not None:
+        _save_checkpoint(path, SimulationState.concatenate(states), strategy_class, combos, prices, settings)
+    return records
@@ -0,0 +1,417 @@
+"""Durable work queue for distributed optimization.
+
+A coordinator splits parameter combinations into batches and stores them in
+a SQLite database on storage shared by all hosts. Any number of workers, on
+any number of hosts, lease batches, backtest them against their own copy of
+the price data and write the result records back into the same database
+(which is also a ``ResultsStore``, so results can be queried as usual).
+
+Leases expire: a worker renews its lease from a background thread while it
+works, and a batch whose lease ran out (dead or disconnected worker) is
+handed to the next worker that asks. A batch failing ``max_attempts`` times
+is marked failed and reported to the coordinator.
+
+Jobs are identified by their run fingerprint. Workers recompute the
+fingerprint from their local data and refuse jobs whose data differs from
+the coordinator's, so every result in a job comes from identical inputs.
+
+The database uses rollback journaling rather than WAL, as WAL only works
+when all processes share one host. The shared filesystem must support POSIX
+file locks (local disks and most NFSv4 setups do).
+"""
+import importlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+from pathlib import Path
+
+import pandas as pd
+
+from ..utils.arrays import frame_to_arrays
+from .evaluation import evaluate_batch
+from .store import ResultsStore, params_key, run_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+# Loads the price data of a job on the worker's host: job -> ticker -> OHLCV frame
+FrameLoader = Callable[[Dict[str, Any]], Dict[str, pd.DataFrame]]
+
+
+class Lease(NamedTuple):
+    """A batch leased by a worker."""
+    batch_id: int
+    job_id: str
+    job: Dict[str, Any]
+    combos: List[Dict[str, Any]]
+
+
+class WorkQueue(ResultsStore):
+    """SQLite-backed queue of parameter combination batches.
+
+    Batches move from 'pending' to 'leased' to 'done' (or 'failed' after
+    ``max_attempts`` leases that did not complete).
+    """
+
+    def __init__(self, path: Union[str, Path], lease_seconds: float = 300.0,
+                 max_attempts: int = 3):
+        """Open (and create if needed) a work queue.
+
+        Args:
+            path: Database file path on shared storage
+            lease_seconds: Lease duration; leases are renewed while a batch runs
+            max_attempts: Leases per batch before it is marked failed
+        """
+        super().__init__(path, wal=False)
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+
+    def _create_tables(self):
+        super()._create_tables()
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                spec TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS batches (
+                batch_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT NOT NULL,
+                combos TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS batches_status ON batches (status, batch_id);
+        """)
+        self._conn.commit()
+
+    def submit(self, job_id: str, job: Dict[str, Any]):
+        """Register a job (no-op if it already exists).
+
+        Args:
+            job_id: Run fingerprint of the job
+            job: JSON-serializable description: 'strategy' ([module, class]),
+                 'settings' (initial_cash, commission, fixed_params), 'window',
+                 'data' (tickers and dates for the worker's loader), 'pruning'
+        """
+        with self._conn:
+            self._conn.execute('INSERT OR IGNORE INTO jobs VALUES (?, ?)',
+                               (job_id, json.dumps(job, default=str)))
+
+    def _queued_keys(self, job_id: str) -> set:
+        keys = set()
+        for (combos,) in self._conn.execute(
+                "SELECT combos FROM batches WHERE job_id = ? AND status IN ('pending', 'leased')",
+                (job_id,)):
+            keys.update(params_key(combo) for combo in json.loads(combos))
+        return keys
+
+    def enqueue(self, job_id: str, combos: Sequence[Dict[str, Any]], batch_size: int) -> int:
+        """Queue the combinations that are neither stored nor already queued.
+
+        Failed batches of the job (e.g. of an earlier run) are dropped, so
+        their combinations are queued again. So are runs stopped early: their
+        stored partial results are dropped until the new results arrive.
+
+        Args:
+            job_id: Job registered with ``submit``
+            combos: Parameter combinations
+            batch_size: Combinations per batch
+
+        Returns:
+            Number of combinations queued
+        """
+        skip = set(self.completed(job_id, combos)) | self._queued_keys(job_id)
+        todo = [combo for combo in combos if params_key(combo) not in skip]
+        batch_size = max(1, batch_size)
+        with self._conn:
+            self._conn.execute("DELETE FROM batches WHERE job_id = ? AND status = 'failed'", (job_id,))
+            self._conn.executemany(
+                'DELETE FROM results WHERE fingerprint = ? AND params = ? AND pruned IS NOT NULL',
+                [(job_id, params_key(combo)) for combo in todo],
+            )
+            self._conn.executemany(
+                'INSERT INTO batches (job_id, combos) VALUES (?, ?)',
+                [(job_id, json.dumps(todo[i:i + batch_size], default=str))
+                 for i in range(0, len(todo), batch_size)],
+            )
+        return len(todo)
+
+    def lease(self, owner: str, exclude_jobs: Sequence[str] = ()) -> Optional[Lease]:
+        """Lease the oldest available batch.
+
+        Available batches are pending ones and leased ones whose lease
+        expired. A batch that already used up its attempts is marked failed.
+
+        Args:
+            owner: Worker identifier
+            exclude_jobs: Jobs this worker cannot run
+
+        Returns:
+            Lease, or None if no batch is available
+        """
+        now = time.time()
+        sql = """SELECT batch_id, job_id, combos, attempts FROM batches
+                 WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"""
+        if exclude_jobs:
+            sql += f" AND job_id NOT IN ({', '.join('?' * len(exclude_jobs))})"
+        sql += ' ORDER BY batch_id LIMIT 1'
+
+        # Exclusive write lock: no two workers can lease the same batch
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            while True:
+                row = self._conn.execute(sql, (now, *exclude_jobs)).fetchone()
+                if row is None:
+                    self._conn.commit()
+                    return None
+
+                batch_id, job_id, combos, attempts = row
+                if attempts >= self.max_attempts:
+                    self._conn.execute(
+                        "UPDATE batches SET status = 'failed', owner = NULL WHERE batch_id = ?",
+                        (batch_id,))
+                    continue
+
+                self._conn.execute(
+                    """UPDATE batches SET status = 'leased', owner = ?, lease_expires = ?,
+                       attempts = attempts + 1 WHERE batch_id = ?""",
+                    (owner, now + self.lease_seconds, batch_id))
+                (spec,) = self._conn.execute('SELECT spec FROM jobs WHERE job_id = ?',
+                                             (job_id,)).fetchone()
+                self._conn.commit()
+                return Lease(batch_id, job_id, json.loads(spec), json.loads(combos))
+        except BaseException:
+            self._conn.rollback()
+            raise
+
+    def renew(self, batch_id: int, owner: str) -> bool:
+        """Extend a lease.
+
+        Returns:
+            False if the lease was lost (expired and taken by another worker)
+        """
+        with self._conn:
+            cursor = self._conn.execute(
+                """UPDATE batches SET lease_expires = ?
+                   WHERE batch_id = ? AND owner = ? AND status = 'leased'""",
+                (time.time() + self.lease_seconds, batch_id, owner))
+        return cursor.rowcount == 1
+
+    def complete(self, lease: Lease, records: Sequence[Dict[str, Any]]):
+        """Store a batch's results and mark it done.
+
+        Results are stored even if the lease was lost meanwhile: they are
+        identical to what the other worker computes.
+
+        Args:
+            lease: Lease of the batch
+            records: Result records of the batch
+        """
+        self.add(lease.job_id, records)
+        with self._conn:
+            self._conn.execute(
+                "UPDATE batches SET status = 'done', owner = NULL, error = NULL WHERE batch_id = ?",
+                (lease.batch_id,))
+
+    def release(self, lease: Lease, owner: str, error: Optional[str] = None, attempt: bool = True):
+        """Give a leased batch back to the queue (e.g. after an error).
+
+        Args:
+            lease: Lease of the batch
+            owner: Worker identifier
+            error: Error message to keep for diagnosis
+            attempt: Count the lease towards ``max_attempts`` (False when the
+                     worker could not run the batch at all, e.g. its data
+                     differs, so the batch is not at fault)
+        """
+        with self._conn:
+            self._conn.execute(
+                """UPDATE batches SET status = 'pending', owner = NULL, lease_expires = NULL,
+                   error = ?, attempts = attempts - ? WHERE batch_id = ? AND owner = ? AND status = 'leased'""",
+                (error, 0 if attempt else 1, lease.batch_id, owner))
+
+    def status(self, job_id: str) -> Dict[str, int]:
+        """Number of batches per status for a job."""
+        return dict(self._conn.execute(
+            'SELECT status, COUNT(*) FROM batches WHERE job_id = ? GROUP BY status', (job_id,)
+        ).fetchall())
+
+    def failures(self, job_id: str) -> List[str]:
+        """Errors of a job's failed batches."""
+        return [error or 'lease expired' for (error,) in self._conn.execute(
+            "SELECT error FROM batches WHERE job_id = ? AND status = 'failed'", (job_id,))]
+
+    def leader_threshold(self, job_id: str, top_n: int) -> Optional[float]:
+        """N-th best stored final value of a job (None if fewer results)."""
+        row = self._conn.execute(
+            """SELECT final_value FROM results WHERE fingerprint = ? AND pruned IS NULL
+               ORDER BY final_value DESC LIMIT 1 OFFSET ?""",
+            (job_id, top_n - 1)).fetchone()
+        return row[0] if row else None
+
+    def wait(self, job_id: str, combos: Sequence[Dict[str, Any]], poll_interval: float = 2.0,
+             timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Block until every combination has a stored result.
+
+        Args:
+            job_id: Job of the combinations
+            combos: Combinations to wait for
+            poll_interval: Seconds between checks
+            timeout: Maximum seconds to wait (None = no limit)
+
+        Returns:
+            Result records of the combinations
+        """
+        wanted = {params_key(combo) for combo in combos}
+        start = time.monotonic()
+        last_log = start
+        while True:
+            done = self.completed(job_id, combos, include_pruned=True)
+            if len(done) >= len(wanted):
+                return list(done.values())
+
+            failures = self.failures(job_id)
+            if failures:
+                raise RuntimeError(f"{len(failures)} batches failed, e.g.: {failures[0]}")
+
+            now = time.monotonic()
+            if timeout is not None and now - start > timeout:
+                raise TimeoutError(f"{len(wanted) - len(done)} combinations still pending")
+            if now - last_log >= 30.0:
+                last_log = now
+                logger.info(f"Queue: {len(done)}/{len(wanted)} combinations done, "
+                            f"batches {self.status(job_id)}")
+            time.sleep(poll_interval)
+
+
+class _Heartbeat:
+    """Renews a lease from a background thread while a batch runs."""
+
+    def __init__(self, path: Union[str, Path], lease: Lease, owner: str, lease_seconds: float):
+        self._args = (path, lease, owner, lease_seconds)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        path, lease, owner, lease_seconds = self._args
+        # SQLite connections belong to the thread that opened them
+        queue = WorkQueue(path, lease_seconds=lease_seconds)
+        try:
+            while not self._stop.wait(lease_seconds / 3):
+                if not queue.renew(lease.batch_id, owner):
+                    logger.warning(f"Lost lease of batch {lease.batch_id}")
+                    return
+        finally:
+            queue.close()
+
+
+def default_worker_id() -> str:
+    """Worker identifier: host name and process id."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def run_worker(path: Union[str, Path], load_frames: FrameLoader,
+               worker_id: Optional[str] = None, lease_seconds: float = 300.0,
+               poll_interval: float = 2.0, idle_timeout: Optional[float] = None) -> int:
+    """Lease and evaluate batches until the queue stays empty.
+
+    Args:
+        path: Work queue database path
+        load_frames: Loads a job's price data on this host
+        worker_id: Worker identifier (default: host:pid)
+        lease_seconds: Lease duration
+        poll_interval: Seconds between polls when the queue is empty
+        idle_timeout: Stop after this many idle seconds (None = run forever)
+
+    Returns:
+        Number of batches completed
+    """
+    worker_id = worker_id or default_worker_id()
+    queue = WorkQueue(path, lease_seconds=lease_seconds)
+    jobs: Dict[str, Dict[str, Any]] = {}
+    rejected: List[str] = []
+    completed = 0
+    idle_since = time.monotonic()
+
+    try:
+        while True:
+            lease = queue.lease(worker_id, exclude_jobs=rejected)
+            if lease is None:
+                if idle_timeout is not None and time.monotonic() - idle_since > idle_timeout:
+                    return completed
+                time.sleep(poll_interval)
+                continue
+
+            if lease.job_id not in jobs:
+                try:
+                    job = _prepare_job(lease, load_frames)
+                except Exception as e:
+                    logger.exception(f"Could not prepare job {lease.job_id}, skipping its batches")
+                    rejected.append(lease.job_id)
+                    queue.release(lease, worker_id, error=f"{type(e).__name__}: {e}")
+                    continue
+                if job is None:
+                    logger.error(f"Local data does not match job {lease.job_id}, skipping its batches")
+                    rejected.append(lease.job_id)
+                    queue.release(lease, worker_id, error=f"data mismatch on {worker_id}", attempt=False)
+                    continue
+                jobs[lease.job_id] = job
+
+            try:
+                with _Heartbeat(path, lease, worker_id, lease_seconds):
+                    records = _evaluate_lease(queue, lease, jobs[lease.job_id])
+            except Exception as e:
+                logger.exception(f"Batch {lease.batch_id} failed")
+                queue.release(lease, worker_id, error=f"{type(e).__name__}: {e}")
+                continue
+
+            queue.complete(lease, records)
+            completed += 1
+            idle_since = time.monotonic()
+    finally:
+        queue.close()
+
+
+def _prepare_job(lease: Lease, load_frames: FrameLoader) -> Optional[Dict[str, Any]]:
+    """Import a job's strategy and load its data; None if the data differs."""
+    module_path, class_name = lease.job['strategy']
+    strategy_class = getattr(importlib.import_module(module_path), class_name)
+    datas = [(ticker, frame_to_arrays(df)) for ticker, df in load_frames(lease.job).items()]
+
+    window = tuple(lease.job['window']) if lease.job.get('window') else None
+    fingerprint = run_fingerprint(f"{module_path}.{class_name}", datas, lease.job['settings'], window)
+    if fingerprint != lease.job_id:
+        return None
+    return {'strategy_class': strategy_class, 'datas': datas, 'window': window}
+
+
+def _evaluate_lease(queue: WorkQueue, lease: Lease, job: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Backtest a leased batch, pruning against the job's stored leaders."""
+    settings = lease.job['settings']
+    pruning_settings = lease.job.get('pruning') or {}
+    top_n = pruning_settings.get('top_n')
+    pruning = {
+        'max_drawdown': pruning_settings.get('max_drawdown'),
+        'min_final_value': queue.leader_threshold(lease.job_id, top_n) if top_n else None,
+    }
+    return evaluate_batch(
+        job['strategy_class'], lease.combos, job['datas'],
+        initial_cash=settings['initial_cash'], commission=settings['commission'],
+        fixed_params=settings['fixed_params'], window=job['window'],
+        pruning=pruning if any(value is not None for value in pruning.values()) else None,
+    )
@@ -18,6 +18,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.utils.config_loader import get_config_loader
 from src.data_loaders.data_manager import DataManager
 from src.strategies.base_strategy import BaseStrategy
+from src.analytics import PortfolioRecorder, compute_metrics, run_monte_carlo, format_monte_carlo
+from src.utils.profiling import HotPathProfiler
 
 
 logging.basicConfig(
@@ -101,8 +103,21 @@ class BacktestRunner:
             strategy_config['class']
         )
         
+        # Opt-in hot-path profiling (no instrumentation at all when disabled)
+        profiler = HotPathProfiler(enabled=self.backtest_config.get('profile', False))
+        strategy_class = strategy_class.with_profiler(profiler)
+        
+        # Streaming mode reads cached parquet row groups lazily and keeps only
+        # each indicator's minimum period in the line buffers (exactbars), so
+        # memory stays bounded for long histories over many tickers
+        streaming = self.backtest_config.get('streaming', False)
+        
         # Initialize cerebro engine
-        cerebro = bt.Cerebro()
+        if streaming:
+            exactbars = self.backtest_config.get('exactbars', 1)
+            cerebro = bt.Cerebro(preload=False, runonce=False, exactbars=exactbars)
+        else:
+            cerebro = bt.Cerebro()
         
         # Enable cheat-on-close mode to simulate live trading at market close
         # Orders placed during a bar execute at that bar's close price (same bar execution)
@@ -115,6 +130,7 @@ class BacktestRunner:
         
         cerebro.broker.setcash(initial_cash)
         cerebro.broker.setcommission(commission=commission)
+        profiler.instrument_broker(cerebro.broker)
         
         # Add strategy - it will use default values from its params tuple
         # No params passed means all defaults are used
@@ -123,66 +139,66 @@ class BacktestRunner:
         # Load data for each ticker
         params = strategy_config.get('params', {})
         tickers = params.get('tickers', [])
-        tickers = params.get('tickers', [])
         
-        for ticker in tickers:
-            # Data loading handled by DataManager
-            
-            # Get daily data (checks local files, fetches if needed)
-            daily_df = self.data_manager.get_data_for_backtest(
-                ticker, start_date, end_date, timeframe='daily'
-            )
-            
-            if daily_df.empty:
-                logger.error(f"No daily data available for {ticker}, skipping")
-                continue
-            
-            # Create and add daily data feed
-            daily_feed = self.data_manager.create_backtrader_feed(daily_df, ticker)
-            cerebro.adddata(daily_feed, name=ticker)
-            
-            # Load minute data for intraday stop loss simulation
-            try:
-                minute_df = self.data_manager.get_data_for_backtest(
-                    ticker, start_date, end_date, timeframe='minute'
+        with profiler.section('feed_loading'):
+            for ticker in tickers:
+                # Data loading handled by DataManager
+                
+                if streaming:
+                    self._add_streaming_feeds(cerebro, ticker, start_date, end_date)
+                    continue
+                
+                # Get daily data (checks local files, fetches if needed)
+                daily_df = self.data_manager.get_data_for_backtest(
+                    ticker, start_date, end_date, timeframe='daily'
                 )
-                if not minute_df.empty:
-                    # Add as separate feed for advanced stop simulation
-                    # minute_feed = self.data_manager.create_backtrader_feed(
-                    #     minute_df, f"{ticker}_minute"
-                    # )
-                    # cerebro.adddata(minute_feed, name=f"{ticker}_minute")
-                    pass  # Minute data loaded for stop simulation
-                else:
-                    logger.warning(f"No minute data available for {ticker}")
-            except Exception as e:
-                logger.warning(f"Error loading minute data for {ticker}: {e}")
-        
-        # Add analyzers
-        cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
-        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+                
+                if daily_df.empty:
+                    logger.error(f"No daily data available for {ticker}, skipping")
+                    continue
+                
+                # Create and add daily data feed
+                daily_feed = self.data_manager.create_backtrader_feed(daily_df, ticker)
+                cerebro.adddata(daily_feed, name=ticker)
+                
+                # Load minute data for intraday stop loss simulation
+                try:
+                    minute_df = self.data_manager.get_data_for_backtest(
+                        ticker, start_date, end_date, timeframe='minute'
+                    )
+                    if not minute_df.empty:
+                        # Add as separate feed for advanced stop simulation
+                        # minute_feed = self.data_manager.create_backtrader_feed(
+                        #     minute_df, f"{ticker}_minute"
+                        # )
+                        # cerebro.adddata(minute_feed, name=f"{ticker}_minute")
+                        pass  # Minute data loaded for stop simulation
+                    else:
+                        logger.warning(f"No minute data available for {ticker}")
+                except Exception as e:
+                    logger.warning(f"Error loading minute data for {ticker}: {e}")
+        
+        # Record portfolio value and closed trades; metrics are computed after the run
+        cerebro.addanalyzer(PortfolioRecorder, _name='recorder')
         
         # Run backtest
         logger.info(f"Starting backtest for {strategy_config['name']}")
         logger.info(f"Initial value: ${cerebro.broker.getvalue():,.2f}")
         
-        results = cerebro.run()
+        with profiler.section('run'):
+            results = cerebro.run()
         final_value = cerebro.broker.getvalue()
         
         logger.info(f"Final value: ${final_value:,.2f} ({(final_value - initial_cash) / initial_cash * 100:+.2f}%)")
         
-        # Plot the results
-        cerebro.plot()
+        # Plot the results (plotting needs full line buffers)
+        if not streaming:
+            cerebro.plot()
         
-        # Extract analyzer results
+        # Compute metrics from the recorded arrays
         strat = results[0]
-        
-        returns = strat.analyzers.returns.get_analysis()
-        sharpe = strat.analyzers.sharpe.get_analysis()
-        drawdown = strat.analyzers.drawdown.get_analysis()
-        trades = strat.analyzers.trades.get_analysis()
+        with profiler.section('metrics'):
+            metrics = compute_metrics(strat.analyzers.recorder.get_analysis(), initial_cash)
         
         # Compile results
         backtest_results = {
@@ -191,17 +207,79 @@ class BacktestRunner:
             'final_value': final_value,
             'total_return': final_value - initial_cash,
             'total_return_percent': (final_value - initial_cash) / initial_cash * 100,
-            'returns': returns,
-            'sharpe_ratio': sharpe.get('sharperatio', None),
-            'max_drawdown': drawdown.get('max', {}).get('drawdown', None),
-            'trades': trades,
+            'returns': metrics['returns'],
+            'sharpe_ratio': metrics['sharpe_ratio'],
+            'sortino_ratio': metrics['sortino_ratio'],
+            'max_drawdown': metrics['max_drawdown'],
+            'calmar_ratio': metrics['calmar_ratio'],
+            'exposure': metrics['exposure'],
+            'win_rate': metrics['win_rate'],
+            'trades': metrics['trades'],
+            'trade_pnl': metrics['trade_pnl'],
+            'bar_returns': metrics['bar_returns'],
         }
         
+        # Optional Monte Carlo confidence intervals
+        monte_carlo = self.backtest_config.get('monte_carlo') or {}
+        if monte_carlo.get('enabled', False):
+            with profiler.section('monte_carlo'):
+                backtest_results['monte_carlo'] = run_monte_carlo(
+                    metrics['trade_pnl'], metrics['bar_returns'], initial_cash, monte_carlo
+                )
+        
         # Print summary
         self._print_results(backtest_results)
         
+        if profiler.enabled:
+            self._report_profile(profiler, strategy_config['name'])
+        
+        journal_path = self.backtest_config.get('journal_path')
+        if journal_path:
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output = Path(journal_path) / f"{strategy_config['name']}_backtest_{timestamp}.parquet"
+            strat.journal.to_parquet(str(output))
+            logger.info(f"Trade journal saved: {output} ({len(strat.journal)} events)")
+        
         return backtest_results
     
+    def _report_profile(self, profiler: HotPathProfiler, name: str):
+        """Print the profile report and save speedscope/pstats files.
+        
+        Args:
+            profiler: Profiler used for the run
+            name: Strategy name used in the output file names
+        """
+        print(profiler.report())
+        
+        output_dir = self.backtest_config.get('profile_path', 'profiles')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        paths = profiler.save(output_dir, f"{name}_backtest_{timestamp}")
+        if paths:
+            logger.info(f"Profile saved: {paths['speedscope']} (speedscope), {paths['pstats']} (pstats)")
+    
+    def _add_streaming_feeds(self, cerebro: bt.Cerebro, ticker: str,
+                             start_date: datetime, end_date: datetime):
+        """Add a lazily streamed daily feed for a ticker.
+        
+        Minute data is not fetched: no strategy feed uses it yet (the
+        in-memory path loads it for stop simulation but never adds it), and
+        caching a cold minute history would download all of it at once.
+        
+        Args:
+            cerebro: Cerebro engine to add the feed to
+            ticker: Stock ticker symbol
+            start_date: Backtest start date
+            end_date: Backtest end date
+        """
+        if not self.data_manager.ensure_cached(ticker, start_date, end_date, timeframe='daily'):
+            logger.error(f"No daily data available for {ticker}, skipping")
+            return
+        
+        daily_feed = self.data_manager.create_streaming_feed(
+            ticker, start_date, end_date, timeframe='daily'
+        )
+        cerebro.adddata(daily_feed, name=ticker)
+    
     def run(self) -> Dict[str, Any]:
         """Run backtest for the strategy specified in config.
         
@@ -249,9 +327,17 @@ class BacktestRunner:
         if results['sharpe_ratio']:
             print(f"Sharpe Ratio: {results['sharpe_ratio']:.2f}")
         
+        if results['sortino_ratio']:
+            print(f"Sortino Ratio: {results['sortino_ratio']:.2f}")
+        
         if results['max_drawdown']:
             print(f"Max Drawdown: {results['max_drawdown']:.2f}%")
         
+        if results['calmar_ratio']:
+            print(f"Calmar Ratio: {results['calmar_ratio']:.2f}")
+        
+        print(f"Exposure: {results['exposure'] * 100:.1f}%")
+        
         trades = results['trades']
         if trades:
             total = trades.get('total', {}).get('total', 0)
@@ -263,6 +349,10 @@ class BacktestRunner:
                 print(f"Won: {won} ({won/total*100:.1f}%)")
                 print(f"Lost: {lost} ({lost/total*100:.1f}%)")
         
+        if results.get('monte_carlo'):
+            print()
+            print(format_monte_carlo(results['monte_carlo']))
+        
         print("="*80 + "\n")
 
 
@@ -0,0 +1,463 @@
+"""Long-running live trading daemon.
+
+A scheduled run (``live.py``, Lambda) starts cold: it builds its clients,
+loads the strategies and fetches every ticker's bars before it can act,
+once a day. ``LiveDaemon`` keeps one ``LiveRunner`` (clients, strategies,
+bars, position bookkeeping and portfolio snapshot) for as long as it runs
+and is driven by minute bars from a ``src.data_loaders.bar_stream`` source:
+
+- Each session's daily bar is built from the minute bars as they arrive.
+  Once the closing minute's bars are in, every strategy is evaluated on the
+  bars in memory and its orders are submitted (``LiveRunner.act_on``), with
+  no fetches between the close and the orders. When the next session
+  starts, the day's bar is replaced by the official daily bar, fetched in
+  the background while bars keep being processed; a ticker whose history
+  is still being fetched at the close is not evaluated that day.
+- Open positions are watched against their stop levels:
+  ``trailing_stop_percent`` below the highest price since the entry, or
+  below the entry itself with ``trail_stops: false`` (the backtests' fixed
+  stop). When a bar trades through a level that the broker's own stop order
+  does not cover, the position is sold right away.
+
+The time from the bar that triggered a decision to its submitted orders is
+logged and reported in milliseconds (``latency_ms``). Run with
+``python src/runners/live.py --daemon``.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from src.brokers.types import OrderSide, OrderType
+from src.data_loaders.bar_stream import AlpacaBarStream, BarUpdate
+from src.runners.live import LiveRunner, strategy_params
+from src.utils.journal import TradeJournal
+
+
+logger = logging.getLogger(__name__)
+
+ONE_MINUTE = timedelta(minutes=1)
+
+_BAR_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+class LiveDaemon:
+    """Runs the live strategies on streamed bars.
+
+    Attributes:
+        results: Execution results of each strategy at each close, with the
+                 'latency_ms' from the closing bar to the submitted orders
+        exits: Executions of the stop exits, with their 'latency_ms'
+    """
+
+    def __init__(self, runner: LiveRunner, source, strategies: Optional[List[Dict[str, Any]]] = None,
+                 market_timezone: str = 'America/New_York', market_open: str = '09:30',
+                 market_close: str = '16:00', close_wait: float = 2.0, snapshot_seconds: float = 60.0,
+                 trail_stops: bool = True):
+        """Initialize daemon.
+
+        Args:
+            runner: Live runner placing the orders (kept for the daemon's life)
+            source: Bar source (``AlpacaBarStream`` or ``ReplayBarStream``)
+            strategies: Strategy configurations (None = the configured ones)
+            market_timezone: Time zone of the session hours
+            market_open: Session open (HH:MM) when the broker's calendar is
+                         unavailable
+            market_close: Session close (HH:MM), likewise
+            close_wait: Seconds to wait for the other tickers' closing bars
+                        once the first one arrives
+            snapshot_seconds: Interval between portfolio snapshot refreshes
+            trail_stops: Raise stop levels with the high since the entry
+                         (False = fixed below the entry, as in backtests)
+        """
+        self.runner = runner
+        self.source = source
+        self.strategy_configs = strategies
+        self.timezone = ZoneInfo(market_timezone)
+        self.market_open = datetime.strptime(market_open, '%H:%M').time()
+        self.market_close = datetime.strptime(market_close, '%H:%M').time()
+        self.close_wait = close_wait
+        self.snapshot_seconds = snapshot_seconds
+        self.trail_stops = trail_stops
+
+        self.strategies: List[Dict[str, Any]] = []
+        # Bars and position bookkeeping per (strategy name, ticker)
+        self.history: Dict[Tuple[str, str], pd.DataFrame] = {}
+        self.positions: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        # Watched stop per ticker
+        self.stops: Dict[str, Dict[str, Any]] = {}
+        self.snapshot = None
+
+        # Current session
+        self.day: Optional[date] = None
+        self.hours: Optional[Tuple[datetime, datetime]] = None
+        self.day_bars: Dict[str, List[float]] = {}
+        self._closing: Set[str] = set()
+        self._close_timer: Optional[asyncio.Task] = None
+        self._evaluated: Optional[date] = None
+        # History refresh of the session and the keys it has not fetched yet
+        self._refresh: Optional[asyncio.Task] = None
+        self._stale: Set[Tuple[str, str]] = set()
+
+        self.results: List[Dict[str, Any]] = []
+        self.exits: List[Dict[str, Any]] = []
+        self._exiting: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._trading: Optional[asyncio.Lock] = None
+
+    @classmethod
+    def from_config(cls, runner: LiveRunner, source=None) -> 'LiveDaemon':
+        """Create a daemon configured by ``live.daemon``.
+
+        Args:
+            runner: Live runner
+            source: Bar source (None = Alpaca's stream on ``live.daemon.feed``)
+        """
+        settings = dict(runner.live_config.get('daemon') or {})
+        feed = settings.pop('feed', 'iex')
+        if source is None:
+            source = AlpacaBarStream(runner.alpaca_config['api_key'], runner.alpaca_config['secret_key'], feed)
+        return cls(runner, source, **settings)
+
+    @property
+    def symbols(self) -> List[str]:
+        """Tickers of all strategies."""
+        return sorted({ticker for strategy in self.strategies for ticker in strategy['tickers']})
+
+    async def run(self, duration: Optional[float] = None):
+        """Run until the source ends, ``duration`` passes or ``stop`` is called.
+
+        Args:
+            duration: Seconds to run for (None = no limit)
+        """
+        self._trading = asyncio.Lock()
+        await asyncio.to_thread(self._prepare)
+        self.snapshot = await asyncio.to_thread(self.runner.take_snapshot)
+        self._watch_positions()
+        logger.info(f"Live daemon: {len(self.strategies)} strategies, {len(self.symbols)} tickers, "
+                    f"{len(self.stops)} stops watched")
+
+        refresher = asyncio.create_task(self._refresh_snapshots())
+        try:
+            await asyncio.wait_for(self._consume(), duration)
+        except asyncio.TimeoutError:
+            logger.info(f"Live daemon stopped after {duration:g} seconds")
+        finally:
+            refresher.cancel()
+            self.source.stop()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self):
+        """Stop the bar source (the daemon then finishes its pending orders)."""
+        self.source.stop()
+
+    async def _consume(self):
+        async for bar in self.source.bars(self.symbols):
+            await self._on_bar(bar)
+
+    async def _refresh_snapshots(self):
+        """Refresh the portfolio snapshot (e.g. for fills of the broker's stops)."""
+        while True:
+            await asyncio.sleep(self.snapshot_seconds)
+            try:
+                async with self._trading:  # type: ignore[union-attr]
+                    self.snapshot = await asyncio.to_thread(self.runner.take_snapshot)
+                self._watch_positions()
+            except Exception as e:
+                logger.error(f"Error refreshing the portfolio snapshot: {e}")
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _prepare(self):
+        """Load the strategies and their saved bars and bookkeeping (once)."""
+        configs = self.strategy_configs
+        if configs is None:
+            configs = self.runner.config_loader.get_strategies()
+        for strategy_config in configs:
+            try:
+                strategy_class = self.runner.load_strategy_class(strategy_config['module'],
+                                                                 strategy_config['class'])
+            except Exception as e:
+                logger.error(f"Error loading strategy {strategy_config['name']}: {e}")
+                continue
+            params = strategy_config.get('params', {})
+            strategy = {
+                'name': strategy_config['name'],
+                'class': strategy_class,
+                'params': params,
+                'tickers': params.get('tickers', []),
+                'lookback_days': params.get('lookback_days', 30),
+                'stop_percent': strategy_params(strategy_class, params).get('trailing_stop_percent'),
+            }
+            self.strategies.append(strategy)
+            for ticker in strategy['tickers']:
+                state = self.runner.load_state(strategy_class, ticker, strategy['lookback_days'])
+                if state is not None:
+                    self.history[(strategy['name'], ticker)] = state.bars
+                    self.positions[(strategy['name'], ticker)] = state.position
+
+    async def _on_bar(self, bar: BarUpdate):
+        received = time.perf_counter()
+        day = bar.timestamp.astimezone(self.timezone).date()
+        if day != self.day:
+            await self._start_session(day)
+        if self.hours is None or not self.hours[0] <= bar.timestamp < self.hours[1]:
+            return
+
+        today = self.day_bars.get(bar.symbol)
+        if today is None:
+            self.day_bars[bar.symbol] = [bar.open, bar.high, bar.low, bar.close, bar.volume]
+        else:
+            today[1] = max(today[1], bar.high)
+            today[2] = min(today[2], bar.low)
+            today[3] = bar.close
+            today[4] += bar.volume
+
+        self._check_stop(bar, received)
+
+        if bar.timestamp + ONE_MINUTE >= self.hours[1] and self._evaluated != self.day:
+            self._closing.add(bar.symbol)
+            if self._closing >= set(self.symbols):
+                if self._close_timer is not None:
+                    self._close_timer.cancel()
+                self._spawn(self._close_session(received))
+            elif self._close_timer is None:
+                self._close_timer = self._spawn(self._close_after(self.close_wait))
+
+    async def _start_session(self, day: date):
+        """Reset the day's bars and start bringing the history up to the previous close.
+
+        The new daily bars (only those since the ones held) are fetched by a
+        background task, so the bar loop and the stop checks go on meanwhile.
+        """
+        if self.hours is not None and self._evaluated != self.day:
+            logger.warning(f"Session {self.day} ended without its closing bars, not evaluated")
+        self.day = day
+        self.day_bars = {}
+        self._closing = set()
+        self._close_timer = None
+        self.hours = await asyncio.to_thread(self._market_hours, day)
+        if self.hours is not None and (self._refresh is None or self._refresh.done()):
+            self._stale = {(strategy['name'], ticker) for strategy in self.strategies
+                           for ticker in strategy['tickers']}
+            self._refresh = self._spawn(asyncio.to_thread(self._refresh_history))
+
+    def _market_hours(self, day: date) -> Optional[Tuple[datetime, datetime]]:
+        """Session hours of a day from the broker's calendar, or the configured ones."""
+        try:
+            return self.runner.broker.get_market_hours(day)
+        except Exception as e:
+            logger.warning(f"Market calendar unavailable ({e}), assuming "
+                           f"{self.market_open:%H:%M}-{self.market_close:%H:%M} on weekdays")
+        if day.weekday() >= 5:
+            return None
+        return (datetime.combine(day, self.market_open, self.timezone),
+                datetime.combine(day, self.market_close, self.timezone))
+
+    def _refresh_history(self):
+        """Fetch the daily bars added since the ones held (``live.workers`` threads).
+
+        Each ticker's history is replaced, and its key leaves ``_stale``, as
+        soon as its fetch completes (or fails, keeping the history held).
+        """
+        def fetch(key: Tuple[str, str], lookback_days: int) -> pd.DataFrame:
+            self.runner.rate_limiter.acquire()
+            return self.runner.data_manager.get_data_for_live(key[1], lookback_days, cached=self.history.get(key))
+
+        with ThreadPoolExecutor(max_workers=self.runner.workers, thread_name_prefix='daemon') as executor:
+            futures = {
+                executor.submit(fetch, (strategy['name'], ticker), strategy['lookback_days']):
+                    (strategy['name'], ticker)
+                for strategy in self.strategies
+                for ticker in strategy['tickers']
+            }
+            for future in as_completed(futures):
+                key = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching {key[1]}: {e}")
+                    df = None
+                if df is not None and df.empty:
+                    logger.warning(f"No data available for {key[1]}")
+                elif df is not None:
+                    self.history[key] = df
+                self._stale.discard(key)
+
+    def _watch_positions(self):
+        """Watch the stop level of each position held by a strategy with a stop."""
+        stops = {}
+        for strategy in self.strategies:
+            if not strategy['stop_percent']:
+                continue
+            for ticker in strategy['tickers']:
+                position = self.snapshot.position(ticker)
+                if ticker in stops or position is None or position.qty <= 0:
+                    continue
+                key = (strategy['name'], ticker)
+                bookkeeping = self.positions.get(key)
+                entry = float(bookkeeping['entry_price'] if bookkeeping else position.avg_entry_price)
+                high = entry
+                if self.trail_stops:
+                    previous = self.stops.get(ticker)
+                    high = max(entry, bookkeeping.get('high_water', entry) if bookkeeping else entry,
+                               previous['high'] if previous is not None and previous['key'] == key else entry)
+                stops[ticker] = {
+                    'key': key,
+                    'class': strategy['class'],
+                    'percent': strategy['stop_percent'],
+                    'high': high,
+                    'covered': self._broker_stop(ticker),
+                }
+        self.stops = stops
+
+    def _broker_stop(self, ticker: str) -> Optional[float]:
+        """Highest level at which a working order already exits a position.
+
+        Returns:
+            The stop price of the position's stop order, infinity when a
+            trailing stop or another exit is working, None without either
+        """
+        covered = None
+        for order in self.snapshot.orders_for(ticker):
+            if order.side != OrderSide.SELL:
+                continue
+            if order.order_type != OrderType.STOP or order.stop_price is None:
+                return float('inf')
+            covered = max(covered or 0.0, float(order.stop_price))
+        return covered
+
+    def _check_stop(self, bar: BarUpdate, received: float):
+        """Exit a watched position whose stop level the bar traded through."""
+        watch = self.stops.get(bar.symbol)
+        if watch is None or bar.symbol in self._exiting:
+            return
+        # The level as of the bar's start: the order of the high and the low
+        # within the bar is unknown
+        level = watch['high'] * (1 - watch['percent'])
+        if self.trail_stops and bar.high > watch['high']:
+            watch['high'] = bar.high
+            bookkeeping = self.positions.get(watch['key'])
+            if bookkeeping is not None:
+                bookkeeping['high_water'] = bar.high
+        if bar.low > level:
+            return
+        if watch['covered'] is not None and watch['covered'] >= level:
+            return  # The broker's stop order exits at (or above) this level
+        self._exiting.add(bar.symbol)
+        self._spawn(self._exit(watch, bar, level, received))
+
+    async def _exit(self, watch: Dict[str, Any], bar: BarUpdate, level: float, received: float):
+        ticker = bar.symbol
+        try:
+            async with self._trading:  # type: ignore[union-attr]
+                execution = await asyncio.to_thread(self.runner.submit_exit, watch['class'], ticker, bar.close,
+                                                    bar.timestamp.isoformat(), self.snapshot)
+        finally:
+            self._exiting.discard(ticker)
+        latency = (time.perf_counter() - received) * 1000
+
+        if execution is None:
+            # No longer held (e.g. the broker's stop filled)
+            self.stops.pop(ticker, None)
+        elif 'error' in execution:
+            logger.error(f"Stop exit of {ticker} failed, retrying on the next bar: {execution['error']}")
+        else:
+            self.stops.pop(ticker, None)
+            self.positions[watch['key']] = None
+            execution['latency_ms'] = latency
+            self.exits.append(execution)
+            logger.info(f"STOP exit: {ticker} traded at ${bar.low:.2f}, through ${level:.2f} "
+                        f"({latency:.1f} ms)")
+
+    async def _close_after(self, seconds: float):
+        """Evaluate the session once the tickers missing a closing bar had time to report."""
+        await asyncio.sleep(seconds)
+        await self._close_session(time.perf_counter())
+
+    async def _close_session(self, received: float):
+        """Evaluate every strategy on the session's bars and submit the orders."""
+        if self._evaluated == self.day:
+            return
+        day = self._evaluated = self.day
+        day_bars = {symbol: list(values) for symbol, values in self.day_bars.items()}
+
+        # Give a history refresh still running up to close_wait to finish;
+        # the tickers it has not fetched by then are skipped
+        if self._refresh is not None and not self._refresh.done():
+            await asyncio.wait({self._refresh}, timeout=self.close_wait)
+        stale = set(self._stale)
+        if stale:
+            logger.warning(f"History of {len(stale)} tickers still being fetched, not evaluated at the close")
+
+        async with self._trading:  # type: ignore[union-attr]
+            all_results = await asyncio.to_thread(self._evaluate_session, day, day_bars, stale)
+        latency = (time.perf_counter() - received) * 1000
+
+        for results in all_results:
+            results['latency_ms'] = latency
+            logger.info(f"{results['strategy']} at the {day} close: {len(results['signals'])} signals, "
+                        f"{len(results['executions'])} orders, {len(results['errors'])} errors "
+                        f"({latency:.1f} ms)")
+        self.results.extend(all_results)
+        self._watch_positions()
+
+        # A journal per session
+        self.runner.save_journal()
+        self.runner.journal = TradeJournal(date_only=False)
+
+    def _evaluate_session(self, day: date, day_bars: Dict[str, List[float]],
+                          stale: Set[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Append the day's bar to each ticker's history and act on the signals (worker thread).
+
+        Tickers in ``stale`` (history not refreshed yet) are reported as errors.
+        """
+        timestamp = pd.Timestamp(day).tz_localize(self.timezone).tz_convert('UTC')
+        all_results = []
+        for strategy in self.strategies:
+            strategy_class = strategy['class']
+            results: Dict[str, Any] = {
+                'strategy': strategy['name'],
+                'timestamp': datetime.now().isoformat(),
+                'signals': [],
+                'executions': [],
+                'errors': [],
+            }
+            evaluations = []
+            for ticker in strategy['tickers']:
+                key = (strategy['name'], ticker)
+                if key in stale:
+                    results['errors'].append({'ticker': ticker, 'error': 'history refresh pending'})
+                    continue
+                history = self.history.get(key)
+                if history is None or ticker not in day_bars:
+                    results['errors'].append({'ticker': ticker,
+                                              'error': 'no history' if history is None else 'no bars today'})
+                    continue
+                bar = pd.DataFrame([day_bars[ticker]], columns=_BAR_COLUMNS,
+                                   index=pd.DatetimeIndex([timestamp], name=history.index.name))
+                df = pd.concat([history[history.index < timestamp], bar])
+                df = df[df.index >= timestamp - pd.Timedelta(days=strategy['lookback_days'] + 10)]
+                self.history[key] = df
+                try:
+                    evaluations.append(self.runner.evaluate_bars(strategy_class, strategy['params'], ticker, df,
+                                                                 strategy['lookback_days'], self.positions.get(key)))
+                except Exception as e:
+                    logger.error(f"Error processing {ticker}: {e}")
+                    results['errors'].append({'ticker': ticker, 'error': str(e)})
+
+            positions = self.runner.act_on(strategy_class, strategy['params'], evaluations, self.snapshot, results)
+            for ticker, position in positions.items():
+                self.positions[(strategy['name'], ticker)] = position
+            all_results.append(results)
+        return all_results
@@ -3,13 +3,39 @@
 This module provides the entry point for live trading execution. It fetches
 recent market data, runs strategies to check for signals, and executes
 trades through the Alpaca broker. Works both locally and in AWS Lambda.
+
+A thread pool fetches each ticker's data and computes its signal. Once
+all are in, the main thread decides on the run's orders in one pass: buys
+are ranked and sized together by a ``BatchAllocator`` within
+``live.max_positions``, cash and buying power, then submitted after the
+sells. All API calls share one rate limiter, and an optional deadline
+(e.g. the Lambda timeout) stops new tickers from being started once it is
+near; those are reported as skipped.
+
+The account, positions and open orders are fetched once per run as a
+``PortfolioSnapshot``; signal checks and order sizing read it, and submitted
+orders update it locally, so the number of broker calls does not grow with
+the number of tickers.
+
+With ``live.state_path`` set, each ticker's bar window and position
+bookkeeping are saved after a run (``src.utils.state_store``), so the next
+run only fetches the bars added since.
+
+With ``live.fanout`` set, the runner coordinates: tickers are evaluated in
+shards by parallel workers (``src.utils.fanout``) and only the orders are
+decided and submitted here.
+
+``--daemon`` keeps the runner alive instead, driven by streamed bars
+(``src.runners.daemon``).
 """
 import sys
+import time
 import logging
 import importlib
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -17,8 +43,19 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.utils.config_loader import get_config_loader
 from src.data_loaders.data_manager import DataManager
 from src.brokers.alpaca_broker import AlpacaBroker
-from src.brokers.types import MarketOrder, OrderSide
+from src.brokers.order_store import OrderStore
+from src.brokers.trade_updates import AlpacaTradeUpdates, TradeUpdateConsumer
+from src.brokers.types import (
+    MarketOrder, OrderRequest, OrderResult, OrderSide, OrderType, OTOOrder, PortfolioSnapshot, Position,
+    StopOrder, TimeInForce, TrailingStopOrder
+)
+from src.utils.arrays import frame_to_arrays
+from src.strategies.allocation import BatchAllocator
 from src.strategies.base_strategy import BaseStrategy
+from src.utils.journal import BUY, SELL, DETAIL_TRAILING_STOP, CancelReason, EventType, TradeJournal
+from src.utils.fanout import ShardTransport, open_transport, shard_tickers
+from src.utils.rate_limit import RateLimiter
+from src.utils.state_store import LiveState, open_state_store
 import backtrader as bt
 
 
@@ -30,6 +67,114 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+class DeadlineExceeded(Exception):
+    """Raised when a ticker cannot be processed before the run's deadline."""
+
+
+def strategy_params(strategy_class, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Strategy parameter defaults merged with configured values."""
+    return {**dict(strategy_class.params._getpairs()), **params}  # type: ignore[attr-defined]
+
+
+def backtrader_signals(strategy_class, params: Dict[str, Any], df,
+                       ticker: str = 'data') -> Tuple[bool, bool]:
+    """Signals at the last bar from a backtrader run over the bars.
+    
+    Args:
+        strategy_class: Strategy class
+        params: Strategy parameters
+        df: Price data DataFrame
+        ticker: Data feed name
+        
+    Returns:
+        (buy_signal, sell_signal) of the strategy after the last bar
+    """
+    # Create a minimal backtrader cerebro to run the strategy
+    cerebro = bt.Cerebro()
+    
+    # Add strategy
+    cerebro.addstrategy(strategy_class, **params)
+    
+    # Create data feed
+    # Type ignores needed due to incomplete backtrader type stubs
+    data_feed = bt.feeds.PandasData(
+        dataname=df,  # type: ignore[call-arg]
+        datetime=None,  # type: ignore[call-arg]
+        open='open',  # type: ignore[call-arg]
+        high='high',  # type: ignore[call-arg]
+        low='low',  # type: ignore[call-arg]
+        close='close',  # type: ignore[call-arg]
+        volume='volume',  # type: ignore[call-arg]
+        openinterest=-1  # type: ignore[call-arg]
+    )
+    cerebro.adddata(data_feed, name=ticker)
+    
+    # Set a minimal broker to avoid errors
+    cerebro.broker.setcash(1000000)
+    
+    # Run strategy
+    strat = cerebro.run()[0]
+    
+    buy = hasattr(strat, 'buy_signal') and strat.buy_signal()
+    sell = hasattr(strat, 'sell_signal') and strat.sell_signal()
+    return bool(buy), bool(sell)
+
+
+def strategy_signals(strategy_class, params: Dict[str, Any], df,
+                     ticker: str = 'data') -> Tuple[bool, bool]:
+    """Signals at the last bar, from ``compute_signals`` when implemented.
+    
+    Args:
+        strategy_class: Strategy class
+        params: Strategy parameters
+        df: Price data DataFrame
+        ticker: Data feed name
+        
+    Returns:
+        (buy_signal, sell_signal) at the last bar
+    """
+    signals = strategy_class.compute_signals(frame_to_arrays(df), strategy_params(strategy_class, params))
+    if signals is None:
+        return backtrader_signals(strategy_class, params, df, ticker)
+    return signals
+
+
+def signal_parity(strategy_class, params: Dict[str, Any], df, window: int) -> List[Dict[str, Any]]:
+    """Compare ``compute_signals`` with backtrader over historical bars.
+    
+    Every ``window``-bar slice of the history is evaluated both ways, as if
+    it were the data of a live run.
+    
+    Args:
+        strategy_class: Strategy class implementing ``compute_signals``
+        params: Strategy parameters
+        df: Historical price data DataFrame
+        window: Bars per evaluation (the live lookback)
+        
+    Returns:
+        One dictionary per slice where the two disagree, with the slice's
+        last 'timestamp' and both results (empty = parity)
+        
+    Raises:
+        ValueError: If the strategy does not implement ``compute_signals``
+    """
+    arrays = frame_to_arrays(df)
+    merged = strategy_params(strategy_class, params)
+    mismatches = []
+    for end in range(window, len(df) + 1):
+        fast = strategy_class.compute_signals(arrays[:, end - window:end], merged)
+        if fast is None:
+            raise ValueError(f"{strategy_class.__name__} does not implement compute_signals")
+        reference = backtrader_signals(strategy_class, params, df.iloc[end - window:end])
+        if fast != reference:
+            mismatches.append({
+                'timestamp': str(df.index[end - 1]),
+                'compute_signals': fast,
+                'backtrader': reference,
+            })
+    return mismatches
+
+
 class LiveRunner:
     """Executes live trading strategies."""
     
@@ -56,19 +201,68 @@ class LiveRunner:
             alpaca_config['secret_key']
         )
         
+        # Local record of orders and fills (kept current by --track-orders)
+        order_store_path = self.live_config.get('order_store')
         self.broker = AlpacaBroker(
             alpaca_config['api_key'],
             alpaca_config['secret_key'],
-            paper=alpaca_config.get('paper', True)
+            paper=alpaca_config.get('paper', True),
+            order_store=OrderStore(order_store_path) if order_store_path else None
         )
+        self.alpaca_config = alpaca_config
+        
+        # Journal of signals and order submissions for this run
+        self.journal = TradeJournal(date_only=False)
+        
+        # Concurrency: worker threads per strategy run, sharing one limit on
+        # Alpaca API requests (data and trading)
+        self.workers = max(1, int(self.live_config.get('workers') or 1))
+        self.rate_limiter = RateLimiter(self.live_config.get('rate_limit', 180))
+        self._size_connection_pools()
+        
+        # Per-ticker state saved between runs (None = every run starts cold)
+        state_path = self.live_config.get('state_path')
+        self.state_store = open_state_store(state_path) if state_path else None
         
         logger.info("Live runner initialized")
     
-    def display_portfolio_status(self):
-        """Display current portfolio status including account info and positions."""
+    def _size_connection_pools(self):
+        """Keep one pooled keep-alive connection per worker thread.
+        
+        The Alpaca clients hold a requests session for their lifetime (and
+        across warm Lambda invocations when the runner is reused), whose
+        default pool keeps only 10 connections per host.
+        """
+        if self.workers <= 10:
+            return
+        from requests.adapters import HTTPAdapter
+        for client in (self.broker.client, self.data_manager.alpaca_client):
+            session = getattr(client, '_session', None)
+            if session is not None:
+                session.mount('https://', HTTPAdapter(pool_maxsize=self.workers))
+    
+    def take_snapshot(self) -> PortfolioSnapshot:
+        """Fetch the account, positions and open orders for a run.
+        
+        Returns:
+            PortfolioSnapshot (three API calls)
+        """
+        for _ in range(3):
+            self.rate_limiter.acquire()
+        return self.broker.get_snapshot()
+    
+    def display_portfolio_status(self, snapshot: Optional[PortfolioSnapshot] = None):
+        """Display current portfolio status including account info and positions.
+        
+        Args:
+            snapshot: Portfolio snapshot to display (None = fetch one)
+        """
         try:
+            if snapshot is None:
+                snapshot = self.take_snapshot()
+            
             # Get account info
-            account = self.broker.get_account()
+            account = snapshot.account
             
             print("\n" + "="*80)
             print("PORTFOLIO STATUS")
@@ -79,7 +273,7 @@ class LiveRunner:
             print(f"Buying Power: ${float(account.buying_power):,.2f}")
             
             # Get positions
-            positions = self.broker.get_positions()
+            positions = list(snapshot.positions.values())
             
             if positions:
                 print(f"\nOpen Positions: {len(positions)}")
@@ -96,6 +290,7 @@ class LiveRunner:
             else:
                 print("\nOpen Positions: 0")
             
+            print(f"Open Orders: {len(snapshot.open_orders)}")
             print("="*80 + "\n")
             
         except Exception as e:
@@ -119,12 +314,38 @@ class LiveRunner:
         
         return strategy_class
     
-    def run_strategy(self, strategy_config: Dict[str, Any]) -> Dict[str, Any]:
+    def deadline_after(self, seconds: float) -> float:
+        """Deadline for a run that must finish within a time limit.
+        
+        Args:
+            seconds: Time available to the run (e.g. the Lambda's remaining time)
+            
+        Returns:
+            ``time.monotonic()`` time after which no new tickers are started,
+            leaving ``live.deadline_margin`` seconds to finish the run
+        """
+        return time.monotonic() + seconds - self.live_config.get('deadline_margin', 15)
+    
+    def run_strategy(self, strategy_config: Dict[str, Any], deadline: Optional[float] = None,
+                     snapshot: Optional[PortfolioSnapshot] = None,
+                     transport: Optional[ShardTransport] = None) -> Dict[str, Any]:
         """Run a strategy and execute any generated signals.
         
+        Data fetches and signal checks run on ``live.workers`` threads, or
+        on the workers of ``transport`` in shards of ``live.shard_size``
+        tickers. Once every ticker is evaluated (or the deadline is reached),
+        the buys are sized together against the portfolio limits and the
+        orders are submitted from this thread.
+        
         Args:
             strategy_config: Strategy configuration dictionary
-            
+            deadline: ``time.monotonic()`` time after which no new tickers are
+                      started (None = no limit)
+            snapshot: Portfolio snapshot of this run, updated as orders are
+                      submitted (None = fetch one)
+            transport: Transport running the shards (None = evaluate the
+                       tickers in this process)
+        
         Returns:
             Dictionary with execution results
         """
@@ -144,121 +365,543 @@ class LiveRunner:
             'errors': []
         }
         
+        if snapshot is None:
+            snapshot = self.take_snapshot()
+        
         # Process each ticker
         params = strategy_config.get('params', {})
         tickers = params.get('tickers', [])
         lookback_days = params.get('lookback_days', 30)
         
-        for ticker in tickers:
-            try:
-                # Processing ticker
-                
-                # Fetch fresh data from Alpaca (always for live trading)
-                df = self.data_manager.get_data_for_live(ticker, lookback_days)
-                
-                if df.empty:
-                    logger.warning(f"No data available for {ticker}")
-                    continue
-                
-                # Run strategy using backtrader's mini-engine
-                signal_result = self._check_signal(
-                    strategy_class, 
-                    strategy_config.get('params', {}),
-                    ticker,
-                    df
-                )
-                
-                if signal_result:
-                    results['signals'].append(signal_result)
-                    
-                    # Execute trade
-                    execution = self._execute_signal(ticker, signal_result)
-                    if execution:
-                        results['executions'].append(execution)
-                
-            except Exception as e:
-                logger.error(f"Error processing {ticker}: {e}")
+        if transport is None:
+            evaluations = self._evaluate_tickers(strategy_class, params, tickers, lookback_days, deadline)
+        else:
+            evaluations = self._evaluate_shards(strategy_config, tickers, deadline, transport)
+        
+        processed = set()
+        evaluated = []
+        for ticker, evaluation, error in evaluations:
+            processed.add(ticker)
+            if error is not None:
+                logger.error(f"Error processing {ticker}: {error}")
                 results['errors'].append({
                     'ticker': ticker,
-                    'error': str(e)
+                    'error': error
                 })
+            elif evaluation is not None:
+                evaluated.append(evaluation)
+        
+        # Decide on all orders at once, in the configured ticker order
+        order = {ticker: i for i, ticker in enumerate(tickers)}
+        evaluated.sort(key=lambda evaluation: order[evaluation['ticker']])
+        self.act_on(strategy_class, params, evaluated, snapshot, results)
+        
+        results['skipped'] = [ticker for ticker in tickers if ticker not in processed]
+        if results['skipped']:
+            logger.warning(f"Deadline reached, skipped {len(results['skipped'])} tickers: "
+                           f"{', '.join(results['skipped'])}")
         
         return results
     
-    def _check_signal(self, strategy_class, params: Dict[str, Any], 
-                     ticker: str, df) -> Optional[Dict[str, Any]]:
-        """Check for trading signals using backtrader.
+    def evaluate_shard(self, payload: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Evaluate a shard of a strategy's tickers (worker mode).
+        
+        Fetches the data and computes the signals of the shard's tickers,
+        saving their state, without any broker calls: the coordinator
+        decides on and submits the orders.
+        
+        Args:
+            payload: Shard payload built by the coordinator ('strategy' with
+                     the shard's tickers, 'deadline_at' as a UNIX timestamp,
+                     'rate_limit')
+            deadline: ``time.monotonic()`` time of this worker's own limit
+                      (None = only the coordinator's)
+        
+        Returns:
+            Dictionary with the 'evaluations', 'errors' and 'skipped' tickers
+            (JSON-serializable)
+        """
+        strategy_config = payload['strategy']
+        strategy_class = self.load_strategy_class(strategy_config['module'], strategy_config['class'])
+        params = strategy_config.get('params', {})
+        tickers = params.get('tickers', [])
+        
+        if payload.get('deadline_at') is not None:
+            # The coordinator's deadline as wall-clock time: a shard that
+            # waited for a free worker gets only what is left of it
+            shard_deadline = time.monotonic() + payload['deadline_at'] - time.time()
+            deadline = shard_deadline if deadline is None else min(deadline, shard_deadline)
+        
+        # This worker's share of the account's API rate limit
+        rate_limiter = RateLimiter(payload['rate_limit']) if payload.get('rate_limit') else self.rate_limiter
+        
+        response = {'evaluations': [], 'errors': [], 'skipped': []}
+        processed = set()
+        for ticker, evaluation, error in self._evaluate_tickers(strategy_class, params, tickers,
+                                                                params.get('lookback_days', 30),
+                                                                deadline, rate_limiter):
+            processed.add(ticker)
+            if error is not None:
+                response['errors'].append({'ticker': ticker, 'error': error})
+            elif evaluation is not None:
+                response['evaluations'].append(evaluation)
+        response['skipped'] = [ticker for ticker in tickers if ticker not in processed]
+        
+        logger.info(f"Shard of {len(tickers)} tickers: {len(response['evaluations'])} evaluated, "
+                    f"{len(response['errors'])} errors, {len(response['skipped'])} skipped")
+        return response
+    
+    def _evaluate_shards(self, strategy_config: Dict[str, Any], tickers: List[str],
+                         deadline: Optional[float], transport: ShardTransport
+                         ) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Evaluate tickers in shards on a transport's workers.
+        
+        Workers stop starting tickers at the deadline; their responses are
+        awaited for half of ``live.deadline_margin`` after it, leaving the
+        other half to submit the orders.
+        
+        Args:
+            strategy_config: Strategy configuration dictionary
+            tickers: Stock tickers
+            deadline: ``time.monotonic()`` time after which no new tickers are
+                      started (None = no limit)
+            transport: Transport running the shards
+        
+        Yields:
+            (ticker, evaluation or None, error message or None) as each shard
+            completes; tickers of shards not back in time are not yielded
+        """
+        shards = shard_tickers(tickers, int(self.live_config.get('shard_size', 25)))
+        if not shards:
+            return
+        
+        # Concurrent shards share the account's API rate limit with the
+        # orders submitted here
+        rate_limit = self.rate_limiter.rate * 60 / (min(len(shards), transport.workers) + 1)
+        
+        remaining = self._remaining(deadline)
+        params = strategy_config.get('params', {})
+        payloads = [
+            {
+                'mode': 'worker',
+                'strategy': {**strategy_config, 'params': {**params, 'tickers': shard}},
+                'deadline_at': None if remaining is None else time.time() + remaining,
+                'rate_limit': rate_limit,
+            }
+            for shard in shards
+        ]
+        timeout = None if remaining is None else remaining + self.live_config.get('deadline_margin', 15) / 2
+        logger.info(f"Fanning out {len(tickers)} tickers in {len(shards)} shards")
+        
+        for payload, response, error in transport.map(payloads, timeout):
+            shard = payload['strategy']['params']['tickers']
+            if error is not None:
+                logger.error(f"Shard {shard[0]}..{shard[-1]} failed: {error}")
+                for ticker in shard:
+                    yield ticker, None, f"shard failed: {error}"
+                continue
+            for evaluation in response['evaluations']:
+                yield evaluation['ticker'], evaluation, None
+            for failure in response['errors']:
+                yield failure['ticker'], None, failure['error']
+    
+    def _evaluate_tickers(self, strategy_class, params: Dict[str, Any], tickers: List[str],
+                          lookback_days: int, deadline: Optional[float],
+                          rate_limiter: Optional[RateLimiter] = None
+                          ) -> Iterator[Tuple[str, Optional[Dict[str, Any]], Optional[str]]]:
+        """Evaluate tickers on ``live.workers`` threads.
+        
+        Args:
+            strategy_class: Strategy class
+            params: Strategy parameters
+            tickers: Stock tickers
+            lookback_days: Days of history to fetch
+            deadline: ``time.monotonic()`` time after which no new tickers are
+                      started (None = no limit)
+            rate_limiter: Limiter of the API requests (None = the runner's)
+        
+        Yields:
+            (ticker, evaluation or None, error message or None) as each
+            ticker completes; tickers not started before the deadline are
+            not yielded
+        """
+        executor = ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(tickers))),
+                                      thread_name_prefix='live')
+        futures = {
+            executor.submit(self._evaluate_ticker, strategy_class, params, ticker,
+                            lookback_days, deadline, rate_limiter or self.rate_limiter): ticker
+            for ticker in tickers
+        }
+        try:
+            for future in as_completed(futures, timeout=self._remaining(deadline)):
+                ticker = futures[future]
+                try:
+                    evaluation = future.result()
+                except DeadlineExceeded:
+                    continue
+                except Exception as e:
+                    yield ticker, None, str(e)
+                    continue
+                yield ticker, evaluation, None
+        except TimeoutError:
+            pass
+        finally:
+            # Tickers not started yet are dropped; running ones finish unobserved
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _remaining(deadline: Optional[float]) -> Optional[float]:
+        """Seconds left until a deadline (None = no deadline)."""
+        return None if deadline is None else max(0.0, deadline - time.monotonic())
+    
+    def _evaluate_ticker(self, strategy_class, params: Dict[str, Any], ticker: str, lookback_days: int,
+                         deadline: Optional[float], rate_limiter: RateLimiter) -> Optional[Dict[str, Any]]:
+        """Fetch a ticker's data and compute its signals (worker thread).
+        
+        With a state store, the saved bars are extended with the new ones
+        and saved again; the position bookkeeping is passed on unchanged.
+        
+        Args:
+            strategy_class: Strategy class
+            params: Strategy parameters
+            ticker: Stock ticker
+            lookback_days: Days of history to fetch
+            deadline: ``time.monotonic()`` time by which the fetch must start
+            rate_limiter: Limiter of the API requests
+        
+        Returns:
+            Evaluation dictionary ('ticker', 'buy', 'sell', the buy signal's
+            'score', 'price', 'timestamp' and the saved 'position'
+            bookkeeping), or None without data
+        
+        Raises:
+            DeadlineExceeded: If the deadline passes before the data is fetched
+        """
+        state = self.load_state(strategy_class, ticker, lookback_days)
+        
+        if not rate_limiter.acquire(deadline):
+            raise DeadlineExceeded(ticker)
+        
+        # Fetch fresh data from Alpaca (always for live trading), only the
+        # new bars when the previous run's are saved
+        df = self.data_manager.get_data_for_live(ticker, lookback_days,
+                                                 cached=state.bars if state is not None else None)
+        
+        if df.empty:
+            logger.warning(f"No data available for {ticker}")
+            return None
+        
+        return self.evaluate_bars(strategy_class, params, ticker, df, lookback_days,
+                                  state.position if state is not None else None)
+    
+    def load_state(self, strategy_class, ticker: str, lookback_days: int) -> Optional[LiveState]:
+        """Load a ticker's saved state.
+        
+        Args:
+            strategy_class: Strategy class
+            ticker: Stock ticker
+            lookback_days: Lookback of this run
+        
+        Returns:
+            LiveState, or None without a state store, a saved state or when it
+            was saved for another lookback
+        """
+        if self.state_store is None:
+            return None
+        state = self.state_store.load(self._state_key(strategy_class, ticker))
+        if state is not None and state.lookback_days != lookback_days:
+            return None
+        return state
+    
+    def evaluate_bars(self, strategy_class, params: Dict[str, Any], ticker: str, df, lookback_days: int,
+                      position: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Compute a ticker's signals at the last of its bars.
+        
+        With a state store, the bars are saved with the position bookkeeping
+        unchanged.
         
         Args:
             strategy_class: Strategy class
             params: Strategy parameters
             ticker: Stock ticker
-            df: Price data DataFrame
+            df: Daily bars, the last one being the bar acted on
+            lookback_days: Lookback the bars were fetched for
+            position: Saved position bookkeeping (None = flat or unknown)
+        
+        Returns:
+            Evaluation dictionary (see ``_evaluate_ticker``)
+        """
+        buy, sell = strategy_signals(strategy_class, params, df, ticker)
+        score = 0.0
+        if buy:
+            score = strategy_class.signal_score(frame_to_arrays(df), strategy_params(strategy_class, params))
+        
+        if self.state_store is not None:
+            self._save_state(strategy_class, ticker,
+                             LiveState(lookback_days=lookback_days, bars=df, position=position))
+        
+        return {
+            'ticker': ticker,
+            'buy': buy,
+            'sell': sell,
+            'score': float(score),
+            'price': float(df['close'].iloc[-1]),
+            'timestamp': df.index[-1].isoformat() if hasattr(df.index[-1], 'isoformat') else str(df.index[-1]),
+            'position': position,
+        }
+    
+    @staticmethod
+    def _state_key(strategy_class, ticker: str) -> str:
+        """State store key of a strategy and ticker."""
+        return f"{strategy_class.__name__}/{ticker}"
+    
+    def _save_state(self, strategy_class, ticker: str, state: LiveState):
+        """Save a ticker's state (failures only cost the next run a cold start)."""
+        try:
+            self.state_store.save(self._state_key(strategy_class, ticker), state)  # type: ignore[union-attr]
+        except Exception as e:
+            logger.warning(f"Could not save live state for {ticker}: {e}")
+    
+    def _save_position(self, strategy_class, ticker: str, position: Optional[Dict[str, Any]]):
+        """Update the position bookkeeping in a ticker's saved state."""
+        state = self.state_store.load(self._state_key(strategy_class, ticker))  # type: ignore[union-attr]
+        if state is not None:
+            state.position = position
+            self._save_state(strategy_class, ticker, state)
+    
+    @staticmethod
+    def _position_bookkeeping(ticker: str, saved: Optional[Dict[str, Any]],
+                              snapshot: PortfolioSnapshot) -> Optional[Dict[str, Any]]:
+        """Saved position bookkeeping, reconciled with the broker's positions.
+        
+        Args:
+            ticker: Stock ticker
+            saved: Bookkeeping saved by the previous run
+            snapshot: Portfolio snapshot of this run
             
         Returns:
-            Signal dictionary or None
+            Bookkeeping of the open (or pending) position, or None when
+            flat (e.g. the stop was hit since the last run)
         """
-        # Create a minimal backtrader cerebro to run the strategy
-        cerebro = bt.Cerebro()
-        
-        # Add strategy
-        cerebro.addstrategy(strategy_class, **params)
-        
-        # Create data feed
-        # Type ignores needed due to incomplete backtrader type stubs
-        data_feed = bt.feeds.PandasData(
-            dataname=df,  # type: ignore[call-arg]
-            datetime=None,  # type: ignore[call-arg]
-            open='open',  # type: ignore[call-arg]
-            high='high',  # type: ignore[call-arg]
-            low='low',  # type: ignore[call-arg]
-            close='close',  # type: ignore[call-arg]
-            volume='volume',  # type: ignore[call-arg]
-            openinterest=-1  # type: ignore[call-arg]
+        position: Optional[Position] = snapshot.position(ticker)
+        if position is None or position.qty <= 0:
+            # Kept while the entry order has not filled yet
+            buy_pending = any(order.side == OrderSide.BUY for order in snapshot.orders_for(ticker))
+            return saved if buy_pending else None
+        if saved is not None:
+            return saved
+        
+        # Position opened outside these runs: adopt it
+        return {
+            'entry_price': position.avg_entry_price,
+            'qty': position.qty,
+            'opened_at': None,
+            'trailing_stop_set': any(order.side == OrderSide.SELL
+                                     and order.order_type in (OrderType.STOP, OrderType.TRAILING_STOP)
+                                     for order in snapshot.orders_for(ticker)),
+        }
+    
+    def act_on(self, strategy_class, params: Dict[str, Any], evaluations: List[Dict[str, Any]],
+               snapshot: PortfolioSnapshot, results: Dict[str, Any]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Turn a run's evaluations into orders and submit them.
+        
+        Runs on the coordinating thread only, once every ticker is
+        evaluated: the final order set (sells, and the buys sized by
+        ``allocate_buys``) is decided in one pass against the snapshot,
+        then submitted, sells first.
+        
+        Args:
+            strategy_class: Strategy class
+            params: Strategy parameters
+            evaluations: Evaluations of the tickers (see ``_evaluate_ticker``)
+            snapshot: Portfolio snapshot of this run, updated with the orders
+            results: Execution results of the run, extended in place
+        
+        Returns:
+            Position bookkeeping of each evaluated ticker after the orders
+        """
+        # Bookkeeping as of the snapshot, before this run's orders
+        positions = {
+            evaluation['ticker']: self._position_bookkeeping(evaluation['ticker'], evaluation['position'], snapshot)
+            for evaluation in evaluations
+        }
+        
+        signals = []
+        scores = []
+        for evaluation in evaluations:
+            signal_result = self._check_signal(evaluation, snapshot)
+            if signal_result:
+                signal_result['client_order_id'] = self._client_order_id(strategy_class, signal_result)
+                signals.append(signal_result)
+                scores.append(evaluation.get('score', 0.0))
+                results['signals'].append(signal_result)
+                self.journal.record(
+                    EventType.SIGNAL, datetime.now().timestamp(), signal_result['ticker'],
+                    side=BUY if signal_result['action'] == 'buy' else SELL,
+                    price=signal_result['price'],
+                )
+        
+        sells = [signal_result for signal_result in signals if signal_result['action'] == 'sell']
+        buys = [i for i, signal_result in enumerate(signals) if signal_result['action'] == 'buy']
+        
+        # Sells free their position slots for the buys
+        held = self._open_positions(snapshot) - {signal_result['ticker'] for signal_result in sells}
+        quantities = self.allocate_buys(strategy_class, params, [signals[i] for i in buys],
+                                        [scores[i] for i in buys], snapshot, len(held))
+        for i, qty in zip(buys, quantities):
+            signals[i]['quantity'] = int(qty)
+            if not qty:
+                logger.info(f"BUY signal not allocated: {signals[i]['ticker']} "
+                            f"(max positions or cash reached)")
+        # Highest-ranked first, as the allocator funds them
+        allocated = [signals[i] for i in sorted(buys, key=lambda i: (-scores[i], i)) if signals[i]['quantity']]
+        
+        executions = []
+        for signal_result in sells:
+            executions.append(self._execute_signal(signal_result['ticker'], signal_result, snapshot))
+        
+        # A sell that was not submitted still holds its slot: drop the
+        # lowest-ranked buys that no longer fit in max_positions
+        failed_sells = sum(1 for execution in executions if not execution or 'error' in execution)
+        max_positions = self.live_config.get('max_positions')
+        if failed_sells and max_positions is not None:
+            excess = min(len(allocated), max(0, len(held) + failed_sells + len(allocated) - max_positions))
+            for signal_result in allocated[len(allocated) - excess:]:
+                logger.info(f"BUY signal dropped, a sell was not submitted: {signal_result['ticker']}")
+                signal_result['quantity'] = 0
+            allocated = allocated[:len(allocated) - excess]
+        
+        stop_percent = strategy_params(strategy_class, params).get('trailing_stop_percent')
+        for signal_result in allocated:
+            executions.append(self._execute_signal(signal_result['ticker'], signal_result, snapshot,
+                                                   stop_percent))
+        
+        for execution in executions:
+            if not execution:
+                continue
+            results['executions'].append(execution)
+            
+            # Keep the position bookkeeping in step with the order
+            if execution.get('stop_canceled') and positions[execution['ticker']] is not None:
+                positions[execution['ticker']] = {**positions[execution['ticker']], 'trailing_stop_set': False}
+            elif 'error' not in execution:
+                positions[execution['ticker']] = None if execution['action'] == 'sell' else {
+                    'entry_price': execution['price'],
+                    'qty': execution['quantity'],
+                    'opened_at': execution['timestamp'],
+                    'trailing_stop_set': 'stop_price' in execution,
+                }
+        
+        if self.state_store is not None:
+            for evaluation in evaluations:
+                ticker = evaluation['ticker']
+                if positions[ticker] != evaluation['position']:
+                    self._save_position(strategy_class, ticker, positions[ticker])
+        
+        return positions
+    
+    def allocate_buys(self, strategy_class, params: Dict[str, Any], buys: List[Dict[str, Any]],
+                      scores: List[float], snapshot: PortfolioSnapshot, open_positions: int) -> List[int]:
+        """Size buy signals against ``live.max_positions``, cash and buying power.
+        
+        Args:
+            strategy_class: Strategy class
+            params: Strategy parameters (``position_percent`` per position)
+            buys: Buy signals
+            scores: Ranking score of each buy, higher first
+            snapshot: Portfolio snapshot of this run
+            open_positions: Positions (and pending entries) held after this
+                            run's sells
+        
+        Returns:
+            Shares to buy per signal (0 = not allocated)
+        """
+        allocator = BatchAllocator(
+            max_positions=self.live_config.get('max_positions'),
+            position_percent=strategy_params(strategy_class, params).get('position_percent', 1.0),
         )
-        cerebro.adddata(data_feed, name=ticker)
+        quantities = allocator.allocate(
+            [signal_result['price'] for signal_result in buys],
+            cash=float(snapshot.account.cash),
+            buying_power=float(snapshot.account.buying_power),
+            open_positions=open_positions,
+            scores=scores,
+        )
+        return quantities.tolist()
+    
+    @staticmethod
+    def _open_positions(snapshot: PortfolioSnapshot) -> set:
+        """Symbols held or with an entry order working."""
+        held = {symbol for symbol, position in snapshot.positions.items() if position.qty > 0}
+        return held | {order.symbol for order in snapshot.open_orders if order.side == OrderSide.BUY}
+    
+    @staticmethod
+    def _client_order_id(strategy_class, signal: Dict[str, Any]) -> str:
+        """Order ID of a signal, the same whenever the same bar is acted on.
+        
+        A retried run (e.g. a Lambda retry after a timeout) submits its
+        orders under the same IDs, which the broker does not fill twice.
+        """
+        return f"{strategy_class.__name__}-{signal['ticker']}-{signal['action']}-{signal['timestamp'][:10]}"
+    
+    def _check_signal(self, evaluation: Dict[str, Any],
+                      snapshot: PortfolioSnapshot) -> Optional[Dict[str, Any]]:
+        """Check for trading signals.
         
-        # Set a minimal broker to avoid errors
-        cerebro.broker.setcash(1000000)
+        Args:
+            evaluation: Evaluation of the ticker (see ``_evaluate_ticker``)
+            snapshot: Portfolio snapshot of this run
         
-        # Run strategy
-        strat_list = cerebro.run()
-        strat = strat_list[0]
+        Returns:
+            Signal dictionary or None
+        """
+        ticker = evaluation['ticker']
         
         # Check current position and signals
-        position = self.broker.get_position(ticker)
+        position = snapshot.position(ticker)
         has_position = position is not None and position.qty > 0
+        buy_pending = any(order.side == OrderSide.BUY for order in snapshot.orders_for(ticker))
         
         # Determine action based on strategy state
         # Note: This is a simplified approach - you may need to enhance based on your strategy logic
         action = None
         
         if not has_position:
-            # Check for buy signal
-            if hasattr(strat, 'buy_signal') and strat.buy_signal():
+            # Check for buy signal (unless an earlier buy is still working)
+            if not buy_pending and evaluation['buy']:
                 action = 'buy'
         else:
             # Check for sell signal
-            if hasattr(strat, 'sell_signal') and strat.sell_signal():
+            if evaluation['sell']:
                 action = 'sell'
         
         if action:
-            current_price = df['close'].iloc[-1]
             return {
                 'ticker': ticker,
                 'action': action,
-                'price': float(current_price),
-                'timestamp': df.index[-1].isoformat() if hasattr(df.index[-1], 'isoformat') else str(df.index[-1])
+                'price': evaluation['price'],
+                'timestamp': evaluation['timestamp']
             }
         
         return None
     
-    def _execute_signal(self, ticker: str, signal: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _execute_signal(self, ticker: str, signal: Dict[str, Any], snapshot: PortfolioSnapshot,
+                        stop_percent: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """Execute a trading signal.
         
+        With a stop percent, a buy goes out as an OTO order: the entry and a
+        GTC stop ``stop_percent`` below the signal price (the stop the
+        backtest places after the entry) in one request. A sell first
+        cancels the stop still holding the position's shares, and places it
+        again if the sell is not submitted; the result of a failed sell has
+        ``stop_canceled`` set when the stop could not be placed again.
+        
         Args:
             ticker: Stock ticker
             signal: Signal dictionary
+            snapshot: Portfolio snapshot of this run, updated with the order
+            stop_percent: Strategy's ``trailing_stop_percent`` (None or 0 =
+                          no stop)
             
         Returns:
             Execution result dictionary
@@ -267,23 +910,35 @@ class LiveRunner:
         
         try:
             if action == 'buy':
-                # Calculate position size from signal (strategy calculates this)
-                account = self.broker.get_account()
-                cash = account.cash
-                # Use position size from signal if provided, otherwise calculate from price
-                position_value = signal.get('size', 1) * signal['price']
-                
+                # Quantity sized by allocate_buys for the whole batch
                 price = signal['price']
-                qty = int(position_value / price)
+                qty = int(signal.get('quantity', 0))
                 
                 if qty > 0:
-                    # Create and submit market order
-                    order = MarketOrder(symbol=ticker, qty=qty, side=OrderSide.BUY)
+                    # Create and submit market order, with its stop attached
+                    stop_price = None
+                    if stop_percent:
+                        stop_price = round(price * (1 - stop_percent), 2 if price >= 1 else 4)
+                        order = OTOOrder(
+                            MarketOrder(symbol=ticker, qty=qty, side=OrderSide.BUY, time_in_force=TimeInForce.GTC),
+                            StopOrder(symbol=ticker, qty=qty, side=OrderSide.SELL, stop_price=stop_price,
+                                      time_in_force=TimeInForce.GTC),
+                        )
+                    else:
+                        order = MarketOrder(symbol=ticker, qty=qty, side=OrderSide.BUY)
+                    order.client_order_id = signal.get('client_order_id')
+                    self.rate_limiter.acquire()
                     result = self.broker.submit_order(order)
                     
+                    self._journal_order(ticker, BUY, qty, price, result)
                     if result.success:
-                        logger.info(f"BUY order executed: {ticker} x{qty} @ ${price:.2f}")
-                        return {
+                        snapshot.record_order(order, price, result.order)
+                        logger.info(f"BUY order executed: {ticker} x{qty} @ ${price:.2f}"
+                                    + (f", stop @ ${stop_price:.2f}" if stop_price else ""))
+                        if stop_price:
+                            self.journal.record(EventType.STOP_SET, datetime.now().timestamp(), ticker,
+                                                side=SELL, size=qty, price=stop_price, percent=stop_percent)
+                        execution = {
                             'ticker': ticker,
                             'action': 'buy',
                             'quantity': qty,
@@ -291,6 +946,9 @@ class LiveRunner:
                             'order_id': result.order_id,
                             'timestamp': datetime.now().isoformat()
                         }
+                        if stop_price:
+                            execution['stop_price'] = stop_price
+                        return execution
                     else:
                         logger.error(f"Failed to submit BUY order: {result.error}")
                         return {
@@ -302,15 +960,25 @@ class LiveRunner:
             
             elif action == 'sell':
                 # Get current position size
-                position = self.broker.get_position(ticker)
+                position = snapshot.position(ticker)
                 if position:
                     qty = position.qty
                     
+                    # Shares held by a working stop cannot be sold
+                    canceled = self._cancel_stops(ticker, snapshot)
+                    
                     # Create and submit market order
                     order = MarketOrder(symbol=ticker, qty=qty, side=OrderSide.SELL)
-                    result = self.broker.submit_order(order)
+                    order.client_order_id = signal.get('client_order_id')
+                    try:
+                        self.rate_limiter.acquire()
+                        result = self.broker.submit_order(order)
+                    except Exception as e:
+                        result = OrderResult(success=False, error=str(e))
                     
+                    self._journal_order(ticker, SELL, qty, signal['price'], result)
                     if result.success:
+                        snapshot.record_order(order, signal['price'], result.order)
                         logger.info(f"SELL order executed: {ticker} x{qty}")
                         return {
                             'ticker': ticker,
@@ -321,12 +989,16 @@ class LiveRunner:
                         }
                     else:
                         logger.error(f"Failed to submit SELL order: {result.error}")
-                        return {
+                        execution = {
                             'ticker': ticker,
                             'action': 'sell',
                             'error': result.error,
                             'timestamp': datetime.now().isoformat()
                         }
+                        # The position is still held: put its stop back
+                        if not self._restore_stops(ticker, canceled, snapshot):
+                            execution['stop_canceled'] = True
+                        return execution
         
         except Exception as e:
             logger.error(f"Error executing signal for {ticker}: {e}")
@@ -339,14 +1011,130 @@ class LiveRunner:
         
         return None
     
-    def run_strategies(self) -> List[Dict[str, Any]]:
+    def submit_exit(self, strategy_class, ticker: str, price: float, timestamp: str,
+                    snapshot: PortfolioSnapshot) -> Optional[Dict[str, Any]]:
+        """Sell a position outside the signal checks (e.g. its stop level was crossed).
+        
+        Args:
+            strategy_class: Strategy class holding the position
+            ticker: Stock ticker
+            price: Price that triggered the exit
+            timestamp: Time of that price (ISO format)
+            snapshot: Portfolio snapshot, updated with the order
+        
+        Returns:
+            Execution result dictionary (None without a position)
+        """
+        signal = {'ticker': ticker, 'action': 'sell', 'price': price, 'timestamp': timestamp}
+        signal['client_order_id'] = self._client_order_id(strategy_class, {**signal, 'action': 'stop'})
+        execution = self._execute_signal(ticker, signal, snapshot)
+        if execution and self.state_store is not None:
+            if 'error' not in execution:
+                self._save_position(strategy_class, ticker, None)
+            elif execution.get('stop_canceled'):
+                state = self.state_store.load(self._state_key(strategy_class, ticker))
+                if state is not None and state.position is not None:
+                    self._save_position(strategy_class, ticker, {**state.position, 'trailing_stop_set': False})
+        return execution
+    
+    def _cancel_stops(self, ticker: str, snapshot: PortfolioSnapshot) -> List[Any]:
+        """Cancel the working stop orders of a position before selling it.
+        
+        Args:
+            ticker: Stock ticker
+            snapshot: Portfolio snapshot of this run, updated with the cancels
+        
+        Returns:
+            The canceled stop orders
+        """
+        canceled = []
+        for order in snapshot.orders_for(ticker):
+            if order.side == OrderSide.SELL and order.order_type in (OrderType.STOP, OrderType.TRAILING_STOP):
+                self.rate_limiter.acquire()
+                if self.broker.cancel_order(order.id):
+                    snapshot.open_orders.remove(order)
+                    canceled.append(order)
+                    logger.info(f"Stop canceled before selling {ticker}: {order.id}")
+        return canceled
+    
+    def _restore_stops(self, ticker: str, canceled: List[Any], snapshot: PortfolioSnapshot) -> bool:
+        """Place stop orders canceled by ``_cancel_stops`` again (GTC).
+        
+        Args:
+            ticker: Stock ticker
+            canceled: Canceled stop orders
+            snapshot: Portfolio snapshot of this run, updated with the new orders
+        
+        Returns:
+            Whether every stop was placed again
+        """
+        restored = True
+        for order in canceled:
+            if order.order_type == OrderType.TRAILING_STOP:
+                request: OrderRequest = TrailingStopOrder(symbol=ticker, qty=order.qty, side=OrderSide.SELL,
+                                            trail_percent=order.trail_percent, trail_price=order.trail_price,
+                                            time_in_force=TimeInForce.GTC)
+            else:
+                request = StopOrder(symbol=ticker, qty=order.qty, side=OrderSide.SELL,
+                                    stop_price=order.stop_price, time_in_force=TimeInForce.GTC)
+            try:
+                self.rate_limiter.acquire()
+                result = self.broker.submit_order(request)
+            except Exception as e:
+                result = OrderResult(success=False, error=str(e))
+            
+            if result.success:
+                # A resting stop: the position is unchanged
+                if result.order is not None:
+                    snapshot.open_orders.append(result.order)
+                logger.info(f"Stop placed again after the failed sell of {ticker}: {result.order_id}")
+                trailing = order.order_type == OrderType.TRAILING_STOP
+                self.journal.record(EventType.STOP_SET, datetime.now().timestamp(), ticker, side=SELL,
+                                    size=order.qty, price=order.stop_price or 0.0,
+                                    percent=order.trail_percent or 0.0,
+                                    detail=DETAIL_TRAILING_STOP if trailing else 0)
+            else:
+                logger.error(f"Could not place the stop of {ticker} again, the position has no stop: "
+                             f"{result.error}")
+                restored = False
+        return restored
+    
+    def _journal_order(self, ticker: str, side: int, qty: float, price: float, result):
+        """Record an order submission (or its rejection) in the journal.
+        
+        Args:
+            ticker: Stock ticker
+            side: BUY or SELL journal side code
+            qty: Order quantity
+            price: Signal price
+            result: OrderResult returned by the broker
+        """
+        if result.success:
+            self.journal.record(EventType.ORDER_SUBMITTED, datetime.now().timestamp(), ticker,
+                                side=side, size=qty, price=price, order_id=result.order_id)
+        else:
+            self.journal.record(EventType.ORDER_CANCELED, datetime.now().timestamp(), ticker,
+                                side=side, size=qty, price=price, detail=CancelReason.REJECTED)
+    
+    def run_strategies(self, deadline: Optional[float] = None,
+                       transport: Optional[ShardTransport] = None) -> List[Dict[str, Any]]:
         """Run strategies.
         
+        Args:
+            deadline: ``time.monotonic()`` time after which no new tickers are
+                      started (None = no limit), see ``deadline_after``
+            transport: Transport fanning the tickers out to workers in
+                       shards (None = evaluate them in this process)
+            
         Returns:
             List of execution results for each strategy
         """
-        # Display portfolio status first
-        self.display_portfolio_status()
+        # A journal per run (the runner may be reused across invocations)
+        self.journal = TradeJournal(date_only=False)
+        
+        # One snapshot for all strategies of this run; display it first
+        snapshot = self.take_snapshot()
+        self.display_portfolio_status(snapshot)
         
         strategies = self.config_loader.get_strategies()
         
@@ -362,7 +1150,7 @@ class LiveRunner:
             logger.info("="*80)
             
             try:
-                results = self.run_strategy(strategy_config)
+                results = self.run_strategy(strategy_config, deadline, snapshot, transport)
                 all_results.append(results)
                 
                 # Print summary
@@ -373,8 +1161,102 @@ class LiveRunner:
                 import traceback
                 traceback.print_exc()
         
+        self.save_journal()
+        
         return all_results
     
+    def save_journal(self):
+        """Export the journal to ``live.journal_path`` (if set and not empty)."""
+        journal_path = self.live_config.get('journal_path')
+        if journal_path and len(self.journal):
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output = Path(journal_path) / f"live_{timestamp}.parquet"
+            self.journal.to_parquet(str(output))
+            logger.info(f"Trade journal saved: {output} ({len(self.journal)} events)")
+    
+    def check_parity(self, strategy_config: Dict[str, Any], window: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Check a strategy's ``compute_signals`` against backtrader.
+        
+        Uses each ticker's daily data over the configured backtest period.
+        
+        Args:
+            strategy_config: Strategy configuration dictionary
+            window: Bars per evaluation (the live lookback)
+            
+        Returns:
+            Ticker -> mismatches, see ``signal_parity``
+        """
+        strategy_class = self.load_strategy_class(strategy_config['module'], strategy_config['class'])
+        params = strategy_config.get('params', {})
+        backtest_config = self.config.get('backtest', {})
+        start_date, end_date = (
+            datetime.strptime(backtest_config[key], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+            for key in ('start_date', 'end_date')
+        )
+        
+        mismatches = {}
+        for ticker in params.get('tickers', []):
+            df = self.data_manager.get_data_for_backtest(ticker, start_date, end_date)
+            mismatches[ticker] = signal_parity(strategy_class, params, df, window)
+            logger.info(f"{ticker}: {len(mismatches[ticker])} mismatches in "
+                        f"{max(0, len(df) - window + 1)} windows of {window} bars")
+            for mismatch in mismatches[ticker]:
+                logger.info(f"  {mismatch['timestamp']}: compute_signals {mismatch['compute_signals']}, "
+                            f"backtrader {mismatch['backtrader']}")
+        return mismatches
+    
+    def track_orders(self, duration: Optional[float] = None):
+        """Record Alpaca's trade updates in the order store (blocks).
+        
+        Args:
+            duration: Seconds to run for (None = until interrupted)
+            
+        Raises:
+            ValueError: If ``live.order_store`` is not set
+        """
+        if self.broker.order_store is None:
+            raise ValueError("Set live.order_store to track orders")
+        source = AlpacaTradeUpdates(self.alpaca_config['api_key'], self.alpaca_config['secret_key'],
+                                    paper=self.alpaca_config.get('paper', True))
+        consumer = TradeUpdateConsumer(self.broker.order_store)
+        logger.info(f"Tracking trade updates into {self.broker.order_store.path}")
+        source.run(consumer, duration)
+        logger.info(f"Recorded {consumer.events} trade updates")
+    
+    def print_order_report(self, days: int = 1):
+        """Print recorded orders and fills from the order store (no API calls).
+        
+        Args:
+            days: Report the orders and fills of the last days
+            
+        Raises:
+            ValueError: If ``live.order_store`` is not set
+        """
+        store = self.broker.order_store
+        if store is None:
+            raise ValueError("Set live.order_store to report orders")
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        orders = store.orders(since)
+        fills = store.fills(since)
+        open_orders = store.open_orders()
+        
+        print("\n" + "="*80)
+        print(f"ORDERS (last {days} day{'s' if days != 1 else ''})")
+        print("="*80)
+        for order in orders.itertuples():
+            detail = (f"ERROR - {order.error}" if isinstance(order.error, str)
+                      else f"filled {order.filled_qty:g}/{order.qty:g}")
+            print(f"  {order.symbol:6s} | {order.side.upper():4s} {order.order_type:13s} | "
+                  f"{order.status:16s} | {detail}")
+        print(f"\nFills: {len(fills)}")
+        for fill in fills.itertuples():
+            print(f"  {fill.timestamp} {fill.symbol:6s} {fill.side.upper():4s} x{fill.qty:g} @ ${fill.price:.2f}")
+        print(f"\nOpen orders: {len(open_orders)}")
+        for order in open_orders:
+            print(f"  {order.symbol:6s} | {order.side.value.upper():4s} {order.order_type.value} | "
+                  f"{order.status.value} | {order.id}")
+        print("="*80 + "\n")
+    
     def _print_results(self, results: Dict[str, Any]):
         """Print execution results.
         
@@ -389,10 +1271,12 @@ class LiveRunner:
         signals = results.get('signals', [])
         executions = results.get('executions', [])
         errors = results.get('errors', [])
+        skipped = results.get('skipped', [])
         
         print(f"\nSignals detected: {len(signals)}")
         for signal in signals:
-            print(f"  - {signal['ticker']}: {signal['action'].upper()} @ ${signal['price']:.2f}")
+            allocation = " (not allocated)" if signal.get('quantity') == 0 else ""
+            print(f"  - {signal['ticker']}: {signal['action'].upper()} @ ${signal['price']:.2f}{allocation}")
         
         print(f"\nOrders executed: {len(executions)}")
         for execution in executions:
@@ -407,6 +1291,9 @@ class LiveRunner:
             for error in errors:
                 print(f"  - {error['ticker']}: {error['error']}")
         
+        if skipped:
+            print(f"\nSkipped (deadline): {', '.join(skipped)}")
+        
         print("="*80 + "\n")
 
 
@@ -417,13 +1304,42 @@ def main():
     parser = argparse.ArgumentParser(description='Execute live trading strategies')
     parser.add_argument('--strategy', type=str, 
                        help='Specific strategy name to run (optional)')
+    parser.add_argument('--check-parity', action='store_true',
+                       help='Compare compute_signals with backtrader over the backtest period '
+                            '(no orders are placed)')
+    parser.add_argument('--window', type=int, default=60,
+                       help='Bars per parity check evaluation (default: 60)')
+    parser.add_argument('--track-orders', type=float, nargs='?', const=0, metavar='SECONDS',
+                       help='Record trade updates in live.order_store (for SECONDS, or until interrupted)')
+    parser.add_argument('--order-report', type=int, nargs='?', const=1, metavar='DAYS',
+                       help='Print the orders and fills recorded in live.order_store (default: last day)')
+    parser.add_argument('--daemon', type=float, nargs='?', const=0, metavar='SECONDS',
+                       help='Run as a long-lived process on streamed bars: strategies are evaluated at '
+                            'the close and stops watched intraday (for SECONDS, or until interrupted)')
     
     args = parser.parse_args()
     
     # Initialize runner
     runner = LiveRunner()
     
-    if args.strategy:
+    # Shard the tickers across workers when live.fanout is set
+    transport = open_transport(runner.live_config)
+    
+    if args.daemon is not None:
+        import asyncio
+        from src.runners.daemon import LiveDaemon
+        daemon = LiveDaemon.from_config(runner)
+        asyncio.run(daemon.run(args.daemon or None))
+    elif args.track_orders is not None:
+        runner.track_orders(args.track_orders or None)
+    elif args.order_report is not None:
+        runner.print_order_report(args.order_report)
+    elif args.check_parity:
+        strategies = runner.config_loader.get_strategies()
+        for strategy_config in strategies:
+            if args.strategy in (None, strategy_config['name']):
+                runner.check_parity(strategy_config, args.window)
+    elif args.strategy:
         # Run specific strategy
         config_loader = get_config_loader()
         strategies = config_loader.get_strategies()
@@ -438,10 +1354,10 @@ def main():
             logger.error(f"Strategy '{args.strategy}' not found in configuration")
             return
         
-        runner.run_strategy(strategy_config)
+        runner.run_strategy(strategy_config, transport=transport)
     else:
         # Run strategies
-        runner.run_strategies()
+        runner.run_strategies(transport=transport)
 
 
 if __name__ == '__main__':
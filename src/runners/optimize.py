@@ -1,17 +1,25 @@
 """Optimization runner for strategy parameter tuning.
 
-This module provides parameter optimization capabilities using backtrader's
-built-in optimization engine. It can test multiple parameter combinations
-in parallel to find optimal strategy parameters.
+This module provides parameter optimization capabilities. Parameter
+combinations are chosen by a search strategy (the full grid, or a budgeted
+random/Sobol/successive halving/TPE search, see ``src.optimization.search``)
+and backtested in parallel by a process pool that reads price data from
+shared memory (see ``src.optimization.parallel``) to find optimal strategy
+parameters. Strategies with array-form signals can instead be evaluated for
+the whole grid at once (``src.optimization.vectorized``), with the best
+candidates re-verified through backtrader. In cross-sectional mode every
+ticker is backtested on its own and parameters are ranked across tickers
+(``src.optimization.cross_section``).
 """
-import backtrader as bt
 import sys
 import importlib
 import logging
+import multiprocessing
+from contextlib import nullcontext
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from typing import List, Dict, Any, Type, Tuple, Optional
-from itertools import product
 
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
@@ -19,6 +27,15 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from src.utils.config_loader import get_config_loader
 from src.data_loaders.data_manager import DataManager
 from src.strategies.base_strategy import BaseStrategy
+from src.analytics import run_monte_carlo, format_monte_carlo
+from src.optimization import (
+    ParallelOptimizer, ParameterSpace, ResultsStore, TPESearch, create_search, resolve_budget,
+    rank_parameters, results_cube, save_cube,
+)
+from src.optimization.cross_section import AGGREGATES, SIGNED_METRICS
+from src.optimization.store import params_key
+from src.optimization.work_queue import WorkQueue, run_worker
+from src.utils.profiling import HotPathProfiler
 
 
 logging.basicConfig(
@@ -29,6 +46,51 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def load_daily_frames(data_manager: DataManager, tickers: List[str], start_date: datetime,
+                      end_date: datetime) -> Dict[str, Any]:
+    """Load daily data for each ticker.
+    
+    Args:
+        data_manager: Data manager reading the local cache
+        tickers: Tickers to load
+        start_date: Start date (UTC)
+        end_date: End date (UTC)
+        
+    Returns:
+        Ticker -> OHLCV DataFrame (tickers without data are skipped)
+    """
+    frames = {}
+    for ticker in tickers:
+        # Get daily data (checks local files, fetches if needed)
+        daily_df = data_manager.get_data_for_backtest(
+            ticker, start_date, end_date, timeframe='daily'
+        )
+        
+        if daily_df.empty:
+            logger.error(f"No daily data available for {ticker}, skipping")
+            continue
+        
+        frames[ticker] = daily_df
+    return frames
+
+
+def load_job_frames(data_paths: Dict[str, Path], job: Dict[str, Any]) -> Dict[str, Any]:
+    """Load a queued job's daily data on this host.
+    
+    Args:
+        data_paths: 'daily' and 'minute' data directories
+        job: Job description with its 'data' (tickers, start and end dates)
+        
+    Returns:
+        Ticker -> OHLCV DataFrame
+    """
+    data_manager = DataManager(daily_path=str(data_paths['daily']), minute_path=str(data_paths['minute']))
+    data = job['data']
+    start_date = datetime.strptime(data['start_date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    end_date = datetime.strptime(data['end_date'], '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    return load_daily_frames(data_manager, data['tickers'], start_date, end_date)
+
+
 class OptimizationRunner:
     """Runs parameter optimization for swing trading strategies."""
     
@@ -41,6 +103,7 @@ class OptimizationRunner:
         self.config_loader = get_config_loader()
         self.config = self.config_loader.load_config()
         self.backtest_config = self.config.get('backtest', {})
+        self.optimize_config = self.config.get('optimize') or {}
         
         # Initialize data manager
         data_paths = self.config_loader.get_data_paths()
@@ -84,13 +147,7 @@ class OptimizationRunner:
         # Get dates from config
         start_str = self.backtest_config.get('start_date')
         end_str = self.backtest_config.get('end_date')
-        
-        if not start_str or not end_str:
-            raise ValueError("start_date and end_date must be set in config.yaml")
-        
-        # Parse dates and make timezone-aware (UTC) for consistency with market data
-        start_date = datetime.strptime(start_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
-        end_date = datetime.strptime(end_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        start_date, end_date = self._date_range()
         
         # Date range loaded from config
         
@@ -100,6 +157,16 @@ class OptimizationRunner:
             strategy_config['class']
         )
         
+        # Distributed mode: combinations go to a work queue served by
+        # ``--worker`` processes on any number of hosts
+        queue_path = self.optimize_config.get('queue_path')
+        
+        # Opt-in hot-path profiling; profiled runs stay in-process so the
+        # timings of every combination land in one profiler (not available
+        # when workers run elsewhere)
+        profiler = HotPathProfiler(enabled=self.backtest_config.get('profile', False) and not queue_path)
+        strategy_class = strategy_class.with_profiler(profiler)
+        
         logger.info(f"Optimizing {strategy_config['name']}")
         
         # Calculate and display total combinations
@@ -111,125 +178,414 @@ class OptimizationRunner:
             logger.info(f"  {param_name}: {values_list}")
             logger.info(f"    ({len(values_list)} values)")
         
-        logger.info(f"\nTotal combinations to test: {total_combinations}")
-        logger.info("="*80)
+        search_name = self.optimize_config.get('search', 'grid')
+        search_options = self.optimize_config.get('search_options') or {}
+        search = create_search(
+            search_name,
+            budget=self.optimize_config.get('budget'),
+            seed=self.optimize_config.get('seed'),
+            **search_options
+        )
         
-        # Initialize cerebro for optimization
-        cerebro = bt.Cerebro()
+        # The search picks explicit combinations from the grid after dropping
+        # invalid and equivalent ones; the strategy uses its default values
+        # for any params not being optimized
+        space = ParameterSpace(
+            param_ranges,
+            constraints=strategy_config.get('optimize_constraints', ()),
+            equivalence=strategy_config.get('optimize_equivalence'),
+        )
         
-        # Enable cheat-on-close mode to simulate live trading at market close
-        # Orders placed during a bar execute at that bar's close price (same bar execution)
-        # This matches live trading where we run the strategy at market close and execute immediately
-        cerebro.broker.set_coc(True)
+        logger.info(f"\nTotal combinations: {total_combinations}")
+        if space.pruned:
+            logger.info(f"Pruned {space.pruned} combinations ({space.invalid} violate constraints, "
+                        f"{space.duplicates} duplicates), {space.size} remain")
+        if search_name != 'grid':
+            budget = resolve_budget(search.budget, space.size)
+            logger.info(f"Search: {search_name}, budget {budget} full-range backtests")
+        logger.info("="*80)
         
-        # Set initial cash and commission
         initial_cash = self.backtest_config.get('initial_cash', 100000.0)
         commission = self.backtest_config.get('commission', 0.001)
         
-        cerebro.broker.setcash(initial_cash)
-        cerebro.broker.setcommission(commission=commission)
-        
-        # Only use parameters specified in OPTIMIZE_PARAMS
-        # Convert to backtrader format: param_name=(val1, val2, val3, ...)
-        bt_params = {}
-        for param_name, param_values in param_ranges.items():
-            bt_params[param_name] = tuple(param_values)
-        
-        # Add optimized strategy - ONLY with parameters from OPTIMIZE_PARAMS
-        # The strategy will use its default values for any params not being optimized
-        # Disable verbose logging during optimization to reduce noise
-        cerebro.optstrategy(strategy_class, verbose_logging=False, **bt_params)
+        # Optional vectorized evaluation for strategies with array-form signals
+        vectorized = self.optimize_config.get('vectorized', False)
+        if vectorized and strategy_class.signal_arrays.__func__ is BaseStrategy.signal_arrays.__func__:
+            logger.warning(f"{strategy_config['name']} has no array-form signals, "
+                           f"evaluating with backtrader")
+            vectorized = False
         
         # Load data for each ticker
         params = strategy_config.get('params', {})
         tickers = params.get('tickers', [])
         
-        for ticker in tickers:
-            # Data loading handled by DataManager
-            
-            # Get daily data (checks local files, fetches if needed)
-            daily_df = self.data_manager.get_data_for_backtest(
-                ticker, start_date, end_date, timeframe='daily'
-            )
-            
-            if daily_df.empty:
-                logger.error(f"No daily data available for {ticker}, skipping")
-                continue
-            
-            # Create and add daily data feed
-            daily_feed = self.data_manager.create_backtrader_feed(daily_df, ticker)
-            cerebro.adddata(daily_feed, name=ticker)
-        
-        # Add all analyzers to collect comprehensive performance metrics
-        cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
-        cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
-        cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
-        cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
-        
-        # Run optimization
+        with profiler.section('feed_loading'):
+            frames = self._load_frames(tickers, start_date, end_date)
+        
+        # Disable verbose logging during optimization to reduce noise and
+        # share each distinct indicator series across combinations
+        fixed_params = {'verbose_logging': False, 'indicator_cache': True}
+        
+        # Optional results store: records are written as chunks finish and,
+        # when resuming, combinations already stored are not re-run. A work
+        # queue is also a results store, filled by distributed workers
+        results_path = self.optimize_config.get('results_path')
+        queue = WorkQueue(queue_path, lease_seconds=self.optimize_config.get('lease_seconds', 300.0)) \
+            if queue_path else None
+        store: Optional[ResultsStore] = queue
+        if store is None and results_path:
+            store = ResultsStore(results_path)
+        
+        # Run optimization in a process pool over shared-memory price data
+        # (in-process when profiling so all timings land in one profiler);
+        # the store is closed however the run ends
         logger.info("Running optimization...")
-        opt_results = cerebro.run()
-        
-        # Extract results with all metrics
-        results = []
-        
-        for run in opt_results:
-            strat = run[0]
+        with store if store is not None else nullcontext(), ParallelOptimizer(
+            strategy_class, frames, initial_cash, commission,
+            fixed_params=fixed_params,
+            workers=self.optimize_config.get('workers'),
+            batch_size=self.optimize_config.get('batch_size'),
+            pruning=self.optimize_config.get('prune'),
+            profiler=profiler,
+        ) as optimizer:
+            resume = self.optimize_config.get('resume', True)
+            description = {'tickers': list(frames), 'start_date': start_str, 'end_date': end_str}
             
-            # Get parameter values
-            params = {}
-            for param_name in param_ranges.keys():
-                params[param_name] = getattr(strat.params, param_name)
+            # Searches may backtest on the most recent part of the date range
+            # (successive halving) before promoting candidates to all of it
+            def backtest(combos: List[Dict[str, Any]], fraction: float) -> List[Dict[str, Any]]:
+                window = optimizer.trailing_window(fraction)
+                if store is None:
+                    return optimizer.evaluate(combos, window=window)
+                
+                fingerprint = optimizer.fingerprint(window)
+                store.register_run(fingerprint, strategy_config['name'], window, description)
+                if queue is not None:
+                    return self._evaluate_on_queue(queue, optimizer, fingerprint, combos, window, description)
+                
+                done = store.completed(fingerprint, combos) if resume else {}
+                if done:
+                    logger.info(f"Resuming: {len(done)} of {len(combos)} combinations already in {results_path}")
+                    optimizer.observe(list(done.values()), window)
+                
+                todo = [combo for combo in combos if params_key(combo) not in done]
+                records = optimizer.evaluate(
+                    todo, window=window,
+                    on_records=lambda chunk_records: store.add(fingerprint, chunk_records)
+                )
+                return list(done.values()) + records
             
+            # Vectorized results are approximate and are not stored; only the
+            # re-verified candidates below go through backtrader
+            # With a checkpoint, a full-range grid sweep resumes the simulation
+            # of every combination and only simulates bars added since
+            checkpoint = self.optimize_config.get('checkpoint_path') if search_name == 'grid' else None
             
-            # Get all analyzer results
-            returns_analysis = strat.analyzers.returns.get_analysis()
-            sharpe_analysis = strat.analyzers.sharpe.get_analysis()
-            drawdown_analysis = strat.analyzers.drawdown.get_analysis()
-            trades_analysis = strat.analyzers.trades.get_analysis()
+            def evaluate(combos: List[Dict[str, Any]], fraction: float) -> List[Dict[str, Any]]:
+                if vectorized:
+                    window = optimizer.trailing_window(fraction)
+                    records = optimizer.evaluate_vectorized(
+                        combos, window=window, checkpoint=checkpoint if window is None else None
+                    )
+                    if records is not None:
+                        return records
+                return backtest(combos, fraction)
             
-            # Extract metrics
-            total_return = returns_analysis.get('rtot', 0) or 0
-            sharpe_ratio = sharpe_analysis.get('sharperatio', None)
-            max_drawdown = drawdown_analysis.get('max', {}).get('drawdown', None)
+            # TPE proposes one combination per worker per round by default
+            if isinstance(search, TPESearch) and 'batch_size' not in search_options:
+                search.batch_size = optimizer.workers
             
-            # Calculate final portfolio value from return
-            final_value = initial_cash * (1 + total_return)
+            with profiler.section('run'):
+                records = search.search(space, evaluate, lambda record: record['total_return'])
             
-            # Trade statistics
-            total_trades = trades_analysis.get('total', {}).get('total', 0)
-            won_trades = trades_analysis.get('won', {}).get('total', 0)
-            win_rate = (won_trades / total_trades * 100) if total_trades > 0 else 0
+            # Store comprehensive results (sorted by return, the default metric,
+            # with re-verified vectorized candidates first); runs stopped early
+            # only have partial metrics and are kept apart
+            results = [record for record in records if not record['pruned']]
+            stopped = [record for record in records if record['pruned']]
+            results.sort(key=lambda x: x['total_return'], reverse=True)
             
-            # Sort by return (default metric)
-            sort_value = total_return
+            verify_top = self.optimize_config.get('verify_top', 10)
+            if vectorized and verify_top and results:
+                with profiler.section('verify'):
+                    results, verified_stopped = self._verify_candidates(results, verify_top, backtest)
+                stopped.extend(verified_stopped)
             
-            # Store comprehensive results
-            result_data = {
-                'params': params,
-                'sort_value': sort_value,
-                'final_value': final_value,
-                'total_return': total_return,
-                'sharpe_ratio': sharpe_ratio,
-                'max_drawdown': max_drawdown,
-                'total_trades': total_trades,
-                'won_trades': won_trades,
-                'win_rate': win_rate
-            }
+            for result in results:
+                result['sort_value'] = result['total_return']
             
-            results.append(result_data)
-        
-        # Sort by metric (descending - higher is better)
-        results.sort(key=lambda x: x['sort_value'], reverse=True)
+            if stopped:
+                over_drawdown = sum(record['pruned'] == 'drawdown' for record in stopped)
+                logger.info(f"Stopped early: {over_drawdown} over the drawdown limit, "
+                            f"{len(stopped) - over_drawdown} unable to reach the top results")
+            
+            # Optional Monte Carlo confidence intervals for the top candidates;
+            # their trade/return series are recomputed instead of shipped for every run
+            monte_carlo = self.backtest_config.get('monte_carlo') or {}
+            if monte_carlo.get('enabled', False):
+                with profiler.section('monte_carlo'):
+                    top = results[:monte_carlo.get('top_n', 3)]
+                    series = {
+                        tuple(sorted(detail['params'].items())): detail
+                        for detail in optimizer.evaluate([result['params'] for result in top],
+                                                         include_series=True, prune=False)
+                    }
+                    for result in top:
+                        detail = series[tuple(sorted(result['params'].items()))]
+                        result['monte_carlo'] = run_monte_carlo(
+                            detail['trade_pnl'], detail['bar_returns'], initial_cash, monte_carlo
+                        )
         
         # Log completion summary
-        logger.info(f"\nOptimization complete: Tested {len(results)} parameter combinations")
+        logger.info(f"\nOptimization complete: Tested {len(results) + len(stopped)} parameter combinations")
         
         # Print top results
         self._print_optimization_results(results, metric, initial_cash, top_n=3)
         
+        if profiler.enabled:
+            self._report_profile(profiler, strategy_config['name'])
+        
         return results
     
+    def _verify_candidates(self, results: List[Dict[str, Any]], count: int,
+                           backtest) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Re-run the best vectorized results through backtrader.
+        
+        Args:
+            results: Vectorized result records, best first
+            count: Number of candidates to re-run
+            backtest: Evaluation function (combos, date fraction) -> records
+            
+        Returns:
+            (results with the verified candidates first, verified runs
+            stopped early)
+        """
+        candidates = results[:count]
+        estimates = {params_key(result['params']): result for result in candidates}
+        verified = backtest([result['params'] for result in candidates], 1.0)
+        
+        deviation = max(abs(record['total_return'] - estimates[params_key(record['params'])]['total_return'])
+                        for record in verified)
+        logger.info(f"Verified the top {len(candidates)} vectorized results with backtrader "
+                    f"(largest total return difference {deviation:.2%})")
+        
+        kept = sorted((record for record in verified if not record['pruned']),
+                      key=lambda x: x['total_return'], reverse=True)
+        return kept + results[count:], [record for record in verified if record['pruned']]
+    
+    def optimize_cross_section(self, strategy_config: Dict[str, Any],
+                               param_ranges: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """Backtest every (ticker, combination) cell on its own and rank parameters.
+        
+        The cells run as independent tasks on the process pool. The
+        ticker x parameter results cube is saved to
+        ``optimize.cross_section.path`` (Parquet) and each combination is
+        ranked by an aggregate of its results across tickers.
+        
+        Args:
+            strategy_config: Strategy configuration dictionary
+            param_ranges: Dictionary mapping parameter names to lists of values to test
+            
+        Returns:
+            One dictionary per combination with 'params' and the
+            ``rank_parameters`` aggregates, best first
+        """
+        settings = self.optimize_config.get('cross_section') or {}
+        metric = settings.get('metric', 'total_return')
+        rank_by = settings.get('rank_by', 'median')
+        if rank_by == 'hit_rate' and metric not in SIGNED_METRICS:
+            raise ValueError(f"rank_by hit_rate needs a signed metric, one of {SIGNED_METRICS}")
+        start_date, end_date = self._date_range()
+        strategy_class = self.load_strategy_class(strategy_config['module'], strategy_config['class'])
+        
+        space = ParameterSpace(
+            param_ranges,
+            constraints=strategy_config.get('optimize_constraints', ()),
+            equivalence=strategy_config.get('optimize_equivalence'),
+        )
+        combos = [space.combo(indices) for indices in space.grid()]
+        
+        tickers = settings.get('tickers') or strategy_config.get('params', {}).get('tickers', [])
+        frames = self._load_frames(tickers, start_date, end_date)
+        if not frames:
+            raise ValueError("No data available for the cross-sectional universe")
+        
+        logger.info(f"Cross-sectional optimization of {strategy_config['name']}: "
+                    f"{len(combos)} combinations x {len(frames)} tickers")
+        
+        # Runs are not stopped early: partial metrics would skew the
+        # aggregates across tickers
+        with ParallelOptimizer(
+            strategy_class, frames,
+            self.backtest_config.get('initial_cash', 100000.0),
+            self.backtest_config.get('commission', 0.001),
+            fixed_params={'verbose_logging': False, 'indicator_cache': True},
+            workers=self.optimize_config.get('workers'),
+            batch_size=self.optimize_config.get('batch_size'),
+        ) as optimizer:
+            records = optimizer.evaluate(combos, prune=False, tickers=optimizer.tickers)
+        
+        cube = results_cube(records)
+        path = settings.get('path')
+        if path:
+            save_cube(cube, path)
+            logger.info(f"Results cube saved: {path}")
+        
+        ranking = rank_parameters(cube, metric, by=rank_by, ascending=metric == 'max_drawdown')
+        
+        print("\n" + "="*80)
+        print(f"CROSS-SECTIONAL RESULTS ({metric} across {len(frames)} tickers, "
+              f"ranked by {rank_by})")
+        print("="*80)
+        print(ranking.head(settings.get('top', 10)).to_string(index=False))
+        
+        names = [name for name in ranking.columns if name not in AGGREGATES]
+        return [
+            {'params': {name: row[name] for name in names}, **{name: row[name] for name in AGGREGATES}}
+            for row in ranking.to_dict('records')
+        ]
+    
+    def _date_range(self) -> Tuple[datetime, datetime]:
+        """Backtest start and end dates from config (UTC)."""
+        start_str = self.backtest_config.get('start_date')
+        end_str = self.backtest_config.get('end_date')
+        
+        if not start_str or not end_str:
+            raise ValueError("start_date and end_date must be set in config.yaml")
+        
+        # Parse dates and make timezone-aware (UTC) for consistency with market data
+        start_date = datetime.strptime(start_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        end_date = datetime.strptime(end_str, '%Y-%m-%d').replace(tzinfo=timezone.utc)
+        return start_date, end_date
+    
+    def _load_frames(self, tickers: List[str], start_date: datetime,
+                     end_date: datetime) -> Dict[str, Any]:
+        """Load daily data for each ticker (see ``load_daily_frames``)."""
+        return load_daily_frames(self.data_manager, tickers, start_date, end_date)
+    
+    def _evaluate_on_queue(self, queue: WorkQueue, optimizer: ParallelOptimizer, fingerprint: str,
+                           combos: List[Dict[str, Any]], window: Optional[Tuple[float, float]],
+                           description: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Queue combinations for distributed workers and wait for their results.
+        
+        Args:
+            queue: Work queue
+            optimizer: Optimizer holding the data and settings of the run
+            fingerprint: Run fingerprint (the job id)
+            combos: Parameter combinations
+            window: Backtest date window (None = full range)
+            description: Tickers and dates workers load on their host
+            
+        Returns:
+            Result records of the combinations
+        """
+        strategy_class = optimizer.strategy_class
+        queue.submit(fingerprint, {
+            'strategy': [strategy_class.__module__, strategy_class.__qualname__],
+            'settings': optimizer.settings,
+            'window': window,
+            'data': description,
+            'pruning': self.optimize_config.get('prune'),
+        })
+        
+        queued = queue.enqueue(fingerprint, combos, self.optimize_config.get('batch_size') or 16)
+        logger.info(f"Queued {queued} of {len(combos)} combinations in {queue.path}, waiting for workers")
+        return queue.wait(fingerprint, combos, poll_interval=self.optimize_config.get('poll_interval', 2.0))
+    
+    def run_worker(self, processes: int = 1, idle_timeout: Optional[float] = None) -> int:
+        """Serve the work queue: lease batches, backtest them and store results.
+        
+        Price data is loaded on this host for each job; jobs whose data does
+        not match the coordinator's are left to other workers.
+        
+        Args:
+            processes: Worker processes to run on this host
+            idle_timeout: Stop after this many seconds without work (None = forever)
+            
+        Returns:
+            Number of batches completed by this process
+        """
+        queue_path = self.optimize_config.get('queue_path')
+        if not queue_path:
+            raise ValueError("optimize.queue_path must be set to run a worker")
+        
+        # A module-level loader, so worker processes can be started with any
+        # multiprocessing start method (spawn pickles the target's arguments)
+        load_frames = partial(load_job_frames, self.config_loader.get_data_paths())
+        
+        kwargs = {
+            'lease_seconds': self.optimize_config.get('lease_seconds', 300.0),
+            'poll_interval': self.optimize_config.get('poll_interval', 2.0),
+            'idle_timeout': idle_timeout,
+        }
+        
+        # Extra processes load data with this runner's data paths
+        children = [
+            multiprocessing.Process(target=run_worker, args=(queue_path, load_frames), kwargs=kwargs)
+            for _ in range(processes - 1)
+        ]
+        for child in children:
+            child.start()
+        
+        logger.info(f"Worker started on {queue_path} ({processes} processes)")
+        completed = run_worker(queue_path, load_frames, **kwargs)
+        
+        for child in children:
+            child.join()
+        logger.info(f"Worker finished: {completed} batches completed")
+        return completed
+    
+    def query(self, top: Optional[int] = None, metric: str = 'total_return',
+              heatmap: Optional[Tuple[str, str]] = None, output: Optional[str] = None):
+        """Print or export stored results of the latest optimization run.
+        
+        Args:
+            top: Number of best results to print
+            metric: Metric to rank by or to map
+            heatmap: (x, y) parameter names for a heatmap of the metric
+            output: CSV path for the heatmap (None = print it)
+        """
+        results_path = self.optimize_config.get('results_path') or self.optimize_config.get('queue_path')
+        if not results_path or not Path(results_path).exists():
+            raise ValueError("No results store: set optimize.results_path and run an optimization first")
+        
+        with ResultsStore(results_path) as store:
+            fingerprint = store.latest_fingerprint(self.config_loader.get_backtest_strategy())
+            if fingerprint is None:
+                raise ValueError(f"No stored optimization runs in {results_path}")
+            
+            if top:
+                print(f"\nTop {top} by {metric}:")
+                for i, record in enumerate(store.top(top, metric, fingerprint), 1):
+                    value = record[metric]
+                    shown = f"{value:.4f}" if value is not None else "N/A"
+                    print(f"  #{i} {metric}={shown}  {record['params']}")
+            
+            if heatmap:
+                table = store.heatmap(heatmap[0], heatmap[1], metric, fingerprint)
+                if output:
+                    Path(output).parent.mkdir(parents=True, exist_ok=True)
+                    table.to_csv(output)
+                    logger.info(f"Heatmap saved: {output}")
+                else:
+                    print(f"\n{metric} ({heatmap[1]} x {heatmap[0]}):")
+                    print(table.to_string())
+    
+    def _report_profile(self, profiler: HotPathProfiler, name: str):
+        """Print the profile report and save speedscope/pstats files.
+        
+        Args:
+            profiler: Profiler used for the run
+            name: Strategy name used in the output file names
+        """
+        print(profiler.report())
+        
+        output_dir = self.backtest_config.get('profile_path', 'profiles')
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        paths = profiler.save(output_dir, f"{name}_optimize_{timestamp}")
+        if paths:
+            logger.info(f"Profile saved: {paths['speedscope']} (speedscope), {paths['pstats']} (pstats)")
+    
     def _print_optimization_results(self, results: List[Dict[str, Any]], 
                                    metric: str, initial_cash: float, top_n: int = 3):
         """Print optimization results with comprehensive metrics.
@@ -275,11 +631,20 @@ class OptimizationRunner:
             else:
                 print(f"  Sharpe Ratio:           N/A")
             
+            if result.get('sortino_ratio') is not None:
+                print(f"  Sortino Ratio:          {result['sortino_ratio']:.3f}")
+            
             if drawdown is not None:
                 print(f"  Max Drawdown:           {drawdown:.2f}%")
             else:
                 print(f"  Max Drawdown:           N/A")
             
+            if result.get('calmar_ratio') is not None:
+                print(f"  Calmar Ratio:           {result['calmar_ratio']:.3f}")
+            
+            if result.get('exposure') is not None:
+                print(f"  Exposure:               {result['exposure'] * 100:.1f}%")
+            
             print(f"\nTrade Statistics:")
             print(f"  Total Trades:           {trades}")
             if trades > 0:
@@ -287,6 +652,10 @@ class OptimizationRunner:
                 print(f"  Losing Trades:          {trades - won} ({100 - win_rate:.1f}%)")
             else:
                 print(f"  No trades executed")
+            
+            if result.get('monte_carlo'):
+                print()
+                print(format_monte_carlo(result['monte_carlo']))
         
         print("\n" + "="*80 + "\n")
 
@@ -324,6 +693,9 @@ class OptimizationRunner:
         logger.info(f"Optimization: {strategy_config['name']}")
         logger.info("="*80)
         
+        if (self.optimize_config.get('cross_section') or {}).get('enabled', False):
+            return self.optimize_cross_section(strategy_config, param_ranges)
+        
         results = self.optimize_strategy(strategy_config, param_ranges, 'return')
         
         return results
@@ -333,12 +705,37 @@ def main():
     """Main entry point for optimization.
     
     All configuration is read from config/config.yaml.
-    Optimizes by return and displays top 3 results.
+    Optimizes by return and displays top 3 results. With --top or --heatmap,
+    results stored in optimize.results_path are queried instead (no backtests).
     """
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Optimize strategy parameters or query stored results')
+    parser.add_argument('--top', type=int,
+                       help='Show the N best stored results of the latest run')
+    parser.add_argument('--metric', type=str, default='total_return',
+                       help='Metric for --top and --heatmap (default: total_return)')
+    parser.add_argument('--heatmap', nargs=2, metavar=('X', 'Y'),
+                       help='Export the metric over two parameters as CSV')
+    parser.add_argument('--output', type=str,
+                       help='CSV path for --heatmap (default: print)')
+    parser.add_argument('--worker', action='store_true',
+                       help='Serve the work queue in optimize.queue_path instead of optimizing')
+    parser.add_argument('--processes', type=int, default=1,
+                       help='Worker processes on this host (with --worker)')
+    parser.add_argument('--idle-timeout', type=float,
+                       help='Stop the worker after this many idle seconds (default: run forever)')
+    
+    args = parser.parse_args()
     runner = OptimizationRunner()
     
     try:
-        runner.run()
+        if args.worker:
+            runner.run_worker(processes=args.processes, idle_timeout=args.idle_timeout)
+        elif args.top or args.heatmap:
+            runner.query(top=args.top, metric=args.metric, heatmap=args.heatmap, output=args.output)
+        else:
+            runner.run()
     except Exception as e:
         logger.error(f"Error running optimization: {e}")
         import traceback
@@ -1,5 +1,6 @@
 """Strategies package."""
+from .allocation import BatchAllocator
 from .base_strategy import BaseStrategy
 from .example_sma import SMAStrategy
 
-__all__ = ['BaseStrategy', 'SMAStrategy']
+__all__ = ['BaseStrategy', 'BatchAllocator', 'SMAStrategy']
@@ -0,0 +1,86 @@
+"""Portfolio-level sizing of buy signals.
+
+``BatchAllocator`` turns the buy candidates of one decision point (a live
+run, or a bar in a backtest) into share quantities in one pass: candidates
+are ranked by score, each is given ``position_percent`` of the cash left
+after the higher-ranked ones that were funded, and only as many are funded
+as ``max_positions`` leaves slots for. With one candidate this is the
+backtest's ``int(cash * position_percent / price)``, so the live runner and
+the strategies size positions the same way. A ``position_percent`` above 1
+sizes on margin, as in the backtest: the top candidate gets the leveraged
+budget and nothing is left for the others.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+class BatchAllocator:
+    """Sizes a batch of buy candidates against portfolio limits.
+
+    Attributes:
+        max_positions: Maximum concurrent positions (None = no limit)
+        position_percent: Fraction of the remaining cash given to each
+                          position, in rank order (above 1 = margin)
+    """
+
+    def __init__(self, max_positions: Optional[int] = None, position_percent: float = 1.0):
+        """Initialize allocator.
+
+        Args:
+            max_positions: Maximum concurrent positions (None = no limit)
+            position_percent: Fraction of the remaining cash per position
+                              (above 1 = margin)
+        """
+        if position_percent <= 0:
+            raise ValueError(f"position_percent must be positive, got {position_percent}")
+        self.max_positions = max_positions
+        self.position_percent = position_percent
+
+    def allocate(self, prices: Sequence[float], cash: float, buying_power: Optional[float] = None,
+                 open_positions: int = 0, scores: Optional[Sequence[float]] = None) -> np.ndarray:
+        """Allocate shares to buy candidates.
+
+        In rank order, each candidate is budgeted ``position_percent`` of
+        the cash not yet spent on the candidates funded before it, so (up to
+        a ``position_percent`` of 1) the budgets never add up to more than
+        the cash. A candidate whose
+        budget buys no share (e.g. one priced above it) spends nothing and
+        takes no slot.
+
+        Args:
+            prices: Estimated price of each candidate
+            cash: Cash available to the batch
+            buying_power: Buying power available (None = cash only); the
+                          smaller of the two is spent
+            open_positions: Positions (and pending entries) already held
+            scores: Ranking score of each candidate, higher first (None =
+                    the given order); ties keep the given order
+
+        Returns:
+            Shares to buy per candidate (int64, 0 = not allocated)
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        count = len(prices)
+        shares = np.zeros(count, dtype=np.int64)
+        if count == 0:
+            return shares
+        scores = np.zeros(count) if scores is None else np.asarray(scores, dtype=np.float64)
+
+        # Rank by score (descending), ties by position in the batch
+        ranked = np.lexsort((np.arange(count), -scores))
+
+        remaining = max(0.0, cash if buying_power is None else min(cash, buying_power))
+        slots = count if self.max_positions is None else max(0, self.max_positions - open_positions)
+        for i in ranked:
+            if slots == 0:
+                break
+            price = prices[i]
+            if price <= 0:
+                continue
+            qty = int(remaining * self.position_percent / price)
+            if qty > 0:
+                shares[i] = qty
+                remaining -= qty * price
+                slots -= 1
+        return shares
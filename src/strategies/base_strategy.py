@@ -4,8 +4,16 @@ This module provides the base class that all trading strategies must inherit fro
 The key design principle is that strategy logic is defined once and used in both backtesting
 and live trading, ensuring consistency across research and production.
 """
+import sys
+from datetime import datetime, time, timezone
+from typing import Dict, Any, Optional, Tuple
+
 import backtrader as bt
-from typing import Dict, Any, Optional
+
+from ..utils.indicator_cache import get_indicator_cache
+from ..utils.journal import (
+    BUY, SELL, DETAIL_TRAILING_STOP, CancelReason, EventType, TradeJournal, bt_num_to_epoch
+)
 
 
 class BaseStrategy(bt.Strategy):
@@ -23,14 +31,21 @@ class BaseStrategy(bt.Strategy):
     
     Attributes:
         params: Backtrader parameters tuple defining strategy parameters
+        long_only: Whether the strategy only ever holds long positions (enables
+                   the optimizer's top-N pruning bound); subclasses that
+                   sell short must set it to False
     """
     
+    long_only = True
+    
     # Default parameters - subclasses should override
     params = (
         ('tickers', []),  # List of tickers to trade
         ('position_percent', 1.0),  # Percentage of portfolio to allocate per position
         ('trailing_stop_percent', 0.01),  # Trailing stop percentage (1% as 0.01)
         ('verbose_logging', True),  # Enable/disable detailed logging
+        ('journal_capacity', 10000),  # Events kept in the trade journal ring buffer
+        ('indicator_cache', False),  # Share precomputed indicators across optimization runs
     )
     
     def __init__(self):
@@ -45,6 +60,116 @@ class BaseStrategy(bt.Strategy):
         self.trailing_stop_order_ids = set()  # Track IDs of trailing stop orders
         self.order_types = {}  # Map order ID -> order type for logging
         
+        # Trade events are journaled as compact records; with verbose logging
+        # they are rendered and printed in batches instead of per event
+        self._verbose = getattr(self.params, 'verbose_logging', True)
+        self.journal = TradeJournal(
+            capacity=self.params.journal_capacity,  # type: ignore[attr-defined]
+            echo=sys.stdout if self._verbose else None,
+        )
+        
+    @classmethod
+    def with_profiler(cls, profiler):
+        """Return this strategy class with its hot paths timed by a profiler.
+        
+        The returned subclass times ``next``, ``notify_order``, ``notify_trade``,
+        ``log``, the per-bar step, indicator precomputation and analyzers. A
+        disabled profiler returns the class unchanged, so there is no overhead
+        unless profiling is requested.
+        
+        Args:
+            profiler: HotPathProfiler instance
+            
+        Returns:
+            Strategy class to pass to cerebro
+        """
+        return profiler.instrument_strategy(cls)
+    
+    def indicator(self, indicator_class, data, **params):
+        """Create an indicator, shared across runs when the cache is enabled.
+        
+        With the ``indicator_cache`` param set (as the optimizer does), each
+        distinct (data, indicator, params) series is computed once per process
+        and reused by every parameter combination. Otherwise, or for indicators
+        without a vectorized implementation, this simply instantiates
+        ``indicator_class``.
+        
+        Args:
+            indicator_class: Backtrader indicator class
+            data: Data feed or line the indicator is applied to
+            **params: Indicator parameters
+            
+        Returns:
+            Indicator instance
+        """
+        if self.params.indicator_cache:  # type: ignore[attr-defined]
+            return get_indicator_cache().indicator(indicator_class, data, **params)
+        return indicator_class(data, **params)
+    
+    @classmethod
+    def signal_arrays(cls, prices, params) -> Optional[Tuple[Any, Any]]:
+        """Array-form entry/exit signals for vectorized grid evaluation.
+        
+        Strategies that trade like ``SMAStrategy`` (long-only in the first
+        data feed, sized by ``position_percent``, exits on a signal or a stop
+        ``trailing_stop_percent`` below entry) can implement this to be
+        evaluated by ``src.optimization.vectorized`` for thousands of
+        combinations at once. The default returns None (not supported).
+        
+        Args:
+            prices: First data feed as a (6, bars) array in ``frame_to_arrays``
+                    layout (datetime, open, high, low, close, volume)
+            params: Parameter name -> array with one value per combination
+        
+        Returns:
+            (entries, exits) boolean arrays of shape (combinations, bars), True
+            on the bars where ``next`` would buy when flat or sell when in a
+            position, or None
+        """
+        return None
+    
+    @classmethod
+    def compute_signals(cls, prices, params) -> Optional[Tuple[bool, bool]]:
+        """Current signals computed directly from price arrays (live fast path).
+        
+        Live trading only needs ``buy_signal()`` and ``sell_signal()`` as of
+        the latest bar. Strategies that can compute them as a pure function
+        of the bars implement this, and the live runner then skips building
+        and running a cerebro per ticker. Implementations must agree with a
+        backtrader run over the same bars; ``src.runners.live.signal_parity``
+        checks this over historical data. The default returns None (the
+        runner falls back to backtrader).
+        
+        Args:
+            prices: Bars in ``frame_to_arrays`` layout (datetime, open, high,
+                    low, close, volume), oldest first
+            params: Strategy parameters (defaults merged with the configured
+                    values)
+        
+        Returns:
+            (buy_signal, sell_signal) at the last bar, or None
+        """
+        return None
+    
+    @classmethod
+    def signal_score(cls, prices, params) -> float:
+        """Strength of a buy signal at the last bar, for ranking candidates.
+        
+        When a live run has more buy signals than ``live.max_positions`` or
+        cash allow, ``BatchAllocator`` funds the highest scores first. The
+        default scores every signal alike (candidates keep the configured
+        ticker order).
+        
+        Args:
+            prices: Bars in ``frame_to_arrays`` layout, oldest first
+            params: Strategy parameters (defaults merged with the configured
+                    values)
+        
+        Returns:
+            Score, higher first
+        """
+        return 0.0
+    
     def next(self):
         """Process the next bar and generate trading signals.
         
@@ -77,31 +202,15 @@ class BaseStrategy(bt.Strategy):
             # Check if this was a trailing stop order first
             is_trailing_stop = order.ref in self.trailing_stop_order_ids
             
-            if order.isbuy():
-                cash_before = self.broker.getcash() + order.executed.value + order.executed.comm
-                cash_after = self.broker.getcash()
-                if is_trailing_stop:
-                    self.log(f'TRAILING STOP HIT (BUY) - Price: ${order.executed.price:,.2f}, '
-                            f'Shares: {order.executed.size}, Cost: ${order.executed.value:,.2f}, '
-                            f'Comm: ${order.executed.comm:.2f}, Cash Before: ${cash_before:,.2f}, Cash After: ${cash_after:,.2f}')
-                else:
-                    self.log(f'BUY EXECUTED - Price: ${order.executed.price:,.2f}, '
-                            f'Shares: {order.executed.size}, Cost: ${order.executed.value:,.2f}, '
-                            f'Comm: ${order.executed.comm:.2f}, Cash Before: ${cash_before:,.2f}, Cash After: ${cash_after:,.2f}')
-                self.entry_price = order.executed.price
-                
-            elif order.issell():
-                cash_before = self.broker.getcash() - order.executed.value + order.executed.comm
-                cash_after = self.broker.getcash()
-                if is_trailing_stop:
-                    self.log(f'TRAILING STOP HIT (SELL) - Price: ${order.executed.price:,.2f}, '
-                            f'Shares: {order.executed.size}, Proceeds: ${order.executed.value:,.2f}, '
-                            f'Comm: ${order.executed.comm:.2f}, Cash Before: ${cash_before:,.2f}, Cash After: ${cash_after:,.2f}')
-                else:
-                    self.log(f'SELL EXECUTED - Price: ${order.executed.price:,.2f}, '
-                            f'Shares: {order.executed.size}, Proceeds: ${order.executed.value:,.2f}, '
-                            f'Comm: ${order.executed.comm:.2f}, Cash Before: ${cash_before:,.2f}, Cash After: ${cash_after:,.2f}')
-                self.entry_price = None
+            self._record(
+                EventType.ORDER_FILLED, order.data._name,
+                side=BUY if order.isbuy() else SELL,
+                size=order.executed.size, price=order.executed.price,
+                value=order.executed.value, comm=order.executed.comm,
+                cash=self.broker.getcash(),
+                detail=DETAIL_TRAILING_STOP if is_trailing_stop else 0,
+            )
+            self.entry_price = order.executed.price if order.isbuy() else None
             
             # Clean up order tracking
             if is_trailing_stop:
@@ -111,21 +220,19 @@ class BaseStrategy(bt.Strategy):
         elif order.status in [order.Canceled, order.Margin, order.Rejected]:
             # Determine the status type
             if order.status == order.Canceled:
-                status_text = "CANCELED"
+                reason = CancelReason.CANCELED
             elif order.status == order.Margin:
-                status_text = "MARGIN"
+                reason = CancelReason.MARGIN
             else:
-                status_text = "REJECTED"
+                reason = CancelReason.REJECTED
             
-            # Get order details
-            order_type = "BUY" if order.isbuy() else "SELL"
-            current_price = self.datas[0].close[0]
-            available_cash = self.broker.getcash()
-            position_value = self.broker.getvalue() - available_cash
-            
-            self.log(f'ORDER {status_text} - Type: {order_type}, Size: {order.created.size}, '
-                    f'Current Price: ${current_price:,.2f}, Available Cash: ${available_cash:,.2f}, '
-                    f'Position Value: ${position_value:,.2f}, Portfolio Value: ${self.broker.getvalue():,.2f}')
+            self._record(
+                EventType.ORDER_CANCELED, order.data._name,
+                side=BUY if order.isbuy() else SELL,
+                size=order.created.size, price=self.datas[0].close[0],
+                value=self.broker.getvalue(), cash=self.broker.getcash(),
+                detail=reason,
+            )
             
             # Clean up tracking for canceled/rejected orders
             self.trailing_stop_order_ids.discard(order.ref)
@@ -143,20 +250,38 @@ class BaseStrategy(bt.Strategy):
         if not trade.isclosed:
             return
         
-        self.log(f'TRADE PROFIT - Gross: ${trade.pnl:+,.2f}, Net: ${trade.pnlcomm:+,.2f}')
+        self._record(EventType.TRADE_CLOSED, trade.data._name, pnl=trade.pnl, pnlcomm=trade.pnlcomm)
+    
+    def stop(self):
+        """Write any journal events not yet echoed (verbose logging)."""
+        self.journal.flush()
+    
+    def _record(self, event, symbol, **fields):
+        """Record a journal event stamped with the current bar datetime."""
+        self.journal.record(event, bt_num_to_epoch(self.datas[0].datetime[0]), symbol, **fields)
     
-    def log(self, txt, dt=None):
+    def log(self, txt, dt=None, args=()):
         """Logging function.
         
+        The message is stored in the journal and only formatted when the journal
+        is rendered, so pass values as ``args`` instead of building f-strings:
+        ``self.log('Fast SMA: ${:,.2f}', args=(self.fast_sma[0],))``.
+        
         Args:
-            txt: Text to log
+            txt: Text to log, or a ``str.format`` template for ``args``
             dt: Datetime for log entry (uses current bar datetime if None)
+            args: Values substituted into ``txt`` on render
         """
         # Only log if verbose_logging is enabled
-        if not getattr(self.params, 'verbose_logging', True):
+        if not self._verbose:
             return
-        dt = dt or self.datas[0].datetime.date(0)
-        print(f'{dt.isoformat()} {txt}', flush=True)
+        if dt is None:
+            timestamp = bt_num_to_epoch(self.datas[0].datetime[0])
+        else:
+            if not isinstance(dt, datetime):
+                dt = datetime.combine(dt, time())
+            timestamp = dt.replace(tzinfo=dt.tzinfo or timezone.utc).timestamp()
+        self.journal.record(EventType.MESSAGE, timestamp, message=(txt, tuple(args)))
     
     def buy_signal(self) -> bool:
         """Check if buy signal is present.
@@ -204,10 +329,9 @@ class BaseStrategy(bt.Strategy):
         if size is None:
             size = self.get_position_size()
         
-        # Log order details before placing
+        # Capture order details before placing
         current_price = self.datas[0].close[0]
         available_cash = self.broker.getcash()
-        estimated_cost = (size * current_price) if size else 0
         
         # Place the buy order
         if exectype and price:
@@ -219,8 +343,8 @@ class BaseStrategy(bt.Strategy):
         if self.order:
             self.order_types[self.order.ref] = 'buy'
         
-        self.log(f'BUY ORDER PLACED - Shares: {size or 0:,}, Price: ${current_price:,.2f}, '
-                f'Est. Cost: ${estimated_cost:,.2f}, Available Cash: ${available_cash:,.2f}')
+        self._record(EventType.ORDER_SUBMITTED, self.datas[0]._name, side=BUY,
+                     size=size or 0, price=current_price, cash=available_cash)
     
     def place_sell_order(self, exectype=None, price=None, size=None):
         """Place a sell order.
@@ -247,7 +371,7 @@ class BaseStrategy(bt.Strategy):
         if self.order:
             self.order_types[self.order.ref] = 'sell'
         
-        self.log(f'SELL ORDER PLACED - Shares: {size or 0:,}')
+        self._record(EventType.ORDER_SUBMITTED, self.datas[0]._name, side=SELL, size=size or 0)
     
     def set_trailing_stop(self, percent: float):
         """Set a trailing stop loss order.
@@ -283,16 +407,17 @@ class BaseStrategy(bt.Strategy):
                 # Long position - set sell stop
                 stop_price = self.entry_price * (1 - trail_percent)
                 trailing_stop_order = self.sell(exectype=bt.Order.Stop, price=stop_price, size=position_size)
-                direction = "SELL"
+                direction = SELL
             else:
                 # Short position - set buy stop
                 stop_price = self.entry_price * (1 + trail_percent)
                 trailing_stop_order = self.buy(exectype=bt.Order.Stop, price=stop_price, size=position_size)
-                direction = "BUY"
+                direction = BUY
             
             # Track this as a trailing stop order
             if trailing_stop_order:
                 self.trailing_stop_order_ids.add(trailing_stop_order.ref)
                 self.order_types[trailing_stop_order.ref] = 'trailing_stop'
             
-            self.log(f'TRAILING STOP SET ({direction}) - {percent * 100:.1f}% @ ${stop_price:,.2f}, Shares: {position_size:,}')
+            self._record(EventType.STOP_SET, self.datas[0]._name, side=direction,
+                         size=position_size, price=stop_price, percent=percent)
@@ -5,7 +5,10 @@ and live trading. The strategy uses simple moving average crossovers for signals
 and includes trailing stop functionality.
 """
 import backtrader as bt
+import numpy as np
+from .allocation import BatchAllocator
 from .base_strategy import BaseStrategy
+from ..utils.arrays import crossovers, moving_averages
 
 
 class SMAStrategy(BaseStrategy):
@@ -28,6 +31,11 @@ class SMAStrategy(BaseStrategy):
         'trailing_stop_percent': [x / 10000 for x in range(200, 2001, 200)],  # 0.02 (2%) to 0.20 (20%)
     }
     
+    # Combinations to skip during optimization: the fast SMA must be faster
+    OPTIMIZE_CONSTRAINTS = (
+        lambda p: p['fast_period'] < p['slow_period'],
+    )
+    
     # Default parameters (backtrader format)
     params = (
         ('tickers', ['SPY']),
@@ -42,14 +50,16 @@ class SMAStrategy(BaseStrategy):
         """Initialize strategy indicators."""
         super().__init__()
         
-        # Calculate SMAs on daily data
+        # Calculate SMAs on daily data (shared across optimization runs when cached)
         # Type ignores needed due to incomplete backtrader type stubs
-        self.fast_sma = bt.indicators.MovingAverageSimple(
-            self.datas[0].close,  # type: ignore[arg-type]
+        self.fast_sma = self.indicator(
+            bt.indicators.MovingAverageSimple,
+            self.datas[0].close,
             period=self.params.fast_period  # type: ignore[attr-defined]
         )
-        self.slow_sma = bt.indicators.MovingAverageSimple(
-            self.datas[0].close,  # type: ignore[arg-type]
+        self.slow_sma = self.indicator(
+            bt.indicators.MovingAverageSimple,
+            self.datas[0].close,
             period=self.params.slow_period  # type: ignore[attr-defined]
         )
         
@@ -58,6 +68,10 @@ class SMAStrategy(BaseStrategy):
         
         # State tracking
         self.trailing_stop_set = False
+        
+        # Sizes entries like the live runner (position_percent checked here,
+        # not on the first entry)
+        self.allocator = BatchAllocator(position_percent=self.params.position_percent)  # type: ignore[attr-defined]
     
     def next(self):
         """Generate trading signals based on SMA crossover."""
@@ -71,16 +85,16 @@ class SMAStrategy(BaseStrategy):
             if self.crossover > 0:  # Fast SMA crossed above Slow SMA
                 # Calculate position size
                 size = self.get_position_size()
-                self.log(f'BUY SIGNAL - Fast SMA: ${self.fast_sma[0]:,.2f}, '
-                        f'Slow SMA: ${self.slow_sma[0]:,.2f}')
+                self.log('BUY SIGNAL - Fast SMA: ${:,.2f}, Slow SMA: ${:,.2f}',
+                         args=(self.fast_sma[0], self.slow_sma[0]))
                 self.place_buy_order(size=size)
                 self.trailing_stop_set = False
         
         else:
             # In position - check for sell signal
             if self.crossover < 0:  # Fast SMA crossed below Slow SMA
-                self.log(f'SELL SIGNAL - Fast SMA: ${self.fast_sma[0]:,.2f}, '
-                        f'Slow SMA: ${self.slow_sma[0]:,.2f}')
+                self.log('SELL SIGNAL - Fast SMA: ${:,.2f}, Slow SMA: ${:,.2f}',
+                         args=(self.fast_sma[0], self.slow_sma[0]))
                 self.place_sell_order()
                 self.trailing_stop_set = False
             
@@ -89,6 +103,53 @@ class SMAStrategy(BaseStrategy):
                 self.set_trailing_stop(self.params.trailing_stop_percent)  # type: ignore[attr-defined]
                 self.trailing_stop_set = True
     
+    @classmethod
+    def signal_arrays(cls, prices, params):
+        """Crossover signals for many parameter combinations at once.
+        
+        Args:
+            prices: First data feed in ``frame_to_arrays`` layout
+            params: Parameter name -> array with one value per combination
+            
+        Returns:
+            (entries, exits): fast SMA crossing above / below the slow SMA
+        """
+        close = prices[4]
+        fast_sma = moving_averages(close, params['fast_period'])
+        slow_sma = moving_averages(close, params['slow_period'])
+        return crossovers(fast_sma, slow_sma)
+    
+    @classmethod
+    def compute_signals(cls, prices, params):
+        """Buy and sell signals at the last bar without running backtrader.
+        
+        Args:
+            prices: Bars in ``frame_to_arrays`` layout
+            params: Strategy parameters
+            
+        Returns:
+            (buy_signal, sell_signal): fast SMA above / below the slow SMA
+            (neither before the slow SMA has enough bars)
+        """
+        periods = np.array([params['fast_period'], params['slow_period']])
+        fast_sma, slow_sma = moving_averages(prices[4], periods)[:, -1]
+        return bool(fast_sma > slow_sma), bool(fast_sma < slow_sma)
+    
+    @classmethod
+    def signal_score(cls, prices, params):
+        """Rank buy signals by how far the fast SMA is above the slow SMA.
+        
+        Args:
+            prices: Bars in ``frame_to_arrays`` layout
+            params: Strategy parameters
+            
+        Returns:
+            Relative spread of the fast over the slow SMA at the last bar
+        """
+        periods = np.array([params['fast_period'], params['slow_period']])
+        fast_sma, slow_sma = moving_averages(prices[4], periods)[:, -1]
+        return float(fast_sma / slow_sma - 1.0) if slow_sma > 0 else 0.0
+    
     def get_position_size(self):
         """Calculate position size based on available cash.
         
@@ -98,8 +159,8 @@ class SMAStrategy(BaseStrategy):
         cash = self.broker.getcash()
         price = self.datas[0].close[0]
         
-        # Use percentage of available cash
-        size = int((cash * self.params.position_percent) / price)  # type: ignore[attr-defined]
+        # Use percentage of available cash, sized like the live runner
+        size = int(self.allocator.allocate([price], cash)[0])
         
         return size
     
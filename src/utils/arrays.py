@@ -0,0 +1,129 @@
+"""Price array layout and NumPy signal kernels.
+
+The optimizer passes price data around as 2-D float64 arrays (one row per
+line: backtrader float date + OHLCV), and vectorized strategies compute their
+signals from those rows. The data feeds, strategies and live signal checks use
+the same layout and kernels without depending on the optimization package.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# backtrader's float date for 1970-01-01 (days since 0001-01-01, plus one)
+_EPOCH_ORDINAL = 719163.0
+_NS_PER_DAY = 86_400_000_000_000
+
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# Row order of the 2-D price arrays: datetime (backtrader float date) + OHLCV
+ARRAY_LINES = ('datetime',) + OHLCV_COLUMNS
+
+
+def ns_to_bt_num(ns: np.ndarray) -> np.ndarray:
+    """Vectorized conversion of UTC epoch nanoseconds to backtrader float dates.
+
+    Args:
+        ns: Array of int64 epoch nanoseconds
+
+    Returns:
+        Array of float64 dates as produced by ``bt.date2num``
+    """
+    days, rem = np.divmod(ns, _NS_PER_DAY)
+    return _EPOCH_ORDINAL + days + rem / _NS_PER_DAY
+
+
+def frame_to_arrays(df: pd.DataFrame) -> np.ndarray:
+    """Convert an OHLCV DataFrame into the 2-D array layout used by ``ArrayData``.
+
+    Args:
+        df: DataFrame with OHLCV columns indexed by timestamp (naive = UTC)
+
+    Returns:
+        Contiguous float64 array of shape (6, bars): datetime, open, high,
+        low, close, volume
+    """
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+
+    columns = {col.lower(): col for col in df.columns}
+    arrays = np.empty((len(ARRAY_LINES), len(df)), dtype=np.float64)
+    arrays[0] = ns_to_bt_num(index.as_unit('ns').asi8)
+    for row, name in enumerate(OHLCV_COLUMNS, start=1):
+        arrays[row] = df[columns[name]].to_numpy(dtype=np.float64)
+    return arrays
+
+
+def slice_window(arrays: np.ndarray, window: Optional[Tuple[float, float]]) -> np.ndarray:
+    """Restrict arrays to a date window without copying.
+
+    Args:
+        arrays: Arrays in ``frame_to_arrays`` layout
+        window: Inclusive (start, end) backtrader float dates, or None for all bars
+
+    Returns:
+        View of the bars inside the window
+    """
+    if window is None:
+        return arrays
+    start = np.searchsorted(arrays[0], window[0], side='left')
+    end = np.searchsorted(arrays[0], window[1], side='right')
+    return arrays[:, start:end]
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average matching ``bt.indicators.MovingAverageSimple``."""
+    result = np.full(len(values), np.nan)
+    if period <= len(values):
+        result[period - 1:] = sliding_window_view(values, period).sum(axis=1) / period
+    return result
+
+
+def moving_averages(values: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """Simple moving averages of one series for many periods.
+
+    Each distinct period is computed once.
+
+    Args:
+        values: Price series
+        periods: Period per combination
+
+    Returns:
+        Array of shape (len(periods), len(values)), NaN before each period fills
+    """
+    unique, inverse = np.unique(np.asarray(periods, dtype=np.int64), return_inverse=True)
+    table = np.stack([sma(values, int(period)) for period in unique])
+    return table[inverse.ravel()]
+
+
+def crossovers(fast: np.ndarray, slow: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Cross up and cross down signals matching ``bt.indicators.CrossOver``.
+
+    Like backtrader, a cross compares the current difference with the last
+    non-zero difference, so touching without crossing is not a signal.
+
+    Args:
+        fast: Fast line, shape (combinations, bars)
+        slow: Slow line, same shape
+
+    Returns:
+        (cross up, cross down) boolean arrays
+    """
+    diff = fast - slow
+    valid = ~np.isnan(diff)
+    positions = np.arange(diff.shape[1])
+
+    # Carry the last non-zero difference forward; the first valid bar seeds
+    # the carry even when its difference is zero
+    first = np.where(valid.any(axis=1), valid.argmax(axis=1), -1)
+    keep = valid & ((diff != 0) | (positions == first[:, None]))
+    last = np.maximum.accumulate(np.where(keep, positions, -1), axis=1)
+    carried = np.take_along_axis(diff, np.maximum(last, 0), axis=1)
+    carried[last < 0] = np.nan
+
+    previous = np.full_like(carried, np.nan)
+    previous[:, 1:] = carried[:, :-1]
+    return (previous < 0) & (diff > 0), (previous > 0) & (diff < 0)
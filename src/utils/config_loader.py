@@ -105,6 +105,8 @@ class ConfigLoader:
             'class': strategy_class.__name__,
             'params': params_dict,
             'optimize_params': getattr(strategy_class, 'OPTIMIZE_PARAMS', {}),
+            'optimize_constraints': getattr(strategy_class, 'OPTIMIZE_CONSTRAINTS', ()),
+            'optimize_equivalence': getattr(strategy_class, 'OPTIMIZE_EQUIVALENCE', None),
         }
         
         self._strategies.append(strategy_config)
@@ -0,0 +1,204 @@
+"""Fan-out of live ticker evaluation across parallel workers.
+
+A single process fetches and evaluates tickers only as fast as its threads
+and one API rate limit allow, which caps the universe at what fits in one
+Lambda timeout. In coordinator mode, ``LiveRunner.run_strategy`` splits a
+strategy's tickers into shards and has a ``ShardTransport`` run
+``LiveRunner.evaluate_shard`` on each of them in parallel. Workers only
+fetch data and compute signals; the coordinator collects their evaluations
+and decides on and submits every order itself, against one portfolio
+snapshot, so portfolio-level limits hold across shards.
+
+Transports:
+    LambdaTransport: invokes a Lambda function (normally the coordinator's
+        own) with ``{"mode": "worker", ...}`` events
+    ProcessPoolTransport: runs the shards in local processes, standing in
+        for Lambda when running or testing locally
+"""
+import json
+import logging
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+# Lambda's maximum timeout, the longest a worker invocation can take
+LAMBDA_MAX_SECONDS = 900
+
+
+def shard_tickers(tickers: List[str], size: int) -> List[List[str]]:
+    """Split tickers into shards.
+
+    Args:
+        tickers: Stock tickers
+        size: Tickers per shard
+
+    Returns:
+        Consecutive shards of at most ``size`` tickers
+    """
+    size = max(1, size)
+    return [tickers[i:i + size] for i in range(0, len(tickers), size)]
+
+
+def run_shard(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate a shard with this process's live runner (worker mode)."""
+    from ..lambda_handler import get_runner
+    return get_runner().evaluate_shard(payload)
+
+
+class ShardTransport(ABC):
+    """Runs shard payloads on parallel workers (base class).
+
+    Attributes:
+        workers: Shards run at the same time
+    """
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+
+    @abstractmethod
+    def _executor(self, shards: int) -> Executor:
+        """Executor running the shards of one ``map`` call."""
+
+    @abstractmethod
+    def _worker(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        """Function evaluating a payload on the executor."""
+
+    def map(self, payloads: List[Dict[str, Any]], timeout: Optional[float] = None
+            ) -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]]:
+        """Run payloads on the workers.
+
+        Args:
+            payloads: Shard payloads
+            timeout: Seconds to wait for the responses (None = no limit)
+
+        Yields:
+            (payload, response or None, error message or None) as each
+            shard completes; shards not back within the timeout are not
+            yielded
+        """
+        executor = self._executor(len(payloads))
+        worker = self._worker()
+        futures = {executor.submit(worker, payload): i for i, payload in enumerate(payloads)}
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                payload = payloads[futures[future]]
+                try:
+                    response = future.result()
+                except Exception as e:
+                    yield payload, None, str(e)
+                    continue
+                yield payload, response, None
+        except TimeoutError:
+            logger.warning(f"{sum(not future.done() for future in futures)} shards timed out")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class LambdaTransport(ShardTransport):
+    """Shards run by synchronous invocations of a Lambda function."""
+
+    def __init__(self, function_name: str, workers: int = 8):
+        """Initialize transport.
+
+        Args:
+            function_name: Name or ARN of the function handling worker events
+            workers: Invocations in flight at the same time
+        """
+        super().__init__(workers)
+        import boto3
+        from botocore.config import Config
+        self.function_name = function_name
+        # Responses arrive when the worker finishes; no retries, as a retried
+        # invocation would arrive after the coordinator stopped waiting
+        self.client = boto3.client('lambda', config=Config(
+            read_timeout=LAMBDA_MAX_SECONDS,
+            max_pool_connections=self.workers,
+            retries={'total_max_attempts': 1},
+        ))
+
+    def _executor(self, shards: int) -> Executor:
+        return ThreadPoolExecutor(max_workers=min(self.workers, max(1, shards)),
+                                  thread_name_prefix='fanout')
+
+    def _worker(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        return self.invoke
+
+    def invoke(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Invoke the function on one payload.
+
+        Args:
+            payload: Shard payload
+
+        Returns:
+            Response body of ``LiveRunner.evaluate_shard``
+
+        Raises:
+            RuntimeError: If the invocation or the worker failed
+        """
+        response = self.client.invoke(FunctionName=self.function_name,
+                                      InvocationType='RequestResponse',
+                                      Payload=json.dumps(payload).encode())
+        body = json.loads(response['Payload'].read())
+        if response.get('FunctionError'):
+            raise RuntimeError(body.get('errorMessage', str(body)) if isinstance(body, dict) else str(body))
+        if body.get('statusCode') != 200:
+            raise RuntimeError(body.get('body', {}).get('error', f"status {body.get('statusCode')}"))
+        return body['body']
+
+
+class ProcessPoolTransport(ShardTransport):
+    """Shards run in a pool of local processes."""
+
+    def __init__(self, workers: int = 4, worker: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        """Initialize transport.
+
+        Args:
+            workers: Processes in the pool
+            worker: Picklable function evaluating a payload (None =
+                    ``run_shard``, a live runner per process)
+        """
+        super().__init__(workers)
+        self.worker = worker or run_shard
+
+    def _executor(self, shards: int) -> Executor:
+        return ProcessPoolExecutor(max_workers=min(self.workers, max(1, shards)))
+
+    def _worker(self) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+        return self.worker
+
+
+def open_transport(live_config: Dict[str, Any], function_name: Optional[str] = None) -> Optional[ShardTransport]:
+    """Create the shard transport configured by ``live.fanout``.
+
+    Args:
+        live_config: The ``live`` configuration section
+        function_name: Function of the running Lambda, the default for
+                       ``fanout: lambda``
+
+    Returns:
+        ShardTransport, or None when fan-out is disabled
+
+    Raises:
+        ValueError: If the configuration is invalid
+    """
+    kind = live_config.get('fanout')
+    if not kind:
+        return None
+    workers = int(live_config.get('fanout_workers') or 8)
+    if kind == 'lambda':
+        function_name = live_config.get('fanout_function') or function_name
+        if not function_name:
+            raise ValueError("live.fanout 'lambda' needs live.fanout_function outside Lambda")
+        # Workers save the ticker states the coordinator updates after its
+        # orders, so they must share the store
+        state_path = live_config.get('state_path')
+        if state_path and not state_path.startswith('s3://'):
+            raise ValueError(f"live.fanout 'lambda' needs an s3:// live.state_path shared by the "
+                             f"workers, not the local directory {state_path!r}")
+        return LambdaTransport(function_name, workers)
+    if kind == 'processes':
+        return ProcessPoolTransport(workers)
+    raise ValueError(f"Unknown live.fanout: {kind!r} (expected 'lambda' or 'processes')")
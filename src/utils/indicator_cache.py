@@ -0,0 +1,193 @@
+"""Indicator memoization shared across optimization combinations.
+
+During a parameter sweep most indicators are identical between combinations:
+with ``fast_period x slow_period x trailing_stop_percent`` the SMA for
+``fast_period=10`` is the same for every slow period and stop value. The
+``IndicatorCache`` computes each distinct indicator series once, vectorized
+with NumPy, keyed by (data feed contents, indicator class, params), and every
+strategy instance receives a ``PrecomputedLine`` that shares the cached buffer
+instead of recomputing it bar by bar.
+
+Only preloaded data can be cached (the full series must be known when the
+strategy is created); strategies fall back to the regular backtrader
+indicator otherwise. The cache lives per process, so each optimization worker
+computes a given indicator at most once per job. It holds at most
+``max_bytes`` of series (least recently used are evicted first), and
+``evaluate_batch`` clears it when a batch belongs to another job's data.
+"""
+import hashlib
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import backtrader as bt
+import numpy as np
+
+from .arrays import sma
+
+
+# Indicator class -> (vectorized function, minimum period function)
+VECTORIZED: Dict[type, Tuple[Callable[..., np.ndarray], Callable[..., int]]] = {
+    bt.indicators.MovingAverageSimple: (sma, lambda period: period),
+}
+
+
+def _source_array(data) -> array:
+    """Return the underlying buffer of a data feed or line."""
+    if hasattr(data, 'array'):
+        return data.array
+    return data.lines[0].array
+
+
+class PrecomputedLine(bt.Indicator):
+    """Indicator whose values were computed up front.
+
+    In runonce mode the cached buffer is attached directly (no per-bar work);
+    in next mode values are copied bar by bar. The buffer is shared between
+    strategy instances and must not be modified.
+    """
+
+    lines = ('value',)
+    params = (
+        ('values', None),  # array('d') aligned with the data feed
+        ('minperiod', 1),
+    )
+
+    def __init__(self):
+        self.addminperiod(self.p.minperiod)  # type: ignore[attr-defined]
+
+    def _once(self):
+        # Attach the shared buffer instead of allocating and filling one
+        self.lines[0].array = self.p.values  # type: ignore[attr-defined]
+
+    def next(self):
+        self.lines.value[0] = self.p.values[len(self) - 1]  # type: ignore[attr-defined]
+
+
+# Default size limit of the cached series (per process)
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+class IndicatorCache:
+    """Computes each distinct indicator series once per process.
+
+    Attributes:
+        max_bytes: Size limit of the cached series; least recently used
+                   series are evicted beyond it
+        nbytes: Size of the cached series
+        hits: Lookups served from the cache
+        misses: Indicator series computed
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._series: 'OrderedDict[Tuple[Any, ...], array]' = OrderedDict()
+        self._job: Optional[Hashable] = None
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def clear(self):
+        """Drop all cached series."""
+        self._series.clear()
+        self._job = None
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def use_for(self, job: Hashable):
+        """Start serving a job, dropping the series of any previous job.
+
+        Entries are keyed by data contents, so this is not needed for
+        correctness: it keeps series of finished jobs from staying cached.
+
+        Args:
+            job: Key identifying the job's data
+        """
+        if job != self._job:
+            self.clear()
+            self._job = job
+
+    @staticmethod
+    def supports(indicator_class: type) -> bool:
+        """Check whether an indicator class has a vectorized implementation."""
+        return indicator_class in VECTORIZED
+
+    def get(self, indicator_class: type, data, **params) -> Optional[Tuple[array, int]]:
+        """Return the cached series for an indicator, computing it if needed.
+
+        Args:
+            indicator_class: Backtrader indicator class
+            data: Preloaded data feed or line the indicator is applied to
+            **params: Indicator parameters
+
+        Returns:
+            Tuple of (shared value buffer, minimum period), or None if the
+            indicator is not supported or the data is not preloaded
+        """
+        if indicator_class not in VECTORIZED:
+            return None
+
+        source = _source_array(data)
+        if len(source) == 0:
+            return None
+
+        compute, minperiod = VECTORIZED[indicator_class]
+        fingerprint = (len(source), hashlib.blake2b(memoryview(source), digest_size=16).digest())
+        key = (fingerprint, indicator_class, tuple(sorted(params.items())))
+
+        series = self._series.get(key)
+        if series is None:
+            self.misses += 1
+            values = compute(np.frombuffer(source, dtype=np.float64), **params)
+            series = self._series[key] = array('d', values.tobytes())
+            self.nbytes += series.itemsize * len(series)
+            # Strategies keep using evicted buffers they already hold
+            while self.nbytes > self.max_bytes and len(self._series) > 1:
+                _, evicted = self._series.popitem(last=False)
+                self.nbytes -= evicted.itemsize * len(evicted)
+        else:
+            self._series.move_to_end(key)
+            self.hits += 1
+
+        return series, minperiod(**params)
+
+    def indicator(self, indicator_class: type, data, **params):
+        """Create an indicator backed by the cache.
+
+        Must be called from a strategy's ``__init__`` (like any backtrader
+        indicator).
+
+        Args:
+            indicator_class: Backtrader indicator class
+            data: Data feed or line
+            **params: Indicator parameters
+
+        Returns:
+            ``PrecomputedLine`` when cached, otherwise a regular instance of
+            ``indicator_class``
+        """
+        cached = self.get(indicator_class, data, **params)
+        if cached is None:
+            return indicator_class(data, **params)
+
+        values, minperiod = cached
+        return PrecomputedLine(data, values=values, minperiod=minperiod)
+
+
+_indicator_cache: Optional[IndicatorCache] = None
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Get the process-wide indicator cache.
+
+    Returns:
+        IndicatorCache instance
+    """
+    global _indicator_cache
+    if _indicator_cache is None:
+        _indicator_cache = IndicatorCache()
+    return _indicator_cache
@@ -0,0 +1,273 @@
+"""Structured, lazily formatted trade journal.
+
+Strategies and the live runner record trading events (orders submitted,
+filled and canceled, stops set, trades closed, signals) as compact numeric
+records in a preallocated columnar ring buffer. Nothing is formatted when an
+event is recorded: human-readable lines are produced only when the journal is
+rendered, and echoed output is written in batches rather than one ``print``
+per event. Journals export to pandas/parquet for analysis.
+"""
+from datetime import datetime, timezone
+from enum import IntEnum
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+import numpy as np
+import pandas as pd
+
+
+class EventType(IntEnum):
+    """Journal event type."""
+    ORDER_SUBMITTED = 1
+    ORDER_FILLED = 2
+    ORDER_CANCELED = 3
+    STOP_SET = 4
+    TRADE_CLOSED = 5
+    SIGNAL = 6
+    MESSAGE = 7
+
+
+class CancelReason(IntEnum):
+    """Reason stored in ``detail`` for ORDER_CANCELED events."""
+    CANCELED = 1
+    MARGIN = 2
+    REJECTED = 3
+
+
+# ``detail`` flag for ORDER_FILLED events: the fill was a trailing stop
+DETAIL_TRAILING_STOP = 1
+
+# Side codes
+BUY = 1
+SELL = -1
+_SIDE_NAMES = {BUY: 'BUY', SELL: 'SELL'}
+
+# backtrader's float date for 1970-01-01
+_EPOCH_ORDINAL = 719163.0
+
+_FLOAT_COLUMNS = ('size', 'price', 'value', 'comm', 'cash', 'pnl', 'pnlcomm', 'percent')
+
+
+def bt_num_to_epoch(num: float) -> float:
+    """Convert a backtrader float date to POSIX seconds (UTC)."""
+    return (num - _EPOCH_ORDINAL) * 86400.0
+
+
+class TradeJournal:
+    """Columnar ring buffer of trading events.
+
+    Attributes:
+        capacity: Maximum number of events retained (oldest are overwritten)
+        count: Total number of events recorded
+    """
+
+    def __init__(self, capacity: int = 10000, echo: Optional[TextIO] = None,
+                 date_only: bool = True):
+        """Initialize journal.
+
+        Args:
+            capacity: Number of events to retain
+            echo: Stream that rendered events are written to in batches
+                  (None = do not echo)
+            date_only: Render timestamps as dates (bar-based journals) instead
+                       of full ISO timestamps
+        """
+        self.capacity = capacity
+        self.count = 0
+        self.echo = echo
+        self.date_only = date_only
+        self._echoed = 0
+
+        self._timestamp = np.zeros(capacity, dtype=np.float64)
+        self._event = np.zeros(capacity, dtype=np.int8)
+        self._symbol = np.zeros(capacity, dtype=np.int16)
+        self._side = np.zeros(capacity, dtype=np.int8)
+        self._detail = np.zeros(capacity, dtype=np.int8)
+        self._floats = {name: np.zeros(capacity, dtype=np.float64) for name in _FLOAT_COLUMNS}
+        # Rarely used object columns: lazy log messages and broker order IDs
+        self._message: List[Any] = [None] * capacity
+        self._order_id: List[Optional[str]] = [None] * capacity
+
+        self._symbols: List[str] = ['']
+        self._symbol_ids: Dict[str, int] = {'': 0}
+
+    @property
+    def dropped(self) -> int:
+        """Number of events overwritten because the buffer was full."""
+        return max(0, self.count - self.capacity)
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def _symbol_id(self, symbol: str) -> int:
+        symbol_id = self._symbol_ids.get(symbol)
+        if symbol_id is None:
+            symbol_id = self._symbol_ids[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return symbol_id
+
+    def record(self, event: EventType, timestamp: float, symbol: str = '', side: int = 0,
+               size: float = 0.0, price: float = 0.0, value: float = 0.0, comm: float = 0.0,
+               cash: float = 0.0, pnl: float = 0.0, pnlcomm: float = 0.0,
+               percent: float = 0.0, detail: int = 0, order_id: Optional[str] = None,
+               message: Any = None):
+        """Record one event.
+
+        Args:
+            event: Event type
+            timestamp: Event time as POSIX seconds (UTC)
+            symbol: Ticker symbol
+            side: BUY (1), SELL (-1) or 0
+            size: Shares
+            price: Execution, order or stop price
+            value: Executed value (fills) or portfolio value (cancels)
+            comm: Commission
+            cash: Cash after the event
+            pnl: Gross P&L (closed trades)
+            pnlcomm: Net P&L (closed trades)
+            percent: Stop percentage in decimal format
+            detail: Event-specific code (CancelReason, DETAIL_TRAILING_STOP)
+            order_id: Broker order ID (live trading)
+            message: (format, args) tuple for MESSAGE events
+        """
+        if self.echo is not None and self.count - self._echoed >= self.capacity:
+            # About to overwrite events that were never echoed
+            self.flush()
+
+        i = self.count % self.capacity
+        self._timestamp[i] = timestamp
+        self._event[i] = event
+        self._symbol[i] = self._symbol_id(symbol) if symbol else 0
+        self._side[i] = side
+        self._detail[i] = detail
+
+        floats = self._floats
+        floats['size'][i] = size
+        floats['price'][i] = price
+        floats['value'][i] = value
+        floats['comm'][i] = comm
+        floats['cash'][i] = cash
+        floats['pnl'][i] = pnl
+        floats['pnlcomm'][i] = pnlcomm
+        floats['percent'][i] = percent
+
+        self._message[i] = message
+        self._order_id[i] = order_id
+        self.count += 1
+
+    def _positions(self, start: int = 0) -> range:
+        """Absolute event numbers still held in the buffer, oldest first."""
+        return range(max(start, self.dropped), self.count)
+
+    def _format_time(self, timestamp: float) -> str:
+        dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+        return dt.date().isoformat() if self.date_only else dt.isoformat()
+
+    def render_event(self, n: int) -> str:
+        """Format one retained event as a log line.
+
+        Args:
+            n: Absolute event number (0 = first event ever recorded)
+
+        Returns:
+            Formatted log line
+        """
+        i = n % self.capacity
+        event = EventType(int(self._event[i]))
+        symbol = self._symbols[self._symbol[i]]
+        side = _SIDE_NAMES.get(int(self._side[i]), '')
+        detail = int(self._detail[i])
+        f = {name: float(column[i]) for name, column in self._floats.items()}
+
+        if event == EventType.ORDER_SUBMITTED:
+            if self._side[i] == BUY:
+                text = (f"BUY ORDER PLACED - Shares: {int(f['size']):,}, Price: ${f['price']:,.2f}, "
+                        f"Est. Cost: ${f['size'] * f['price']:,.2f}, Available Cash: ${f['cash']:,.2f}")
+            else:
+                text = f"SELL ORDER PLACED - Shares: {int(f['size']):,}"
+        elif event == EventType.ORDER_FILLED:
+            if self._side[i] == BUY:
+                cash_before = f['cash'] + f['value'] + f['comm']
+                amount = f"Cost: ${f['value']:,.2f}"
+            else:
+                cash_before = f['cash'] - f['value'] + f['comm']
+                amount = f"Proceeds: ${f['value']:,.2f}"
+            label = f"TRAILING STOP HIT ({side})" if detail == DETAIL_TRAILING_STOP else f"{side} EXECUTED"
+            text = (f"{label} - Price: ${f['price']:,.2f}, Shares: {f['size']:g}, {amount}, "
+                    f"Comm: ${f['comm']:.2f}, Cash Before: ${cash_before:,.2f}, Cash After: ${f['cash']:,.2f}")
+        elif event == EventType.ORDER_CANCELED:
+            reason = CancelReason(detail).name if detail else 'CANCELED'
+            text = (f"ORDER {reason} - Type: {side}, Size: {f['size']:g}, "
+                    f"Current Price: ${f['price']:,.2f}, Available Cash: ${f['cash']:,.2f}, "
+                    f"Position Value: ${f['value'] - f['cash']:,.2f}, Portfolio Value: ${f['value']:,.2f}")
+        elif event == EventType.STOP_SET:
+            text = (f"TRAILING STOP SET ({side}) - {f['percent'] * 100:.1f}% @ ${f['price']:,.2f}, "
+                    f"Shares: {int(f['size']):,}")
+        elif event == EventType.TRADE_CLOSED:
+            text = f"TRADE PROFIT - Gross: ${f['pnl']:+,.2f}, Net: ${f['pnlcomm']:+,.2f}"
+        elif event == EventType.SIGNAL:
+            text = f"{side} SIGNAL @ ${f['price']:,.2f}".lstrip()
+        else:
+            fmt, args = self._message[i]
+            text = fmt.format(*args) if args else fmt
+
+        if symbol and event != EventType.MESSAGE:
+            text = f"{symbol} {text}"
+        if self._order_id[i]:
+            text = f"{text} (Order ID: {self._order_id[i]})"
+
+        return f"{self._format_time(self._timestamp[i])} {text}"
+
+    def render(self) -> List[str]:
+        """Format every retained event.
+
+        Returns:
+            List of log lines, oldest first
+        """
+        return [self.render_event(n) for n in self._positions()]
+
+    def flush(self):
+        """Write events not yet echoed to the echo stream in one write."""
+        if self.echo is None or self._echoed >= self.count:
+            return
+
+        lines = [self.render_event(n) for n in self._positions(self._echoed)]
+        self._echoed = self.count
+        self.echo.write("\n".join(lines) + "\n")
+        self.echo.flush()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Export retained events as a DataFrame.
+
+        Returns:
+            DataFrame with one row per event, oldest first
+        """
+        order = np.array([n % self.capacity for n in self._positions()], dtype=np.int64)
+        symbols = np.array(self._symbols, dtype=object)
+
+        frame = pd.DataFrame({
+            'timestamp': pd.to_datetime(self._timestamp[order], unit='s', utc=True),
+            'event': [EventType(int(code)).name for code in self._event[order]],
+            'symbol': symbols[self._symbol[order]],
+            'side': np.where(self._side[order] == BUY, 'buy',
+                             np.where(self._side[order] == SELL, 'sell', '')),
+            'detail': self._detail[order],
+        })
+        for name, column in self._floats.items():
+            frame[name] = column[order]
+        frame['order_id'] = [self._order_id[i] for i in order]
+        frame['message'] = [
+            self.render_event(n) if self._event[n % self.capacity] == EventType.MESSAGE else None
+            for n in self._positions()
+        ]
+        return frame
+
+    def to_parquet(self, path: str):
+        """Write retained events to a parquet file.
+
+        Args:
+            path: Output file path (parent directories are created)
+        """
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        self.to_frame().to_parquet(output)
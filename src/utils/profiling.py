@@ -0,0 +1,367 @@
+"""Opt-in hot-path profiling for backtests and optimization.
+
+``HotPathProfiler`` times the strategy callbacks backtrader drives on every bar
+(``next``, ``notify_order``, ``notify_trade``, ``log``), the per-bar strategy
+step (which includes indicator updates in non-runonce mode), vectorized
+indicator precomputation, analyzers, the broker and any named runner section
+such as feed loading.
+
+Timings are recorded per call path, so nested calls (e.g. ``log`` inside
+``next``) are attributed correctly and exclusive ("self") times add up. The
+results can be printed as a text report, or exported for speedscope
+(https://www.speedscope.app) or Python's ``pstats``.
+
+When disabled nothing is wrapped: strategy classes and brokers are returned
+unchanged and sections are no-ops, so there is no per-bar overhead.
+"""
+import functools
+import json
+import marshal
+import subprocess
+import sys
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter_ns
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Strategy methods timed under their own name
+STRATEGY_CALLBACKS = ('next', 'notify_order', 'notify_trade', 'log')
+
+# Backtrader internals timed under a descriptive name
+STRATEGY_INTERNALS = {
+    '_once': 'indicators',  # vectorized indicator precompute (runonce mode)
+    '_oncepost': 'bar',  # per-bar strategy step (runonce mode)
+    '_next': 'bar',  # per-bar strategy step incl. indicator updates (next mode)
+    '_next_analyzers': 'analyzers',
+}
+
+# Pseudo file name used for pstats function keys
+_PSTATS_FILE = 'swing-trader'
+
+
+class _CallStats:
+    """Cumulative and per-call timing statistics for one name."""
+
+    __slots__ = ('count', 'total_ns', 'min_ns', 'max_ns')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def add(self, elapsed_ns: int):
+        if self.count == 0 or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+
+class HotPathProfiler:
+    """Records call-path timings for strategy hot paths and runner sections."""
+
+    def __init__(self, enabled: bool = True):
+        """Initialize profiler.
+
+        Args:
+            enabled: If False, all instrumentation methods are no-ops
+        """
+        self.enabled = enabled
+        # Active frames: [path, start_ns, child_ns]
+        self._stack: List[List[Any]] = []
+        # Call path -> [calls, total_ns, self_ns]
+        self._paths: Dict[Tuple[str, ...], List[int]] = {}
+        # Name -> per-call statistics
+        self._calls: Dict[str, _CallStats] = {}
+
+    def _enter(self, name: str):
+        parent = self._stack[-1][0] if self._stack else ()
+        self._stack.append([parent + (name,), perf_counter_ns(), 0])
+
+    def _exit(self):
+        path, start_ns, child_ns = self._stack.pop()
+        elapsed = perf_counter_ns() - start_ns
+
+        if self._stack:
+            self._stack[-1][2] += elapsed
+
+        stats = self._paths.get(path)
+        if stats is None:
+            stats = self._paths[path] = [0, 0, 0]
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += elapsed - child_ns
+
+        calls = self._calls.get(path[-1])
+        if calls is None:
+            calls = self._calls[path[-1]] = _CallStats()
+        calls.add(elapsed)
+
+    def wrap(self, name: str, func):
+        """Wrap a callable so each call is timed under ``name``.
+
+        Args:
+            name: Name to record the calls under
+            func: Callable to wrap
+
+        Returns:
+            Timed callable (or ``func`` itself when disabled)
+        """
+        if not self.enabled:
+            return func
+
+        enter = self._enter
+        exit_ = self._exit
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            enter(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                exit_()
+
+        return timed
+
+    def section(self, name: str):
+        """Context manager timing a named block (e.g. feed loading).
+
+        Args:
+            name: Section name
+
+        Returns:
+            Context manager
+        """
+        if not self.enabled:
+            return nullcontext()
+        return self._section(name)
+
+    @contextmanager
+    def _section(self, name: str):
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def instrument_strategy(self, strategy_class):
+        """Create a subclass of a strategy with its hot paths timed.
+
+        Args:
+            strategy_class: Backtrader strategy class
+
+        Returns:
+            Instrumented subclass (or ``strategy_class`` itself when disabled)
+        """
+        if not self.enabled:
+            return strategy_class
+
+        attrs: Dict[str, Any] = {'__module__': strategy_class.__module__}
+        for method_name in STRATEGY_CALLBACKS:
+            attrs[method_name] = self.wrap(method_name, getattr(strategy_class, method_name))
+        for method_name, label in STRATEGY_INTERNALS.items():
+            attrs[method_name] = self.wrap(label, getattr(strategy_class, method_name))
+
+        # Use the strategy's metaclass so backtrader params are inherited
+        return type(strategy_class)(strategy_class.__name__, (strategy_class,), attrs)
+
+    def instrument_broker(self, broker):
+        """Time the broker's per-bar processing (order matching, valuation).
+
+        Args:
+            broker: Backtrader broker instance (instrumented in place)
+
+        Returns:
+            The same broker instance
+        """
+        if self.enabled:
+            broker.next = self.wrap('broker', broker.next)
+        return broker
+
+    def report(self) -> str:
+        """Build a text report of the recorded timings.
+
+        Returns:
+            Report with per-name call statistics and the call-path tree
+        """
+        lines = [
+            "=" * 80,
+            "PROFILE REPORT",
+            "=" * 80,
+            f"{'Name':<20} {'Calls':>10} {'Total (ms)':>12} {'Mean (us)':>11} "
+            f"{'Min (us)':>10} {'Max (us)':>10}",
+            "-" * 80,
+        ]
+
+        by_total = sorted(self._calls.items(), key=lambda item: item[1].total_ns, reverse=True)
+        for name, stats in by_total:
+            mean_us = stats.total_ns / stats.count / 1e3 if stats.count else 0.0
+            lines.append(
+                f"{name:<20} {stats.count:>10,} {stats.total_ns / 1e6:>12.2f} {mean_us:>11.2f} "
+                f"{stats.min_ns / 1e3:>10.2f} {stats.max_ns / 1e3:>10.2f}"
+            )
+
+        lines.extend([
+            "",
+            f"{'Call path':<50} {'Calls':>10} {'Total (ms)':>12} {'Self (ms)':>11}",
+            "-" * 80,
+        ])
+        for path in sorted(self._paths):
+            calls, total_ns, self_ns = self._paths[path]
+            label = "  " * (len(path) - 1) + path[-1]
+            lines.append(f"{label:<50} {calls:>10,} {total_ns / 1e6:>12.2f} {self_ns / 1e6:>11.2f}")
+
+        lines.append("=" * 80)
+        return "\n".join(lines)
+
+    def to_speedscope(self, name: str = 'backtest') -> Dict[str, Any]:
+        """Export the call-path tree as a speedscope sampled profile.
+
+        Each call path becomes one weighted sample whose weight is its
+        exclusive time, so speedscope's flame graph reproduces the tree.
+
+        Args:
+            name: Profile name shown in speedscope
+
+        Returns:
+            Speedscope file contents as a dictionary
+        """
+        frame_index: Dict[str, int] = {}
+        samples = []
+        weights = []
+
+        for path, (_, _, self_ns) in sorted(self._paths.items()):
+            sample = []
+            for frame in path:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frame_index)
+                sample.append(frame_index[frame])
+            samples.append(sample)
+            weights.append(self_ns)
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'shared': {'frames': [{'name': frame} for frame in frame_index]},
+            'profiles': [{
+                'type': 'sampled',
+                'name': name,
+                'unit': 'nanoseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }],
+            'name': name,
+            'exporter': 'swing-trader',
+        }
+
+    def to_pstats(self) -> Dict[Tuple[str, int, str], Tuple]:
+        """Export the timings in the format ``pstats.Stats`` loads.
+
+        Returns:
+            Mapping of function key to (cc, nc, tt, ct, callers)
+        """
+        def key(name: str) -> Tuple[str, int, str]:
+            return (_PSTATS_FILE, 0, name)
+
+        stats: Dict[Tuple[str, int, str], List[Any]] = {}
+        for path, (calls, total_ns, self_ns) in self._paths.items():
+            entry = stats.setdefault(key(path[-1]), [0, 0, 0.0, 0.0, {}])
+            entry[0] += calls
+            entry[1] += calls
+            entry[2] += self_ns / 1e9
+            entry[3] += total_ns / 1e9
+
+            if len(path) > 1:
+                caller = key(path[-2])
+                cc, nc, tt, ct = entry[4].get(caller, (0, 0, 0.0, 0.0))
+                entry[4][caller] = (cc + calls, nc + calls, tt + self_ns / 1e9, ct + total_ns / 1e9)
+
+        return {func: tuple(values) for func, values in stats.items()}
+
+    def save(self, directory: str, name: str) -> Optional[Dict[str, Path]]:
+        """Write speedscope and pstats files for the recorded timings.
+
+        Args:
+            directory: Output directory (created if needed)
+            name: Base file name
+
+        Returns:
+            Dictionary with 'speedscope' and 'pstats' paths, or None when disabled
+        """
+        if not self.enabled:
+            return None
+
+        output_dir = Path(directory)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        speedscope_path = output_dir / f"{name}.speedscope.json"
+        with open(speedscope_path, 'w') as f:
+            json.dump(self.to_speedscope(name), f)
+
+        pstats_path = output_dir / f"{name}.pstats"
+        with open(pstats_path, 'wb') as f:
+            marshal.dump(self.to_pstats(), f)
+
+        return {'speedscope': speedscope_path, 'pstats': pstats_path}
+
+
+def import_times(module: str) -> List[Tuple[str, float, float]]:
+    """Measure the import cost of a module and everything it imports.
+
+    The module is imported in a fresh interpreter (``python -X importtime``),
+    so nothing is already loaded, as on a Lambda cold start.
+
+    Args:
+        module: Dotted module name (e.g. 'src.lambda_handler')
+
+    Returns:
+        (module, self seconds, cumulative seconds) per imported module, in
+        import order
+    """
+    root = Path(__file__).resolve().parent.parent.parent
+    code = f"import sys; sys.path.insert(0, {str(root)!r}); import {module}"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            capture_output=True, text=True, cwd=root)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+    return times
+
+
+def import_report(module: str, top: int = 20) -> str:
+    """Import cost of a module by package, most expensive first.
+
+    Third-party modules are grouped by top-level package, this project's by
+    subpackage (e.g. 'src.runners').
+
+    Args:
+        module: Dotted module name
+        top: Number of packages listed
+
+    Returns:
+        Formatted report
+    """
+    totals: Dict[str, float] = {}
+    for name, self_seconds, _ in import_times(module):
+        parts = name.split('.')
+        package = '.'.join(parts[:2]) if parts[0] == 'src' else parts[0]
+        totals[package] = totals.get(package, 0.0) + self_seconds
+    total = sum(totals.values())
+
+    lines = [
+        f"Import time of {module}: {total * 1000:.1f} ms",
+        f"{'Package':<32} {'Self (ms)':>10} {'Share':>7}",
+    ]
+    for package, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{package:<32} {seconds * 1000:>10.1f} {seconds / total:>7.1%}")
+    return '\n'.join(lines)
@@ -0,0 +1,61 @@
+"""Thread-safe rate limiting for API calls.
+
+Alpaca limits each account to a number of API requests per minute, shared by
+everything that calls the API with the same keys. ``RateLimiter`` is a token
+bucket that the live runner's worker threads acquire a token from before
+every request, so concurrent fetches and order submissions stay under the
+limit instead of failing with HTTP 429.
+"""
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """Token bucket shared by the threads calling one API.
+
+    Attributes:
+        rate: Sustained requests per second
+        burst: Requests allowed back to back after an idle period
+    """
+
+    def __init__(self, per_minute: float, burst: int = 10):
+        """Initialize rate limiter.
+
+        Args:
+            per_minute: Sustained requests per minute
+            burst: Requests allowed back to back after an idle period
+        """
+        if per_minute <= 0:
+            raise ValueError(f"per_minute must be positive, got {per_minute}")
+        self.rate = per_minute / 60.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """Wait until a request may be made.
+
+        Waiting callers reserve their slot, so requests are served in the
+        order they asked for them.
+
+        Args:
+            deadline: ``time.monotonic()`` time by which the request must be
+                      made (None = wait as long as needed)
+
+        Returns:
+            True once the request may be made, False (immediately, without
+            using up a token) if that would only be after the deadline
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if deadline is not None and now + wait > deadline:
+                return False
+            self._tokens -= 1.0
+        if wait:
+            time.sleep(wait)
+        return True
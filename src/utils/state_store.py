@@ -0,0 +1,187 @@
+"""Persistent per-ticker state for live runs.
+
+A live run needs each ticker's recent bars (the lookback window the
+indicators are computed over) and the bookkeeping of its position (entry
+price, whether the trailing stop was placed). Without saved state, every
+invocation refetches the whole window and loses the bookkeeping. With a
+state store, the runner saves a ``LiveState`` per strategy and ticker
+after each run. The next run then only fetches the bars since the last one
+(``DataManager.get_data_for_live`` with ``cached``). A missing, unreadable
+or outdated state (e.g. a changed lookback) means a cold start from the
+full history.
+
+States are small JSON documents kept in a directory (local disk or
+``/tmp`` in Lambda, where it survives warm invocations only) or in S3
+(``s3://bucket/prefix``, shared by every invocation).
+"""
+import json
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Format version of saved states; older versions are discarded
+STATE_VERSION = 1
+
+_BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+
+@dataclass
+class LiveState:
+    """State of one strategy and ticker between live runs.
+
+    Attributes:
+        lookback_days: Lookback the bars were fetched for
+        bars: Recent bars indexed by timestamp (UTC)
+        position: Bookkeeping of the open position ('entry_price', 'qty',
+                  'opened_at', 'trailing_stop_set'), None when flat
+    """
+    lookback_days: int
+    bars: pd.DataFrame
+    position: Optional[Dict[str, Any]] = None
+
+    def to_document(self) -> Dict[str, Any]:
+        """Convert to a JSON-serializable document."""
+        index = pd.DatetimeIndex(self.bars.index)
+        if index.tz is None:
+            index = index.tz_localize('UTC')
+        bars = {column: self.bars[column].astype(float).tolist() for column in _BAR_COLUMNS}
+        bars['timestamp'] = index.tz_convert('UTC').as_unit('ns').asi8.tolist()
+        return {
+            'version': STATE_VERSION,
+            'lookback_days': self.lookback_days,
+            'bars': bars,
+            'position': self.position,
+        }
+
+    @classmethod
+    def from_document(cls, document: Dict[str, Any]) -> Optional['LiveState']:
+        """Create from a saved document (None if it has another version)."""
+        if document.get('version') != STATE_VERSION:
+            return None
+        bars = document['bars']
+        index = pd.to_datetime(bars['timestamp'], unit='ns', utc=True)
+        frame = pd.DataFrame({column: bars[column] for column in _BAR_COLUMNS}, index=index)
+        frame.index.name = 'timestamp'
+        return cls(lookback_days=document['lookback_days'], bars=frame,
+                   position=document.get('position'))
+
+
+class StateStore(ABC):
+    """Key -> JSON document store (base class)."""
+
+    @abstractmethod
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        """Read a document, or None if there is none."""
+
+    @abstractmethod
+    def write(self, key: str, document: Dict[str, Any]):
+        """Write (replace) a document."""
+
+    def load(self, key: str) -> Optional[LiveState]:
+        """Load a live state.
+
+        Args:
+            key: State key (e.g. 'SMAStrategy/SPY')
+
+        Returns:
+            LiveState, or None if missing or unreadable (cold start)
+        """
+        try:
+            document = self.read(key)
+            return LiveState.from_document(document) if document is not None else None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable live state {key}: {e}")
+            return None
+
+    def save(self, key: str, state: LiveState):
+        """Save a live state.
+
+        Args:
+            key: State key
+            state: State to save
+        """
+        self.write(key, state.to_document())
+
+
+class DirectoryStateStore(StateStore):
+    """States as JSON files in a directory."""
+
+    def __init__(self, root: Union[str, Path]):
+        """Initialize store.
+
+        Args:
+            root: Directory holding the states (created when needed)
+        """
+        self.root = Path(root)
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        if not path.exists():
+            return None
+        return json.loads(path.read_text())
+
+    def write(self, key: str, document: Dict[str, Any]):
+        # Write to a temporary file first so readers never see a partial state
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.partial")
+        partial.write_text(json.dumps(document))
+        os.replace(partial, path)
+
+
+class S3StateStore(StateStore):
+    """States as JSON objects in an S3 bucket."""
+
+    def __init__(self, bucket: str, prefix: str = ''):
+        """Initialize store.
+
+        Args:
+            bucket: Bucket name
+            prefix: Key prefix of the states
+        """
+        import boto3
+        self.client = boto3.client('s3')
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}.json" if self.prefix else f"{key}.json"
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client.exceptions.NoSuchKey:
+            return None
+        return json.loads(response['Body'].read())
+
+    def write(self, key: str, document: Dict[str, Any]):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key),
+                               Body=json.dumps(document).encode(),
+                               ContentType='application/json')
+
+
+def open_state_store(location: str) -> StateStore:
+    """Open the state store at a location.
+
+    Args:
+        location: 's3://bucket/prefix' or a directory path
+
+    Returns:
+        StateStore
+    """
+    if location.startswith('s3://'):
+        bucket, _, prefix = location[len('s3://'):].partition('/')
+        return S3StateStore(bucket, prefix)
+    return DirectoryStateStore(location)
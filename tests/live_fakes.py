@@ -0,0 +1,122 @@
+"""Stand-ins for the live runner's data manager, broker and strategies.
+
+Shared by the live runner and daemon tests; no API calls are made.
+"""
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.brokers.alpaca_broker import MARKET_TIMEZONE
+from src.brokers.types import OrderResult, OrderSide, OrderType, PortfolioSnapshot
+from src.strategies.base_strategy import BaseStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+
+
+class AlwaysSignalStrategy(BaseStrategy):
+    """Buys when flat, sells when in a position."""
+    params = (('tickers', []), ('lookback_days', 30), ('position_percent', 0.1))
+
+    def buy_signal(self) -> bool:
+        return True
+
+    def sell_signal(self) -> bool:
+        return True
+
+
+def strategy_config(tickers):
+    return {
+        'name': 'AlwaysSignal',
+        'module': AlwaysSignalStrategy.__module__,
+        'class': 'AlwaysSignalStrategy',
+        'params': {'tickers': tickers, 'lookback_days': 30},
+    }
+
+
+class FakeDataManager:
+    """Serves the last 30 SPY bars for every ticker ('BAD' fails).
+
+    Records the fetches, the cached bars passed in and the most fetches in
+    flight at once.
+    """
+
+    def __init__(self, delay=0.0, delays=None):
+        self.df = pd.read_parquet(SPY_PATH).iloc[-30:]
+        self.delay = delay
+        self.delays = delays or {}
+        self.fetches = []
+        self.cached = {}
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def get_data_for_live(self, ticker, days_back=30, cached=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            self.fetches.append(ticker)
+            self.cached[ticker] = cached
+        time.sleep(self.delays.get(ticker, self.delay))
+        with self.lock:
+            self.active -= 1
+        if ticker == 'BAD':
+            raise ConnectionError('no data')
+        return self.df
+
+
+class FakeBroker:
+    """Holds 10 shares (entered at 100) of each ``held`` ticker.
+
+    ``buying`` tickers have a buy order working and ``stops`` tickers a stop
+    order (at ``stop_price``). Orders of the ``rejects`` types or tickers are
+    rejected.
+    Sessions close at ``close``.
+    """
+    paper = True
+
+    def __init__(self, held=(), buying=(), stops=(), stop_price=None, rejects=(), close='16:00'):
+        self.held = set(held)
+        self.buying = set(buying)
+        self.stops = set(stops)
+        self.stop_price = stop_price
+        self.rejects = set(rejects)
+        self.close = datetime.strptime(close, '%H:%M').time()
+        self.orders = []
+        self.requests = []
+        self.canceled = []
+        self.snapshots = 0
+
+    def get_snapshot(self):
+        self.snapshots += 1
+        return PortfolioSnapshot(
+            account=SimpleNamespace(cash=100000.0, buying_power=100000.0),
+            positions={symbol: SimpleNamespace(symbol=symbol, qty=10, avg_entry_price=100.0)
+                       for symbol in self.held},
+            open_orders=[SimpleNamespace(symbol=symbol, side=OrderSide.BUY) for symbol in self.buying]
+            + [SimpleNamespace(id=f'stop-{symbol}', symbol=symbol, qty=10, side=OrderSide.SELL,
+                               order_type=OrderType.STOP, stop_price=self.stop_price,
+                               trail_percent=None, trail_price=None)
+               for symbol in self.stops],
+        )
+
+    def get_market_hours(self, day):
+        return (datetime.combine(day, datetime.strptime('09:30', '%H:%M').time(), MARKET_TIMEZONE),
+                datetime.combine(day, self.close, MARKET_TIMEZONE))
+
+    def cancel_order(self, order_id):
+        self.canceled.append(order_id)
+        return True
+
+    def submit_order(self, order):
+        self.requests.append(order)
+        if order.order_type in self.rejects or order.symbol in self.rejects:
+            return OrderResult(success=False, error='rejected')
+        self.orders.append((order.symbol, order.side.value, order.qty))
+        return OrderResult(success=True, order=SimpleNamespace(id=f'id-{order.symbol}', symbol=order.symbol,
+                                                               side=order.side, order_type=order.order_type,
+                                                               stop_price=getattr(order, 'stop_price', None)))
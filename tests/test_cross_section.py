@@ -0,0 +1,72 @@
+"""Tests for cross-sectional (per-ticker) optimization."""
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.optimization import (
+    ParallelOptimizer, load_cube, rank_parameters, results_cube, save_cube,
+)
+from src.strategies.example_sma import SMAStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+COMBOS = [{'fast_period': fast, 'slow_period': slow} for fast in (5, 10) for slow in (20, 30)]
+
+
+@pytest.fixture(scope='module')
+def frames():
+    spy = pd.read_parquet(SPY_PATH)
+    # Second ticker: the same bars in reverse order (a different price path)
+    reversed_spy = pd.DataFrame(spy.to_numpy()[::-1], index=spy.index, columns=spy.columns)
+    return {'SPY': spy, 'REV': reversed_spy}
+
+
+def _optimize(frames, tickers=None, workers=1):
+    with ParallelOptimizer(SMAStrategy, frames, 100000.0, 0.001,
+                           fixed_params={'verbose_logging': False}, workers=workers) as optimizer:
+        return optimizer.evaluate(COMBOS, tickers=tickers)
+
+
+def test_cells_match_single_ticker_runs(frames):
+    cube = results_cube(_optimize(frames, tickers=['SPY', 'REV'], workers=2))
+    assert len(cube) == len(COMBOS) * 2
+
+    for ticker in frames:
+        expected = {tuple(record['params'].values()): record['final_value']
+                    for record in _optimize({ticker: frames[ticker]})}
+        cells = cube[cube['ticker'] == ticker]
+        for row in cells.itertuples():
+            assert row.final_value == pytest.approx(expected[(row.fast_period, row.slow_period)])
+
+
+def test_rank_parameters(tmp_path):
+    cube = pd.DataFrame({
+        'ticker': ['A', 'B', 'C'] * 2,
+        'fast_period': [5] * 3 + [10] * 3,
+        'total_return': [0.3, 0.2, -0.2, 0.1, 0.1, 0.05],
+        'max_drawdown': [10.0, 5.0, 30.0, 4.0, 6.0, 5.0],
+    })
+    path = tmp_path / 'cube.parquet'
+    save_cube(cube, path)
+    assert list(load_cube(path, metrics=['total_return']).columns) == ['ticker', 'fast_period', 'total_return']
+
+    by_median = rank_parameters(cube, 'total_return', by='median')
+    assert by_median['fast_period'].tolist() == [5, 10]
+    assert by_median['median'].tolist() == pytest.approx([0.2, 0.1])
+    assert by_median['hit_rate'].tolist() == pytest.approx([2 / 3, 1.0])
+
+    by_worst = rank_parameters(cube, 'total_return', by='worst')
+    assert by_worst['fast_period'].tolist() == [10, 5]
+
+    drawdown = rank_parameters(cube, 'max_drawdown', by='worst', ascending=True)
+    assert drawdown['fast_period'].tolist() == [10, 5]
+    assert drawdown['worst'].tolist() == [6.0, 30.0]
+    # A drawdown is never negative: no hit rate
+    assert drawdown['hit_rate'].isna().all()
+    with pytest.raises(ValueError, match='hit_rate'):
+        rank_parameters(cube, 'max_drawdown', by='hit_rate', ascending=True)
@@ -0,0 +1,79 @@
+"""Tests for the shared optimization indicator cache."""
+import sys
+from array import array
+from pathlib import Path
+from types import SimpleNamespace
+
+import backtrader as bt
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics import PortfolioRecorder
+from src.data_loaders.data_manager import DataManager
+from src.optimization import IndicatorCache, get_indicator_cache
+from src.strategies.example_sma import SMAStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+
+
+def _final_values(indicator_cache, **cerebro_kwargs):
+    cerebro = bt.Cerebro(stdstats=False, **cerebro_kwargs)
+    cerebro.broker.set_coc(True)
+    cerebro.broker.setcash(100000.0)
+    cerebro.broker.setcommission(commission=0.001)
+    cerebro.optstrategy(SMAStrategy, verbose_logging=False, indicator_cache=indicator_cache,
+                        fast_period=(5, 10), slow_period=(20, 30), trailing_stop_percent=(0.02, 0.1))
+    cerebro.adddata(DataManager().create_backtrader_feed(pd.read_parquet(SPY_PATH), 'SPY'), name='SPY')
+    cerebro.addanalyzer(PortfolioRecorder, _name='recorder')
+
+    return {
+        (strat.p.fast_period, strat.p.slow_period, strat.p.trailing_stop_percent):
+            strat.analyzers.recorder.get_analysis()['values']
+        for strat, in cerebro.run(maxcpus=1)
+    }
+
+
+@pytest.mark.parametrize('cerebro_kwargs', [{}, {'runonce': False}])
+def test_cached_indicators_match_backtrader(cerebro_kwargs):
+    cache = get_indicator_cache()
+    cache.clear()
+
+    expected = _final_values(False, **cerebro_kwargs)
+    actual = _final_values(True, **cerebro_kwargs)
+
+    for combo, values in expected.items():
+        assert (actual[combo] == values).all()
+
+    # 8 combinations x 2 SMAs, but only 4 distinct periods
+    assert cache.misses == 4
+    assert cache.hits == 12
+
+
+def test_cache_is_bounded_and_scoped_to_a_job():
+    # A preloaded line: anything exposing its buffer as .array
+    closes = SimpleNamespace(array=array('d', pd.read_parquet(SPY_PATH)['close'].iloc[-100:].tolist()))
+    series_bytes = 8 * len(closes.array)
+    sma = bt.indicators.MovingAverageSimple
+    cache = IndicatorCache(max_bytes=2 * series_bytes)
+
+    cache.get(sma, closes, period=5)
+    cache.get(sma, closes, period=10)
+    cache.get(sma, closes, period=5)  # most recently used
+    cache.get(sma, closes, period=20)
+
+    # period=10 was evicted, period=5 kept
+    assert len(cache) == 2 and cache.nbytes == 2 * series_bytes
+    cache.get(sma, closes, period=5)
+    assert (cache.hits, cache.misses) == (2, 3)
+
+    cache.use_for('job-1')
+    assert len(cache) == 0
+    cache.get(sma, closes, period=5)
+    cache.use_for('job-1')
+    assert len(cache) == 1
+    cache.use_for('job-2')
+    assert len(cache) == 0
@@ -0,0 +1,105 @@
+"""Tests for the structured trade journal."""
+import io
+import sys
+from datetime import date
+from pathlib import Path
+
+import backtrader as bt
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_loaders.data_manager import DataManager
+from src.strategies.example_sma import SMAStrategy
+from src.utils.journal import BUY, EventType, TradeJournal
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+
+
+class _Unformattable:
+    """Fails if formatted, to prove messages are only rendered on demand."""
+
+    def __format__(self, spec):
+        raise AssertionError("message formatted eagerly")
+
+
+def test_ring_buffer_keeps_latest_events():
+    journal = TradeJournal(capacity=3)
+    for i in range(5):
+        journal.record(EventType.TRADE_CLOSED, 86400.0 * i, 'SPY', pnl=float(i), pnlcomm=float(i))
+
+    assert journal.count == 5
+    assert journal.dropped == 2
+    assert list(journal.to_frame()['pnl']) == [2.0, 3.0, 4.0]
+
+
+def test_messages_are_formatted_only_on_render():
+    journal = TradeJournal()
+    journal.record(EventType.MESSAGE, 0.0, message=('value {}', (_Unformattable(),)))
+    journal.record(EventType.ORDER_SUBMITTED, 0.0, 'SPY', side=BUY, size=10, price=100.0, cash=5000.0)
+
+    assert journal.render_event(1) == (
+        '1970-01-01 SPY BUY ORDER PLACED - Shares: 10, Price: $100.00, '
+        'Est. Cost: $1,000.00, Available Cash: $5,000.00'
+    )
+
+
+def test_echo_is_batched_until_flush():
+    stream = io.StringIO()
+    journal = TradeJournal(capacity=2, echo=stream)
+    journal.record(EventType.SIGNAL, 0.0, 'SPY', side=BUY, price=1.0)
+    journal.record(EventType.SIGNAL, 0.0, 'SPY', side=BUY, price=2.0)
+    assert stream.getvalue() == ''
+
+    # A full buffer is echoed before events are overwritten
+    journal.record(EventType.SIGNAL, 0.0, 'SPY', side=BUY, price=3.0)
+    assert stream.getvalue().count('\n') == 2
+
+    journal.flush()
+    assert stream.getvalue().splitlines()[-1] == '1970-01-01 SPY BUY SIGNAL @ $3.00'
+
+
+def test_events_without_side_have_no_side_label():
+    journal = TradeJournal()
+    journal.record(EventType.SIGNAL, 0.0, 'SPY', price=1.0)
+
+    assert journal.render_event(0) == '1970-01-01 SPY SIGNAL @ $1.00'
+    assert list(journal.to_frame()['side']) == ['']
+
+
+class _LoggingStrategy(SMAStrategy):
+    def next(self):
+        if not self.journal.count:
+            self.log('explicit date', date(2020, 1, 2))
+            self.log('value {:.1f}', args=(1.25,))
+
+
+def test_strategy_journal_exports_to_parquet(tmp_path):
+    cerebro = bt.Cerebro()
+    cerebro.broker.set_coc(True)
+    cerebro.broker.setcash(100000.0)
+    cerebro.addstrategy(SMAStrategy, verbose_logging=False)
+    cerebro.adddata(DataManager().create_backtrader_feed(pd.read_parquet(SPY_PATH), 'SPY'), name='SPY')
+    strat = cerebro.run()[0]
+
+    output = tmp_path / 'journal.parquet'
+    strat.journal.to_parquet(str(output))
+    frame = pd.read_parquet(output)
+
+    # Free-form log messages are skipped when verbose logging is off
+    assert 'MESSAGE' not in set(frame['event'])
+    assert (frame['event'] == 'TRADE_CLOSED').sum() > 0
+    assert set(frame['symbol']) == {'SPY'}
+
+
+def test_log_takes_the_date_positionally():
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(_LoggingStrategy, verbose_logging=True)
+    cerebro.adddata(DataManager().create_backtrader_feed(pd.read_parquet(SPY_PATH).iloc[:40], 'SPY'), name='SPY')
+    strat = cerebro.run()[0]
+
+    first, second = strat.journal.render()[:2]
+    assert first == '2020-01-02 explicit date'
+    assert second.endswith(' value 1.2') and not second.startswith('2020-01-02')
@@ -0,0 +1,104 @@
+"""Tests for the live daemon on replayed bars (no API calls)."""
+import asyncio
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.brokers.alpaca_broker import MARKET_TIMEZONE
+from src.data_loaders.bar_stream import BarUpdate, ReplayBarStream
+from src.runners.daemon import LiveDaemon
+from src.runners.live import LiveRunner
+from src.utils.rate_limit import RateLimiter
+from tests.live_fakes import FakeBroker, FakeDataManager, strategy_config
+
+
+SESSION = date(2024, 1, 2)
+
+
+def bar(symbol, clock, low, high, close, volume=100.0):
+    timestamp = datetime.combine(SESSION, datetime.strptime(clock, '%H:%M').time(), MARKET_TIMEZONE)
+    return BarUpdate(symbol, timestamp.astimezone(timezone.utc), low, high, low, close, volume)
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setenv('ALPACA_API_KEY', 'test')
+    monkeypatch.setenv('ALPACA_SECRET_KEY', 'test')
+    runner = LiveRunner()
+    runner.data_manager = FakeDataManager()
+    runner.rate_limiter = RateLimiter(per_minute=60000)
+    return runner
+
+
+def run_daemon(runner, bars, **settings):
+    daemon = LiveDaemon(runner, ReplayBarStream(bars), strategies=[strategy_config(['T0', 'T1'])], **settings)
+    asyncio.run(daemon.run())
+    return daemon
+
+
+def test_daemon_trails_stops_and_acts_at_the_close(runner):
+    # Holds T1 (entered at 100); the session closes early
+    runner.broker = FakeBroker(held={'T1'}, close='13:00')
+    daemon = run_daemon(runner, [
+        bar('T0', '08:00', 90.0, 91.0, 90.5),  # Pre-market, not part of the day
+        bar('T0', '09:30', 100.0, 100.5, 100.2),
+        # T1 (entered at 100) rises: its stop trails to 110 * 0.99
+        bar('T1', '09:30', 109.5, 110.0, 109.8),
+        bar('T1', '10:00', 108.5, 109.6, 108.6),
+        bar('T0', '12:59', 100.1, 101.0, 101.0),
+        bar('T1', '12:59', 107.5, 108.2, 108.0),
+    ])
+
+    # Sold on the bar through 108.90, once
+    assert [execution['ticker'] for execution in daemon.exits] == ['T1']
+    assert daemon.exits[0]['latency_ms'] >= 0
+    assert runner.broker.requests[0].client_order_id == 'AlwaysSignalStrategy-T1-stop-2024-01-02'
+
+    # At the early close, both are flat and bought from the day's bar in
+    # memory: history was only fetched when the session started
+    assert sorted(runner.data_manager.fetches) == ['T0', 'T1']
+    assert runner.broker.orders == [('T1', 'sell', 10), ('T0', 'buy', int(10000 / 101.0)),
+                                    ('T1', 'buy', int(9000 / 108.0))]
+    [results] = daemon.results
+    assert [signal['price'] for signal in results['signals']] == [101.0, 108.0]
+    assert results['signals'][0]['timestamp'] == '2024-01-02T05:00:00+00:00'
+    assert results['errors'] == [] and results['latency_ms'] >= 0
+    day_bar = daemon.history[('AlwaysSignal', 'T0')].iloc[-1]
+    assert day_bar.tolist() == [100.0, 101.0, 100.0, 101.0, 200.0]
+
+
+def test_broker_stop_covers_a_fixed_level(runner):
+    runner.broker = FakeBroker(held={'T1'}, stops={'T1'}, stop_price=99.0, close='13:00')
+    daemon = run_daemon(runner, [
+        bar('T1', '09:30', 98.0, 100.5, 98.5),
+        bar('T0', '12:59', 100.0, 100.0, 100.0),
+        bar('T1', '12:59', 98.0, 98.5, 98.2),
+    ], trail_stops=False)
+
+    # The broker's stop exits at 99, so the daemon leaves it; the sell signal
+    # at the close cancels it first
+    assert daemon.exits == []
+    assert runner.broker.orders[0] == ('T1', 'sell', 10)
+    assert runner.broker.canceled == ['stop-T1']
+
+
+def test_slow_history_refresh_does_not_block_the_bars(runner):
+    runner.broker = FakeBroker(held={'T1'}, close='13:00')
+    runner.data_manager = FakeDataManager(delays={'T1': 1.0})
+    daemon = run_daemon(runner, [
+        bar('T1', '09:30', 98.0, 100.5, 98.5),
+        bar('T0', '12:59', 100.0, 101.0, 101.0),
+        bar('T1', '12:59', 98.0, 98.5, 98.2),
+    ], close_wait=0.1)
+
+    # The stop is handled while T1's history is still being fetched
+    assert [execution['ticker'] for execution in daemon.exits] == ['T1']
+    # At the close, only T1 (history not in yet) is skipped
+    [results] = daemon.results
+    assert [signal['ticker'] for signal in results['signals']] == ['T0']
+    assert results['errors'] == [{'ticker': 'T1', 'error': 'history refresh pending'}]
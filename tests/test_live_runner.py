@@ -0,0 +1,299 @@
+"""Tests for the live runner's ticker pipeline (no API calls)."""
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import backtrader as bt
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_loaders.data_manager import DataManager
+from src.brokers.types import OrderType, OTOOrder, StopOrder, TimeInForce
+from src.runners.live import LiveRunner, signal_parity
+from src.strategies.allocation import BatchAllocator
+from src.strategies.example_sma import SMAStrategy
+from src.utils.fanout import ProcessPoolTransport, open_transport
+from src.utils.rate_limit import RateLimiter
+from src.utils.state_store import DirectoryStateStore
+from tests.live_fakes import SPY_PATH, FakeBroker, FakeDataManager, strategy_config
+
+
+FETCH_SECONDS = 0.05
+
+# Runner of the forked shard workers, set by the fan-out test
+WORKER_RUNNER = None
+
+
+def evaluate_in_worker(payload):
+    if 'T6' in payload['strategy']['params']['tickers']:
+        raise RuntimeError('worker crashed')
+    return WORKER_RUNNER.evaluate_shard(payload)
+
+
+@pytest.fixture
+def runner(monkeypatch):
+    monkeypatch.setenv('ALPACA_API_KEY', 'test')
+    monkeypatch.setenv('ALPACA_SECRET_KEY', 'test')
+    runner = LiveRunner()
+    runner.data_manager = FakeDataManager(delay=FETCH_SECONDS)
+    runner.broker = FakeBroker(held={'T1', 'T3'}, buying={'T5'}, stops={'T1'})
+    runner.workers = 4
+    runner.rate_limiter = RateLimiter(per_minute=60000)
+    return runner
+
+
+def test_tickers_are_processed_concurrently(runner):
+    tickers = [f'T{i}' for i in range(8)] + ['BAD']
+    snapshot = runner.take_snapshot()
+    results = runner.run_strategy(strategy_config(tickers), snapshot=snapshot)
+
+    assert runner.data_manager.max_active > 1
+    assert runner.broker.snapshots == 1
+
+    # T5 already has a buy order working
+    traded = [ticker for ticker in tickers[:-1] if ticker != 'T5']
+    assert sorted(signal['ticker'] for signal in results['signals']) == traded
+    # Sells first, then the buys allocated 10% of the remaining cash each:
+    # with T5 pending, max_positions (5) leaves no slot for T7
+    price = float(runner.data_manager.df['close'].iloc[-1])
+    quantities = []
+    cash = 100000.0
+    for _ in range(4):
+        quantities.append(int(cash * 0.1 / price))
+        cash -= quantities[-1] * price
+    assert runner.broker.orders == [('T1', 'sell', 10), ('T3', 'sell', 10)] + [
+        (ticker, 'buy', qty) for ticker, qty in zip(['T0', 'T2', 'T4', 'T6'], quantities)
+    ]
+    assert [signal['quantity'] for signal in results['signals'] if signal['ticker'] == 'T7'] == [0]
+    assert results['errors'] == [{'ticker': 'BAD', 'error': 'no data'}]
+    assert results['skipped'] == []
+    # Entries carry their stop (trailing_stop_percent 1%) in the same request;
+    # T1's stop was canceled before selling
+    entry = runner.broker.requests[2]
+    assert isinstance(entry, OTOOrder) and entry.stop.stop_price == round(price * 0.99, 2)
+    assert runner.broker.canceled == ['stop-T1']
+    assert len(runner.journal) == 17
+
+    # Submitted orders update the snapshot
+    assert snapshot.positions == {}
+    assert snapshot.account.cash == pytest.approx(100000.0 - sum(quantities) * price)
+    assert len(snapshot.orders_for('T0')) == 1
+
+
+def test_deadline_skips_remaining_tickers(runner):
+    results = runner.run_strategy(strategy_config(['T0', 'T1']), deadline=time.monotonic())
+
+    assert results['skipped'] == ['T0', 'T1']
+    assert results['signals'] == [] and runner.broker.orders == []
+
+
+def test_shards_are_evaluated_by_workers(runner, monkeypatch):
+    monkeypatch.setattr(sys.modules[__name__], 'WORKER_RUNNER', runner)
+    runner.live_config = {**runner.live_config, 'shard_size': 3}
+    tickers = [f'T{i}' for i in range(8)] + ['BAD']
+    transport = ProcessPoolTransport(workers=2, worker=evaluate_in_worker)
+
+    results = runner.run_strategy(strategy_config(tickers), transport=transport)
+
+    # Orders are submitted here, from one snapshot (T5 already has a buy working)
+    assert runner.broker.snapshots == 1
+    traded = ['T0', 'T1', 'T2', 'T3', 'T4']
+    assert sorted(signal['ticker'] for signal in results['signals']) == traded
+    assert sorted(symbol for symbol, _, _ in runner.broker.orders) == traded
+    # The shard of T6 failed as a whole
+    assert sorted(error['ticker'] for error in results['errors']) == ['BAD', 'T6', 'T7']
+    assert results['skipped'] == []
+
+
+def test_queued_shards_keep_the_coordinators_deadline(runner):
+    # A shard that waited for a worker past the deadline starts no tickers
+    payload = {'strategy': strategy_config(['T0', 'T1']), 'deadline_at': time.time() - 1}
+    assert runner.evaluate_shard(payload)['skipped'] == ['T0', 'T1']
+
+    payload['deadline_at'] = time.time() + 60
+    assert runner.evaluate_shard(payload)['skipped'] == []
+
+
+def test_lambda_fanout_needs_a_shared_state_store():
+    config = {'fanout': 'lambda', 'fanout_function': 'live', 'state_path': '/tmp/live-state'}
+    with pytest.raises(ValueError, match='s3://'):
+        open_transport(config)
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(per_minute=600, burst=1)
+    start = time.monotonic()
+    for _ in range(4):
+        assert limiter.acquire()
+    assert time.monotonic() - start >= 0.29
+
+    # The next token is 0.1s away
+    assert not limiter.acquire(deadline=time.monotonic() + 0.01)
+    assert limiter.acquire(deadline=time.monotonic() + 0.5)
+
+
+def test_allocator_ranks_and_limits_candidates():
+    allocator = BatchAllocator(max_positions=3, position_percent=0.5)
+    prices = [10.0, 20.0, 6000.0, 40.0]
+    scores = [0.1, 0.3, 0.5, 0.2]
+
+    # Ranked C, B, D, A: C buys no share and takes no slot, B and D get
+    # half of the cash left (5000, then 2520), A finds no slot left
+    shares = allocator.allocate(prices, cash=10000.0, buying_power=20000.0, open_positions=1, scores=scores)
+    assert shares.tolist() == [0, 250, 0, 62]
+
+    # Buying power below cash is what limits the batch
+    assert allocator.allocate([10.0], cash=10000.0, buying_power=1000.0).tolist() == [50]
+    assert not allocator.allocate(prices, cash=10000.0, open_positions=3).any()
+
+    # One candidate sizes like the backtest: int(cash * position_percent / price)
+    assert BatchAllocator(position_percent=0.3).allocate([123.45], 98765.0)[0] == int(98765.0 * 0.3 / 123.45)
+
+
+def test_allocator_skips_unaffordable_candidates():
+    # The top-ranked candidate costs more than the cash: the next one is
+    # funded from all of it
+    allocator = BatchAllocator(max_positions=5, position_percent=1.0)
+    assert allocator.allocate([200000.0, 20.0], cash=100000.0, scores=[1, 0]).tolist() == [0, 5000]
+    assert BatchAllocator(position_percent=0.5).allocate([200000.0, 20.0], cash=100000.0,
+                                                         scores=[1, 0]).tolist() == [0, 2500]
+
+    # With position_percent 1.0, what one position leaves funds the next slots
+    shares = allocator.allocate([200000.0, 30.0, 7.0, 3.0], cash=100.0)
+    assert shares.tolist() == [0, 3, 1, 1]
+
+
+def test_margin_position_percent_still_backtests():
+    # Above 1 sizes on margin like the backtest always did; only the top
+    # candidate of a batch is funded
+    assert BatchAllocator(position_percent=1.5).allocate([100.0, 50.0], cash=1000.0).tolist() == [15, 0]
+    with pytest.raises(ValueError):
+        BatchAllocator(position_percent=0.0)
+
+    cerebro = bt.Cerebro()
+    cerebro.addstrategy(SMAStrategy, verbose_logging=False, position_percent=1.5)
+    cerebro.adddata(DataManager().create_backtrader_feed(pd.read_parquet(SPY_PATH), 'SPY'), name='SPY')
+    strat = cerebro.run()[0]
+    price = strat.datas[0].close[0]
+    assert strat.get_position_size() == int(cerebro.broker.getcash() * 1.5 / price)
+
+
+@pytest.mark.parametrize('rejects', [{OrderType.MARKET}, {OrderType.MARKET, OrderType.STOP}])
+def test_failed_sell_puts_the_stop_back(runner, tmp_path, rejects):
+    runner.broker = FakeBroker(held={'T1'}, stops={'T1'}, stop_price=90.0, rejects=rejects)
+    runner.state_store = DirectoryStateStore(tmp_path)
+    results = runner.run_strategy(strategy_config(['T1']))
+
+    # The stop was canceled for the sell, then placed again once it failed
+    assert runner.broker.canceled == ['stop-T1']
+    sell, stop = runner.broker.requests
+    assert sell.order_type == OrderType.MARKET
+    assert isinstance(stop, StopOrder) and stop.stop_price == 90.0 and stop.qty == 10
+    assert stop.time_in_force == TimeInForce.GTC
+
+    [execution] = results['executions']
+    assert execution['error'] == 'rejected'
+    restored = OrderType.STOP not in rejects
+    assert execution.get('stop_canceled', False) is not restored
+    position = runner.state_store.load('AlwaysSignalStrategy/T1').position
+    assert position['qty'] == 10 and position['trailing_stop_set'] is restored
+
+
+@pytest.mark.parametrize('max_positions, bought', [(5, ['T4', 'T5']), (4, ['T4'])])
+def test_failed_sell_drops_buys_only_over_max_positions(runner, max_positions, bought):
+    runner.live_config = {**runner.live_config, 'max_positions': max_positions}
+    runner.broker = FakeBroker(held={'T1', 'T2', 'T3'}, rejects={'T1'})
+    results = runner.run_strategy(strategy_config(['T1', 'T4', 'T5']))
+
+    # T1 still holds its slot next to T2 and T3
+    assert [execution['ticker'] for execution in results['executions'] if 'error' in execution] == ['T1']
+    assert sorted(symbol for symbol, side, _ in runner.broker.orders if side == 'buy') == bought
+
+
+def test_compute_signals_match_backtrader():
+    df = pd.read_parquet(SPY_PATH).iloc[-100:]
+    params = {'fast_period': 5, 'slow_period': 20, 'verbose_logging': False}
+    assert signal_parity(SMAStrategy, params, df, window=40) == []
+
+
+def test_state_is_saved_and_resumed(runner, tmp_path):
+    runner.state_store = DirectoryStateStore(tmp_path)
+    config = strategy_config(['T0', 'T1'])
+
+    runner.run_strategy(config)
+    assert runner.data_manager.cached == {'T0': None, 'T1': None}
+    saved = runner.state_store.load('AlwaysSignalStrategy/T0')
+    assert saved.bars.equals(runner.data_manager.df)
+    assert saved.position['qty'] > 0 and saved.position['trailing_stop_set']
+    # T1 was sold
+    assert runner.state_store.load('AlwaysSignalStrategy/T1').position is None
+
+    runner.run_strategy(config)
+    assert runner.data_manager.cached['T0'].equals(runner.data_manager.df)
+
+    # A different lookback starts cold
+    runner.run_strategy({**config, 'params': {**config['params'], 'lookback_days': 60}})
+    assert runner.data_manager.cached == {'T0': None, 'T1': None}
+
+
+def test_live_data_fetches_only_new_bars():
+    full = pd.read_parquet(SPY_PATH).iloc[-40:]
+    starts = []
+
+    def fetch(ticker, start_date, end_date, timeframe):
+        starts.append(start_date)
+        return full[full.index >= start_date]
+
+    manager = DataManager()
+    manager._fetch_from_alpaca = fetch
+    days_back = (datetime.now(timezone.utc) - full.index[0]).days - 9
+
+    # The last cached bar was incomplete and is replaced
+    cached = full.iloc[:-5].copy()
+    cached.iloc[-1, cached.columns.get_loc('close')] += 1.0
+    assert manager.get_data_for_live('SPY', days_back, cached=cached).equals(full)
+    assert starts == [full.index[-7]]
+
+    # Revised history: the full window is fetched again
+    cached.iloc[-2, cached.columns.get_loc('close')] += 1.0
+    assert manager.get_data_for_live('SPY', days_back, cached=cached).equals(full)
+    assert starts[-1] < full.index[0]
+
+
+def test_lambda_reuses_the_runner(monkeypatch):
+    from src import lambda_handler
+
+    monkeypatch.setenv('ALPACA_API_KEY', 'test')
+    monkeypatch.setenv('ALPACA_SECRET_KEY', 'test')
+    monkeypatch.setattr(lambda_handler, '_runner', None)
+    context = SimpleNamespace(function_name='test', request_id='test',
+                              get_remaining_time_in_millis=lambda: 60000)
+
+    first = lambda_handler.lambda_handler({'warmup': True}, context)
+    runner = lambda_handler.get_runner()
+    second = lambda_handler.lambda_handler({'warmup': True}, context)
+
+    assert first['body']['cold_start'] and not second['body']['cold_start']
+    assert lambda_handler.get_runner() is runner
+
+
+def test_live_imports_skip_the_optimizer():
+    # A fresh interpreter, as on a Lambda cold start. pandas itself imports
+    # core pyarrow, but not the parquet/filesystem modules.
+    code = ('import sys, src.runners.live; '
+            'print(" ".join(sorted(m for m in sys.modules if m.startswith(("src.optimization", "pyarrow.")))))')
+    env = dict(os.environ, ALPACA_API_KEY='test', ALPACA_SECRET_KEY='test')
+    result = subprocess.run([sys.executable, '-c', code], cwd=Path(__file__).parent.parent,
+                            env=env, capture_output=True, text=True, check=True)
+
+    loaded = result.stdout.split()
+    assert not [module for module in loaded if module.startswith('src.optimization')]
+    for module in ('pyarrow.parquet', 'pyarrow.fs'):
+        assert module not in loaded
@@ -0,0 +1,72 @@
+"""Tests for the portfolio recorder and vectorized metrics.
+
+The metrics computed from ``PortfolioRecorder`` arrays must report the same
+numbers as the backtrader analyzers they replace.
+"""
+import sys
+from pathlib import Path
+
+import backtrader as bt
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics import PortfolioRecorder, compute_metrics
+from src.data_loaders.data_manager import DataManager
+from src.strategies.example_sma import SMAStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+INITIAL_CASH = 100000.0
+
+
+def _multi_year(df, years):
+    """Chain copies of a year of bars into a continuous multi-year series."""
+    growth = df['close'].iloc[-1] / df['close'].iloc[0]
+    copies = []
+    for year in range(years):
+        copy = df.copy()
+        # 52 weeks later, so bars stay on weekdays
+        copy.index = copy.index + pd.Timedelta(weeks=52 * (year - years + 1))
+        copy[['open', 'high', 'low', 'close']] *= growth ** year
+        copies.append(copy)
+    return pd.concat(copies)
+
+
+@pytest.mark.parametrize('cerebro_kwargs', [{}, {'preload': False, 'runonce': False}])
+def test_metrics_match_backtrader_analyzers(cerebro_kwargs):
+    # Several years: the (annual) Sharpe ratio needs more than one year
+    df = _multi_year(pd.read_parquet(SPY_PATH), 4)
+
+    cerebro = bt.Cerebro(**cerebro_kwargs)
+    cerebro.broker.set_coc(True)
+    cerebro.broker.setcash(INITIAL_CASH)
+    cerebro.broker.setcommission(commission=0.001)
+    cerebro.addstrategy(SMAStrategy, verbose_logging=False, fast_period=5, slow_period=20)
+    cerebro.adddata(DataManager().create_backtrader_feed(df, 'SPY'), name='SPY')
+
+    cerebro.addanalyzer(bt.analyzers.Returns, _name='returns')
+    cerebro.addanalyzer(bt.analyzers.SharpeRatio, _name='sharpe')
+    cerebro.addanalyzer(bt.analyzers.DrawDown, _name='drawdown')
+    cerebro.addanalyzer(bt.analyzers.TradeAnalyzer, _name='trades')
+    cerebro.addanalyzer(PortfolioRecorder, _name='recorder')
+
+    strat = cerebro.run()[0]
+    metrics = compute_metrics(strat.analyzers.recorder.get_analysis(), INITIAL_CASH)
+
+    assert metrics['final_value'] == pytest.approx(cerebro.broker.getvalue())
+    assert metrics['returns'] == pytest.approx(dict(strat.analyzers.returns.get_analysis()))
+    assert metrics['sharpe_ratio'] is not None
+    assert metrics['sharpe_ratio'] == strat.analyzers.sharpe.get_analysis()['sharperatio']
+    assert metrics['max_drawdown'] == pytest.approx(
+        strat.analyzers.drawdown.get_analysis()['max']['drawdown']
+    )
+
+    trades = strat.analyzers.trades.get_analysis()
+    assert metrics['trades']['total'] == dict(trades['total'])
+    assert metrics['won_trades'] == trades.won.total
+    assert metrics['lost_trades'] == trades.lost.total
+    assert metrics['trades']['pnl']['net']['total'] == pytest.approx(trades.pnl.net.total)
+    assert 0.0 < metrics['exposure'] < 1.0
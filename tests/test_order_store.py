@@ -0,0 +1,121 @@
+"""Tests for the order-state store and trade update consumer (no API calls)."""
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+from alpaca.trading.enums import OrderSide as AlpacaOrderSide, OrderStatus as AlpacaOrderStatus
+from alpaca.trading.enums import OrderType as AlpacaOrderType
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.brokers import (
+    AlpacaBroker, MarketOrder, OrderEvent, OrderSide, OrderStatus, OrderStore,
+    ReplayTradeUpdates, TradeUpdateConsumer,
+)
+from src.brokers.types import Order
+
+
+SUBMITTED = datetime(2024, 3, 1, 20, 59, tzinfo=timezone.utc)
+
+
+def alpaca_order(client_order_id, status=AlpacaOrderStatus.NEW, filled_qty=0, price=None):
+    return SimpleNamespace(
+        id=f'id-{client_order_id}', client_order_id=client_order_id, symbol='SPY', qty='10',
+        side=AlpacaOrderSide.BUY, type=AlpacaOrderType.MARKET, status=status,
+        filled_qty=str(filled_qty), filled_avg_price=price, limit_price=None, stop_price=None,
+        trail_percent=None, trail_price=None, submitted_at=SUBMITTED, filled_at=None,
+        canceled_at=None, expired_at=None, failed_at=None,
+    )
+
+
+class FakeTradingClient:
+    def __init__(self):
+        self.submitted = {}
+        self.lookups = 0
+
+    def submit_order(self, request):
+        if request.client_order_id in self.submitted:
+            raise Exception('{"code":40010001,"message":"client_order_id must be unique"}')
+        if request.qty > 100:
+            raise Exception('insufficient buying power')
+        self.submitted[request.client_order_id] = alpaca_order(request.client_order_id)
+        return self.submitted[request.client_order_id]
+
+    def get_order_by_client_id(self, client_order_id):
+        return self.submitted[client_order_id]
+
+    def get_order_by_id(self, order_id):
+        self.lookups += 1
+        return next(order for order in self.submitted.values() if order.id == order_id)
+
+
+def make_broker(store):
+    broker = AlpacaBroker('test', 'test', paper=True, order_store=store)
+    broker.client = FakeTradingClient()
+    return broker
+
+
+def buy(client_order_id, qty=10):
+    order = MarketOrder(symbol='SPY', qty=qty, side=OrderSide.BUY)
+    order.client_order_id = client_order_id
+    return order
+
+
+def event(name, order: Order, seconds, **fill):
+    return OrderEvent(event=name, order=order, timestamp=SUBMITTED + timedelta(seconds=seconds), **fill)
+
+
+def test_submissions_are_idempotent(tmp_path):
+    with OrderStore(tmp_path / 'orders.db') as store:
+        broker = make_broker(store)
+
+        first = broker.submit_order(buy('SMA-SPY-buy-2024-03-01'))
+        again = broker.submit_order(buy('SMA-SPY-buy-2024-03-01'))
+        assert first.success and again.success
+        assert again.order_id == first.order_id
+        assert len(broker.client.submitted) == 1
+
+        # Submitted but never recorded (e.g. a crash in between)
+        broker.order_store = None
+        broker.submit_order(buy('SMA-SPY-buy-2024-03-04'))
+        broker.order_store = store
+        retried = broker.submit_order(buy('SMA-SPY-buy-2024-03-04'))
+        assert retried.success and store.by_client_id('SMA-SPY-buy-2024-03-04').id == retried.order_id
+
+        rejected = broker.submit_order(buy('SMA-SPY-buy-2024-03-05', qty=1000))
+        assert not rejected.success
+        assert store.by_client_id('SMA-SPY-buy-2024-03-05') is None
+        assert store.orders()['error'].notna().sum() == 1
+
+
+def test_trade_updates_drive_order_state(tmp_path):
+    with OrderStore(tmp_path / 'orders.db') as store:
+        broker = make_broker(store)
+        order = broker.submit_order(buy('SMA-SPY-buy-2024-03-01')).order
+
+        partial = Order.from_alpaca(alpaca_order(order.client_order_id, AlpacaOrderStatus.PARTIALLY_FILLED, 4, '500.0'))
+        filled = Order.from_alpaca(alpaca_order(order.client_order_id, AlpacaOrderStatus.FILLED, 10, '500.2'))
+        events = [
+            event('partial_fill', partial, 1, price=500.0, qty=4.0, execution_id='e1'),
+            event('fill', filled, 2, price=500.33, qty=6.0, execution_id='e2'),
+            # Redelivered, and an older state arriving late
+            event('fill', filled, 2, price=500.33, qty=6.0, execution_id='e2'),
+            event('new', order, 0, execution_id='e0'),
+        ]
+        consumer = TradeUpdateConsumer(store)
+        ReplayTradeUpdates(events).run(consumer)
+
+        assert consumer.events == 4
+        assert store.fills()['qty'].tolist() == [4.0, 6.0]
+        assert store.open_orders() == []
+
+        # Final orders are read from the store, without an API call
+        recorded = broker.get_order(order.id)
+        assert recorded.status == OrderStatus.FILLED and recorded.filled_qty == 10
+        assert broker.client.lookups == 0
+
+        # A submission response processed after its fill does not undo it
+        store.save(order)
+        assert store.get(order.id).status == OrderStatus.FILLED
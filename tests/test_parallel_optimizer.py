@@ -0,0 +1,182 @@
+"""Tests for the shared-memory parallel optimizer."""
+import gc
+import sys
+import weakref
+from pathlib import Path
+
+import backtrader as bt
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics import PortfolioRecorder, compute_metrics
+from src.data_loaders.data_manager import DataManager
+from src.optimization import ParallelOptimizer, evaluate_batch, frame_to_arrays
+from src.optimization.evaluation import COLLECT_EVERY
+from src.strategies.example_sma import SMAStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+INITIAL_CASH = 100000.0
+COMMISSION = 0.001
+COMBOS = [
+    {'fast_period': fast, 'slow_period': slow}
+    for fast in (5, 10, 15) for slow in (20, 30)
+]
+
+
+def _pandas_backtest(df, **params):
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.broker.set_coc(True)
+    cerebro.broker.setcash(INITIAL_CASH)
+    cerebro.broker.setcommission(commission=COMMISSION)
+    cerebro.addstrategy(SMAStrategy, verbose_logging=False, **params)
+    cerebro.adddata(DataManager().create_backtrader_feed(df, 'SPY'), name='SPY')
+    cerebro.addanalyzer(PortfolioRecorder, _name='recorder')
+    strat = cerebro.run()[0]
+    return compute_metrics(strat.analyzers.recorder.get_analysis(), INITIAL_CASH)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_records_match_pandas_feed_backtests(workers):
+    df = pd.read_parquet(SPY_PATH)
+
+    with ParallelOptimizer(SMAStrategy, {'SPY': df}, INITIAL_CASH, COMMISSION,
+                           fixed_params={'verbose_logging': False, 'indicator_cache': True},
+                           workers=workers, batch_size=2) as optimizer:
+        records = optimizer.evaluate(COMBOS)
+
+    assert len(records) == len(COMBOS)
+    for record in records:
+        expected = _pandas_backtest(df, **record['params'])
+        assert record['final_value'] == expected['final_value']
+        assert record['max_drawdown'] == expected['max_drawdown']
+        assert record['total_trades'] == expected['total_trades']
+        # Only compact scalar records are returned by default
+        assert 'trade_pnl' not in record
+
+
+def test_window_matches_backtest_on_sliced_data():
+    df = pd.read_parquet(SPY_PATH)
+    combo = COMBOS[0]
+
+    with ParallelOptimizer(SMAStrategy, {'SPY': df}, INITIAL_CASH, COMMISSION,
+                           fixed_params={'verbose_logging': False}, workers=1) as optimizer:
+        record, = optimizer.evaluate([combo], window=optimizer.trailing_window(0.5))
+
+    start, end = df.index[0], df.index[-1]
+    expected = _pandas_backtest(df[df.index >= end - (end - start) * 0.5], **combo)
+    assert record['final_value'] == pytest.approx(expected['final_value'])
+    assert record['total_trades'] == expected['total_trades']
+
+
+def test_pruning_keeps_the_top_results():
+    df = pd.read_parquet(SPY_PATH)
+    settings = dict(fixed_params={'verbose_logging': False}, workers=1, batch_size=1)
+
+    with ParallelOptimizer(SMAStrategy, {'SPY': df}, INITIAL_CASH, COMMISSION, **settings) as optimizer:
+        full = optimizer.evaluate(COMBOS)
+    with ParallelOptimizer(SMAStrategy, {'SPY': df}, INITIAL_CASH, COMMISSION,
+                           pruning={'max_drawdown': 50.0, 'top_n': 2}, **settings) as optimizer:
+        pruned = optimizer.evaluate(COMBOS)
+
+    best = sorted(full, key=lambda record: record['final_value'], reverse=True)[:2]
+    kept = {tuple(sorted(r['params'].items())): r for r in pruned if not r['pruned']}
+    for record in best:
+        assert kept[tuple(sorted(record['params'].items()))]['final_value'] == record['final_value']
+    assert all(r['pruned'] in (None, 'drawdown', 'top_n') for r in pruned)
+
+
+def test_drawdown_limit_stops_run():
+    df = pd.read_parquet(SPY_PATH)
+
+    with ParallelOptimizer(SMAStrategy, {'SPY': df}, INITIAL_CASH, COMMISSION,
+                           fixed_params={'verbose_logging': False}, workers=1,
+                           pruning={'max_drawdown': 0.1}) as optimizer:
+        records = optimizer.evaluate(COMBOS[:2])
+
+    assert [record['pruned'] for record in records] == ['drawdown', 'drawdown']
+
+
+class BuyAndHoldStrategy(bt.Strategy):
+    """Buys on the first bar and holds."""
+    long_only = True
+
+    def next(self):
+        if not self.position:
+            self.buy(size=10)
+
+
+class ShortAndHoldStrategy(bt.Strategy):
+    """Sells short on the first bar and holds."""
+
+    def next(self):
+        if not self.position:
+            self.sell(size=10)
+
+
+def test_top_n_bound_applies_only_to_long_only_strategies():
+    datas = [('SPY', frame_to_arrays(pd.read_parquet(SPY_PATH).iloc[-250:]))]
+    # A threshold no run can reach: the long-only bound prunes the long run
+    # at once, but a short position can gain on falling prices
+    pruning = {'min_final_value': INITIAL_CASH * 100}
+
+    [long_run] = evaluate_batch(BuyAndHoldStrategy, [{}], datas, INITIAL_CASH, COMMISSION, pruning=pruning)
+    [short_run] = evaluate_batch(ShortAndHoldStrategy, [{}], datas, INITIAL_CASH, COMMISSION, pruning=pruning)
+
+    assert long_run['pruned'] == 'top_n'
+    assert short_run['pruned'] is None
+
+
+class ParamsRecordingStrategy(bt.Strategy):
+    """Records the params of every run."""
+    params = (('a', 0), ('b', 0))
+    runs = []
+
+    def __init__(self):
+        ParamsRecordingStrategy.runs.append({'a': self.p.a, 'b': self.p.b})
+
+
+def test_batch_runs_each_combination_alone():
+    # Guards the backtrader internals evaluate_batch relies on (explicit
+    # combinations through Cerebro.strats/_dooptimize)
+    datas = [('SPY', frame_to_arrays(pd.read_parquet(SPY_PATH).iloc[-20:]))]
+    combos = [{'a': 1, 'b': 2}, {'a': 1, 'b': 3}, {'a': 4, 'b': 2}]
+
+    records = evaluate_batch(ParamsRecordingStrategy, combos, datas, INITIAL_CASH, COMMISSION)
+
+    assert ParamsRecordingStrategy.runs == combos
+    assert [record['params'] for record in records] == combos
+
+
+class TrackedSMAStrategy(SMAStrategy):
+    """Records how many strategy instances are alive when each run starts."""
+    alive = weakref.WeakSet()
+    peak = 0
+
+    def __init__(self):
+        super().__init__()
+        TrackedSMAStrategy.alive.add(self)
+        TrackedSMAStrategy.peak = max(TrackedSMAStrategy.peak, len(TrackedSMAStrategy.alive))
+
+
+def test_batch_memory_stays_flat():
+    datas = [('SPY', frame_to_arrays(pd.read_parquet(SPY_PATH).iloc[-250:]))]
+    combos = [{'fast_period': fast, 'slow_period': 30} for fast in range(2, 26)]
+
+    # Without automatic collections, only the batch's own collections free
+    # the finished runs' strategies (kept alive by reference cycles)
+    gc.disable()
+    try:
+        records = evaluate_batch(TrackedSMAStrategy, combos, datas, INITIAL_CASH, COMMISSION,
+                                 fixed_params={'verbose_logging': False})
+    finally:
+        gc.enable()
+
+    assert [record['params'] for record in records] == combos
+    assert all(record['final_value'] > 0 for record in records)
+    assert TrackedSMAStrategy.peak <= COLLECT_EVERY + 1
+    gc.collect()
+    assert len(TrackedSMAStrategy.alive) == 0
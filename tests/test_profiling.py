@@ -0,0 +1,131 @@
+"""Tests for the hot-path profiler."""
+import json
+import pstats
+import subprocess
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.strategies.example_sma import SMAStrategy
+from src.utils import profiling
+from src.utils.profiling import HotPathProfiler
+
+
+def _prices():
+    index = pd.date_range('2023-01-02', periods=40, freq='B')
+    close = 100 + np.sin(np.arange(40) / 3) * 5
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': 1000.0}, index=index)
+
+
+def test_disabled_profiler_changes_nothing(tmp_path):
+    profiler = HotPathProfiler(enabled=False)
+    broker = bt.brokers.BackBroker()
+    next_method = broker.next
+
+    assert profiler.instrument_strategy(SMAStrategy) is SMAStrategy
+    assert profiler.instrument_broker(broker).next == next_method
+    assert profiler.wrap('f', len) is len
+    with profiler.section('load'):
+        pass
+    assert profiler.save(str(tmp_path), 'run') is None
+    assert 'load' not in profiler.report()
+
+
+def test_sections_are_timed_per_call_path():
+    profiler = HotPathProfiler()
+    with profiler.section('load'):
+        time.sleep(0.01)
+        for _ in range(3):
+            with profiler.section('parse'):
+                time.sleep(0.001)
+
+    load_calls, load_total, load_self = profiler._paths[('load',)]
+    parse_calls, parse_total, parse_self = profiler._paths[('load', 'parse')]
+    assert (load_calls, parse_calls) == (1, 3)
+    assert parse_total == parse_self >= 3_000_000
+    # Exclusive times add up to the outer section's total
+    assert load_self + parse_total == load_total
+    assert profiler._calls['parse'].count == 3
+
+    report = profiler.report()
+    lines = report.splitlines()
+    assert lines[1] == 'PROFILE REPORT'
+    # Per-name statistics are sorted by total time, the tree is indented
+    assert [line.split()[0] for line in lines[5:7]] == ['load', 'parse']
+    assert any(line.startswith('  parse ') and line.split()[1] == '3' for line in lines)
+
+
+def test_exports_load_back(tmp_path):
+    profiler = HotPathProfiler()
+    with profiler.section('next'):
+        with profiler.section('log'):
+            pass
+    with profiler.section('log'):
+        pass
+
+    paths = profiler.save(str(tmp_path), 'run')
+
+    speedscope = json.loads(paths['speedscope'].read_text())
+    frames = [frame['name'] for frame in speedscope['shared']['frames']]
+    profile = speedscope['profiles'][0]
+    assert [[frames[i] for i in sample] for sample in profile['samples']] == [['log'], ['next'], ['next', 'log']]
+    assert profile['endValue'] == sum(profile['weights'])
+
+    stats = pstats.Stats(str(paths['pstats']))
+    log_key = ('swing-trader', 0, 'log')
+    calls, _, _, cumulative, callers = stats.stats[log_key]
+    assert calls == 2
+    assert list(callers) == [('swing-trader', 0, 'next')]
+    assert stats.total_calls == 3
+    assert cumulative > 0
+
+
+def test_instrumented_strategy_times_callbacks():
+    profiler = HotPathProfiler()
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(bt.feeds.PandasData(dataname=_prices()))
+    cerebro.addstrategy(profiler.instrument_strategy(SMAStrategy), verbose_logging=False,
+                        fast_period=3, slow_period=5)
+    profiler.instrument_broker(cerebro.broker)
+    cerebro.run()
+
+    assert profiler._calls['next'].count > 0
+    assert profiler._calls['broker'].count > 0
+    assert 'bar' in profiler._calls
+
+
+def test_import_times_parses_importtime_output(monkeypatch):
+    stderr = '\n'.join([
+        'import time: self [us] | cumulative | imported package',
+        'import time:       120 |        120 |   _io',
+        'import time:      1500 |       2500 |     src.utils.journal',
+        'some warning',
+        'import time:      1000 |       3500 | src.utils',
+    ])
+    calls = []
+
+    def fake_run(args, **kwargs):
+        calls.append(args)
+        return SimpleNamespace(returncode=0, stderr=stderr)
+
+    monkeypatch.setattr(subprocess, 'run', fake_run)
+    assert profiling.import_times('src.utils') == [
+        ('_io', 0.00012, 0.00012),
+        ('src.utils.journal', 0.0015, 0.0025),
+        ('src.utils', 0.001, 0.0035),
+    ]
+    assert calls[0][1:3] == ['-X', 'importtime']
+
+    report = profiling.import_report('src.utils')
+    assert report.splitlines()[0] == 'Import time of src.utils: 2.6 ms'
+    assert report.splitlines()[2].split()[0] == 'src.utils'
+
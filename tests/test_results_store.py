@@ -0,0 +1,87 @@
+"""Tests for the on-disk optimization results store."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.optimization import ResultsStore, run_fingerprint
+from src.optimization.evaluation import RECORD_METRICS
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+
+
+def _record(fast, slow, total_return, pruned=None):
+    record = {name: 0.0 for name in RECORD_METRICS}
+    record.update(params={'fast_period': fast, 'slow_period': slow},
+                  total_return=total_return, total_trades=3, pruned=pruned)
+    return record
+
+
+def test_fingerprint_depends_on_data_and_window():
+    arrays = np.arange(12, dtype=np.float64).reshape(6, 2)
+    settings = {'initial_cash': 100000.0, 'commission': 0.001, 'fixed_params': {}}
+
+    base = run_fingerprint('SMAStrategy', [('SPY', arrays)], settings)
+    assert base == run_fingerprint('SMAStrategy', [('SPY', arrays.copy())], settings)
+    assert base != run_fingerprint('SMAStrategy', [('SPY', arrays + 1)], settings)
+    assert base != run_fingerprint('SMAStrategy', [('SPY', arrays)], settings, window=(0.0, 1.0))
+
+
+def test_store_resume_and_queries(tmp_path):
+    path = tmp_path / 'results.db'
+    with ResultsStore(path) as store:
+        store.register_run('run', 'SMAStrategy')
+        store.add('run', [_record(5, 20, 0.1), _record(5, 30, 0.3), _record(10, 20, 0.2)])
+        store.add('run', [_record(10, 30, -0.5, pruned='top_n')])
+
+    # Reopened store: completed combinations are found for resuming
+    with ResultsStore(path) as store:
+        done = store.completed('run', [{'fast_period': 5, 'slow_period': 30},
+                                       {'fast_period': 15, 'slow_period': 30}])
+        assert [record['params'] for record in done.values()] == [{'fast_period': 5, 'slow_period': 30}]
+        assert store.completed('other') == {}
+        # Runs stopped early are run again unless asked for
+        assert len(store.completed('run')) == 3
+        assert len(store.completed('run', include_pruned=True)) == 4
+
+        top = store.top(2, 'total_return')
+        assert [record['total_return'] for record in top] == [0.3, 0.2]
+        assert top[0]['total_trades'] == 3
+
+        filtered = store.top(5, filters={'slow_period': 20, 'total_return': ('>', 0.15)})
+        assert [record['params'] for record in filtered] == [{'fast_period': 10, 'slow_period': 20}]
+
+        heatmap = store.heatmap('fast_period', 'slow_period')
+        assert heatmap.loc[30, 5] == 0.3
+        # Runs stopped early are left out
+        assert np.isnan(heatmap.loc[30, 10])
+
+
+def test_resume_reruns_pruned_combinations_when_pruning_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('ALPACA_API_KEY', 'test')
+    monkeypatch.setenv('ALPACA_SECRET_KEY', 'test')
+    from src.runners.optimize import OptimizationRunner
+
+    runner = OptimizationRunner()
+    runner.backtest_config = {'start_date': '2023-01-01', 'end_date': '2023-12-31'}
+    runner._load_frames = lambda tickers, start, end: {'SPY': pd.read_parquet(SPY_PATH)}
+    strategy = {'name': 'SMA', 'module': 'src.strategies.example_sma', 'class': 'SMAStrategy',
+                'params': {'tickers': ['SPY']}}
+    param_ranges = {'fast_period': [5, 10], 'slow_period': [20, 30]}
+    path = tmp_path / 'results.db'
+
+    # A tight drawdown limit stops every combination early
+    runner.optimize_config = {'results_path': str(path), 'workers': 1, 'prune': {'max_drawdown': 0.01}}
+    assert runner.optimize_strategy(strategy, param_ranges) == []
+
+    # Resumed without pruning: the partial results are not taken as done
+    runner.optimize_config = {'results_path': str(path), 'workers': 1}
+    results = runner.optimize_strategy(strategy, param_ranges)
+    assert len(results) == 4
+    with ResultsStore(path) as store:
+        assert store.records(include_pruned=True)['pruned'].isna().all()
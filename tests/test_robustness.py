@@ -0,0 +1,52 @@
+"""Tests for Monte Carlo robustness analysis."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.analytics.metrics import max_drawdown
+from src.analytics.robustness import monte_carlo_returns, monte_carlo_trades, resample_indices
+
+
+INITIAL_CASH = 100000.0
+
+
+@pytest.mark.parametrize('method', ['bootstrap', 'block', 'shuffle'])
+def test_resample_indices_shape_and_range(method):
+    indices = resample_indices(7, 50, method, block_size=3, rng=np.random.default_rng(0))
+
+    assert indices.shape == (50, 7)
+    assert indices.min() >= 0 and indices.max() < 7
+    if method == 'shuffle':
+        assert (np.sort(indices, axis=1) == np.arange(7)).all()
+
+
+def test_observed_metrics_match_original_path():
+    rng = np.random.default_rng(1)
+    pnl = rng.normal(100.0, 1000.0, 200)
+    summary = monte_carlo_trades(pnl, INITIAL_CASH, n_samples=500, seed=2)
+
+    equity = INITIAL_CASH + np.cumsum(pnl)
+    assert summary['final_value']['observed'] == pytest.approx(equity[-1])
+    assert summary['max_drawdown']['observed'] == pytest.approx(
+        max_drawdown(np.concatenate(([INITIAL_CASH], equity)))['drawdown']
+    )
+    assert summary['final_value']['lower'] <= summary['final_value']['median'] <= summary['final_value']['upper']
+
+
+def test_shuffled_returns_keep_final_value():
+    returns = np.random.default_rng(3).normal(0.0005, 0.01, 250)
+    summary = monte_carlo_returns(returns, INITIAL_CASH, n_samples=1000, method='shuffle', seed=4)
+
+    expected = INITIAL_CASH * np.prod(1.0 + returns)
+    assert summary['final_value']['lower'] == pytest.approx(expected)
+    assert summary['final_value']['upper'] == pytest.approx(expected)
+    assert summary['max_drawdown']['lower'] < summary['max_drawdown']['upper']
+
+
+def test_empty_history_returns_none():
+    assert monte_carlo_trades(np.array([]), INITIAL_CASH) is None
@@ -0,0 +1,108 @@
+"""Tests for budgeted optimization search strategies."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.optimization import ParameterSpace, SearchStrategy, SuccessiveHalving, create_search
+from src.optimization.search import sobol_points
+
+
+SPACE = {
+    'fast_period': list(range(2, 22)),
+    'slow_period': list(range(20, 80, 5)),
+    'trailing_stop_percent': [0.02, 0.05, 0.1],
+}
+
+
+def _objective(params):
+    return -((params['fast_period'] - 13) ** 2 + (params['slow_period'] - 40) ** 2 / 25
+             + params['trailing_stop_percent'])
+
+
+class _Evaluator:
+    """Synthetic backtests that record their cost in full-window units."""
+
+    def __init__(self):
+        self.cost = 0.0
+        self.fractions = []
+
+    def __call__(self, combos, fraction):
+        self.cost += len(combos) * fraction
+        self.fractions.append(fraction)
+        return [{'params': combo, 'total_return': _objective(combo)} for combo in combos]
+
+
+def test_sobol_points_match_reference_sequence():
+    points = sobol_points(4, 2)
+    assert points.tolist() == [[0.0, 0.0], [0.5, 0.5], [0.75, 0.25], [0.25, 0.75]]
+
+
+@pytest.mark.parametrize('name', ['random', 'sobol', 'halving', 'tpe'])
+def test_search_respects_budget(name):
+    space = ParameterSpace(SPACE)
+    evaluate = _Evaluator()
+
+    records = create_search(name, budget=0.1, seed=1).search(
+        space, evaluate, lambda record: record['total_return']
+    )
+
+    assert evaluate.cost <= 0.1 * space.size + 1e-9
+    assert records
+    # Returned records are distinct full-window results of valid combinations
+    params = [tuple(sorted(record['params'].items())) for record in records]
+    assert len(set(params)) == len(params)
+    for record in records:
+        assert all(record['params'][name] in values for name, values in SPACE.items())
+
+
+def test_successive_halving_promotes_to_full_window():
+    space = ParameterSpace(SPACE)
+    evaluate = _Evaluator()
+
+    SuccessiveHalving(budget=0.1, seed=1, eta=3, min_fraction=0.25).search(
+        space, evaluate, lambda record: record['total_return']
+    )
+
+    assert evaluate.fractions == [0.25, 0.5, 1.0]
+
+
+def test_tpe_beats_random_sampling_on_smooth_objective():
+    space = ParameterSpace(SPACE)
+    score = lambda record: record['total_return']
+
+    tpe = [max(map(score, create_search('tpe', 0.05, seed).search(space, _Evaluator(), score)))
+           for seed in range(5)]
+    random = [max(map(score, create_search('random', 0.05, seed).search(space, _Evaluator(), score)))
+              for seed in range(5)]
+
+    assert np.mean(tpe) > np.mean(random)
+
+
+def test_parameter_space_prunes_invalid_and_equivalent_combinations():
+    space = ParameterSpace(
+        {'fast_period': [5, 10, 20], 'slow_period': [10, 20], 'trailing_stop_percent': [0.0, 0.02]},
+        constraints=(lambda p: p['fast_period'] < p['slow_period'],),
+        # Without a stop the slow period is irrelevant in this toy rule
+        equivalence=lambda p: p if p['trailing_stop_percent'] else {**p, 'slow_period': None},
+    )
+
+    assert space.grid_size == 12
+    assert space.invalid == 6
+    assert space.duplicates == 1
+    assert space.size == 5
+    assert all(space.combo(idx)['fast_period'] < space.combo(idx)['slow_period'] for idx in space.grid())
+    # Sampling never returns pruned combinations
+    assert set(space.sobol(10, np.random.default_rng(0))) == set(space.grid())
+
+
+def test_search_strategies_must_implement_search():
+    class Incomplete(SearchStrategy):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
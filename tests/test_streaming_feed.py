@@ -0,0 +1,90 @@
+"""Tests for the streaming parquet data feed.
+
+Runs the example SMA strategy over the cached SPY data twice - once with the
+in-memory PandasData feed and once streamed from small parquet row groups in
+exactbars mode - and checks both runs end with the same portfolio value.
+"""
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import backtrader as bt
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.data_loaders.data_manager import DataManager
+from src.strategies.example_sma import SMAStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+START = datetime(2023, 2, 1, tzinfo=timezone.utc)
+END = datetime(2023, 11, 30, tzinfo=timezone.utc)
+
+
+def _run(cerebro, feed):
+    cerebro.broker.set_coc(True)
+    cerebro.broker.setcash(100000.0)
+    cerebro.broker.setcommission(commission=0.001)
+    cerebro.addstrategy(SMAStrategy, verbose_logging=False)
+    cerebro.adddata(feed, name='SPY')
+    cerebro.run()
+    return cerebro.broker.getvalue()
+
+
+def test_streaming_matches_in_memory(tmp_path):
+    df = pd.read_parquet(SPY_PATH)
+
+    manager = DataManager(daily_path=str(tmp_path), minute_path=str(tmp_path))
+    manager.ROW_GROUP_SIZE = 16  # force many row groups
+    manager.save_data('SPY', df, 'daily')
+
+    assert manager.ensure_cached('SPY', START, END, 'daily')
+
+    in_memory = df[(df.index >= START) & (df.index <= END)]
+    expected = _run(bt.Cerebro(), manager.create_backtrader_feed(in_memory, 'SPY'))
+
+    streamed = _run(
+        bt.Cerebro(preload=False, runonce=False, exactbars=1),
+        manager.create_streaming_feed('SPY', START, END)
+    )
+
+    assert streamed == expected
+
+
+def test_streaming_feed_prunes_row_groups(tmp_path):
+    df = pd.read_parquet(SPY_PATH)
+
+    manager = DataManager(daily_path=str(tmp_path), minute_path=str(tmp_path))
+    manager.ROW_GROUP_SIZE = 10
+    manager.save_data('SPY', df, 'daily')
+
+    feed = manager.create_streaming_feed(
+        'SPY',
+        datetime(2023, 6, 1, tzinfo=timezone.utc),
+        datetime(2023, 6, 30, tzinfo=timezone.utc)
+    )
+    feed.start()
+    try:
+        # June spans at most 3 of the 25 ten-row groups
+        assert len(feed._row_groups) <= 3
+    finally:
+        feed.stop()
+
+
+def test_streaming_backtest_fetches_no_minute_data(tmp_path, monkeypatch):
+    monkeypatch.setenv('ALPACA_API_KEY', 'test')
+    monkeypatch.setenv('ALPACA_SECRET_KEY', 'test')
+    from src.runners.backtest import BacktestRunner
+
+    runner = BacktestRunner()
+    manager = DataManager(daily_path=str(tmp_path), minute_path=str(tmp_path / 'minute'))
+    manager.save_data('SPY', pd.read_parquet(SPY_PATH), 'daily')
+    manager._fetch_from_alpaca = lambda *args: pytest.fail('nothing should be fetched')
+    runner.data_manager = manager
+
+    cerebro = bt.Cerebro(preload=False, runonce=False, exactbars=1)
+    runner._add_streaming_feeds(cerebro, 'SPY', START, END)
+    assert len(cerebro.datas) == 1
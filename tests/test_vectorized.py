@@ -0,0 +1,105 @@
+"""Tests for the vectorized grid evaluator."""
+import sys
+from pathlib import Path
+
+import backtrader as bt
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.optimization import (
+    crossovers, evaluate_batch, evaluate_vectorized, frame_to_arrays, moving_averages,
+)
+from src.strategies.base_strategy import BaseStrategy
+from src.strategies.example_sma import SMAStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+SETTINGS = {
+    'initial_cash': 100000.0,
+    'commission': 0.001,
+    'fixed_params': {'verbose_logging': False, 'indicator_cache': True},
+}
+
+
+@pytest.fixture(scope='module')
+def datas():
+    return [('SPY', frame_to_arrays(pd.read_parquet(SPY_PATH)))]
+
+
+class _CrossRecorder(bt.Strategy):
+    params = (('fast', 10), ('slow', 30))
+
+    def __init__(self):
+        fast = bt.indicators.SMA(self.data.close, period=self.p.fast)  # type: ignore[attr-defined]
+        slow = bt.indicators.SMA(self.data.close, period=self.p.slow)  # type: ignore[attr-defined]
+        self.cross = bt.indicators.CrossOver(fast, slow)  # type: ignore[arg-type]
+        self.values = []
+
+    def next(self):
+        self.values.append(self.cross[0])
+
+
+def test_crossovers_match_backtrader(datas):
+    close = datas[0][1][4]
+    periods = [(5, 20), (10, 30), (15, 50)]
+    up, down = crossovers(moving_averages(close, np.array([f for f, _ in periods])),
+                          moving_averages(close, np.array([s for _, s in periods])))
+
+    for row, (fast, slow) in enumerate(periods):
+        cerebro = bt.Cerebro(stdstats=False)
+        cerebro.adddata(bt.feeds.PandasData(dataname=pd.read_parquet(SPY_PATH)))
+        cerebro.addstrategy(_CrossRecorder, fast=fast, slow=slow)
+        expected = np.array(cerebro.run()[0].values)
+        signals = up[row].astype(int) - down[row].astype(int)
+        assert np.array_equal(signals[-len(expected):], expected)
+        assert not signals[:-len(expected)].any()
+
+
+def test_records_match_backtrader(datas):
+    # Wide stops: no stop is left working after a crossover exit, which the
+    # vectorized simulation does not model
+    combos = [
+        {'fast_period': fast, 'slow_period': slow, 'trailing_stop_percent': stop}
+        for fast in (5, 10, 20) for slow in (20, 30, 50) for stop in (0.1, 0.2) if fast < slow
+    ]
+    vectorized = evaluate_vectorized(SMAStrategy, combos, datas, chunk_size=7, **SETTINGS)
+    backtested = evaluate_batch(SMAStrategy, combos, datas, **SETTINGS)
+
+    assert [record['params'] for record in vectorized] == combos
+    for fast_record, record in zip(vectorized, backtested):
+        assert fast_record['final_value'] == pytest.approx(record['final_value'], rel=1e-9)
+        assert fast_record['max_drawdown'] == pytest.approx(record['max_drawdown'], rel=1e-9)
+        assert fast_record['exposure'] == record['exposure']
+        assert fast_record['total_trades'] == record['total_trades']
+        assert fast_record['won_trades'] == record['won_trades']
+        assert fast_record['pruned'] is None
+
+
+def test_strategies_without_array_signals(datas):
+    assert evaluate_vectorized(BaseStrategy, [{'trailing_stop_percent': 0.1}], datas, **SETTINGS) is None
+
+
+def test_checkpoint_resumes_with_new_bars(datas, tmp_path):
+    arrays = datas[0][1]
+    combos = [{'fast_period': fast, 'slow_period': 30, 'trailing_stop_percent': stop}
+              for fast in (5, 10, 20) for stop in (0.02, 0.1)]
+    checkpoint = tmp_path / 'state.npz'
+
+    def evaluate(bars):
+        return evaluate_vectorized(SMAStrategy, combos, [('SPY', bars)], chunk_size=4,
+                                   checkpoint=checkpoint, **SETTINGS)
+
+    full = evaluate_vectorized(SMAStrategy, combos, [('SPY', arrays)], **SETTINGS)
+    evaluate(arrays[:, :180])
+    assert evaluate(arrays[:, :220]) == evaluate_vectorized(SMAStrategy, combos, [('SPY', arrays[:, :220])],
+                                                            **SETTINGS)
+    assert evaluate(arrays) == full
+
+    # Earlier bars changed: full recompute instead of resuming
+    revised = arrays.copy()
+    revised[4, 100] *= 1.05
+    assert evaluate(revised) == evaluate_vectorized(SMAStrategy, combos, [('SPY', revised)], **SETTINGS)
@@ -0,0 +1,145 @@
+"""Tests for the distributed optimization work queue."""
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.optimization import ParallelOptimizer
+from src.optimization.store import params_key
+from src.optimization.work_queue import WorkQueue, run_worker
+from src.strategies.example_sma import SMAStrategy
+
+
+SPY_PATH = Path(__file__).parent.parent / 'data' / 'daily' / 'SPY.parquet'
+COMBOS = [
+    {'fast_period': fast, 'slow_period': slow}
+    for fast in (5, 10, 15) for slow in (20, 30)
+]
+
+
+def _load_frames(job):
+    return {ticker: pd.read_parquet(SPY_PATH) for ticker in job['data']['tickers']}
+
+
+def test_leases_expire_and_fail_after_max_attempts(tmp_path):
+    with WorkQueue(tmp_path / 'queue.db', lease_seconds=60.0, max_attempts=2) as queue:
+        queue.submit('job', {'strategy': ['m', 'C']})
+        assert queue.enqueue('job', COMBOS, batch_size=4) == 6
+        # Queued combinations are not queued twice
+        assert queue.enqueue('job', COMBOS, batch_size=4) == 0
+
+        first = queue.lease('a')
+        second = queue.lease('b')
+        assert first.batch_id != second.batch_id
+        assert queue.lease('c') is None
+
+        # A dead worker's lease expires and the batch goes to another worker
+        queue.lease_seconds = 0.0
+        queue.release(second, 'b')
+        assert queue.lease('c').batch_id == second.batch_id  # attempt 2
+        time.sleep(0.01)
+        assert queue.renew(second.batch_id, 'b') is False
+        assert queue.lease('d') is None  # attempts used up
+        assert queue.status('job') == {'leased': 1, 'failed': 1}
+        assert len(queue.failures('job')) == 1
+
+
+def test_failed_batches_are_requeued_by_a_rerun(tmp_path):
+    with WorkQueue(tmp_path / 'queue.db', lease_seconds=0.0, max_attempts=1) as queue:
+        queue.submit('job', {'strategy': ['m', 'C']})
+        queue.enqueue('job', COMBOS, batch_size=6)
+
+        # A worker whose data differs does not use up the batch's attempt
+        lease = queue.lease('stale')
+        queue.release(lease, 'stale', error='data mismatch on stale', attempt=False)
+        assert queue.lease('a').batch_id == lease.batch_id
+        time.sleep(0.01)
+        assert queue.lease('b') is None
+        assert queue.failures('job') == ['data mismatch on stale']
+
+        # Rerunning the optimization queues the failed combinations again
+        assert queue.enqueue('job', COMBOS, batch_size=6) == 6
+        assert queue.failures('job') == []
+        assert queue.status('job') == {'pending': 1}
+
+
+def test_workers_match_in_process_optimizer(tmp_path):
+    df = pd.read_parquet(SPY_PATH)
+    path = tmp_path / 'queue.db'
+    fixed_params = {'verbose_logging': False, 'indicator_cache': True}
+
+    with ParallelOptimizer(SMAStrategy, {'SPY': df}, 100000.0, 0.001,
+                           fixed_params=fixed_params, workers=1) as optimizer:
+        expected = {tuple(sorted(r['params'].items())): r for r in optimizer.evaluate(COMBOS)}
+        job_id = optimizer.fingerprint()
+
+        with WorkQueue(path) as queue:
+            queue.submit(job_id, {
+                'strategy': [SMAStrategy.__module__, SMAStrategy.__qualname__],
+                'settings': optimizer.settings,
+                'window': None,
+                'data': {'tickers': ['SPY']},
+            })
+            queue.enqueue(job_id, COMBOS, batch_size=2)
+
+            workers = [multiprocessing.Process(target=run_worker, args=(path, _load_frames),
+                                               kwargs={'poll_interval': 0.1, 'idle_timeout': 1.0})
+                       for _ in range(2)]
+            for worker in workers:
+                worker.start()
+            records = queue.wait(job_id, COMBOS, poll_interval=0.1, timeout=60.0)
+            for worker in workers:
+                worker.join()
+
+    assert len(records) == len(COMBOS)
+    for record in records:
+        assert record['final_value'] == expected[tuple(sorted(record['params'].items()))]['final_value']
+
+
+def test_runs_stopped_early_are_requeued(tmp_path):
+    with WorkQueue(tmp_path / 'queue.db') as queue:
+        queue.submit('job', {'strategy': ['m', 'C']})
+        queue.add('job', [{'params': COMBOS[0], 'final_value': 90000.0, 'pruned': 'drawdown'},
+                          {'params': COMBOS[1], 'final_value': 110000.0, 'pruned': None}])
+
+        # The stopped run is queued again and its partial result dropped, so
+        # waiting returns the new result rather than the stale one
+        assert queue.enqueue('job', COMBOS[:2], batch_size=2) == 1
+        assert list(queue.completed('job', include_pruned=True)) == [params_key(COMBOS[1])]
+
+
+def test_worker_processes_start_with_spawn(tmp_path, monkeypatch):
+    monkeypatch.setenv('ALPACA_API_KEY', 'test')
+    monkeypatch.setenv('ALPACA_SECRET_KEY', 'test')
+    from src.runners import optimize
+    from src.runners.optimize import OptimizationRunner, load_job_frames
+
+    runner = OptimizationRunner()
+    path = tmp_path / 'queue.db'
+    runner.optimize_config = {'queue_path': str(path), 'poll_interval': 0.1}
+    data = {'tickers': ['SPY'], 'start_date': '2023-01-03', 'end_date': '2023-12-29'}
+    frames = load_job_frames(runner.config_loader.get_data_paths(), {'data': data})
+
+    with ParallelOptimizer(SMAStrategy, frames, 100000.0, 0.001, workers=1) as optimizer:
+        job_id = optimizer.fingerprint()
+        with WorkQueue(path) as queue:
+            queue.submit(job_id, {
+                'strategy': [SMAStrategy.__module__, SMAStrategy.__qualname__],
+                'settings': optimizer.settings,
+                'window': None,
+                'data': data,
+            })
+            queue.enqueue(job_id, COMBOS, batch_size=1)
+
+    # The extra worker process pickles its data loader
+    monkeypatch.setattr(optimize, 'multiprocessing', multiprocessing.get_context('spawn'))
+    runner.run_worker(processes=2, idle_timeout=1.0)
+
+    with WorkQueue(path) as queue:
+        assert len(queue.completed(job_id, COMBOS)) == len(COMBOS)
+        assert queue.status(job_id) == {'done': len(COMBOS)}